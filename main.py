@@ -1,4 +1,6 @@
+import argparse
 import configparser
+import os
 from datetime import datetime
 
 from src.numerical_framework.backward_induction.backward_induction import backward_induction_over_user_types
@@ -8,20 +10,24 @@ from src.numerical_framework.helpers.framework_creators import SearchMaximizeRev
     get_and_validate_backward_induction_input_from_config_ini, \
     get_and_validate_single_max_revenue_input_from_config_ini, \
     get_and_validate_differential_evolution_input_from_config_ini
-from src.numerical_framework.helpers.output_files_helper import create_or_get_file, \
+from src.numerical_framework.helpers.output_files_helper import create_or_get_file, export_result_database, \
     write_header_line_overview_csv_backward_induction, \
     write_header_line_overview_csv_differential_evolution, write_header_line_overview_csv_single_max_revenue, \
     write_header_line_overview_csv_search_max_revenue
+from src.numerical_framework.helpers.sharding_helper import get_shard_from_environment, validate_shard, \
+    get_shard_suffix, merge_shard_files
 from src.numerical_framework.search_maximize_revenue.search_maximize_revenue import search_maximize_revenue
 from src.numerical_framework.single_maximize_revenue.single_maximize_revenue import single_maximize_revenue
 
 
-def backward_induction(config):
+def backward_induction(config, shard_index=0, shard_count=1):
     backward_induction_creator = get_and_validate_backward_induction_input_from_config_ini(config)
+    set_shard(backward_induction_creator, shard_index, shard_count)
 
     start_time = datetime.now()
     main_file_name = start_time.strftime(
-        "%m.%d.%Y_%H.%M.%S") + "_backward_induction_" + backward_induction_creator.price_strategy_type + ".csv"
+        "%m.%d.%Y_%H.%M.%S") + "_backward_induction_" + backward_induction_creator.price_strategy_type + \
+                     get_shard_suffix(shard_index, shard_count) + ".csv"
     path_main_file = create_or_get_file(backward_induction_creator.path_to_folder, main_file_name)
     write_header_line_overview_csv_backward_induction(backward_induction_creator.n_max, path_main_file)
 
@@ -29,13 +35,15 @@ def backward_induction(config):
     backward_induction_over_user_types(backward_induction_creator)
 
 
-def differential_evolution(config):
+def differential_evolution(config, shard_index=0, shard_count=1):
     differential_evolution_creator = get_and_validate_differential_evolution_input_from_config_ini(config)
+    set_shard(differential_evolution_creator, shard_index, shard_count)
 
     # create main file
     start_time = datetime.now()
     main_file_name_without_csv = start_time.strftime(
-        "%m.%d.%Y_%H.%M.%S") + "_" + f"{differential_evolution_creator.price_strategy_type}"
+        "%m.%d.%Y_%H.%M.%S") + "_" + f"{differential_evolution_creator.price_strategy_type}" + get_shard_suffix(
+        shard_index, shard_count)
     main_file_name = main_file_name_without_csv + ".csv"
     path_main_file = create_or_get_file(differential_evolution_creator.path_to_folder, main_file_name)
     write_header_line_overview_csv_differential_evolution(differential_evolution_creator.n_max, path_main_file)
@@ -46,6 +54,47 @@ def differential_evolution(config):
     differential_evolution_maximize_revenue(differential_evolution_creator)
 
 
+def set_shard(creator, shard_index, shard_count):
+    error_message = validate_shard(shard_index, shard_count)
+    if error_message is not None:
+        raise Exception("The shard contains the following input error: \n    - " + error_message)
+    creator.shard_index = shard_index
+    creator.shard_count = shard_count
+    # every shard only writes its main file, the results of all shards are merged with --merge afterwards
+    if shard_count > 1:
+        creator.files_results_are_written_to = None
+        creator.result_database = None
+
+
+def merge_shards(config, shard_files):
+    operation_type = config.get('MAIN', 'type')
+    if operation_type == 'BACKWARD_INDUCTION':
+        creator = get_and_validate_backward_induction_input_from_config_ini(config)
+    elif operation_type == 'DIFFERENTIAL_EVOLUTION':
+        creator = get_and_validate_differential_evolution_input_from_config_ini(config)
+    else:
+        raise Exception('only results of BACKWARD_INDUCTION or DIFFERENTIAL_EVOLUTION can be merged')
+    number_of_results = merge_shard_files(shard_files, creator.path_to_folder, creator.files_results_are_written_to)
+    print(f"{number_of_results} results of {len(shard_files)} shards merged")
+
+
+def export_results(config, file_name):
+    operation_type = config.get('MAIN', 'type')
+    if operation_type == 'BACKWARD_INDUCTION':
+        creator = get_and_validate_backward_induction_input_from_config_ini(config)
+    elif operation_type == 'DIFFERENTIAL_EVOLUTION':
+        creator = get_and_validate_differential_evolution_input_from_config_ini(config)
+    elif operation_type == 'SINGLE_MAX_REVENUE':
+        creator = get_and_validate_single_max_revenue_input_from_config_ini(config)
+    else:
+        raise Exception('only results of BACKWARD_INDUCTION, DIFFERENTIAL_EVOLUTION or SINGLE_MAX_REVENUE can be exported')
+    if creator.result_database is None:
+        raise Exception('result_database in MAIN in config.ini must be set to export results')
+    number_of_results = export_result_database(os.path.join(creator.path_to_folder, creator.result_database),
+                                               operation_type, creator.n_max, file_name)
+    print(f"{number_of_results} results exported to {file_name}")
+
+
 def single_max_revenue(config):
     single_maximize_revenue_creator = get_and_validate_single_max_revenue_input_from_config_ini(config)
 
@@ -76,17 +125,34 @@ def search_max_revenue(config):
 
 
 if __name__ == '__main__':
+    # the shard is read from the SLURM job array if not given, e.g., SLURM_ARRAY_TASK_ID=1 SLURM_ARRAY_TASK_COUNT=4
+    environment_shard_index, environment_shard_count = get_shard_from_environment()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shard-index', type=int, default=environment_shard_index,
+                        help='index of the shard of the settings or runs evaluated by this process')
+    parser.add_argument('--shard-count', type=int, default=environment_shard_count,
+                        help='number of shards the settings or runs are split into')
+    parser.add_argument('--merge', nargs='+', metavar='SHARD_FILE',
+                        help='main .csv files of all shards merged into the files results are written to')
+    parser.add_argument('--export-results', metavar='CSV_FILE',
+                        help='.csv file all results of the result_database are exported to')
+    arguments = parser.parse_args()
+
     try:
         config = configparser.RawConfigParser()
         config.read('config.ini')
         operation_type = config.get('MAIN', 'type')
-        if operation_type == 'BACKWARD_INDUCTION':
+        if arguments.merge is not None:
+            merge_shards(config, arguments.merge)
+        elif arguments.export_results is not None:
+            export_results(config, arguments.export_results)
+        elif operation_type == 'BACKWARD_INDUCTION':
             print("Backward induction started")
-            backward_induction(config)
+            backward_induction(config, arguments.shard_index, arguments.shard_count)
             print("Backward induction finished")
         elif operation_type == 'DIFFERENTIAL_EVOLUTION':
             print("Differential evolution started")
-            differential_evolution(config)
+            differential_evolution(config, arguments.shard_index, arguments.shard_count)
             print("Differential evolution finished")
         elif operation_type == 'SINGLE_MAX_REVENUE':
             print("Single max revenue started")
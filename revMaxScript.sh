@@ -1,5 +1,6 @@
 #!/bin/bash
 #SBATCH --job-name=RevenueMaximizer
+# --array=0-<n-1> splits the run grid into n shards, merge with python main.py --merge (see README.md)
 #SBATCH --array=0-0
 #SBATCH -N 1
 #SBATCH --cpus-per-task=20
@@ -51,6 +51,47 @@ class Game(object):
         self.expected_publisher_revenue = 0
         self.expected_user_welfare = 0
 
+    def reset(self, product_information=None, user_type=None, n_upgrade=None):
+        """
+        Re-targets the game to a new user type and product information and resets all results in place
+
+        The user states are kept, i.e., n_max and price_strategy_type cannot be changed.
+
+        Parameters
+        ----------
+        product_information : ProductInformation, optional
+            new prices over time and product qualities, default: None (unchanged)
+        user_type : UserType, optional
+            new type of the user who is acting optimally, default: None (unchanged)
+        n_upgrade : int, optional
+            new timestep of upgrade release, default: None (unchanged)
+        """
+        if product_information is not None:
+            self.product_information = product_information
+        if user_type is not None:
+            self.user_type = user_type
+        if n_upgrade is not None:
+            self.n_upgrade = n_upgrade
+        self.expected_publisher_revenue = 0
+        self.expected_user_welfare = 0
+        for user_states in self.user_states:
+            for user_state in user_states:
+                user_state.reset()
+
+    def reset_forward_pass(self):
+        """
+        Resets the probabilities states are reached, revenue and welfare, the results of the backward induction are kept
+        """
+        self.expected_publisher_revenue = 0
+        self.expected_user_welfare = 0
+        for user_states in self.user_states:
+            for user_state in user_states:
+                user_state.probability_state_is_reached = 0
+
+
+# games reused by get_game_from_pool(), key: (n_max, price_strategy_type), every process has its own pool
+GAME_POOL = {}
+
 
 def create_game(product_information, user_type, n_max, n_upgrade, price_strategy_type):
     """
@@ -97,3 +138,38 @@ def add_all_user_states(game):
     game.user_states = [None] * game.n_max
     for i in range(0, game.n_max):
         game.user_states[i] = create_all_possible_user_states(game.price_strategy_type)
+
+
+def get_game_from_pool(product_information, user_type, n_max, n_upgrade, price_strategy_type):
+    """
+    Returns a game with all possible user states, reusing the game of the last call with the same n_max and price
+    strategy type
+
+    The game is reset in place instead of creating all user states again, i.e., the results of a game from the pool
+    have to be read before the next game with the same n_max and price strategy type is requested.
+
+    Parameters
+    ----------
+    product_information : ProductInformation
+        prices over time and product qualities
+    user_type : UserType
+        type of the user who is acting optimally
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    n_upgrade : int
+        timestep of upgrade release
+    price_strategy_type : PriceStrategyType
+        type of price strategy chosen by the publisher
+
+    Returns
+    -------
+    Game
+        contains all important information to play the game, especially all possible user states
+    """
+    game = GAME_POOL.get((n_max, price_strategy_type))
+    if game is None:
+        game = create_game(product_information, user_type, n_max, n_upgrade, price_strategy_type)
+        GAME_POOL[(n_max, price_strategy_type)] = game
+    else:
+        game.reset(product_information, user_type, n_upgrade)
+    return game
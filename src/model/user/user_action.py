@@ -13,7 +13,13 @@ class UserAction(object):
         1 if subscribe, else 0
     buy_action : BuyAction
         see BuyAction
+    code : int
+        integer encoding of the action, see get_user_action_code()
+    preference_rank : int
+        the preferred of two actions delivering equal utility has the higher rank, see
+        get_preferred_action_if_deliver_equal_utility()
     """
+    __slots__ = ('subscribe_action', 'buy_action', 'code', 'preference_rank')
 
     def __init__(self, subscribe_action, buy_action):
         """
@@ -26,6 +32,8 @@ class UserAction(object):
         """
         self.subscribe_action = subscribe_action
         self.buy_action = BuyAction(buy_action[0], buy_action[1])
+        self.code = get_user_action_code(subscribe_action, buy_action[0], buy_action[1])
+        self.preference_rank = get_preference_rank(subscribe_action, buy_action[0], buy_action[1])
 
 
 class BuyAction(object):
@@ -41,6 +49,7 @@ class BuyAction(object):
     upgrade : int
         1 if buy upgrade, else 0
     """
+    __slots__ = ('base_product', 'upgrade')
 
     def __init__(self, base_product, upgrade):
         """
@@ -55,6 +64,51 @@ class BuyAction(object):
         self.upgrade = upgrade
 
 
+def get_user_action_code(subscribe_action, buy_base_product, buy_upgrade):
+    """
+    Encodes a user action as integer (bitmask of subscribe action, buy base product and buy upgrade)
+
+    Parameters
+    ----------
+    subscribe_action : int
+        1 if subscribe, else 0
+    buy_base_product : int
+        1 if buy base product, else 0
+    buy_upgrade : int
+        1 if buy upgrade, else 0
+
+    Returns
+    -------
+    int
+        code of the user action between 0 and 7
+    """
+    return subscribe_action << 2 | buy_base_product << 1 | buy_upgrade
+
+
+def get_preference_rank(subscribe_action, buy_base_product, buy_upgrade):
+    """
+    Ranks a user action with the rules of get_preferred_action_if_deliver_equal_utility()
+
+    I.e., more actions are preferred, then more buy actions, then buying the base product.
+
+    Parameters
+    ----------
+    subscribe_action : int
+        1 if subscribe, else 0
+    buy_base_product : int
+        1 if buy base product, else 0
+    buy_upgrade : int
+        1 if buy upgrade, else 0
+
+    Returns
+    -------
+    int
+        rank of the user action, different for all user actions
+    """
+    return 100 * (subscribe_action + buy_base_product + buy_upgrade) + 10 * (buy_base_product + buy_upgrade) + \
+        buy_base_product
+
+
 def create_all_possible_user_actions(price_strategy_type):
     """
     Creates the 8 possible user actions
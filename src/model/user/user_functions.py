@@ -1,4 +1,15 @@
-from src.model.user.user_state import get_max_of_buying_and_ownership, Ownership
+import math
+from functools import lru_cache
+
+from src.model.user.user_action import create_all_possible_user_actions
+from src.model.user.user_state import get_max_of_buying_and_ownership, OWNERSHIPS, create_all_possible_user_states
+from src.model.user.user_type import UserType
+
+# after n_max, the first subscribed timesteps are summed one by one, the remaining ones with a geometric series
+NUMBER_OF_SUBSCRIPTION_TIMESTEPS_SUMMED_ONE_BY_ONE = 32
+# subscription tails cached, the valuations and prices are continuous, hence only the most recent ones are kept (the
+# states of a solved game share the same few subscription tails)
+SUBSCRIPTION_TAIL_CACHE_SIZE = 4096
 
 
 def get_immediate_utility(timestep, n_upgrade, user_action, user_type, user_state, product_information):
@@ -56,7 +67,7 @@ def get_normalized_immediate_reward(timestep, n_upgrade, user_action, user_type,
         immediate reward
     """
     reward_if_subscribed = user_action.subscribe_action * get_realized_quality(timestep, n_upgrade,
-                                                                               Ownership(1, 1),
+                                                                               OWNERSHIPS[1][1],
                                                                                user_type.quality_decay_factor,
                                                                                product_information.product_quality)
 
@@ -203,12 +214,10 @@ def get_expected_utility_and_payment_in_future(timestep, current_user_state, use
         sum_of_expected_utilities = 0
         sum_of_expected_payments = 0
         next_user_states = game.user_states[timestep]
-        for next_user_state in next_user_states:
-            transition_probability = get_transition_probability(timestep, game.n_upgrade, next_user_state,
-                                                                current_user_state, user_action,
-                                                                game.user_type,
-                                                                game.product_information.product_quality.upgrade,
-                                                                is_calculating_future_expectancy=True)
+        # only successors with a transition probability > 0 are considered
+        for next_user_state_index, transition_probability in get_successor_states(timestep + 1, current_user_state,
+                                                                                   user_action, game):
+            next_user_state = next_user_states[next_user_state_index]
             sum_of_expected_utilities += transition_probability * next_user_state.expected_utility
             sum_of_expected_payments += transition_probability * (
                     next_user_state.expected_payment_in_future + next_user_state.immediate_payment)
@@ -274,7 +283,7 @@ def get_normalized_immediate_utility_with_ownership(timestep, n_upgrade, user_st
 
 def get_expected_future_utility_and_payment_with_subscription(game, current_user_state):
     """
-    Calculates the expected future utility and payment with subscription
+    Calculates the expected future utility and payment with subscription and no ownership
 
     Parameters
     ----------
@@ -290,23 +299,10 @@ def get_expected_future_utility_and_payment_with_subscription(game, current_user
     """
     if current_user_state.demand == 0:
         return 0, 0
-    future_utility = 0
-    future_payment = 0
-    immediate_utility = 1
-    timestep = game.n_max + 1
-    while immediate_utility > 0:
-        quality_factor_base_product = game.user_type.quality_decay_factor ** (timestep - 1)
-        quality_factor_upgrade = game.user_type.quality_decay_factor ** (timestep - game.n_upgrade)
-        quality_factor = quality_factor_base_product * game.product_information.product_quality.base_product + \
-                         quality_factor_upgrade * game.product_information.product_quality.upgrade
-        immediate_utility = quality_factor * game.user_type.valuation - game.product_information.price_subscription[
-            game.n_max - 1]
-        if immediate_utility >= 0:
-            probability_reached = game.user_type.engagement_factor ** (timestep - game.n_max)
-            future_utility += immediate_utility * probability_reached
-            future_payment += game.product_information.price_subscription[game.n_max - 1] * probability_reached
-        timestep += 1
-    return future_utility, future_payment
+    return get_expected_utility_and_payment_of_subscription_tail(
+        game.user_type.valuation, game.user_type.quality_decay_factor, game.user_type.engagement_factor,
+        game.product_information.price_subscription[game.n_max - 1], game.n_max, game.n_upgrade,
+        game.product_information.product_quality.base_product, game.product_information.product_quality.upgrade)
 
 
 def get_expected_future_utility_and_payment_for_upgrade_with_subscription(game, current_user_state):
@@ -327,20 +323,111 @@ def get_expected_future_utility_and_payment_for_upgrade_with_subscription(game,
     """
     if current_user_state.demand == 0:
         return 0, 0
+    # the base product is owned, the subscription only adds the quality of the upgrade
+    return get_expected_utility_and_payment_of_subscription_tail(
+        game.user_type.valuation, game.user_type.quality_decay_factor, game.user_type.engagement_factor,
+        game.product_information.price_subscription[game.n_max - 1], game.n_max, game.n_upgrade, 0,
+        game.product_information.product_quality.upgrade)
+
+
+@lru_cache(maxsize=SUBSCRIPTION_TAIL_CACHE_SIZE)
+def get_expected_utility_and_payment_of_subscription_tail(valuation, quality_decay_factor, engagement_factor,
+                                                          subscription_price, n_max, n_upgrade, quality_base_product,
+                                                          quality_upgrade):
+    """
+    Calculates the expected utility and payment of subscribing after n_max as long as the immediate utility is positive
+
+    The immediate utility in timestep j > n_max is
+    u_j = (q^(j-1) * quality_base_product + q^(j-n_upgrade) * quality_upgrade) * valuation - subscription_price
+    and is weighted with e^(j-n_max). Because u_j is decreasing, the last timestep with positive utility is solved with
+    the logarithm of subscription_price / (u_(n_max+1) + subscription_price) and the sums are geometric series.
+    A timestep with an immediate utility of exactly 0 is still subscribed, but ends the subscription. At most
+    NUMBER_OF_SUBSCRIPTION_TIMESTEPS_SUMMED_ONE_BY_ONE timesteps are summed one by one, so the calculation time does
+    not depend on how long the subscription stays attractive. The last SUBSCRIPTION_TAIL_CACHE_SIZE results are
+    cached.
+
+    Parameters
+    ----------
+    valuation : float
+        in thesis: v, valuation of the user
+    quality_decay_factor : float
+        in thesis: q, quality decay factor of the user
+    engagement_factor : float
+        in thesis: e, engagement factor of the user
+    subscription_price : float
+        subscription price in timestep n_max, which is also paid after n_max
+    n_max : int
+        in thesis: N, the last timestep
+    n_upgrade : int
+        in thesis: m, timestep of upgrade release
+    quality_base_product : float
+        quality of base product (0 if the base product is already owned)
+    quality_upgrade : float
+        quality of upgrade
+
+    Returns
+    -------
+    float, float
+        expected future utility, expected future payment
+    """
+
+    def get_immediate_utility_with_subscription(timestep):
+        quality_factor_base_product = quality_decay_factor ** (timestep - 1)
+        quality_factor_upgrade = quality_decay_factor ** (timestep - n_upgrade)
+        quality_factor = quality_factor_base_product * quality_base_product + quality_factor_upgrade * quality_upgrade
+        return quality_factor * valuation - subscription_price
+
+    def get_geometric_sum(ratio, number_of_summands):
+        # sum of ratio^i for i in 0, ..., number_of_summands - 1
+        if number_of_summands == math.inf:
+            return 1 / (1 - ratio) if ratio < 1 else math.inf
+        if ratio == 1:
+            return number_of_summands
+        return (1 - ratio ** number_of_summands) / (1 - ratio)
+
+    first_immediate_utility = get_immediate_utility_with_subscription(n_max + 1)
+    if first_immediate_utility <= 0:
+        number_of_subscribed_timesteps = 0
+    elif subscription_price <= 0 or quality_decay_factor >= 1:
+        # the immediate utility never drops to 0, the user subscribes forever
+        number_of_subscribed_timesteps = math.inf
+    else:
+        # u_(n_max+k) > 0 <=> q^(k-1) > subscription_price / (u_(n_max+1) + subscription_price)
+        ratio_price_to_valuation = subscription_price / (first_immediate_utility + subscription_price)
+        number_of_subscribed_timesteps = max(1, math.ceil(math.log(ratio_price_to_valuation) /
+                                                          math.log(quality_decay_factor)))
+        # correct rounding errors of the logarithm with the exact immediate utility
+        while get_immediate_utility_with_subscription(n_max + number_of_subscribed_timesteps + 1) > 0:
+            number_of_subscribed_timesteps += 1
+        while number_of_subscribed_timesteps > 1 and \
+                get_immediate_utility_with_subscription(n_max + number_of_subscribed_timesteps) <= 0:
+            number_of_subscribed_timesteps -= 1
+
+    # the first timesteps are summed one by one as in the thesis, the remaining ones as geometric series
+    number_of_timesteps_summed_one_by_one = min(number_of_subscribed_timesteps,
+                                                NUMBER_OF_SUBSCRIPTION_TIMESTEPS_SUMMED_ONE_BY_ONE)
     future_utility = 0
     future_payment = 0
-    immediate_utility = 1
-    timestep = game.n_max + 1
-    while immediate_utility > 0:
-        quality_factor_upgrade = game.user_type.quality_decay_factor ** (timestep - game.n_upgrade)
-        quality_factor = quality_factor_upgrade * game.product_information.product_quality.upgrade
-        immediate_utility = quality_factor * game.user_type.valuation - game.product_information.price_subscription[
-            game.n_max - 1]
-        if immediate_utility >= 0:
-            probability_reached = game.user_type.engagement_factor ** (timestep - game.n_max)
-            future_utility += immediate_utility * probability_reached
-            future_payment += game.product_information.price_subscription[game.n_max - 1] * probability_reached
-        timestep += 1
+    for timestep in range(n_max + 1, n_max + number_of_timesteps_summed_one_by_one + 1):
+        probability_reached = engagement_factor ** (timestep - n_max)
+        future_utility += get_immediate_utility_with_subscription(timestep) * probability_reached
+        future_payment += subscription_price * probability_reached
+    number_of_remaining_timesteps = number_of_subscribed_timesteps - number_of_timesteps_summed_one_by_one
+    if number_of_remaining_timesteps > 0:
+        first_remaining_timestep = n_max + number_of_timesteps_summed_one_by_one + 1
+        probability_reached = engagement_factor ** (first_remaining_timestep - n_max)
+        valuation_in_first_remaining_timestep = \
+            get_immediate_utility_with_subscription(first_remaining_timestep) + subscription_price
+        future_utility += valuation_in_first_remaining_timestep * probability_reached * get_geometric_sum(
+            engagement_factor * quality_decay_factor, number_of_remaining_timesteps)
+        if subscription_price != 0:
+            payment_of_remaining_timesteps = subscription_price * probability_reached * get_geometric_sum(
+                engagement_factor, number_of_remaining_timesteps)
+            future_utility -= payment_of_remaining_timesteps
+            future_payment += payment_of_remaining_timesteps
+    if number_of_subscribed_timesteps != math.inf and \
+            get_immediate_utility_with_subscription(n_max + number_of_subscribed_timesteps + 1) == 0:
+        future_payment += subscription_price * engagement_factor ** (number_of_subscribed_timesteps + 1)
     return future_utility, future_payment
 
 
@@ -363,27 +450,9 @@ def get_preferred_action_if_deliver_equal_utility(first_action, second_action):
     float
         transition probability
     """
-    first_action_total_actions = first_action.subscribe_action + first_action.buy_action.base_product + \
-                                 first_action.buy_action.upgrade
-    second_action_total_actions = second_action.subscribe_action + second_action.buy_action.base_product + \
-                                  second_action.buy_action.upgrade
-    first_action_total_buy_actions = first_action.buy_action.base_product + first_action.buy_action.upgrade
-    second_action_total_buy_actions = second_action.buy_action.base_product + second_action.buy_action.upgrade
-
-    if first_action_total_actions < second_action_total_actions:
-        return second_action
-    elif second_action_total_actions < first_action_total_actions:
+    # the ranks are precomputed with these rules, see get_preference_rank()
+    if first_action.preference_rank > second_action.preference_rank:
         return first_action
-    else:
-        if first_action_total_buy_actions < second_action_total_buy_actions:
-            return second_action
-        elif second_action_total_buy_actions < first_action_total_buy_actions:
-            return first_action
-        else:
-            if first_action.buy_action.base_product < second_action.buy_action.base_product:
-                return second_action
-            elif second_action.buy_action.base_product < first_action.buy_action.base_product:
-                return first_action
     # fallback if actions are the same, i.e., first_action is not preferred and second_action is returned
     return second_action
 
@@ -457,3 +526,111 @@ def get_transition_probability(timestep, n_upgrade, next_user_state, current_use
                 elif next_user_state.demand == 0:  # and current_user_state.demand == 1
                     return 0
     return 0
+
+
+@lru_cache(maxsize=None)
+def get_transition_table(engagement_factor, n_upgrade, quality_upgrade, price_strategy_type):
+    """
+    Precomputes the successor states with a transition probability > 0 for every user state and user action
+
+    The transition probabilities only depend on the timestep through the upgrade release, i.e., the successors are
+    calculated once for the transition into n_upgrade and once for all other timesteps (see
+    get_transition_probability()). At most two successors have a transition probability > 0.
+
+    Parameters
+    ----------
+    engagement_factor : float
+        engagement factor of user type
+    n_upgrade : int
+        in thesis: m, timestep of upgrade release
+    quality_upgrade : float
+        quality of upgrade
+    price_strategy_type : PriceStrategyType
+        pricing strategy chosen by the publisher
+
+    Returns
+    -------
+    dict
+        key: (is next timestep n_upgrade, code of user state, code of user action), value: tuple of (index of next user
+        state, transition probability)
+    """
+    user_states = create_all_possible_user_states(price_strategy_type)
+    user_actions = create_all_possible_user_actions(price_strategy_type)
+    user_type = UserType(None, engagement_factor, None, None)
+
+    transition_table = {}
+    for is_upgrade_release in [True, False]:
+        next_timestep = n_upgrade if is_upgrade_release else n_upgrade + 1
+        for current_user_state in user_states:
+            for user_action in user_actions:
+                successor_states = []
+                for next_user_state_index, next_user_state in enumerate(user_states):
+                    transition_probability = get_transition_probability(next_timestep, n_upgrade, next_user_state,
+                                                                        current_user_state, user_action, user_type,
+                                                                        quality_upgrade)
+                    if transition_probability > 0:
+                        successor_states.append((next_user_state_index, transition_probability))
+                transition_table[(is_upgrade_release, current_user_state.code, user_action.code)] = tuple(
+                    successor_states)
+    return transition_table
+
+
+def get_successor_states(next_timestep, current_user_state, user_action, game):
+    """
+    Finds the successor states with a transition probability > 0 (see get_transition_table())
+
+    Parameters
+    ----------
+    next_timestep : int
+        timestep of the successor states
+    current_user_state : UserState
+        state from which the transition starts
+    user_action : UserAction
+        action played in current_user_state
+    game : Game
+        collecting all information (i.e., states, best actions etc.)
+
+    Returns
+    -------
+    tuple
+        tuple of (index of next user state in game.user_states[next_timestep - 1], transition probability)
+    """
+    transition_table = get_transition_table(game.user_type.engagement_factor, game.n_upgrade,
+                                            game.product_information.product_quality.upgrade,
+                                            game.price_strategy_type)
+    return transition_table[(next_timestep == game.n_upgrade, current_user_state.code, user_action.code)]
+
+
+@lru_cache(maxsize=None)
+def get_allowed_user_actions(price_strategy_type, is_upgrade_released):
+    """
+    Precomputes the user actions considered in the backward induction for every user state
+
+    Actions which are not allowed or never optimal are skipped, i.e., buying the upgrade without owning or buying the
+    base product, subscribing if base product and upgrade are owned, buying the upgrade before it is released and
+    buying an owned product.
+
+    Parameters
+    ----------
+    price_strategy_type : PriceStrategyType
+        pricing strategy chosen by the publisher
+    is_upgrade_released : bool
+        True if the timestep is n_upgrade or later
+
+    Returns
+    -------
+    dict
+        key: code of user state, value: tuple of user actions in the order of create_all_possible_user_actions()
+    """
+    allowed_user_actions = {}
+    for user_state in create_all_possible_user_states(price_strategy_type):
+        ownership = user_state.ownership
+        allowed_user_actions[user_state.code] = tuple(
+            user_action for user_action in create_all_possible_user_actions(price_strategy_type)
+            if not (ownership.base_product == 0 and user_action.buy_action.base_product == 0 and
+                    user_action.buy_action.upgrade == 1) and
+            not (ownership.base_product == 1 and ownership.upgrade == 1 and user_action.subscribe_action == 1) and
+            not (user_action.buy_action.upgrade == 1 and not is_upgrade_released) and
+            not (user_action.buy_action.upgrade == 1 and ownership.upgrade == 1) and
+            not (user_action.buy_action.base_product == 1 and ownership.base_product == 1))
+    return allowed_user_actions
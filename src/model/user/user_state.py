@@ -34,7 +34,12 @@ class UserState(object):
         expected utility in future timesteps if user plays best_action
     expected_utility : float
         expected utility (in timestep itself and future timestep) if user plays best_action
+    code : int
+        integer encoding of demand and ownership, see get_user_state_code()
     """
+    __slots__ = ('demand', 'ownership', 'code', 'probability_state_is_reached', 'best_action',
+                 'normalized_immediate_reward', 'immediate_payment', 'immediate_utility', 'expected_payment_in_future',
+                 'expected_utility_in_future', 'expected_utility')
 
     def __init__(self, demand, ownership):
         """
@@ -46,9 +51,16 @@ class UserState(object):
             First element: base product, second element: upgrade. 1 if product is bought, else 0. Creates Ownership.
         """
         self.demand = demand
-        self.ownership = Ownership(ownership[0], ownership[1])
+        self.ownership = OWNERSHIPS[ownership[0]][ownership[1]]
+        self.code = get_user_state_code(demand, ownership[0], ownership[1])
+        self.reset()
+
+    def reset(self):
+        """
+        Resets all results of the backward induction and forward pass, demand and ownership are kept
+        """
         self.probability_state_is_reached = 0
-        self.best_action = UserAction(0, [0, 0])
+        self.best_action = NO_ACTION
         self.normalized_immediate_reward = 0
         self.immediate_payment = 0
         self.immediate_utility = 0
@@ -70,6 +82,7 @@ class Ownership(object):
     upgrade : int
         1 if user owns (= has bought) upgrade, else 0
     """
+    __slots__ = ('base_product', 'upgrade')
 
     def __init__(self, base_product, upgrade):
         """
@@ -85,6 +98,33 @@ class Ownership(object):
         self.upgrade = upgrade
 
 
+# ownerships are never changed, hence all user states and actions share these objects, index: [base product][upgrade]
+OWNERSHIPS = [[Ownership(0, 0), Ownership(0, 1)], [Ownership(1, 0), Ownership(1, 1)]]
+# default best action of a user state before the backward induction
+NO_ACTION = UserAction(0, [0, 0])
+
+
+def get_user_state_code(demand, owns_base_product, owns_upgrade):
+    """
+    Encodes a user state as integer (bitmask of demand and ownership of base product and upgrade)
+
+    Parameters
+    ----------
+    demand : int
+        0 if user has no demand, 1 if user has demand
+    owns_base_product : int
+        1 if user owns base product, else 0
+    owns_upgrade : int
+        1 if user owns upgrade, else 0
+
+    Returns
+    -------
+    int
+        code of the user state between 0 and 7
+    """
+    return demand << 2 | owns_base_product << 1 | owns_upgrade
+
+
 def get_max_of_buying_and_ownership(buy_action, ownership):
     """
     Finds the maximum of newly bought and already owned base_product and upgrade
@@ -101,9 +141,9 @@ def get_max_of_buying_and_ownership(buy_action, ownership):
     Returns
     -------
     Ownership
-        newly created Ownership with the max values of buy_action and ownership
+        shared Ownership with the max values of buy_action and ownership (see OWNERSHIPS)
     """
-    return Ownership(max(buy_action.base_product, ownership.base_product), max(buy_action.upgrade, ownership.upgrade))
+    return OWNERSHIPS[buy_action.base_product | ownership.base_product][buy_action.upgrade | ownership.upgrade]
 
 
 def create_all_possible_user_states(price_strategy_type):
@@ -1,3 +1,4 @@
+import numpy as np
 from scipy.stats import truncnorm
 
 
@@ -42,6 +43,50 @@ class UserType(object):
         self.valuation = valuation
 
 
+class UserTypePopulation(object):
+    """
+    A class used to represent all user types of a game (except arrival time) and their probabilities
+
+    The population does not depend on the prices, hence it is created once and reused for every evaluation.
+
+    ...
+
+    Attributes
+    ----------
+    valuations : list[float]
+        valuation of every user type
+    quality_decay_factors : list[float]
+        quality decay factor of every user type
+    engagement_factors : list[float]
+        engagement factor of every user type
+    probabilities : ndarray
+        shape (user types, n_max), probability of user type and arrival time (including valuation weight)
+    total_valuation_weight : float
+        sum of all valuation weights, only used for execution testing
+    """
+
+    def __init__(self, valuations, quality_decay_factors, engagement_factors, probabilities, total_valuation_weight):
+        """
+        Parameters
+        ----------
+        valuations : list[float]
+            valuation of every user type
+        quality_decay_factors : list[float]
+            quality decay factor of every user type
+        engagement_factors : list[float]
+            engagement factor of every user type
+        probabilities : ndarray
+            shape (user types, n_max), probability of user type and arrival time (including valuation weight)
+        total_valuation_weight : float
+            sum of all valuation weights, only used for execution testing
+        """
+        self.valuations = valuations
+        self.quality_decay_factors = quality_decay_factors
+        self.engagement_factors = engagement_factors
+        self.probabilities = probabilities
+        self.total_valuation_weight = total_valuation_weight
+
+
 def get_probability_user_type(user_type, creator, single_arrivals_in_first_timestep,
                               single_probability_of_second_quality_decay_element,
                               single_engagement_factor_short_term_user):
@@ -198,3 +243,135 @@ def get_truncated_normal(mean, sd, low, upp):
     """
     return truncnorm(
         (low - mean) / sd, (upp - mean) / sd, loc=mean, scale=sd)
+
+
+def get_user_types_of_population(creator, single_number_of_user_valuations, single_arrivals_in_first_timestep,
+                                 single_probability_of_second_quality_decay_element,
+                                 single_engagement_factor_short_term_user, single_standard_deviation_valuation):
+    """
+    Creates all user types of the game (except arrival time) and their probabilities for every arrival time
+
+    The user types are ordered as in the loops over valuations, quality decay factors and engagement factors of the
+    backward induction and differential evolution.
+
+    Parameters
+    ----------
+    creator: AbstractGameCreator
+        creator defined through config.ini
+
+    single_number_of_user_valuations: int
+        number of intervals the valuation range is split into
+
+    single_arrivals_in_first_timestep: int
+        x_a from thesis defining arrival distribution
+
+    single_probability_of_second_quality_decay_element: float
+        x_gamma from thesis defining quality decay distribution
+
+    single_engagement_factor_short_term_user: float
+        x_delta from thesis defining engagement factor distribution
+
+    single_standard_deviation_valuation: float
+        standard deviation of the truncated normal distribution of valuations
+
+    Returns
+    -------
+    valuations : list[float]
+        valuation of every user type
+    quality_decay_factors : list[float]
+        quality decay factor of every user type
+    engagement_factors : list[float]
+        engagement factor of every user type
+    probabilities : ndarray
+        shape (user types, n_max), probability of user type and arrival time (including valuation weight)
+    total_valuation_weight : float
+        sum of all valuation weights, only used for execution testing
+    """
+    interval_length = (creator.valuation_range[1] - creator.valuation_range[0]) / single_number_of_user_valuations
+    valuation_bounds = np.arange(creator.valuation_range[0], creator.valuation_range[1] + interval_length,
+                                 interval_length)
+    valuation_mean = (creator.valuation_range[0] + creator.valuation_range[1]) / 2
+    long_term_engagement_factors = [single_engagement_factor_short_term_user, creator.engagement_factor_long_term_user]
+
+    valuations = []
+    quality_decay_factors = []
+    engagement_factors = []
+    probabilities = []
+    total_valuation_weight = 0
+
+    # the distribution and the probabilities except valuation weight are the same for all valuations
+    if single_standard_deviation_valuation != 0:
+        truncated_normal = get_truncated_normal(mean=valuation_mean, sd=single_standard_deviation_valuation,
+                                                low=creator.valuation_range[0], upp=creator.valuation_range[1])
+        cdf_of_valuation_bounds = truncated_normal.cdf(valuation_bounds)
+    probabilities_without_valuation_weight = [
+        [get_probability_user_type(UserType(arrival_time, engagement_factor, quality_decay_factor, None), creator,
+                                   single_arrivals_in_first_timestep,
+                                   single_probability_of_second_quality_decay_element,
+                                   single_engagement_factor_short_term_user)
+         for arrival_time in range(1, creator.n_max + 1)]
+        for quality_decay_factor in creator.quality_decay_factors
+        for engagement_factor in long_term_engagement_factors]
+
+    for v in range(len(valuation_bounds) - 1):
+        lowerbound = valuation_bounds[v]
+        upperbound = valuation_bounds[v + 1]
+        if single_standard_deviation_valuation != 0:
+            valuation_weight = cdf_of_valuation_bounds[v + 1] - cdf_of_valuation_bounds[v]
+            valuation = (lowerbound + upperbound) / 2
+        # single_standard_deviation_valuation == 0
+        else:
+            valuation = valuation_mean
+            valuation_weight = 1 / (len(valuation_bounds) - 1)
+        total_valuation_weight += valuation_weight
+
+        type_index = 0
+        for quality_decay_factor in creator.quality_decay_factors:
+            for engagement_factor in long_term_engagement_factors:
+                valuations.append(float(valuation))
+                quality_decay_factors.append(quality_decay_factor)
+                engagement_factors.append(engagement_factor)
+                probabilities.append([probability * valuation_weight
+                                      for probability in probabilities_without_valuation_weight[type_index]])
+                type_index += 1
+
+    return valuations, quality_decay_factors, engagement_factors, np.array(probabilities), float(
+        total_valuation_weight)
+
+
+def create_user_type_population(creator, single_number_of_user_valuations, single_arrivals_in_first_timestep,
+                                single_probability_of_second_quality_decay_element,
+                                single_engagement_factor_short_term_user, single_standard_deviation_valuation):
+    """
+    Creates the population of all user types of the game (except arrival time), see get_user_types_of_population()
+
+    Parameters
+    ----------
+    creator: AbstractGameCreator
+        creator defined through config.ini
+
+    single_number_of_user_valuations: int
+        number of intervals the valuation range is split into
+
+    single_arrivals_in_first_timestep: int
+        x_a from thesis defining arrival distribution
+
+    single_probability_of_second_quality_decay_element: float
+        x_gamma from thesis defining quality decay distribution
+
+    single_engagement_factor_short_term_user: float
+        x_delta from thesis defining engagement factor distribution
+
+    single_standard_deviation_valuation: float
+        standard deviation of the truncated normal distribution of valuations
+
+    Returns
+    -------
+    UserTypePopulation
+        all user types and their probabilities
+    """
+    return UserTypePopulation(*get_user_types_of_population(creator, single_number_of_user_valuations,
+                                                            single_arrivals_in_first_timestep,
+                                                            single_probability_of_second_quality_decay_element,
+                                                            single_engagement_factor_short_term_user,
+                                                            single_standard_deviation_valuation))
@@ -1,331 +1,648 @@
+import copy
+import itertools
+from collections import OrderedDict
 from datetime import datetime
 
-import numpy as np
-
-from src.model.game.game import create_game
-from src.model.user.user_action import create_all_possible_user_actions, UserAction
+from src.model.game.game import get_game_from_pool
 from src.model.user.user_functions import get_immediate_utility, get_immediate_payment, \
     get_normalized_immediate_reward, \
-    get_expected_utility_and_payment_in_future, get_transition_probability, \
-    get_preferred_action_if_deliver_equal_utility
-from src.model.user.user_type import UserType, get_probability_user_type, get_truncated_normal
-from src.numerical_framework.helpers.output_files_helper import write_backward_induction_result
+    get_expected_utility_and_payment_in_future, get_successor_states, get_allowed_user_actions
+from src.model.user.user_state import NO_ACTION
+from src.model.user.user_type import UserType, get_user_types_of_population
+from src.numerical_framework.backward_induction.reweighting import SolvedUserTypes, get_distinct_user_types, \
+    get_population_revenue_and_welfare
+from src.numerical_framework.helpers.output_files_helper import write_backward_induction_result, ResultSink
+from src.numerical_framework.helpers.parallel_helper import map_in_parallel
+from src.numerical_framework.helpers.result_store import close_result_stores
+from src.numerical_framework.helpers.sharding_helper import select_shard
 from src.numerical_framework.helpers.tests_during_execution import test_reached_probabilities, \
-    test_if_value_equal_one
+    test_if_value_equal_one, test_reached_probabilities_tensorized, test_reached_probabilities_of_arrival_mixture
 from src.numerical_framework.result.result import BackwardInductionResult
+from src.numerical_framework.tensorized_backward_induction.tensorized_backward_induction import \
+    calculate_optimal_user_actions_tensorized, solve_user_types_tensorized
 
 
 def backward_induction_over_user_types(backward_induction_creator):
     """
     Executes the whole backward induction process, creates the result object and writes it to .csv files
 
+    All combinations of the population parameters (or all single user types) are independent and are distributed over
+    number_of_workers processes, the results are written in the same order as without workers. With several shards
+    (e.g., tasks of a SLURM job array), only the settings of the shard of this process are evaluated.
+
     Parameters
     ----------
     backward_induction_creator : BackwardInductionCreator
         object containing all details about backward induction specifics
     """
-    if backward_induction_creator.induction_with_all_user_types_from_game:
-        for single_number_of_user_valuations in backward_induction_creator.number_of_user_valuations:
-            for single_arrivals_in_first_timestep in backward_induction_creator.arrivals_in_first_timestep:
-                for single_probability_of_second_quality_decay_element in backward_induction_creator.probability_of_second_quality_decay_element:
-                    for single_engagement_factor_short_term_user in backward_induction_creator.engagement_factor_short_term_user:
-                        for single_standard_deviation_valuation in backward_induction_creator.standard_deviation_valuation:
-                            interval_length = (backward_induction_creator.valuation_range[1] -
-                                               backward_induction_creator.valuation_range[
-                                                   0]) / single_number_of_user_valuations
-                            valuations = np.arange(backward_induction_creator.valuation_range[0],
-                                                   backward_induction_creator.valuation_range[1] + interval_length,
-                                                   interval_length)
-                            quality_decay_factors = backward_induction_creator.quality_decay_factors
-                            long_term_engagement_factors = [
-                                single_engagement_factor_short_term_user,
-                                backward_induction_creator.engagement_factor_long_term_user]
-                            total_revenue = []
-                            user_welfare = []
-                            revenue_base_product_per_timestep = []
-                            revenue_upgrade_per_timestep = []
-                            revenue_subscription_per_timestep = []
-                            revenue_base_product_per_timestep_single_user_type = []
-                            revenue_upgrade_per_timestep_single_user_type = []
-                            revenue_subscription_per_timestep_single_user_type = []
-                            total_valuation_weight = 0
-                            total_prob_user_type = 0
-
-                            # prepare result object
-                            backward_induction_result = BackwardInductionResult()
-                            backward_induction_result.path_to_main_file = backward_induction_creator.path_to_main_file
-                            backward_induction_result.number_of_user_valuations = single_number_of_user_valuations
-                            backward_induction_result.price_strategy_type = backward_induction_creator.price_strategy_type
-                            backward_induction_result.price_base_product = backward_induction_creator.product_information.price_base_product
-                            backward_induction_result.price_upgrade = backward_induction_creator.product_information.price_upgrade
-                            backward_induction_result.price_subscription = backward_induction_creator.product_information.price_subscription
-                            backward_induction_result.n_max = backward_induction_creator.n_max
-                            backward_induction_result.n_upgrade = backward_induction_creator.n_upgrade
-                            backward_induction_result.engagement_factor_short_term_user = single_engagement_factor_short_term_user
-                            backward_induction_result.engagement_factor_long_term_user = backward_induction_creator.engagement_factor_long_term_user
-                            backward_induction_result.probability_short_term_user = backward_induction_creator.probability_short_term_user
-                            backward_induction_result.quality_decay_factors = backward_induction_creator.quality_decay_factors
-                            backward_induction_result.probability_of_second_quality_decay_factor = single_probability_of_second_quality_decay_element
-                            backward_induction_result.valuation_range = backward_induction_creator.valuation_range
-                            backward_induction_result.standard_deviation_valuation = single_standard_deviation_valuation
-                            backward_induction_result.arrivals_in_first_timestep = single_arrivals_in_first_timestep
-                            backward_induction_result.product_quality_base_product = backward_induction_creator.product_quality_base_product
-                            backward_induction_result.product_quality_upgrade = backward_induction_creator.product_quality_upgrade
-                            backward_induction_result.files_results_are_written_to = backward_induction_creator.files_results_are_written_to
-                            backward_induction_result.path_to_folder = backward_induction_creator.path_to_folder
-
-                            for i in range(0, backward_induction_creator.n_max):
-                                revenue_base_product_per_timestep.append(0)
-                                revenue_upgrade_per_timestep.append(0)
-                                revenue_subscription_per_timestep.append(0)
-                                revenue_base_product_per_timestep_single_user_type.append(0)
-                                revenue_upgrade_per_timestep_single_user_type.append(0)
-                                revenue_subscription_per_timestep_single_user_type.append(0)
-
-                            for v in range(len(valuations) - 1):
-                                lowerbound = valuations[v]
-                                upperbound = valuations[v + 1]
-                                valuation_mean = (backward_induction_creator.valuation_range[0] +
-                                                  backward_induction_creator.valuation_range[1]) / 2
-
-                                if single_standard_deviation_valuation != 0:
-                                    cdf_lowerboud = get_truncated_normal(mean=valuation_mean,
-                                                                         sd=single_standard_deviation_valuation,
-                                                                         low=backward_induction_creator.valuation_range[
-                                                                             0],
-                                                                         upp=backward_induction_creator.valuation_range[
-                                                                             1]).cdf(
-                                        lowerbound)
-                                    cdf_upperbound = get_truncated_normal(mean=valuation_mean,
-                                                                          sd=single_standard_deviation_valuation,
-                                                                          low=
-                                                                          backward_induction_creator.valuation_range[0],
-                                                                          upp=
-                                                                          backward_induction_creator.valuation_range[
-                                                                              1]).cdf(
-                                        upperbound)
-                                    valuation_weight = cdf_upperbound - cdf_lowerboud
-                                    total_valuation_weight += valuation_weight
-
-                                    valuation = (lowerbound + upperbound) / 2
-                                    valuation = valuation
-                                # single_standard_deviation_valuation == 0
-                                else:
-                                    valuation = valuation_mean
-                                    valuation_weight = 1 / (len(valuations) - 1)
-                                    total_valuation_weight += valuation_weight
-
-                                for quality_decay_factor in quality_decay_factors:
-                                    for engagement_factor in long_term_engagement_factors:
-                                        user_type = UserType(None, engagement_factor, quality_decay_factor, valuation)
-                                        product_information = backward_induction_creator.product_information
-
-                                        game = create_game(product_information, user_type,
-                                                           backward_induction_creator.n_max,
-                                                           backward_induction_creator.n_upgrade,
-                                                           backward_induction_creator.price_strategy_type)
-                                        calculate_optimal_user_actions(game)
-
-                                        for arr_time in range(1, backward_induction_creator.n_max + 1):
-                                            game.user_type.arrival_time = arr_time
-                                            calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(
-                                                game)
-                                            test_reached_probabilities(game)
-                                            prob_user_type = get_probability_user_type(game.user_type,
-                                                                                       backward_induction_creator,
-                                                                                       single_arrivals_in_first_timestep,
-                                                                                       single_probability_of_second_quality_decay_element,
-                                                                                       single_engagement_factor_short_term_user) * valuation_weight
-                                            total_revenue += [game.expected_publisher_revenue * prob_user_type]
-                                            user_welfare += [game.expected_user_welfare * prob_user_type]
-                                            total_prob_user_type += prob_user_type
-
-                                            # set revenue for single user type to 0
-                                            for i in range(0, game.n_max):
-                                                revenue_base_product_per_timestep_single_user_type[i] = 0
-                                                revenue_upgrade_per_timestep_single_user_type[i] = 0
-                                                revenue_subscription_per_timestep_single_user_type[i] = 0
-
-                                            # count revenue for different timesteps and products
-                                            timestep_count_revenue = game.n_max
-                                            while timestep_count_revenue > 0:
-                                                for current_user_state in game.user_states[timestep_count_revenue - 1]:
-                                                    if current_user_state.probability_state_is_reached > 0:
-                                                        revenue_base_product_current_timestep = 0
-                                                        revenue_upgrade_current_timestep = 0
-                                                        revenue_subscription_current_timestep = 0
-                                                        if current_user_state.best_action.subscribe_action == 1:
-                                                            revenue_subscription_current_timestep += \
-                                                                backward_induction_creator.product_information.price_subscription[
-                                                                    timestep_count_revenue - 1] * current_user_state.probability_state_is_reached
-
-                                                            if timestep_count_revenue == game.n_max:
-                                                                revenue_subscription_current_timestep += current_user_state.expected_payment_in_future * current_user_state.probability_state_is_reached
-
-                                                        if current_user_state.best_action.buy_action.base_product == 1:
-                                                            revenue_base_product_current_timestep += \
-                                                                backward_induction_creator.product_information.price_base_product[
-                                                                    timestep_count_revenue - 1] * current_user_state.probability_state_is_reached
-
-                                                        if current_user_state.best_action.buy_action.upgrade == 1:
-                                                            revenue_upgrade_current_timestep += \
-                                                                backward_induction_creator.product_information.price_upgrade[
-                                                                    timestep_count_revenue - 1] * current_user_state.probability_state_is_reached
-
-                                                        revenue_base_product_per_timestep[
-                                                            timestep_count_revenue - 1] += revenue_base_product_current_timestep * prob_user_type
-                                                        revenue_base_product_per_timestep_single_user_type[
-                                                            timestep_count_revenue - 1] += revenue_base_product_current_timestep
-                                                        revenue_upgrade_per_timestep[
-                                                            timestep_count_revenue - 1] += revenue_upgrade_current_timestep * prob_user_type
-                                                        revenue_upgrade_per_timestep_single_user_type[
-                                                            timestep_count_revenue - 1] += revenue_upgrade_current_timestep
-                                                        revenue_subscription_per_timestep[
-                                                            timestep_count_revenue - 1] += revenue_subscription_current_timestep * prob_user_type
-                                                        revenue_subscription_per_timestep_single_user_type[
-                                                            timestep_count_revenue - 1] += revenue_subscription_current_timestep
-                                                timestep_count_revenue -= 1
-
-                                            if backward_induction_creator.print_single_user_types:
-                                                backward_induction_result.timestamp = datetime.now().strftime(
-                                                    "%m.%d.%Y_%H.%M.%S")
-                                                backward_induction_result.probability_user_type = prob_user_type
-                                                backward_induction_result.arrival_time = arr_time
-                                                backward_induction_result.valuation = valuation
-                                                backward_induction_result.engagement_factor = engagement_factor
-                                                backward_induction_result.quality_decay_factor = quality_decay_factor
-                                                backward_induction_result.expected_publisher_revenue = game.expected_publisher_revenue
-                                                backward_induction_result.expected_user_welfare = game.expected_user_welfare
-                                                backward_induction_result.expected_total_welfare = game.expected_user_welfare + game.expected_publisher_revenue
-                                                backward_induction_result.revenue_base_product = revenue_base_product_per_timestep_single_user_type
-                                                backward_induction_result.revenue_upgrade = revenue_upgrade_per_timestep_single_user_type
-                                                backward_induction_result.revenue_subscription = revenue_subscription_per_timestep_single_user_type
-                                                # write backward induction results to .csv file
-                                                write_backward_induction_result(backward_induction_result)
-
-                                            # set values to 0 again
-                                            game.expected_publisher_revenue = 0
-                                            game.expected_user_welfare = 0
-                                            timestep = game.n_max
-
-                                            while timestep > 0:
-                                                for user_state in game.user_states[timestep - 1]:
-                                                    user_state.probability_state_is_reached = 0
-                                                timestep -= 1
-
-                            if backward_induction_creator.print_user_types_combined:
-                                backward_induction_result.timestamp = datetime.now().strftime(
-                                    "%m.%d.%Y_%H.%M.%S")
-                                backward_induction_result.probability_user_type = round(total_prob_user_type, 5)
-                                backward_induction_result.arrival_time = [1, backward_induction_creator.n_max]
-                                backward_induction_result.valuation = backward_induction_creator.valuation_range
-                                backward_induction_result.engagement_factor = [single_engagement_factor_short_term_user,
-                                                                               backward_induction_creator.engagement_factor_long_term_user]
-                                backward_induction_result.quality_decay_factor = backward_induction_creator.quality_decay_factors
-                                backward_induction_result.expected_publisher_revenue = sum(total_revenue)
-                                backward_induction_result.expected_user_welfare = sum(user_welfare)
-                                backward_induction_result.expected_total_welfare = sum(total_revenue) + sum(
-                                    user_welfare)
-                                backward_induction_result.revenue_base_product = revenue_base_product_per_timestep
-                                backward_induction_result.revenue_upgrade = revenue_upgrade_per_timestep
-                                backward_induction_result.revenue_subscription = revenue_subscription_per_timestep
-
-                                # write backward induction results to .csv file
-                                write_backward_induction_result(backward_induction_result)
-
-                            test_if_value_equal_one(total_valuation_weight, "total_valuation_weight")
-                            test_if_value_equal_one(total_prob_user_type, "total_prob_user_type")
-
-    # induction_with_all_user_types_from_game = False => backward induction for single user types
+    # the .csv files stay open for all results, the rows are written in batches
+    with ResultSink() as result_sink:
+        if backward_induction_creator.induction_with_all_user_types_from_game:
+            population_parameters = list(itertools.product(
+                backward_induction_creator.number_of_user_valuations,
+                backward_induction_creator.arrivals_in_first_timestep,
+                backward_induction_creator.probability_of_second_quality_decay_element,
+                backward_induction_creator.engagement_factor_short_term_user,
+                backward_induction_creator.standard_deviation_valuation))
+            population_parameters = select_shard(population_parameters, backward_induction_creator.shard_index,
+                                                 backward_induction_creator.shard_count)
+            if backward_induction_creator.reuse_solved_user_types:
+                # every distinct user type is solved once, the populations are weighted sums of the user types
+                user_types_of_populations = get_user_types_of_populations(backward_induction_creator,
+                                                                          population_parameters)
+                solved_user_types = solve_distinct_user_types(
+                    backward_induction_creator, get_distinct_user_types(
+                        [user_types[:3] for user_types in user_types_of_populations]))
+                for single_population_parameters, user_types in zip(population_parameters, user_types_of_populations):
+                    backward_induction_results = get_backward_induction_results_of_population_from_solved_user_types(
+                        backward_induction_creator, single_population_parameters, user_types, solved_user_types)
+                    for backward_induction_result in backward_induction_results:
+                        write_backward_induction_result(backward_induction_result, result_sink)
+            else:
+                for backward_induction_results in map_in_parallel(get_backward_induction_results_of_population,
+                                                                  backward_induction_creator, population_parameters,
+                                                                  backward_induction_creator.number_of_workers):
+                    for backward_induction_result in backward_induction_results:
+                        write_backward_induction_result(backward_induction_result, result_sink)
+
+        # induction_with_all_user_types_from_game = False => backward induction for single user types
+        else:
+            user_type_parameters = list(itertools.product(
+                backward_induction_creator.user_valuations, backward_induction_creator.user_arrival_times,
+                backward_induction_creator.user_engagement_factors,
+                backward_induction_creator.user_quality_decay_factors))
+            user_type_parameters = select_shard(user_type_parameters, backward_induction_creator.shard_index,
+                                                backward_induction_creator.shard_count)
+            for backward_induction_result in map_in_parallel(get_backward_induction_result_of_user_type,
+                                                             backward_induction_creator, user_type_parameters,
+                                                             backward_induction_creator.number_of_workers):
+                write_backward_induction_result(backward_induction_result, result_sink)
+    # results added to the result database are committed
+    close_result_stores()
+
+
+def get_backward_induction_results_of_population(backward_induction_creator, population_parameters):
+    """
+    Performs the backward induction for all user types of a population and creates the results to be written
+
+    Parameters
+    ----------
+    backward_induction_creator : BackwardInductionCreator
+        object containing all details about backward induction specifics
+    population_parameters : tuple
+        number of user valuations, arrivals in first timestep, probability of second quality decay element,
+        engagement factor short term user and standard deviation of the valuations of the population
+
+    Returns
+    -------
+    list[BackwardInductionResult]
+        results of the single user types (if print_single_user_types) and of the combined user types (if
+        print_user_types_combined) in the order they are written to the .csv files
+    """
+    single_number_of_user_valuations, single_arrivals_in_first_timestep, \
+        single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user, \
+        single_standard_deviation_valuation = population_parameters
+    backward_induction_results = []
+
+    total_revenue = []
+    user_welfare = []
+    revenue_base_product_per_timestep = []
+    revenue_upgrade_per_timestep = []
+    revenue_subscription_per_timestep = []
+    total_prob_user_type = 0
+
+    # prepare result object
+    backward_induction_result = create_backward_induction_result_of_population(backward_induction_creator,
+                                                                               population_parameters)
+
+    for i in range(0, backward_induction_creator.n_max):
+        revenue_base_product_per_timestep.append(0)
+        revenue_upgrade_per_timestep.append(0)
+        revenue_subscription_per_timestep.append(0)
+
+    valuations, quality_decay_factors, engagement_factors, probabilities, total_valuation_weight = get_user_types_of_population(
+        backward_induction_creator, single_number_of_user_valuations,
+        single_arrivals_in_first_timestep,
+        single_probability_of_second_quality_decay_element,
+        single_engagement_factor_short_term_user, single_standard_deviation_valuation)
+
+    # single user types need a forward pass per arrival time, combined results only a
+    # single forward pass per user type with all arrival times weighted by their probability
+    if backward_induction_creator.print_single_user_types:
+        probabilities_arrival_time = None
     else:
-        # prepare result object
-        backward_induction_result = BackwardInductionResult()
-        backward_induction_result.path_to_main_file = backward_induction_creator.path_to_main_file
-        backward_induction_result.number_of_user_valuations = "-"
-        backward_induction_result.price_strategy_type = backward_induction_creator.price_strategy_type
-        backward_induction_result.price_base_product = backward_induction_creator.product_information.price_base_product
-        backward_induction_result.price_upgrade = backward_induction_creator.product_information.price_upgrade
-        backward_induction_result.price_subscription = backward_induction_creator.product_information.price_subscription
-        backward_induction_result.n_max = backward_induction_creator.n_max
-        backward_induction_result.n_upgrade = backward_induction_creator.n_upgrade
-        backward_induction_result.engagement_factor_short_term_user = "-"
-        backward_induction_result.engagement_factor_long_term_user = "-"
-        backward_induction_result.probability_short_term_user = "-"
-        backward_induction_result.quality_decay_factors = "-"
-        backward_induction_result.probability_of_second_quality_decay_factor = "-"
-        backward_induction_result.valuation_range = "-"
-        backward_induction_result.standard_deviation_valuation = "-"
-        backward_induction_result.arrivals_in_first_timestep = "-"
-        backward_induction_result.probability_user_type = "-"
-        backward_induction_result.product_quality_base_product = backward_induction_creator.product_quality_base_product
-        backward_induction_result.product_quality_upgrade = backward_induction_creator.product_quality_upgrade
-        backward_induction_result.files_results_are_written_to = backward_induction_creator.files_results_are_written_to
-        backward_induction_result.path_to_folder = backward_induction_creator.path_to_folder
-
-        for valuation in backward_induction_creator.user_valuations:
-            for arrival_time in backward_induction_creator.user_arrival_times:
-                for engagement_factor in backward_induction_creator.user_engagement_factors:
-                    for quality_decay_factor in backward_induction_creator.user_quality_decay_factors:
-                        user_type = UserType(arrival_time, engagement_factor, quality_decay_factor, valuation)
-                        game = create_game(backward_induction_creator.product_information,
-                                           user_type, backward_induction_creator.n_max,
-                                           backward_induction_creator.n_upgrade,
-                                           backward_induction_creator.price_strategy_type)
-
-                        # do backward induction
-                        calculate_optimal_user_actions(game)
-                        calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game)
-                        test_reached_probabilities(game)
-
-                        # count actions of user type
-                        timestep_count_revenue = game.n_max
-                        revenue_base_product_per_timestep = []
-                        revenue_upgrade_per_timestep = []
-                        revenue_subscription_per_timestep = []
-
-                        for i in range(0, game.n_max):
-                            revenue_base_product_per_timestep.append(0)
-                            revenue_upgrade_per_timestep.append(0)
-                            revenue_subscription_per_timestep.append(0)
-
-                        while timestep_count_revenue > 0:
-                            for current_user_state in game.user_states[timestep_count_revenue - 1]:
-                                if current_user_state.probability_state_is_reached > 0:
-                                    if current_user_state.best_action.subscribe_action == 1:
-                                        revenue_subscription_per_timestep[timestep_count_revenue - 1] += \
-                                            backward_induction_creator.product_information.price_subscription[
-                                                timestep_count_revenue - 1] * current_user_state.probability_state_is_reached
-                                        if timestep_count_revenue == game.n_max:
-                                            revenue_subscription_per_timestep[
-                                                timestep_count_revenue - 1] += current_user_state.expected_payment_in_future * current_user_state.probability_state_is_reached
-                                    if current_user_state.best_action.buy_action.base_product == 1:
-                                        revenue_base_product_per_timestep[timestep_count_revenue - 1] += \
-                                            backward_induction_creator.product_information.price_base_product[
-                                                timestep_count_revenue - 1] * current_user_state.probability_state_is_reached
-                                    if current_user_state.best_action.buy_action.upgrade == 1:
-                                        revenue_upgrade_per_timestep[timestep_count_revenue - 1] += \
-                                            backward_induction_creator.product_information.price_upgrade[
-                                                timestep_count_revenue - 1] * current_user_state.probability_state_is_reached
-                            timestep_count_revenue -= 1
-
-                        backward_induction_result.timestamp = datetime.now().strftime(
-                            "%m.%d.%Y_%H.%M.%S")
-                        backward_induction_result.arrival_time = arrival_time
-                        backward_induction_result.valuation = valuation
-                        backward_induction_result.engagement_factor = engagement_factor
-                        backward_induction_result.quality_decay_factor = quality_decay_factor
-                        backward_induction_result.expected_publisher_revenue = game.expected_publisher_revenue
-                        backward_induction_result.expected_user_welfare = game.expected_user_welfare
-                        backward_induction_result.expected_total_welfare = game.expected_user_welfare + game.expected_publisher_revenue
-                        backward_induction_result.revenue_base_product = revenue_base_product_per_timestep
-                        backward_induction_result.revenue_upgrade = revenue_upgrade_per_timestep
-                        backward_induction_result.revenue_subscription = revenue_subscription_per_timestep
-
-                        # write backward induction results to .csv file
-                        write_backward_induction_result(backward_induction_result)
-
-
-def calculate_optimal_user_actions(game):
+        probabilities_arrival_time = probabilities
+
+    # all user types are solved at once with the tensorized backward induction
+    if backward_induction_creator.use_tensorized_backward_induction:
+        tensorized_game = solve_user_types_tensorized(
+            backward_induction_creator.product_information, backward_induction_creator.n_max,
+            backward_induction_creator.n_upgrade,
+            backward_induction_creator.price_strategy_type, valuations, quality_decay_factors,
+            engagement_factors, probabilities_arrival_time)
+        test_reached_probabilities_tensorized(tensorized_game)
+
+    for user_type_index in range(len(valuations)):
+        valuation = valuations[user_type_index]
+        quality_decay_factor = quality_decay_factors[user_type_index]
+        engagement_factor = engagement_factors[user_type_index]
+        if not backward_induction_creator.use_tensorized_backward_induction:
+            user_type = UserType(None, engagement_factor, quality_decay_factor, valuation)
+            game = get_game_from_pool(backward_induction_creator.product_information, user_type,
+                                      backward_induction_creator.n_max,
+                                      backward_induction_creator.n_upgrade,
+                                      backward_induction_creator.price_strategy_type)
+            calculate_optimal_user_actions(game)
+
+        if not backward_induction_creator.print_single_user_types:
+            probabilities_of_user_type = probabilities[user_type_index].tolist()
+            if backward_induction_creator.use_tensorized_backward_induction:
+                total_revenue += [
+                    tensorized_game.expected_publisher_revenue[user_type_index, 0].item()]
+                user_welfare += [
+                    tensorized_game.expected_user_welfare[user_type_index, 0].item()]
+                revenue_base_product_per_timestep_user_type = \
+                    tensorized_game.revenue_base_product[user_type_index, 0].tolist()
+                revenue_upgrade_per_timestep_user_type = \
+                    tensorized_game.revenue_upgrade[user_type_index, 0].tolist()
+                revenue_subscription_per_timestep_user_type = \
+                    tensorized_game.revenue_subscription[user_type_index, 0].tolist()
+            else:
+                calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare_of_arrival_mixture(
+                    game, probabilities_of_user_type)
+                test_reached_probabilities_of_arrival_mixture(game, probabilities_of_user_type)
+                total_revenue += [game.expected_publisher_revenue]
+                user_welfare += [game.expected_user_welfare]
+                revenue_base_product_per_timestep_user_type, revenue_upgrade_per_timestep_user_type, revenue_subscription_per_timestep_user_type = get_revenue_per_timestep(
+                    game)
+            total_prob_user_type += sum(probabilities_of_user_type)
+
+            # revenue per timestep is already weighted with the probabilities of the arrival times
+            for i in range(0, backward_induction_creator.n_max):
+                revenue_base_product_per_timestep[i] += \
+                    revenue_base_product_per_timestep_user_type[i]
+                revenue_upgrade_per_timestep[i] += revenue_upgrade_per_timestep_user_type[i]
+                revenue_subscription_per_timestep[i] += \
+                    revenue_subscription_per_timestep_user_type[i]
+        # print_single_user_types = True => forward pass for every arrival time
+        else:
+            for arr_time in range(1, backward_induction_creator.n_max + 1):
+                prob_user_type = probabilities[user_type_index, arr_time - 1].item()
+                if backward_induction_creator.use_tensorized_backward_induction:
+                    expected_publisher_revenue = tensorized_game.expected_publisher_revenue[
+                        user_type_index, arr_time - 1].item()
+                    expected_user_welfare = tensorized_game.expected_user_welfare[
+                        user_type_index, arr_time - 1].item()
+                    revenue_base_product_per_timestep_single_user_type = \
+                        tensorized_game.revenue_base_product[user_type_index, arr_time - 1].tolist()
+                    revenue_upgrade_per_timestep_single_user_type = \
+                        tensorized_game.revenue_upgrade[user_type_index, arr_time - 1].tolist()
+                    revenue_subscription_per_timestep_single_user_type = \
+                        tensorized_game.revenue_subscription[user_type_index, arr_time - 1].tolist()
+                else:
+                    game.user_type.arrival_time = arr_time
+                    calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(
+                        game)
+                    test_reached_probabilities(game)
+                    expected_publisher_revenue = game.expected_publisher_revenue
+                    expected_user_welfare = game.expected_user_welfare
+                    revenue_base_product_per_timestep_single_user_type, revenue_upgrade_per_timestep_single_user_type, revenue_subscription_per_timestep_single_user_type = get_revenue_per_timestep(
+                        game)
+
+                    # set values to 0 again, the results of the backward induction are kept
+                    game.reset_forward_pass()
+
+                total_revenue += [expected_publisher_revenue * prob_user_type]
+                user_welfare += [expected_user_welfare * prob_user_type]
+                total_prob_user_type += prob_user_type
+
+                for i in range(0, backward_induction_creator.n_max):
+                    revenue_base_product_per_timestep[i] += \
+                        revenue_base_product_per_timestep_single_user_type[i] * prob_user_type
+                    revenue_upgrade_per_timestep[i] += \
+                        revenue_upgrade_per_timestep_single_user_type[i] * prob_user_type
+                    revenue_subscription_per_timestep[i] += \
+                        revenue_subscription_per_timestep_single_user_type[i] * prob_user_type
+
+                # write single user type
+                add_single_user_type_result(backward_induction_results, backward_induction_result, prob_user_type,
+                                            arr_time, valuation, engagement_factor, quality_decay_factor,
+                                            expected_publisher_revenue, expected_user_welfare,
+                                            revenue_base_product_per_timestep_single_user_type,
+                                            revenue_upgrade_per_timestep_single_user_type,
+                                            revenue_subscription_per_timestep_single_user_type)
+
+    if backward_induction_creator.print_user_types_combined:
+        add_combined_user_types_result(backward_induction_results, backward_induction_result,
+                                       backward_induction_creator, total_prob_user_type, sum(total_revenue),
+                                       sum(user_welfare), revenue_base_product_per_timestep,
+                                       revenue_upgrade_per_timestep, revenue_subscription_per_timestep)
+
+    test_if_value_equal_one(total_valuation_weight, "total_valuation_weight")
+    test_if_value_equal_one(total_prob_user_type, "total_prob_user_type")
+    return backward_induction_results
+
+
+def get_user_types_of_populations(backward_induction_creator, population_parameters):
+    """
+    Creates the user types and their probabilities of several populations
+
+    Parameters
+    ----------
+    backward_induction_creator : BackwardInductionCreator
+        object containing all details about backward induction specifics
+    population_parameters : list[tuple]
+        number of user valuations, arrivals in first timestep, probability of second quality decay element,
+        engagement factor short term user and standard deviation of the valuations of every population
+
+    Returns
+    -------
+    list[tuple]
+        valuations, quality decay factors, engagement factors, probabilities and total valuation weight of every
+        population, see get_user_types_of_population()
+    """
+    return [get_user_types_of_population(backward_induction_creator, *single_population_parameters)
+            for single_population_parameters in population_parameters]
+
+
+def solve_user_type_for_all_arrival_times(backward_induction_creator, user_type_parameters):
+    """
+    Performs the backward induction for a user type and the forward pass for every arrival time
+
+    Parameters
+    ----------
+    backward_induction_creator : BackwardInductionCreator
+        object containing all details about backward induction specifics
+    user_type_parameters : tuple
+        valuation, quality decay factor and engagement factor of the user type
+
+    Returns
+    -------
+    expected_publisher_revenue : list[float]
+        expected revenue of the user type arriving in every timestep
+    expected_user_welfare : list[float]
+        expected welfare of the user type arriving in every timestep
+    revenue_base_product : list[list[float]]
+        expected revenue through the base product in every timestep for every arrival time
+    revenue_upgrade : list[list[float]]
+        expected revenue through the upgrade in every timestep for every arrival time
+    revenue_subscription : list[list[float]]
+        expected revenue through subscription in every timestep for every arrival time
+    """
+    valuation, quality_decay_factor, engagement_factor = user_type_parameters
+    user_type = UserType(None, engagement_factor, quality_decay_factor, valuation)
+    game = get_game_from_pool(backward_induction_creator.product_information, user_type,
+                              backward_induction_creator.n_max,
+                              backward_induction_creator.n_upgrade,
+                              backward_induction_creator.price_strategy_type)
+    calculate_optimal_user_actions(game)
+
+    expected_publisher_revenue = []
+    expected_user_welfare = []
+    revenue_base_product = []
+    revenue_upgrade = []
+    revenue_subscription = []
+    for arrival_time in range(1, backward_induction_creator.n_max + 1):
+        game.user_type.arrival_time = arrival_time
+        calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game)
+        test_reached_probabilities(game)
+        expected_publisher_revenue.append(game.expected_publisher_revenue)
+        expected_user_welfare.append(game.expected_user_welfare)
+        revenue_base_product_per_timestep, revenue_upgrade_per_timestep, revenue_subscription_per_timestep = \
+            get_revenue_per_timestep(game)
+        revenue_base_product.append(revenue_base_product_per_timestep)
+        revenue_upgrade.append(revenue_upgrade_per_timestep)
+        revenue_subscription.append(revenue_subscription_per_timestep)
+        # set values to 0 again, the results of the backward induction are kept
+        game.reset_forward_pass()
+    return expected_publisher_revenue, expected_user_welfare, revenue_base_product, revenue_upgrade, \
+        revenue_subscription
+
+
+def solve_distinct_user_types(backward_induction_creator, user_types):
+    """
+    Solves every distinct user type once for all arrival times
+
+    With the tensorized backward induction, all user types are solved at once. Otherwise, the user types are
+    distributed over number_of_workers processes.
+
+    Parameters
+    ----------
+    backward_induction_creator : BackwardInductionCreator
+        object containing all details about backward induction specifics
+    user_types : list[tuple]
+        valuation, quality decay factor and engagement factor of every distinct user type
+
+    Returns
+    -------
+    SolvedUserTypes
+        revenue and welfare of every user type for every arrival time
+    """
+    solved_user_types = SolvedUserTypes(user_types, backward_induction_creator.n_max)
+    if not user_types:
+        return solved_user_types
+
+    if backward_induction_creator.use_tensorized_backward_induction:
+        valuations, quality_decay_factors, engagement_factors = (list(parameters) for parameters in zip(*user_types))
+        tensorized_game = solve_user_types_tensorized(
+            backward_induction_creator.product_information, backward_induction_creator.n_max,
+            backward_induction_creator.n_upgrade, backward_induction_creator.price_strategy_type, valuations,
+            quality_decay_factors, engagement_factors)
+        test_reached_probabilities_tensorized(tensorized_game)
+        solved_user_types.expected_publisher_revenue[:] = tensorized_game.expected_publisher_revenue
+        solved_user_types.expected_user_welfare[:] = tensorized_game.expected_user_welfare
+        solved_user_types.revenue_base_product[:] = tensorized_game.revenue_base_product
+        solved_user_types.revenue_upgrade[:] = tensorized_game.revenue_upgrade
+        solved_user_types.revenue_subscription[:] = tensorized_game.revenue_subscription
+    else:
+        for user_type_index, solution in enumerate(map_in_parallel(solve_user_type_for_all_arrival_times,
+                                                                   backward_induction_creator, user_types,
+                                                                   backward_induction_creator.number_of_workers)):
+            solved_user_types.expected_publisher_revenue[user_type_index] = solution[0]
+            solved_user_types.expected_user_welfare[user_type_index] = solution[1]
+            solved_user_types.revenue_base_product[user_type_index] = solution[2]
+            solved_user_types.revenue_upgrade[user_type_index] = solution[3]
+            solved_user_types.revenue_subscription[user_type_index] = solution[4]
+    return solved_user_types
+
+
+def get_backward_induction_results_of_population_from_solved_user_types(backward_induction_creator,
+                                                                         population_parameters, user_types,
+                                                                         solved_user_types):
+    """
+    Creates the results of a population from the solved user types, without solving a game
+
+    Produces the same results as get_backward_induction_results_of_population() (up to rounding errors).
+
+    Parameters
+    ----------
+    backward_induction_creator : BackwardInductionCreator
+        object containing all details about backward induction specifics
+    population_parameters : tuple
+        number of user valuations, arrivals in first timestep, probability of second quality decay element,
+        engagement factor short term user and standard deviation of the valuations of the population
+    user_types : tuple
+        valuations, quality decay factors, engagement factors, probabilities and total valuation weight of the
+        population, see get_user_types_of_population()
+    solved_user_types : SolvedUserTypes
+        revenue and welfare of the user types for every arrival time, see solve_distinct_user_types()
+
+    Returns
+    -------
+    list[BackwardInductionResult]
+        results of the single user types (if print_single_user_types) and of the combined user types (if
+        print_user_types_combined) in the order they are written to the .csv files
+    """
+    valuations, quality_decay_factors, engagement_factors, probabilities, total_valuation_weight = user_types
+    user_type_indices = solved_user_types.get_user_type_indices(valuations, quality_decay_factors,
+                                                                engagement_factors)
+    backward_induction_results = []
+    backward_induction_result = create_backward_induction_result_of_population(backward_induction_creator,
+                                                                               population_parameters)
+
+    if backward_induction_creator.print_single_user_types:
+        for user_type_index, row in enumerate(user_type_indices):
+            for arrival_time in range(1, backward_induction_creator.n_max + 1):
+                add_single_user_type_result(
+                    backward_induction_results, backward_induction_result,
+                    probabilities[user_type_index, arrival_time - 1].item(), arrival_time,
+                    valuations[user_type_index], engagement_factors[user_type_index],
+                    quality_decay_factors[user_type_index],
+                    solved_user_types.expected_publisher_revenue[row, arrival_time - 1].item(),
+                    solved_user_types.expected_user_welfare[row, arrival_time - 1].item(),
+                    solved_user_types.revenue_base_product[row, arrival_time - 1].tolist(),
+                    solved_user_types.revenue_upgrade[row, arrival_time - 1].tolist(),
+                    solved_user_types.revenue_subscription[row, arrival_time - 1].tolist())
+
+    total_prob_user_type = probabilities.sum().item()
+    if backward_induction_creator.print_user_types_combined:
+        add_combined_user_types_result(backward_induction_results, backward_induction_result,
+                                       backward_induction_creator, total_prob_user_type,
+                                       *get_population_revenue_and_welfare(solved_user_types, user_type_indices,
+                                                                           probabilities))
+
+    test_if_value_equal_one(total_valuation_weight, "total_valuation_weight")
+    test_if_value_equal_one(total_prob_user_type, "total_prob_user_type")
+    return backward_induction_results
+
+
+def create_backward_induction_result_of_population(backward_induction_creator, population_parameters):
+    """
+    Creates the result object with the game information of a population, completed for every result of the population
+
+    Parameters
+    ----------
+    backward_induction_creator : BackwardInductionCreator
+        object containing all details about backward induction specifics
+    population_parameters : tuple
+        number of user valuations, arrivals in first timestep, probability of second quality decay element,
+        engagement factor short term user and standard deviation of the valuations of the population
+
+    Returns
+    -------
+    BackwardInductionResult
+        result without user type, revenue and welfare
+    """
+    single_number_of_user_valuations, single_arrivals_in_first_timestep, \
+        single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user, \
+        single_standard_deviation_valuation = population_parameters
+    backward_induction_result = BackwardInductionResult()
+    backward_induction_result.path_to_main_file = backward_induction_creator.path_to_main_file
+    backward_induction_result.number_of_user_valuations = single_number_of_user_valuations
+    backward_induction_result.price_strategy_type = backward_induction_creator.price_strategy_type
+    backward_induction_result.price_base_product = backward_induction_creator.product_information.price_base_product
+    backward_induction_result.price_upgrade = backward_induction_creator.product_information.price_upgrade
+    backward_induction_result.price_subscription = backward_induction_creator.product_information.price_subscription
+    backward_induction_result.n_max = backward_induction_creator.n_max
+    backward_induction_result.n_upgrade = backward_induction_creator.n_upgrade
+    backward_induction_result.engagement_factor_short_term_user = single_engagement_factor_short_term_user
+    backward_induction_result.engagement_factor_long_term_user = backward_induction_creator.engagement_factor_long_term_user
+    backward_induction_result.probability_short_term_user = backward_induction_creator.probability_short_term_user
+    backward_induction_result.quality_decay_factors = backward_induction_creator.quality_decay_factors
+    backward_induction_result.probability_of_second_quality_decay_factor = single_probability_of_second_quality_decay_element
+    backward_induction_result.valuation_range = backward_induction_creator.valuation_range
+    backward_induction_result.standard_deviation_valuation = single_standard_deviation_valuation
+    backward_induction_result.arrivals_in_first_timestep = single_arrivals_in_first_timestep
+    backward_induction_result.product_quality_base_product = backward_induction_creator.product_quality_base_product
+    backward_induction_result.product_quality_upgrade = backward_induction_creator.product_quality_upgrade
+    backward_induction_result.files_results_are_written_to = backward_induction_creator.files_results_are_written_to
+    backward_induction_result.result_database = backward_induction_creator.result_database
+    backward_induction_result.path_to_folder = backward_induction_creator.path_to_folder
+    return backward_induction_result
+
+
+def add_single_user_type_result(backward_induction_results, backward_induction_result, probability_user_type,
+                                arrival_time, valuation, engagement_factor, quality_decay_factor,
+                                expected_publisher_revenue, expected_user_welfare, revenue_base_product,
+                                revenue_upgrade, revenue_subscription):
+    """
+    Adds the result of a single user type and arrival time of a population to the results of the population
+
+    Parameters
+    ----------
+    backward_induction_results : list[BackwardInductionResult]
+        results of the population, the result is appended
+    backward_induction_result : BackwardInductionResult
+        result of the population, see create_backward_induction_result_of_population() (copied)
+    probability_user_type : float
+        probability of the user type and arrival time
+    arrival_time : int
+        arrival time of the user type
+    valuation : float
+        valuation of the user type
+    engagement_factor : float
+        engagement factor of the user type
+    quality_decay_factor : float
+        quality decay factor of the user type
+    expected_publisher_revenue : float
+        expected revenue of the user type (not weighted)
+    expected_user_welfare : float
+        expected welfare of the user type (not weighted)
+    revenue_base_product : list[float]
+        expected revenue through the base product in every timestep
+    revenue_upgrade : list[float]
+        expected revenue through the upgrade in every timestep
+    revenue_subscription : list[float]
+        expected revenue through subscription in every timestep
+    """
+    backward_induction_result.timestamp = datetime.now().strftime(
+        "%m.%d.%Y_%H.%M.%S")
+    backward_induction_result.probability_user_type = probability_user_type
+    backward_induction_result.arrival_time = arrival_time
+    backward_induction_result.valuation = valuation
+    backward_induction_result.engagement_factor = engagement_factor
+    backward_induction_result.quality_decay_factor = quality_decay_factor
+    backward_induction_result.expected_publisher_revenue = expected_publisher_revenue
+    backward_induction_result.expected_user_welfare = expected_user_welfare
+    backward_induction_result.expected_total_welfare = expected_user_welfare + expected_publisher_revenue
+    backward_induction_result.revenue_base_product = revenue_base_product
+    backward_induction_result.revenue_upgrade = revenue_upgrade
+    backward_induction_result.revenue_subscription = revenue_subscription
+    # backward induction results are written to .csv file in backward_induction_over_user_types()
+    backward_induction_results.append(copy.copy(backward_induction_result))
+
+
+def add_combined_user_types_result(backward_induction_results, backward_induction_result, backward_induction_creator,
+                                   total_prob_user_type, expected_publisher_revenue, expected_user_welfare,
+                                   revenue_base_product, revenue_upgrade, revenue_subscription):
+    """
+    Adds the result of all user types of a population combined to the results of the population
+
+    Parameters
+    ----------
+    backward_induction_results : list[BackwardInductionResult]
+        results of the population, the result is appended
+    backward_induction_result : BackwardInductionResult
+        result of the population, see create_backward_induction_result_of_population() (copied)
+    backward_induction_creator : BackwardInductionCreator
+        object containing all details about backward induction specifics
+    total_prob_user_type : float
+        sum of the probabilities of all user types and arrival times
+    expected_publisher_revenue : float
+        expected revenue of the population
+    expected_user_welfare : float
+        expected welfare of the population
+    revenue_base_product : list[float]
+        expected revenue through the base product in every timestep
+    revenue_upgrade : list[float]
+        expected revenue through the upgrade in every timestep
+    revenue_subscription : list[float]
+        expected revenue through subscription in every timestep
+    """
+    backward_induction_result.timestamp = datetime.now().strftime(
+        "%m.%d.%Y_%H.%M.%S")
+    backward_induction_result.probability_user_type = round(total_prob_user_type, 5)
+    backward_induction_result.arrival_time = [1, backward_induction_creator.n_max]
+    backward_induction_result.valuation = backward_induction_creator.valuation_range
+    backward_induction_result.engagement_factor = [backward_induction_result.engagement_factor_short_term_user,
+                                                   backward_induction_creator.engagement_factor_long_term_user]
+    backward_induction_result.quality_decay_factor = backward_induction_creator.quality_decay_factors
+    backward_induction_result.expected_publisher_revenue = expected_publisher_revenue
+    backward_induction_result.expected_user_welfare = expected_user_welfare
+    backward_induction_result.expected_total_welfare = expected_publisher_revenue + expected_user_welfare
+    backward_induction_result.revenue_base_product = revenue_base_product
+    backward_induction_result.revenue_upgrade = revenue_upgrade
+    backward_induction_result.revenue_subscription = revenue_subscription
+    # backward induction results are written to .csv file in backward_induction_over_user_types()
+    backward_induction_results.append(copy.copy(backward_induction_result))
+
+
+def get_backward_induction_result_of_user_type(backward_induction_creator, user_type_parameters):
+    """
+    Performs the backward induction for a single user type and creates the result to be written
+
+    Parameters
+    ----------
+    backward_induction_creator : BackwardInductionCreator
+        object containing all details about backward induction specifics
+    user_type_parameters : tuple
+        valuation, arrival time, engagement factor and quality decay factor of the user type
+
+    Returns
+    -------
+    BackwardInductionResult
+        result of the user type
+    """
+    valuation, arrival_time, engagement_factor, quality_decay_factor = user_type_parameters
+
+    # prepare result object
+    backward_induction_result = BackwardInductionResult()
+    backward_induction_result.path_to_main_file = backward_induction_creator.path_to_main_file
+    backward_induction_result.number_of_user_valuations = "-"
+    backward_induction_result.price_strategy_type = backward_induction_creator.price_strategy_type
+    backward_induction_result.price_base_product = backward_induction_creator.product_information.price_base_product
+    backward_induction_result.price_upgrade = backward_induction_creator.product_information.price_upgrade
+    backward_induction_result.price_subscription = backward_induction_creator.product_information.price_subscription
+    backward_induction_result.n_max = backward_induction_creator.n_max
+    backward_induction_result.n_upgrade = backward_induction_creator.n_upgrade
+    backward_induction_result.engagement_factor_short_term_user = "-"
+    backward_induction_result.engagement_factor_long_term_user = "-"
+    backward_induction_result.probability_short_term_user = "-"
+    backward_induction_result.quality_decay_factors = "-"
+    backward_induction_result.probability_of_second_quality_decay_factor = "-"
+    backward_induction_result.valuation_range = "-"
+    backward_induction_result.standard_deviation_valuation = "-"
+    backward_induction_result.arrivals_in_first_timestep = "-"
+    backward_induction_result.probability_user_type = "-"
+    backward_induction_result.product_quality_base_product = backward_induction_creator.product_quality_base_product
+    backward_induction_result.product_quality_upgrade = backward_induction_creator.product_quality_upgrade
+    backward_induction_result.files_results_are_written_to = backward_induction_creator.files_results_are_written_to
+    backward_induction_result.result_database = backward_induction_creator.result_database
+    backward_induction_result.path_to_folder = backward_induction_creator.path_to_folder
+
+    user_type = UserType(arrival_time, engagement_factor, quality_decay_factor, valuation)
+    game = get_game_from_pool(backward_induction_creator.product_information,
+                              user_type, backward_induction_creator.n_max,
+                              backward_induction_creator.n_upgrade,
+                              backward_induction_creator.price_strategy_type)
+
+    # do backward induction
+    calculate_optimal_user_actions_with_engine(game, backward_induction_creator)
+    calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game)
+    test_reached_probabilities(game)
+
+    # count actions of user type
+    revenue_base_product_per_timestep, revenue_upgrade_per_timestep, revenue_subscription_per_timestep = get_revenue_per_timestep(
+        game)
+
+    backward_induction_result.timestamp = datetime.now().strftime(
+        "%m.%d.%Y_%H.%M.%S")
+    backward_induction_result.arrival_time = arrival_time
+    backward_induction_result.valuation = valuation
+    backward_induction_result.engagement_factor = engagement_factor
+    backward_induction_result.quality_decay_factor = quality_decay_factor
+    backward_induction_result.expected_publisher_revenue = game.expected_publisher_revenue
+    backward_induction_result.expected_user_welfare = game.expected_user_welfare
+    backward_induction_result.expected_total_welfare = game.expected_user_welfare + game.expected_publisher_revenue
+    backward_induction_result.revenue_base_product = revenue_base_product_per_timestep
+    backward_induction_result.revenue_upgrade = revenue_upgrade_per_timestep
+    backward_induction_result.revenue_subscription = revenue_subscription_per_timestep
+
+    # backward induction results are written to .csv file in backward_induction_over_user_types()
+    return backward_induction_result
+
+
+def calculate_optimal_user_actions(game, last_timestep=None):
     """
     Finds the optimal action for every user state in every timestep (i.e., backward induction is performed)
 
@@ -333,16 +650,22 @@ def calculate_optimal_user_actions(game):
     ----------
     game : Game
         object holding all important information for the publisher and user acting optimally against each other
+    last_timestep : int, optional
+        timestep the backward induction starts with, the user states of later timesteps must already hold their
+        results, default: None (n_max)
     """
-    # get all possible user actions
-    all_possible_user_actions = create_all_possible_user_actions(game.price_strategy_type)
+    # get the user actions considered in every user state before and after the upgrade release
+    allowed_user_actions_before_upgrade = get_allowed_user_actions(game.price_strategy_type, False)
+    allowed_user_actions_after_upgrade = get_allowed_user_actions(game.price_strategy_type, True)
 
     # do actual backward induction by iteration back from n_max to 1
-    timestep = game.n_max
+    timestep = game.n_max if last_timestep is None else last_timestep
 
     while timestep > 0:
+        allowed_user_actions = allowed_user_actions_after_upgrade if timestep >= game.n_upgrade else \
+            allowed_user_actions_before_upgrade
         for current_user_state in game.user_states[timestep - 1]:
-            best_action = UserAction(0, [0, 0])
+            best_action = NO_ACTION
             best_normalized_immediate_reward = 0
             best_immediate_payment = 0
             best_immediate_utility = 0
@@ -350,21 +673,8 @@ def calculate_optimal_user_actions(game):
             best_expected_utility_in_future_best = 0
             best_expected_utility = 0
 
-            for user_action in all_possible_user_actions:
-                # it is not allowed to buy the upgrade without owning or buying the base product
-                if current_user_state.ownership.base_product == 0 and user_action.buy_action.base_product == 0 and user_action.buy_action.upgrade == 1:
-                    continue
-                # it is never optimal to subscribe if base product and upgrade are already owned
-                if current_user_state.ownership.base_product == 1 and current_user_state.ownership.upgrade == 1 and user_action.subscribe_action == 1:
-                    continue
-                # if upgrade is not released yet it cannot be optimal to buy it
-                if user_action.buy_action.upgrade == 1 and timestep < game.n_upgrade:
-                    continue
-                # if base product or upgrade already owned, it is never optimal to buy the corresponding product
-                if user_action.buy_action.upgrade == 1 and current_user_state.ownership.upgrade == 1:
-                    continue
-                if user_action.buy_action.base_product == 1 and current_user_state.ownership.base_product == 1:
-                    continue
+            # actions which are not allowed or never optimal are skipped (see get_allowed_user_actions())
+            for user_action in allowed_user_actions[current_user_state.code]:
                 immediate_utility = get_immediate_utility(timestep, game.n_upgrade,
                                                           user_action, game.user_type,
                                                           current_user_state,
@@ -375,8 +685,9 @@ def calculate_optimal_user_actions(game):
                 total_expected_utility_for_action = immediate_utility + expected_utility_in_future
 
                 if total_expected_utility_for_action >= best_expected_utility:
+                    # see get_preferred_action_if_deliver_equal_utility()
                     if total_expected_utility_for_action == best_expected_utility and total_expected_utility_for_action > 0:
-                        if get_preferred_action_if_deliver_equal_utility(user_action, best_action) != user_action:
+                        if user_action.preference_rank <= best_action.preference_rank:
                             continue
 
                     best_action = user_action
@@ -402,6 +713,79 @@ def calculate_optimal_user_actions(game):
         timestep -= 1
 
 
+# results of the user states of a timestep, key: (user type and game, price suffix from the timestep until n_max)
+BACKWARD_INDUCTION_SUFFIX_CACHE = OrderedDict()
+# the least recently used timesteps are removed from BACKWARD_INDUCTION_SUFFIX_CACHE above this size
+MAX_SIZE_OF_BACKWARD_INDUCTION_SUFFIX_CACHE = 20000
+
+
+def calculate_optimal_user_actions_with_suffix_cache(game):
+    """
+    Finds the optimal action for every user state in every timestep, reusing timesteps calculated before
+
+    The results of timestep t only depend on the user type and the prices from t until n_max. They are cached with this
+    price suffix, such that the backward induction only starts at the last timestep whose price suffix has not been
+    seen before, e.g., if the crossover of differential evolution only changed prices of early timesteps. Produces the
+    same results as calculate_optimal_user_actions().
+
+    Parameters
+    ----------
+    game : Game
+        object holding all important information for the publisher and user acting optimally against each other
+    """
+    game_key = (game.user_type.valuation, game.user_type.quality_decay_factor, game.user_type.engagement_factor,
+                game.n_max, game.n_upgrade, game.price_strategy_type,
+                game.product_information.product_quality.base_product,
+                game.product_information.product_quality.upgrade)
+    prices = tuple(zip(game.product_information.price_base_product, game.product_information.price_upgrade,
+                       game.product_information.price_subscription))
+
+    # restore the timesteps whose price suffix has been seen before
+    timestep = game.n_max
+    while timestep > 0:
+        key = (game_key, prices[timestep - 1:])
+        cached_results = BACKWARD_INDUCTION_SUFFIX_CACHE.get(key)
+        if cached_results is None:
+            break
+        BACKWARD_INDUCTION_SUFFIX_CACHE.move_to_end(key)
+        for user_state, results in zip(game.user_states[timestep - 1], cached_results):
+            user_state.best_action, user_state.immediate_payment, user_state.normalized_immediate_reward, \
+                user_state.immediate_utility, user_state.expected_payment_in_future, \
+                user_state.expected_utility_in_future, user_state.expected_utility = results
+        timestep -= 1
+
+    if timestep > 0:
+        calculate_optimal_user_actions(game, timestep)
+        while timestep > 0:
+            BACKWARD_INDUCTION_SUFFIX_CACHE[(game_key, prices[timestep - 1:])] = tuple(
+                (user_state.best_action, user_state.immediate_payment, user_state.normalized_immediate_reward,
+                 user_state.immediate_utility, user_state.expected_payment_in_future,
+                 user_state.expected_utility_in_future, user_state.expected_utility)
+                for user_state in game.user_states[timestep - 1])
+            if len(BACKWARD_INDUCTION_SUFFIX_CACHE) > MAX_SIZE_OF_BACKWARD_INDUCTION_SUFFIX_CACHE:
+                BACKWARD_INDUCTION_SUFFIX_CACHE.popitem(last=False)
+            timestep -= 1
+
+
+def calculate_optimal_user_actions_with_engine(game, creator):
+    """
+    Finds the optimal action for every user state in every timestep with the engine chosen in the config.ini
+
+    Parameters
+    ----------
+    game : Game
+        object holding all important information for the publisher and user acting optimally against each other
+    creator : AbstractGameCreator
+        creator defined through config.ini, use_tensorized_backward_induction and use_suffix_cache choose the engine
+    """
+    if creator.use_tensorized_backward_induction:
+        calculate_optimal_user_actions_tensorized(game)
+    elif creator.use_suffix_cache:
+        calculate_optimal_user_actions_with_suffix_cache(game)
+    else:
+        calculate_optimal_user_actions(game)
+
+
 def calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game):
     """
     Calculates and adds the probabilities a state is reached to the game object
@@ -416,16 +800,62 @@ def calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_we
 
     timestep = game.user_type.arrival_time
     while timestep <= game.n_max:
-        for user_state in game.user_states[timestep - 1]:
+        user_states = game.user_states[timestep - 1]
+        # states before the arrival time are not reached, only successors with a transition probability > 0 are considered
+        if timestep > game.user_type.arrival_time:
             for last_user_state in game.user_states[timestep - 2]:
                 if last_user_state.probability_state_is_reached > 0:
-                    user_state.probability_state_is_reached += get_transition_probability(timestep, game.n_upgrade,
-                                                                                          user_state, last_user_state,
-                                                                                          last_user_state.best_action,
-                                                                                          game.user_type,
-                                                                                          game.product_information.product_quality.upgrade) * \
-                                                               last_user_state.probability_state_is_reached
+                    for user_state_index, transition_probability in get_successor_states(timestep, last_user_state,
+                                                                                         last_user_state.best_action,
+                                                                                         game):
+                        user_states[user_state_index].probability_state_is_reached += \
+                            transition_probability * last_user_state.probability_state_is_reached
+
+        for user_state in user_states:
+            game.expected_publisher_revenue += user_state.probability_state_is_reached * user_state.immediate_payment
+            game.expected_user_welfare += user_state.probability_state_is_reached * user_state.immediate_utility
+            if timestep == game.n_max:
+                game.expected_user_welfare += user_state.probability_state_is_reached * user_state.expected_utility_in_future
+                game.expected_publisher_revenue += user_state.probability_state_is_reached * user_state.expected_payment_in_future
+
+        timestep += 1
+
 
+def calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare_of_arrival_mixture(
+        game, probabilities_arrival_time):
+    """
+    Calculates and adds the probabilities a state is reached for users arriving in all timesteps to the game object
+
+    Users arriving in timestep a enter the start state with the weight probabilities_arrival_time[a - 1]. Since the
+    forward pass is linear, the expected revenue and welfare are the ones of every arrival time weighted with its
+    probability, the same holds for get_revenue_per_timestep(). The arrival time of the user type is not used.
+
+    Parameters
+    ----------
+    game : Game
+        object holding all important information for the publisher and user acting optimally against each other
+    probabilities_arrival_time : list[float]
+        probability of every arrival time
+    """
+    timestep = 1
+    while timestep <= game.n_max:
+        user_states = game.user_states[timestep - 1]
+        # only successors with a transition probability > 0 are considered
+        if timestep > 1:
+            for last_user_state in game.user_states[timestep - 2]:
+                if last_user_state.probability_state_is_reached > 0:
+                    for user_state_index, transition_probability in get_successor_states(timestep, last_user_state,
+                                                                                         last_user_state.best_action,
+                                                                                         game):
+                        user_states[user_state_index].probability_state_is_reached += \
+                            transition_probability * last_user_state.probability_state_is_reached
+
+        # users arriving in this timestep enter the start state
+        for user_state in user_states:
+            if user_state.demand == 1 and user_state.ownership.base_product == 0 and user_state.ownership.upgrade == 0:
+                user_state.probability_state_is_reached += probabilities_arrival_time[timestep - 1]
+
+        for user_state in user_states:
             game.expected_publisher_revenue += user_state.probability_state_is_reached * user_state.immediate_payment
             game.expected_user_welfare += user_state.probability_state_is_reached * user_state.immediate_utility
             if timestep == game.n_max:
@@ -435,6 +865,81 @@ def calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_we
         timestep += 1
 
 
+def calculate_publisher_revenue_and_user_welfare_from_backward_induction(game, probabilities_arrival_time):
+    """
+    Calculates the expected revenue and welfare of users arriving in all timesteps without a forward pass
+
+    The backward induction already holds the expected payment and utility of every state, i.e., a user arriving in
+    timestep a pays the immediate and expected future payment of the start state in timestep a. The results are the
+    same as with calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare_of_arrival_mixture(),
+    but the probabilities states are reached are not calculated.
+
+    Parameters
+    ----------
+    game : Game
+        object holding all important information for the publisher and user acting optimally against each other
+    probabilities_arrival_time : list[float]
+        probability of every arrival time
+    """
+    for timestep in range(1, game.n_max + 1):
+        if probabilities_arrival_time[timestep - 1] == 0:
+            continue
+        for user_state in game.user_states[timestep - 1]:
+            if user_state.demand == 1 and user_state.ownership.base_product == 0 and user_state.ownership.upgrade == 0:
+                game.expected_publisher_revenue += probabilities_arrival_time[timestep - 1] * (
+                        user_state.immediate_payment + user_state.expected_payment_in_future)
+                game.expected_user_welfare += probabilities_arrival_time[timestep - 1] * user_state.expected_utility
+
+
+def get_revenue_per_timestep(game):
+    """
+    Calculates the expected revenue through base product, upgrade and subscription in every timestep of a game
+
+    The probabilities states are reached have to be calculated before. The expected subscription payment after n_max is
+    added to the subscription revenue of n_max.
+
+    Parameters
+    ----------
+    game : Game
+        object holding all important information for the publisher and user acting optimally against each other
+
+    Returns
+    -------
+    revenue_base_product_per_timestep : list[float]
+        expected revenue through the base product in every timestep
+    revenue_upgrade_per_timestep : list[float]
+        expected revenue through the upgrade in every timestep
+    revenue_subscription_per_timestep : list[float]
+        expected revenue through subscription in every timestep
+    """
+    revenue_base_product_per_timestep = [0] * game.n_max
+    revenue_upgrade_per_timestep = [0] * game.n_max
+    revenue_subscription_per_timestep = [0] * game.n_max
+
+    timestep_count_revenue = game.n_max
+    while timestep_count_revenue > 0:
+        for current_user_state in game.user_states[timestep_count_revenue - 1]:
+            if current_user_state.probability_state_is_reached > 0:
+                if current_user_state.best_action.subscribe_action == 1:
+                    revenue_subscription_per_timestep[timestep_count_revenue - 1] += \
+                        game.product_information.price_subscription[
+                            timestep_count_revenue - 1] * current_user_state.probability_state_is_reached
+                    if timestep_count_revenue == game.n_max:
+                        revenue_subscription_per_timestep[
+                            timestep_count_revenue - 1] += current_user_state.expected_payment_in_future * current_user_state.probability_state_is_reached
+                if current_user_state.best_action.buy_action.base_product == 1:
+                    revenue_base_product_per_timestep[timestep_count_revenue - 1] += \
+                        game.product_information.price_base_product[
+                            timestep_count_revenue - 1] * current_user_state.probability_state_is_reached
+                if current_user_state.best_action.buy_action.upgrade == 1:
+                    revenue_upgrade_per_timestep[timestep_count_revenue - 1] += \
+                        game.product_information.price_upgrade[
+                            timestep_count_revenue - 1] * current_user_state.probability_state_is_reached
+        timestep_count_revenue -= 1
+
+    return revenue_base_product_per_timestep, revenue_upgrade_per_timestep, revenue_subscription_per_timestep
+
+
 def get_start_state(game):
     """
     Finds the starting state for the user type playing the game
@@ -0,0 +1,131 @@
+import numpy as np
+
+
+class SolvedUserTypes(object):
+    """
+    A class used to represent the revenue and welfare of distinct user types for every arrival time, solved once for the
+    prices of the backward induction
+
+    The optimal actions of a user type (valuation, quality decay factor, engagement factor) do not depend on the
+    distribution of the user types. The results of a population are hence weighted sums of the rows of the user types
+    of the population (see get_population_revenue_and_welfare()), for any arrivals in first timestep, probability of
+    second quality decay element, probability of short term users or standard deviation of the valuations.
+
+    ...
+
+    Attributes
+    ----------
+    user_types : list[tuple]
+        valuation, quality decay factor and engagement factor of every distinct user type, the position in the list is
+        the row of the user type
+    user_type_indices : dict
+        key: valuation, quality decay factor and engagement factor, value: row of the user type
+    expected_publisher_revenue : ndarray
+        shape (user types, n_max), expected revenue of a user type arriving in every timestep
+    expected_user_welfare : ndarray
+        shape (user types, n_max), expected welfare of a user type arriving in every timestep
+    revenue_base_product : ndarray
+        shape (user types, n_max, n_max), expected revenue through the base product in every timestep of a user type
+        arriving in every timestep
+    revenue_upgrade : ndarray
+        shape (user types, n_max, n_max), expected revenue through the upgrade in every timestep
+    revenue_subscription : ndarray
+        shape (user types, n_max, n_max), expected revenue through subscription in every timestep
+    """
+
+    def __init__(self, user_types, n_max):
+        """
+        Parameters
+        ----------
+        user_types : list[tuple]
+            valuation, quality decay factor and engagement factor of every distinct user type
+        n_max : int
+            last timestep where users arrive and publisher can change prices
+        """
+        self.user_types = user_types
+        self.user_type_indices = {user_type: index for index, user_type in enumerate(user_types)}
+        self.expected_publisher_revenue = np.zeros((len(user_types), n_max))
+        self.expected_user_welfare = np.zeros((len(user_types), n_max))
+        self.revenue_base_product = np.zeros((len(user_types), n_max, n_max))
+        self.revenue_upgrade = np.zeros((len(user_types), n_max, n_max))
+        self.revenue_subscription = np.zeros((len(user_types), n_max, n_max))
+
+    def get_user_type_indices(self, valuations, quality_decay_factors, engagement_factors):
+        """
+        Returns the rows of the user types of a population
+
+        Parameters
+        ----------
+        valuations : list[float]
+            valuation of every user type of the population
+        quality_decay_factors : list[float]
+            quality decay factor of every user type of the population
+        engagement_factors : list[float]
+            engagement factor of every user type of the population
+
+        Returns
+        -------
+        ndarray
+            shape (user types of the population,), row of every user type
+        """
+        return np.array([self.user_type_indices[user_type] for user_type in
+                         zip(valuations, quality_decay_factors, engagement_factors)], dtype=int)
+
+
+def get_distinct_user_types(user_types_of_populations):
+    """
+    Collects the distinct user types of several populations in the order they appear first
+
+    Parameters
+    ----------
+    user_types_of_populations : list[tuple]
+        valuations, quality decay factors and engagement factors of the user types of every population, see
+        get_user_types_of_population()
+
+    Returns
+    -------
+    list[tuple]
+        valuation, quality decay factor and engagement factor of every distinct user type
+    """
+    distinct_user_types = {}
+    for valuations, quality_decay_factors, engagement_factors in user_types_of_populations:
+        for user_type in zip(valuations, quality_decay_factors, engagement_factors):
+            distinct_user_types.setdefault(user_type, None)
+    return list(distinct_user_types)
+
+
+def get_population_revenue_and_welfare(solved_user_types, user_type_indices, probabilities):
+    """
+    Calculates the expected revenue and welfare of a population as weighted sum of the solved user types
+
+    Parameters
+    ----------
+    solved_user_types : SolvedUserTypes
+        revenue and welfare of the distinct user types for every arrival time
+    user_type_indices : ndarray
+        shape (user types of the population,), row of every user type, see SolvedUserTypes.get_user_type_indices()
+    probabilities : ndarray
+        shape (user types of the population, n_max), probability of user type and arrival time
+
+    Returns
+    -------
+    expected_publisher_revenue : float
+        expected revenue of the population
+    expected_user_welfare : float
+        expected welfare of the population
+    revenue_base_product : list[float]
+        expected revenue through the base product in every timestep
+    revenue_upgrade : list[float]
+        expected revenue through the upgrade in every timestep
+    revenue_subscription : list[float]
+        expected revenue through subscription in every timestep
+    """
+    expected_publisher_revenue = np.sum(solved_user_types.expected_publisher_revenue[user_type_indices] * probabilities)
+    expected_user_welfare = np.sum(solved_user_types.expected_user_welfare[user_type_indices] * probabilities)
+    revenue_base_product = np.einsum('ka,kat->t', probabilities,
+                                     solved_user_types.revenue_base_product[user_type_indices])
+    revenue_upgrade = np.einsum('ka,kat->t', probabilities, solved_user_types.revenue_upgrade[user_type_indices])
+    revenue_subscription = np.einsum('ka,kat->t', probabilities,
+                                     solved_user_types.revenue_subscription[user_type_indices])
+    return expected_publisher_revenue.item(), expected_user_welfare.item(), revenue_base_product.tolist(), \
+        revenue_upgrade.tolist(), revenue_subscription.tolist()
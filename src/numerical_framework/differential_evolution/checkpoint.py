@@ -0,0 +1,251 @@
+import glob
+import hashlib
+import os
+import pickle
+
+import numpy as np
+
+# checkpoint of a run is written next to its .txt file with this ending instead of .txt
+CHECKPOINT_FILE_ENDING = ".checkpoint"
+# parameters of the DifferentialEvolutionCreator the runs of a study depend on (besides the run parameters), a
+# checkpoint is only resumed by a study with the same values; the main file name is not part of them since it contains
+# the start time of the job and changes with every restart
+STUDY_PARAMETERS = ["study_name", "n_max", "n_upgrade", "quality_decay_factors",
+                    "engagement_factor_long_term_user", "probability_short_term_user", "valuation_range",
+                    "product_quality_base_product", "product_quality_upgrade", "price_strategy_type",
+                    "evolution_with_all_user_types_from_game", "play_different_ask_prices", "is_prices_discounted",
+                    "is_subscription_price_variable", "first_base_price_fixed", "first_upgrade_price_fixed",
+                    "price_bounds", "base_price_for_both_buy", "upgrade_price_for_both_buy", "user_valuation",
+                    "user_arrival_time", "user_quality_decay_factor", "user_engagement_factor",
+                    "exact_valuation_integration", "use_evaluation_cache", "evaluation_cache_tolerance",
+                    "seeded_initial_population_fraction", "early_stopping_generations",
+                    "early_stopping_relative_improvement", "early_stopping_price_spread"]
+
+
+class DifferentialEvolutionCheckpoint(object):
+    """
+    A class used to represent the state of a single differential evolution run such that it can be resumed
+
+    ...
+
+    Attributes
+    ----------
+    run_parameters : tuple
+        run number, setting, optimizer, strategy and popsize of the run (see run_differential_evolution())
+    price_strategy_type : str
+        price strategy type, i.e., one of PriceStrategyType
+    bounds : list[tuple[float]]
+        bounds of the prices (variables) of the run
+    study_key : str
+        hash of the game and differential evolution parameters of the study the run belongs to, see get_study_key()
+    file_path : str
+        path to the .txt file of the run
+    start_time : datetime
+        time the run was started
+    generation : int
+        number of generations of differential evolution done
+    population : ndarray
+        shape (members, number of prices), prices of every member of the population
+    population_energies : ndarray
+        shape (members,), objective of every member of the population
+    rng_state : dict
+        state of the bit generator of the random number generator used by differential evolution
+    evaluation_number : int
+        global EVALUATION_NUMBER of the run
+    number_of_evaluations : int
+        number of evaluations counted by differential evolution
+    best_revenues : list[float]
+        best revenue after every generation of the early stopping policy, continued by a resumed run
+    is_finished : bool
+        True if the run is finished and its result has been created
+    """
+
+    def __init__(self, run_parameters, price_strategy_type, bounds, study_key, file_path, start_time):
+        """
+        Parameters
+        ----------
+        run_parameters : tuple
+            run number, setting, optimizer, strategy and popsize of the run (see run_differential_evolution())
+        price_strategy_type : str
+            price strategy type, i.e., one of PriceStrategyType
+        bounds : list[tuple[float]]
+            bounds of the prices (variables) of the run
+        study_key : str
+            hash of the game and differential evolution parameters of the study, see get_study_key()
+        file_path : str
+            path to the .txt file of the run
+        start_time : datetime
+            time the run was started
+        """
+        self.run_parameters = run_parameters
+        self.price_strategy_type = price_strategy_type
+        self.bounds = bounds
+        self.study_key = study_key
+        self.file_path = file_path
+        self.start_time = start_time
+        self.generation = 0
+        self.population = None
+        self.population_energies = None
+        self.rng_state = None
+        self.evaluation_number = 0
+        self.number_of_evaluations = 0
+        self.best_revenues = []
+        self.is_finished = False
+
+    def is_checkpoint_of_run(self, run_parameters, price_strategy_type, bounds, study_key):
+        """
+        Returns True if the checkpoint belongs to the run with the given parameters
+
+        Parameters
+        ----------
+        run_parameters : tuple
+            run number, setting, optimizer, strategy and popsize of the run (see run_differential_evolution())
+        price_strategy_type : str
+            price strategy type, i.e., one of PriceStrategyType
+        bounds : list[tuple[float]]
+            bounds of the prices (variables) of the run
+        study_key : str
+            hash of the game and differential evolution parameters of the study, see get_study_key()
+
+        Returns
+        -------
+        bool
+            True if the checkpoint belongs to the run
+        """
+        # checkpoints written before the study key was introduced are not resumed
+        return getattr(self, "study_key", None) == study_key and \
+            tuple(self.run_parameters) == tuple(run_parameters) and \
+            self.price_strategy_type == price_strategy_type and \
+            np.array_equal(np.array(self.bounds, dtype=float), np.array(bounds, dtype=float))
+
+
+def get_study_key(differential_evolution_creator):
+    """
+    Returns the hash of the game and differential evolution parameters of a study (see STUDY_PARAMETERS)
+
+    Checkpoints are searched in all subfolders of path_to_folder, hence a checkpoint of an older study with other
+    parameters (or another study name) is not resumed and its finished runs are not skipped.
+
+    Parameters
+    ----------
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+
+    Returns
+    -------
+    str
+        hash of the parameters of the study
+    """
+    values = []
+    for study_parameter in STUDY_PARAMETERS:
+        value = getattr(differential_evolution_creator, study_parameter)
+        # objects such as the PriceBounds are compared by their attributes
+        values.append(sorted(vars(value).items()) if hasattr(value, "__dict__") else value)
+    return hashlib.sha256(repr(values).encode()).hexdigest()
+
+
+def get_checkpoint_path(file_path):
+    """
+    Returns the path of the checkpoint of the run with the given .txt file
+
+    Parameters
+    ----------
+    file_path : str
+        path to the .txt file of the run
+
+    Returns
+    -------
+    str
+        path to the checkpoint file of the run
+    """
+    return os.path.splitext(file_path)[0] + CHECKPOINT_FILE_ENDING
+
+
+def write_checkpoint(checkpoint):
+    """
+    Writes the checkpoint next to the .txt file of its run
+
+    The checkpoint is written to a temporary file first and replaces the previous checkpoint afterwards, hence the
+    previous checkpoint is kept if the job is stopped while writing.
+
+    Parameters
+    ----------
+    checkpoint : DifferentialEvolutionCheckpoint
+        state of the run
+    """
+    checkpoint_path = get_checkpoint_path(checkpoint.file_path)
+    with open(checkpoint_path + ".tmp", "wb") as file:
+        pickle.dump(checkpoint, file)
+    os.replace(checkpoint_path + ".tmp", checkpoint_path)
+
+
+def find_latest_checkpoint(path_to_folder, run_parameters, price_strategy_type, bounds, study_key):
+    """
+    Finds the latest checkpoint of a run in the folder of the differential evolution results (and its subfolders)
+
+    Parameters
+    ----------
+    path_to_folder : str
+        folder the results of differential evolution are written to
+    run_parameters : tuple
+        run number, setting, optimizer, strategy and popsize of the run (see run_differential_evolution())
+    price_strategy_type : str
+        price strategy type, i.e., one of PriceStrategyType
+    bounds : list[tuple[float]]
+        bounds of the prices (variables) of the run
+    study_key : str
+        hash of the game and differential evolution parameters of the study, see get_study_key()
+
+    Returns
+    -------
+    DifferentialEvolutionCheckpoint
+        latest checkpoint of the run, None if the run has no checkpoint
+    """
+    checkpoint_paths = glob.glob(os.path.join(path_to_folder, "**", "*" + CHECKPOINT_FILE_ENDING), recursive=True)
+    for checkpoint_path in sorted(checkpoint_paths, key=os.path.getmtime, reverse=True):
+        with open(checkpoint_path, "rb") as file:
+            checkpoint = pickle.load(file)
+        if checkpoint.is_checkpoint_of_run(run_parameters, price_strategy_type, bounds, study_key):
+            return checkpoint
+    return None
+
+
+def create_checkpoint_callback(checkpoint, checkpoint_every_x_generations, rng, get_evaluation_number,
+                               get_best_revenues):
+    """
+    Creates the callback of differential evolution writing the checkpoint every x generations
+
+    Parameters
+    ----------
+    checkpoint : DifferentialEvolutionCheckpoint
+        state of the run when differential evolution is started (generation and evaluations of a resumed run)
+    checkpoint_every_x_generations : int
+        number of generations between two checkpoints
+    rng : Generator
+        random number generator used by differential evolution
+    get_evaluation_number : callable
+        returns the global EVALUATION_NUMBER of the run
+    get_best_revenues : callable
+        returns the best revenue after every generation of the early stopping policy of the run
+
+    Returns
+    -------
+    callable
+        callback for scipy.optimize.differential_evolution()
+    """
+    first_generation = checkpoint.generation
+    first_number_of_evaluations = checkpoint.number_of_evaluations
+
+    def checkpoint_callback(intermediate_result):
+        generation = first_generation + intermediate_result.nit
+        if generation % checkpoint_every_x_generations == 0:
+            checkpoint.generation = generation
+            checkpoint.population = np.array(intermediate_result.population)
+            checkpoint.population_energies = np.array(intermediate_result.population_energies)
+            checkpoint.rng_state = rng.bit_generator.state
+            checkpoint.evaluation_number = get_evaluation_number()
+            checkpoint.number_of_evaluations = first_number_of_evaluations + intermediate_result.nfev
+            checkpoint.best_revenues = list(get_best_revenues())
+            write_checkpoint(checkpoint)
+
+    return checkpoint_callback
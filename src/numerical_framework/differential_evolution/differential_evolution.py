@@ -1,343 +1,630 @@
+import itertools
 import time
 from datetime import datetime
 
 import numpy as np
-from scipy.optimize import differential_evolution
 
-from src.model.game.game import create_game
+from src.model.game.game import get_game_from_pool
 from src.model.game.price_strategy_type import PriceStrategyType
 from src.model.publisher.productinformation import ProductInformation
-from src.model.user.user_type import UserType, get_probability_user_type, get_truncated_normal
-from src.numerical_framework.backward_induction.backward_induction import calculate_optimal_user_actions, \
-    calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare
+from src.model.user.user_type import UserType, create_user_type_population
+from src.numerical_framework.backward_induction.backward_induction import \
+    calculate_optimal_user_actions_with_engine, \
+    calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare, get_revenue_per_timestep, \
+    calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare_of_arrival_mixture, \
+    calculate_publisher_revenue_and_user_welfare_from_backward_induction
+from src.numerical_framework.differential_evolution.checkpoint import DifferentialEvolutionCheckpoint, \
+    find_latest_checkpoint, create_checkpoint_callback, write_checkpoint, get_study_key
+from src.numerical_framework.differential_evolution.early_stopping import EarlyStopping, combine_callbacks
+from src.numerical_framework.differential_evolution.initial_population import create_seeded_initial_population
+from src.numerical_framework.differential_evolution.optimizers import OPTIMIZERS, OptimizationProblem
+from src.numerical_framework.differential_evolution.evaluation_cache import CachedEvaluation, \
+    get_evaluation_cache_key, get_cached_evaluation, add_evaluation_to_cache, get_evaluation_cache_counters, \
+    reset_evaluation_cache_counters
 from src.numerical_framework.helpers.high_price import HighPrice
-from src.numerical_framework.helpers.output_files_helper import add_first_line_to_document, add_line_to_document, \
-    create_or_get_file, PARTITION_LINE, fill_text_file_with_basic_information, write_differential_evolution_result
+from src.numerical_framework.helpers.output_files_helper import create_or_get_file, PARTITION_LINE, \
+    fill_text_file_with_basic_information, write_differential_evolution_result, ResultSink
+from src.numerical_framework.helpers.parallel_helper import map_in_parallel, get_number_of_processes
+from src.numerical_framework.helpers.result_store import close_result_stores
+from src.numerical_framework.helpers.run_log import open_run_log, get_run_log, GZIP_FILE_ENDING, \
+    close_run_logs_of_worker
+from src.numerical_framework.helpers.sharding_helper import select_shard
 from src.numerical_framework.helpers.tests_during_execution import test_reached_probabilities, \
-    test_if_value_equal_one
+    test_if_value_equal_one, test_reached_probabilities_tensorized, test_reached_probabilities_of_arrival_mixture
+from src.numerical_framework.helpers.worker_pool import EvaluationContext, WorkerPool, get_worker_pool, \
+    close_worker_pools
 from src.numerical_framework.result.result import DifferentialEvolutionResult
+from src.numerical_framework.tensorized_backward_induction.tensorized_backward_induction import \
+    solve_user_types_tensorized, solve_user_types_tensorized_for_price_vectors
+from src.numerical_framework.tensorized_backward_induction.valuation_breakpoints import \
+    get_population_revenue_and_welfare_with_exact_valuations
 
 EVALUATION_NUMBER = 0
+# maximal number of user types times price vectors solved in one call of the vectorized objective (limits memory)
+MAX_USER_TYPES_SOLVED_AT_ONCE = 2048
+# maximal number of generations of a differential evolution (default of scipy), including those before a resume
+MAXIMAL_NUMBER_OF_GENERATIONS = 1000
 
 
-class PriceBounds(object):
+def differential_evolution_maximize_revenue(differential_evolution_creator):
+    """
+    Executes the whole differential evolution process, creates the result object and writes it to .csv files
+
+    Every differential evolution (setting, optimizer, strategy, popsize and repetition) is a run. Strategies are only
+    varied for optimizers using them, i.e., differential evolution. With number_of_concurrent_runs
+    larger than 1, the runs are distributed over processes and the result of a run is written to the .csv files as
+    soon as it is finished.
+
+    Parameters
+    ----------
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+    """
+
+    # for single user type, the following variables are not important and length of lists is set to 1 to prevent too many iterations over for-loops
+    if not differential_evolution_creator.evolution_with_all_user_types_from_game:
+        differential_evolution_creator.number_of_user_valuations = [1]
+        differential_evolution_creator.arrivals_in_first_timestep = [1]
+        differential_evolution_creator.probability_of_second_quality_decay_element = [1]
+        differential_evolution_creator.engagement_factor_short_term_user = [1]
+        differential_evolution_creator.standard_deviation_valuation = [1]
+
+    # run number, setting, optimizer, strategy and popsize of every run in the order of the repetitions
+    optimizers_and_strategies = []
+    for optimizer in differential_evolution_creator.optimizers:
+        if OPTIMIZERS[optimizer].uses_strategies:
+            for strategy in differential_evolution_creator.differential_evolution_strategies:
+                optimizers_and_strategies.append((optimizer, strategy))
+        else:
+            optimizers_and_strategies.append((optimizer, "-"))
+    runs_per_repetition = [setting + optimizer_and_strategy + (popsize,) for setting, optimizer_and_strategy, popsize in
+                           itertools.product(itertools.product(
+                               differential_evolution_creator.number_of_user_valuations,
+                               differential_evolution_creator.arrivals_in_first_timestep,
+                               differential_evolution_creator.probability_of_second_quality_decay_element,
+                               differential_evolution_creator.engagement_factor_short_term_user,
+                               differential_evolution_creator.standard_deviation_valuation),
+                               optimizers_and_strategies, differential_evolution_creator.popsizes)]
+    run_parameters = [(repetition * len(runs_per_repetition) + i + 1,) + run for repetition in
+                      range(differential_evolution_creator.number_of_iterations_per_evolution_type)
+                      for i, run in enumerate(runs_per_repetition)]
+    # with several shards (e.g., tasks of a SLURM job array), only the runs of the shard of this process are executed
+    run_parameters = select_shard(run_parameters, differential_evolution_creator.shard_index,
+                                  differential_evolution_creator.shard_count)
+
+    # the .csv files stay open for all runs, the result of a run is written as soon as it is finished
+    with ResultSink(batch_size=1) as result_sink:
+        if differential_evolution_creator.number_of_concurrent_runs == 1:
+            for single_run_parameters in run_parameters:
+                differential_evolution_result = run_differential_evolution(differential_evolution_creator,
+                                                                           single_run_parameters)
+                # runs finished before a resume are skipped
+                if differential_evolution_result is not None:
+                    write_differential_evolution_result(differential_evolution_result, result_sink)
+
+                # wait 1 second after every repetition such that very fast evolutions differ in their .txt file name
+                if single_run_parameters[0] % len(runs_per_repetition) == 0:
+                    time.sleep(1)
+        else:
+            # runs are distributed over processes, the results are written as soon as a run is finished
+            for differential_evolution_result in map_in_parallel(
+                    run_differential_evolution, differential_evolution_creator, run_parameters,
+                    differential_evolution_creator.number_of_concurrent_runs, is_ordered=False):
+                if differential_evolution_result is not None:
+                    write_differential_evolution_result(differential_evolution_result, result_sink)
+    # results added to the result database are committed
+    close_result_stores()
+    # the persistent worker pool has been reused by all runs of this process
+    close_worker_pools()
+
+
+def run_differential_evolution(differential_evolution_creator, run_parameters):
     """
-    A class used to represent Price Bounds used to perform Differential Evolution
+    Executes a single differential evolution, writes its progress to its own .txt file and creates the result object
+
+    Parameters
+    ----------
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+    run_parameters : tuple
+        run number, number of user valuations, arrivals in first timestep, probability of second quality decay element,
+        engagement factor short term user, standard deviation of the valuations, optimizer, strategy and popsize of the
+        run
+
+    Returns
+    -------
+    DifferentialEvolutionResult
+        result of the differential evolution to be written to the .csv files, None if the run has been finished before
+        a resume
+    """
+    run_number, single_number_of_user_valuations, single_arrivals_in_first_timestep, \
+        single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user, \
+        single_standard_deviation_valuation, optimizer, strategy, popsize = run_parameters
+    global EVALUATION_NUMBER
+
+    # user types do not depend on prices, they are created once for all evaluations
+    user_type_population = None
+    if differential_evolution_creator.evolution_with_all_user_types_from_game:
+        user_type_population = create_user_type_population(
+            differential_evolution_creator, single_number_of_user_valuations, single_arrivals_in_first_timestep,
+            single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user,
+            single_standard_deviation_valuation)
+        test_if_value_equal_one(user_type_population.total_valuation_weight, "total_valuation_weight")
+        test_if_value_equal_one(user_type_population.probabilities.sum().item(), "total_prob_user_type")
+
+    bounds = create_bounds(differential_evolution_creator)
+
+    # a resumed run continues its .txt file and the state of its latest checkpoint
+    checkpoint = None
+    if differential_evolution_creator.resume_from_checkpoint:
+        checkpoint = find_latest_checkpoint(differential_evolution_creator.path_to_folder, run_parameters,
+                                            differential_evolution_creator.price_strategy_type, bounds,
+                                            get_study_key(differential_evolution_creator))
+        if checkpoint is not None and checkpoint.is_finished:
+            # the result has already been written by the job the run was finished in
+            return None
+
+    if checkpoint is None:
+        start_time = datetime.now()
+
+        # create and fill overview .txt file with basic informations for differential evolution
+        file_name = start_time.strftime(
+            "%m.%d.%Y_%H.%M.%S") + "_" + differential_evolution_creator.price_strategy_type + ".txt"
+        if differential_evolution_creator.number_of_concurrent_runs != 1:
+            # concurrent runs can start in the same second
+            file_name = start_time.strftime("%m.%d.%Y_%H.%M.%S") + "_" + str(
+                run_number) + "_" + differential_evolution_creator.price_strategy_type + ".txt"
+        if differential_evolution_creator.compress_run_logs:
+            file_name += GZIP_FILE_ENDING
+        path_to_file_folder = differential_evolution_creator.path_to_folder + "/" + \
+                              differential_evolution_creator.name_main_file_without_ending
+        file_path = create_or_get_file(path_to_file_folder, file_name)
+        run_log = open_run_log(file_path)
+        fill_text_file_with_basic_information(differential_evolution_creator, run_log)
+        checkpoint = DifferentialEvolutionCheckpoint(run_parameters, differential_evolution_creator.price_strategy_type,
+                                                     bounds, get_study_key(differential_evolution_creator), file_path,
+                                                     start_time)
+    else:
+        start_time = checkpoint.start_time
+        file_path = checkpoint.file_path
+        EVALUATION_NUMBER = checkpoint.evaluation_number
+        run_log = open_run_log(file_path)
+        run_log.add_line("RESUMED at generation " + str(checkpoint.generation) + " on " +
+                         datetime.now().strftime("%m.%d.%Y_%H.%M.%S"))
+
+    # the population and random number generator of a resumed run are restored, the population is evaluated again
+    rng = np.random.default_rng()
+    init = 'latinhypercube'
+    maxiter = MAXIMAL_NUMBER_OF_GENERATIONS
+    if checkpoint.population is not None:
+        rng.bit_generator.state = checkpoint.rng_state
+        init = checkpoint.population
+        maxiter = max(0, MAXIMAL_NUMBER_OF_GENERATIONS - checkpoint.generation)
+    elif differential_evolution_creator.seeded_initial_population_fraction > 0:
+        # part of the first population are reservation prices of representative user types
+        init = create_seeded_initial_population(differential_evolution_creator, bounds, popsize,
+                                                user_type_population, rng)
+    generations_before_resume = checkpoint.generation
+    number_of_evaluations_before_resume = checkpoint.number_of_evaluations
+    # the best revenues of the generations before the resume stay in the window of the early stopping policy
+    early_stopping = EarlyStopping(differential_evolution_creator, bounds)
+    early_stopping.best_revenues = list(checkpoint.best_revenues)
+    # the checkpoint of a generation is written before differential evolution is stopped early after it, including
+    # the best revenue of the generation
+    callbacks = []
+    if early_stopping.is_enabled() and OPTIMIZERS[optimizer].supports_callbacks:
+        callbacks.append(early_stopping)
+    if differential_evolution_creator.checkpoint_every_x_generations > 0 and OPTIMIZERS[optimizer].supports_callbacks:
+        callbacks.append(create_checkpoint_callback(checkpoint,
+                                                    differential_evolution_creator.checkpoint_every_x_generations,
+                                                    rng, lambda: EVALUATION_NUMBER,
+                                                    lambda: early_stopping.best_revenues))
+    callback = combine_callbacks(callbacks)
+
+    # run differential evolution
+    arguments = (
+        differential_evolution_creator, file_path, single_number_of_user_valuations,
+        single_arrivals_in_first_timestep,
+        single_probability_of_second_quality_decay_element,
+        single_engagement_factor_short_term_user, single_standard_deviation_valuation,
+        user_type_population)
+    # workers = -1 to use all available CPU cores, concurrent runs share the CPU cores
+    # workers = -1 overrides updating to 'deferred' since parallelization is needed
+    workers = -1
+    if differential_evolution_creator.number_of_concurrent_runs != 1:
+        workers = max(1, get_number_of_processes(-1) // get_number_of_processes(
+            differential_evolution_creator.number_of_concurrent_runs))
+    vectorized_objective = None
+    if differential_evolution_creator.use_vectorized_objective:
+        # the whole population is evaluated in one call in this process
+        vectorized_objective = objective_maximize_revenue_vectorized
+    # with several worker processes, the evaluation cache is looked up in this process around the map of the workers,
+    # otherwise the caches of the workers would be lost with the pool of the run
+    is_evaluation_cache_of_this_process = differential_evolution_creator.use_evaluation_cache and \
+        vectorized_objective is None and OPTIMIZERS[optimizer].supports_map_like_workers and \
+        get_number_of_processes(workers) != 1
+    shared_evaluation_context = None
+    worker_pool_of_run = None
+    if (differential_evolution_creator.use_persistent_worker_pool or is_evaluation_cache_of_this_process) and \
+            vectorized_objective is None and OPTIMIZERS[optimizer].supports_map_like_workers:
+        if differential_evolution_creator.use_persistent_worker_pool:
+            # the pool is created once for all runs, the arguments are sent to every worker once instead of with
+            # every task
+            worker_pool = get_worker_pool(get_number_of_processes(workers))
+        else:
+            worker_pool_of_run = WorkerPool(get_number_of_processes(workers))
+            worker_pool = worker_pool_of_run
+        objective_of_workers = objective_maximize_revenue
+        if is_evaluation_cache_of_this_process:
+            objective_of_workers = evaluate_revenue_and_welfare
+        shared_evaluation_context = worker_pool.share_context(
+            EvaluationContext(objective_of_workers, arguments, prepare_worker_for_run, (EVALUATION_NUMBER,)))
+        workers = shared_evaluation_context
+        if is_evaluation_cache_of_this_process:
+            workers = EvaluationCacheMap(shared_evaluation_context, arguments)
+    # lines of worker processes are written after the lines buffered so far
+    run_log.flush()
+    try:
+        result = OPTIMIZERS[optimizer].minimize(OptimizationProblem(objective_maximize_revenue, vectorized_objective,
+                                                                    bounds, arguments, strategy, popsize, rng, init,
+                                                                    maxiter, callback, workers))
+    finally:
+        if shared_evaluation_context is not None:
+            shared_evaluation_context.close()
+        if worker_pool_of_run is not None:
+            worker_pool_of_run.close()
+    if differential_evolution_creator.use_vectorized_objective:
+        # nfev of vectorized differential evolution counts calls with the whole population, not single evaluations
+        number_of_evaluations = EVALUATION_NUMBER
+    else:
+        number_of_evaluations = number_of_evaluations_before_resume + result['nfev']
+    end_time = datetime.now()
+
+    # access differential evolution result
+    solution = result['x']
+    price_base_product, price_upgrade, price_subscription, revenue_per_user, welfare_per_user, revenue_base_product_per_timestep, revenue_upgrade_per_timestep, revenue_subscription_per_timestep = get_solution_details(
+        solution, *arguments)
+    # the solution is not evaluated again, its objective is the negated revenue of the details
+    evaluation = -abs(revenue_per_user)
+
+    # write differential evolution results to .txt file
+    price_base_product_rounded = []
+    price_upgrade_rounded = []
+    price_subscription_rounded = []
+    for i in range(len(price_base_product)):
+        price_base_product_rounded.append(round(price_base_product[i], 4))
+        price_upgrade_rounded.append(round(price_upgrade[i], 4))
+        price_subscription_rounded.append(round(price_subscription[i], 4))
+    additional_info_line = "Optimizer: " + optimizer + ", \t Total evaluations: " + str(
+        number_of_evaluations) + ", \t Generations: " + str(generations_before_resume + result['nit']) + \
+                           ", \t Status: " + str(result['message'])
+    if early_stopping.stop_reason is not None:
+        additional_info_line += ", \t Early stopping after generation " + str(
+            generations_before_resume + early_stopping.generation) + ": " + early_stopping.stop_reason
+    if differential_evolution_creator.use_evaluation_cache:
+        # all lookups of the run are done in this process (see EvaluationCacheMap)
+        evaluation_cache_hits, evaluation_cache_misses = get_evaluation_cache_counters()
+        additional_info_line += ", \t Evaluation cache hits: " + str(
+            evaluation_cache_hits) + ", \t Evaluation cache misses: " + str(evaluation_cache_misses)
+    main_info_line = "Solution: " + str(solution) + ", \t Evaluation: " + str(
+        evaluation)
+    time_information_line = "Runtime: " + str(
+        end_time - start_time) + ",\t Start time: " + start_time.strftime(
+        "%m.%d.%Y_%H.%M.%S") + ",\t End Time: " + end_time.strftime(
+        "%m.%d.%Y_%H.%M.%S")
+    info_string_end_result = "Revenue: " + str(
+        round(revenue_per_user, 4)) + "Welfare: " + str(
+        round(welfare_per_user, 4)) + ",\t Base product price: " + str(
+        price_base_product_rounded) + ",\t Upgrade price: " + str(
+        price_upgrade_rounded) + ",\t Subscription price: " + str(
+        round(price_subscription[0], 4))
+    # the summary is written at the beginning of the .txt file
+    run_log.write_summary([time_information_line, PARTITION_LINE, "RESULT", main_info_line, PARTITION_LINE,
+                           info_string_end_result, PARTITION_LINE, additional_info_line, PARTITION_LINE,
+                           PARTITION_LINE])
+    run_log.close()
+
+    # write differential evolution results to .csv file
+    differential_evolution_result = DifferentialEvolutionResult()
+    differential_evolution_result.path_to_main_file = differential_evolution_creator.path_to_main_file
+    differential_evolution_result.number_of_user_valuations = single_number_of_user_valuations
+    differential_evolution_result.price_strategy_type = differential_evolution_creator.price_strategy_type
+    differential_evolution_result.price_base_product = price_base_product
+    differential_evolution_result.price_upgrade = price_upgrade
+    differential_evolution_result.price_subscription = price_subscription
+    differential_evolution_result.n_max = differential_evolution_creator.n_max
+    differential_evolution_result.n_upgrade = differential_evolution_creator.n_upgrade
+    differential_evolution_result.engagement_factor_short_term_user = single_engagement_factor_short_term_user
+    differential_evolution_result.engagement_factor_long_term_user = differential_evolution_creator.engagement_factor_long_term_user
+    differential_evolution_result.probability_short_term_user = differential_evolution_creator.probability_short_term_user
+    differential_evolution_result.quality_decay_factors = differential_evolution_creator.quality_decay_factors
+    differential_evolution_result.probability_of_second_quality_decay_factor = single_probability_of_second_quality_decay_element
+    differential_evolution_result.valuation_range = differential_evolution_creator.valuation_range
+    differential_evolution_result.standard_deviation_valuation = single_standard_deviation_valuation
+    differential_evolution_result.arrivals_in_first_timestep = single_arrivals_in_first_timestep
+    differential_evolution_result.product_quality_base_product = differential_evolution_creator.product_quality_base_product
+    differential_evolution_result.product_quality_upgrade = differential_evolution_creator.product_quality_upgrade
+    differential_evolution_result.files_results_are_written_to = differential_evolution_creator.files_results_are_written_to
+    differential_evolution_result.result_database = differential_evolution_creator.result_database
+    differential_evolution_result.path_to_folder = differential_evolution_creator.path_to_folder
+    differential_evolution_result.expected_publisher_revenue = revenue_per_user
+    differential_evolution_result.expected_user_welfare = welfare_per_user
+    differential_evolution_result.expected_total_welfare = revenue_per_user + welfare_per_user
+    differential_evolution_result.revenue_base_product = revenue_base_product_per_timestep
+    differential_evolution_result.revenue_upgrade = revenue_upgrade_per_timestep
+    differential_evolution_result.revenue_subscription = revenue_subscription_per_timestep
+    differential_evolution_result.evolution_with_all_user_types_from_game = differential_evolution_creator.evolution_with_all_user_types_from_game
+    differential_evolution_result.start_time = start_time
+    differential_evolution_result.runtime = end_time - start_time
+    differential_evolution_result.number_of_evaluations = number_of_evaluations
+    differential_evolution_result.is_prices_discounted = differential_evolution_creator.is_prices_discounted
+    differential_evolution_result.is_subscription_price_variable = differential_evolution_creator.is_subscription_price_variable
+    differential_evolution_result.price_bounds = differential_evolution_creator.price_bounds
+    differential_evolution_result.popsize = popsize
+    differential_evolution_result.optimizer = optimizer
+    differential_evolution_result.differential_evolution_strategy = strategy
+    differential_evolution_result.user_valuation = "-"
+    differential_evolution_result.user_arrival_time = "-"
+    differential_evolution_result.user_quality_decay_factor = "-"
+    differential_evolution_result.user_engagement_factor = "-"
+    differential_evolution_result.first_base_price_fixed = differential_evolution_creator.first_base_price_fixed
+    differential_evolution_result.first_upgrade_price_fixed = differential_evolution_creator.first_upgrade_price_fixed
+
+    if not differential_evolution_creator.evolution_with_all_user_types_from_game:
+        differential_evolution_result.user_valuation = differential_evolution_creator.user_valuation
+        differential_evolution_result.user_arrival_time = differential_evolution_creator.user_arrival_time
+        differential_evolution_result.user_quality_decay_factor = differential_evolution_creator.user_quality_decay_factor
+        differential_evolution_result.user_engagement_factor = differential_evolution_creator.user_engagement_factor
+
+
+    # a resumed job skips the run, its result is written to the .csv files after it is returned
+    if differential_evolution_creator.checkpoint_every_x_generations > 0:
+        checkpoint.generation = generations_before_resume + result['nit']
+        if OPTIMIZERS[optimizer].supports_callbacks:
+            checkpoint.population = result['population']
+            checkpoint.population_energies = result['population_energies']
+        checkpoint.rng_state = rng.bit_generator.state
+        checkpoint.evaluation_number = EVALUATION_NUMBER
+        checkpoint.number_of_evaluations = number_of_evaluations
+        checkpoint.best_revenues = list(early_stopping.best_revenues)
+        checkpoint.is_finished = True
+        write_checkpoint(checkpoint)
+
+    # set global evaluation number and evaluation cache counters to 0 for next evolution
+    EVALUATION_NUMBER = 0
+    reset_evaluation_cache_counters()
+
+    return differential_evolution_result
+
+
+def prepare_worker_for_run(evaluation_number):
+    """
+    Prepares a persistent worker process for the evaluations of a new run
+
+    Parameters
+    ----------
+    evaluation_number : int
+        evaluation number of the run when it has been shared with the workers (e.g., of a resumed run)
+    """
+    global EVALUATION_NUMBER
+    EVALUATION_NUMBER = evaluation_number
+    # the .txt files of earlier runs are not written to anymore
+    close_run_logs_of_worker()
+
+
+class EvaluationCacheMap(object):
+    """
+    A class used to represent map-like workers looking up the candidates of a run in the EVALUATION_CACHE of this process
+
+    Only the candidates not cached are sent to the worker processes (evaluate_revenue_and_welfare()), hence the
+    evaluations of all generations, the polishing, the solution details and later runs of this process share the cache
+    and all hits and misses are counted in this process. Cache hits are not written to the .txt file.
 
     ...
 
     Attributes
     ----------
-    buy_min : int
-        minimum bound for base product price
-    buy_max : int
-        maximum bound for base product price
-    upgrade_min : int
-        minimum bound for upgrade price
-    upgrade_max : int
-        maximum bound for upgrade price
-    subscription_min : int
-        minimum bound for subscription price
-    subscription_max : int
-        maximum bound for subscription price
+    shared_evaluation_context : SharedEvaluationContext
+        context of the run in the worker pool, evaluates evaluate_revenue_and_welfare() for every candidate
+    arguments : tuple
+        arguments of the objective of the run
     """
 
-    def __init__(self, buy_min, buy_max, upgrade_min, upgrade_max, subscription_min, subscription_max):
+    def __init__(self, shared_evaluation_context, arguments):
         """
         Parameters
         ----------
-        buy_min : int
-            minimum bound for base product price
-        buy_max : int
-            maximum bound for base product price
-        upgrade_min : int
-            minimum bound for upgrade price
-        upgrade_max : int
-            maximum bound for upgrade price
-        subscription_min : int
-            minimum bound for subscription price
-        subscription_max : int
-            maximum bound for subscription price
+        shared_evaluation_context : SharedEvaluationContext
+            context of the run in the worker pool, evaluates evaluate_revenue_and_welfare() for every candidate
+        arguments : tuple
+            arguments of the objective of the run
+        """
+        self.shared_evaluation_context = shared_evaluation_context
+        self.arguments = arguments
 
+    def __call__(self, function, candidates):
         """
-        self.buy_min = buy_min
-        self.buy_max = buy_max
-        self.upgrade_min = upgrade_min
-        self.upgrade_max = upgrade_max
-        self.subscription_min = subscription_min
-        self.subscription_max = subscription_max
+        Evaluates the objective of every candidate, candidates not cached are evaluated in the worker processes
 
+        Parameters
+        ----------
+        function : callable
+            objective wrapped by the optimizer, not sent to the workers since the objective is part of the context
+        candidates : iterable
+            prices of every candidate
+
+        Returns
+        -------
+        list[float]
+            negated revenue of every candidate in the order of the candidates
+        """
+        differential_evolution_creator = self.arguments[0]
+        candidates = list(candidates)
+        evaluation_cache_keys = []
+        objectives = [None] * len(candidates)
+        candidates_to_solve = []
+        for i, candidate in enumerate(candidates):
+            price_base_product, price_upgrade, price_subscription = get_price_vectors(candidate,
+                                                                                      differential_evolution_creator)
+            evaluation_cache_keys.append(get_evaluation_cache_key(differential_evolution_creator, self.arguments[2:7],
+                                                                  price_base_product, price_upgrade,
+                                                                  price_subscription))
+            cached_evaluation = get_cached_evaluation(evaluation_cache_keys[i])
+            if cached_evaluation is None:
+                candidates_to_solve.append(i)
+            else:
+                objectives[i] = -abs(cached_evaluation.expected_publisher_revenue)
 
-def differential_evolution_maximize_revenue(differential_evolution_creator):
+        if candidates_to_solve:
+            evaluations = self.shared_evaluation_context(function, [candidates[i] for i in candidates_to_solve])
+            for i, (revenue_per_user_type, welfare_per_user_type) in zip(candidates_to_solve, evaluations):
+                add_evaluation_to_cache(evaluation_cache_keys[i],
+                                        CachedEvaluation(revenue_per_user_type, welfare_per_user_type))
+                objectives[i] = -abs(revenue_per_user_type)
+        return objectives
+
+
+def objective_maximize_revenue(prices, *arguments):
     """
-    Executes the whole differential evolution process, creates the result object and writes it to .csv files
+    Defines the objective function which is to be maximized through differential evolution
 
     Parameters
     ----------
-    differential_evolution_creator : DifferentialEvolutionCreator
-        object containing all details about differential evolution specifics
+    prices : list[float]
+        list containing all prices (variables) for the specific evaluation of differential evolution
+    *arguments
+        all other necessary arguments for one single differential evolution evaluation such as the DifferentialEvolutionCreator
+        and the UserTypePopulation (None for a single user type)
     """
+    differential_evolution_creator, file_path = arguments[:2]
 
-    number_of_iterations_over_same_type = 0
+    global EVALUATION_NUMBER
+    EVALUATION_NUMBER += 1
 
-    # for single user type, the following variables are not important and length of lists is set to 1 to prevent too many iterations over for-loops
-    if not differential_evolution_creator.evolution_with_all_user_types_from_game:
-        differential_evolution_creator.number_of_user_valuations = [1]
-        differential_evolution_creator.arrivals_in_first_timestep = [1]
-        differential_evolution_creator.probability_of_second_quality_decay_element = [1]
-        differential_evolution_creator.engagement_factor_short_term_user = [1]
-        differential_evolution_creator.standard_deviation_valuation = [1]
+    # create price vectors from inserted bounds
+    price_base_product, price_upgrade, price_subscription = get_price_vectors(prices, differential_evolution_creator)
 
-    while number_of_iterations_over_same_type < differential_evolution_creator.number_of_iterations_per_evolution_type:
-        for single_number_of_user_valuations in differential_evolution_creator.number_of_user_valuations:
-            for single_arrivals_in_first_timestep in differential_evolution_creator.arrivals_in_first_timestep:
-                for single_probability_of_second_quality_decay_element in differential_evolution_creator.probability_of_second_quality_decay_element:
-                    for single_engagement_factor_short_term_user in differential_evolution_creator.engagement_factor_short_term_user:
-                        for single_standard_deviation_valuation in differential_evolution_creator.standard_deviation_valuation:
-                            for strategy in differential_evolution_creator.differential_evolution_strategies:
-                                for popsize in differential_evolution_creator.popsizes:
-                                    start_time = datetime.now()
-
-                                    # create and fill overview .txt file with basic informations for differential evolution
-                                    file_name = start_time.strftime(
-                                        "%m.%d.%Y_%H.%M.%S") + "_" + differential_evolution_creator.price_strategy_type + ".txt"
-                                    path_to_file_folder = differential_evolution_creator.path_to_folder + "/" + \
-                                                          differential_evolution_creator.name_main_file_without_ending
-                                    file_path = create_or_get_file(path_to_file_folder, file_name)
-                                    fill_text_file_with_basic_information(differential_evolution_creator, file_path)
-
-                                    # run differential evolution
-                                    bounds = create_bounds(differential_evolution_creator)
-                                    arguments = (
-                                        differential_evolution_creator, file_path, single_number_of_user_valuations,
-                                        single_arrivals_in_first_timestep,
-                                        single_probability_of_second_quality_decay_element,
-                                        single_engagement_factor_short_term_user, single_standard_deviation_valuation)
-                                    # workers = -1 to use all available CPU cores
-                                    # workers = -1 overrides updating to 'deferred' since parallelization is needed
-                                    # updating = 'deferred' is compatible with parallelization
-                                    result = differential_evolution(objective_maximize_revenue, bounds, args=arguments,
-                                                                    workers=-1, updating='deferred', popsize=popsize,
-                                                                    strategy=strategy)
-                                    end_time = datetime.now()
-
-                                    # access differential evolution result
-                                    solution = result['x']
-                                    number_of_evaluations = result['nfev']
-                                    evaluation = objective_maximize_revenue(solution, differential_evolution_creator,
-                                                                            file_path, single_number_of_user_valuations,
-                                                                            single_arrivals_in_first_timestep,
-                                                                            single_probability_of_second_quality_decay_element,
-                                                                            single_engagement_factor_short_term_user,
-                                                                            single_standard_deviation_valuation)
-                                    price_base_product, price_upgrade, price_subscription, revenue_per_user, welfare_per_user, revenue_base_product_per_timestep, revenue_upgrade_per_timestep, revenue_subscription_per_timestep = get_solution_details(
-                                        solution, differential_evolution_creator,
-                                        file_path, single_number_of_user_valuations,
-                                        single_arrivals_in_first_timestep,
-                                        single_probability_of_second_quality_decay_element,
-                                        single_engagement_factor_short_term_user,
-                                        single_standard_deviation_valuation)
-
-                                    # write differential evolution results to .txt file
-                                    price_base_product_rounded = []
-                                    price_upgrade_rounded = []
-                                    price_subscription_rounded = []
-                                    for i in range(len(price_base_product)):
-                                        price_base_product_rounded.append(round(price_base_product[i], 4))
-                                        price_upgrade_rounded.append(round(price_upgrade[i], 4))
-                                        price_subscription_rounded.append(round(price_subscription[i], 4))
-                                    add_first_line_to_document(file_path, PARTITION_LINE)
-                                    additional_info_line = "Total evaluations: " + str(
-                                        number_of_evaluations) + ", \t Status: " + str(
-                                        result['message'])
-                                    main_info_line = "Solution: " + str(solution) + ", \t Evaluation: " + str(
-                                        evaluation)
-                                    time_information_line = "Runtime: " + str(
-                                        end_time - start_time) + ",\t Start time: " + start_time.strftime(
-                                        "%m.%d.%Y_%H.%M.%S") + ",\t End Time: " + end_time.strftime(
-                                        "%m.%d.%Y_%H.%M.%S")
-                                    info_string_end_result = "Revenue: " + str(
-                                        round(revenue_per_user, 4)) + "Welfare: " + str(
-                                        round(welfare_per_user, 4)) + ",\t Base product price: " + str(
-                                        price_base_product_rounded) + ",\t Upgrade price: " + str(
-                                        price_upgrade_rounded) + ",\t Subscription price: " + str(
-                                        round(price_subscription[0], 4))
-                                    add_first_line_to_document(file_path, PARTITION_LINE)
-                                    add_first_line_to_document(file_path, additional_info_line)
-                                    add_first_line_to_document(file_path, PARTITION_LINE)
-                                    add_first_line_to_document(file_path, info_string_end_result)
-                                    add_first_line_to_document(file_path, PARTITION_LINE)
-                                    add_first_line_to_document(file_path, main_info_line)
-                                    add_first_line_to_document(file_path, "RESULT")
-                                    add_first_line_to_document(file_path, PARTITION_LINE)
-                                    add_first_line_to_document(file_path, time_information_line)
-
-                                    # write differential evolution results to .csv file
-                                    differential_evolution_result = DifferentialEvolutionResult()
-                                    differential_evolution_result.path_to_main_file = differential_evolution_creator.path_to_main_file
-                                    differential_evolution_result.number_of_user_valuations = single_number_of_user_valuations
-                                    differential_evolution_result.price_strategy_type = differential_evolution_creator.price_strategy_type
-                                    differential_evolution_result.price_base_product = price_base_product
-                                    differential_evolution_result.price_upgrade = price_upgrade
-                                    differential_evolution_result.price_subscription = price_subscription
-                                    differential_evolution_result.n_max = differential_evolution_creator.n_max
-                                    differential_evolution_result.n_upgrade = differential_evolution_creator.n_upgrade
-                                    differential_evolution_result.engagement_factor_short_term_user = single_engagement_factor_short_term_user
-                                    differential_evolution_result.engagement_factor_long_term_user = differential_evolution_creator.engagement_factor_long_term_user
-                                    differential_evolution_result.probability_short_term_user = differential_evolution_creator.probability_short_term_user
-                                    differential_evolution_result.quality_decay_factors = differential_evolution_creator.quality_decay_factors
-                                    differential_evolution_result.probability_of_second_quality_decay_factor = single_probability_of_second_quality_decay_element
-                                    differential_evolution_result.valuation_range = differential_evolution_creator.valuation_range
-                                    differential_evolution_result.standard_deviation_valuation = single_standard_deviation_valuation
-                                    differential_evolution_result.arrivals_in_first_timestep = single_arrivals_in_first_timestep
-                                    differential_evolution_result.product_quality_base_product = differential_evolution_creator.product_quality_base_product
-                                    differential_evolution_result.product_quality_upgrade = differential_evolution_creator.product_quality_upgrade
-                                    differential_evolution_result.files_results_are_written_to = differential_evolution_creator.files_results_are_written_to
-                                    differential_evolution_result.path_to_folder = differential_evolution_creator.path_to_folder
-                                    differential_evolution_result.expected_publisher_revenue = revenue_per_user
-                                    differential_evolution_result.expected_user_welfare = welfare_per_user
-                                    differential_evolution_result.expected_total_welfare = revenue_per_user + welfare_per_user
-                                    differential_evolution_result.revenue_base_product = revenue_base_product_per_timestep
-                                    differential_evolution_result.revenue_upgrade = revenue_upgrade_per_timestep
-                                    differential_evolution_result.revenue_subscription = revenue_subscription_per_timestep
-                                    differential_evolution_result.evolution_with_all_user_types_from_game = differential_evolution_creator.evolution_with_all_user_types_from_game
-                                    differential_evolution_result.start_time = start_time
-                                    differential_evolution_result.runtime = end_time - start_time
-                                    differential_evolution_result.number_of_evaluations = number_of_evaluations
-                                    differential_evolution_result.is_prices_discounted = differential_evolution_creator.is_prices_discounted
-                                    differential_evolution_result.is_subscription_price_variable = differential_evolution_creator.is_subscription_price_variable
-                                    differential_evolution_result.price_bounds = differential_evolution_creator.price_bounds
-                                    differential_evolution_result.popsize = popsize
-                                    differential_evolution_result.differential_evolution_strategy = strategy
-                                    differential_evolution_result.user_valuation = "-"
-                                    differential_evolution_result.user_arrival_time = "-"
-                                    differential_evolution_result.user_quality_decay_factor = "-"
-                                    differential_evolution_result.user_engagement_factor = "-"
-                                    differential_evolution_result.first_base_price_fixed = differential_evolution_creator.first_base_price_fixed
-                                    differential_evolution_result.first_upgrade_price_fixed = differential_evolution_creator.first_upgrade_price_fixed
-
-                                    if not differential_evolution_creator.evolution_with_all_user_types_from_game:
-                                        differential_evolution_result.user_valuation = differential_evolution_creator.user_valuation
-                                        differential_evolution_result.user_arrival_time = differential_evolution_creator.user_arrival_time
-                                        differential_evolution_result.user_quality_decay_factor = differential_evolution_creator.user_quality_decay_factor
-                                        differential_evolution_result.user_engagement_factor = differential_evolution_creator.user_engagement_factor
-
-                                    write_differential_evolution_result(differential_evolution_result)
-
-                                    # set global evaluation number to 0 for next evolution
-                                    global EVALUATION_NUMBER
-                                    EVALUATION_NUMBER = 0
-
-        number_of_iterations_over_same_type += 1
-
-        # wait 1 second such that very fast evolutions differ in their .txt file name
-        time.sleep(1)
+    # price vectors evaluated before (up to evaluation_cache_tolerance) are not solved again
+    cached_evaluation = None
+    if differential_evolution_creator.use_evaluation_cache:
+        evaluation_cache_key = get_evaluation_cache_key(differential_evolution_creator, arguments[2:7],
+                                                        price_base_product, price_upgrade, price_subscription)
+        cached_evaluation = get_cached_evaluation(evaluation_cache_key)
 
+    if cached_evaluation is not None:
+        revenue_per_user_type = cached_evaluation.expected_publisher_revenue
+    else:
+        revenue_per_user_type, welfare_per_user_type = calculate_revenue_and_welfare(
+            price_base_product, price_upgrade, price_subscription, *arguments)
+        if differential_evolution_creator.use_evaluation_cache:
+            add_evaluation_to_cache(evaluation_cache_key,
+                                    CachedEvaluation(revenue_per_user_type, welfare_per_user_type))
 
-def objective_maximize_revenue(prices, *arguments):
+    write_evaluation_to_file(differential_evolution_creator, file_path, revenue_per_user_type, price_base_product,
+                             price_upgrade, price_subscription)
+
+    # return negated value since differential evolution is minimizing
+    return -abs(revenue_per_user_type)
+
+
+def evaluate_revenue_and_welfare(prices, *arguments):
     """
-    Defines the objective function which is to be maximized through differential evolution
+    Evaluates the prices of a candidate without the EVALUATION_CACHE, used by the workers of an EvaluationCacheMap
 
     Parameters
     ----------
     prices : list[float]
         list containing all prices (variables) for the specific evaluation of differential evolution
     *arguments
-        all other necessary arguments for one single differential evolution evaluation such as the DifferentialEvolutionCreator
+        all other necessary arguments for one single differential evolution evaluation, see objective_maximize_revenue()
+
+    Returns
+    -------
+    revenue_per_user_type : float
+        expected revenue of the prices
+    welfare_per_user_type : float
+        expected welfare of the prices
     """
-    differential_evolution_creator, file_path, single_number_of_user_valuations, single_arrivals_in_first_timestep, single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user, single_standard_deviation_valuation = arguments
+    differential_evolution_creator, file_path = arguments[:2]
 
     global EVALUATION_NUMBER
     EVALUATION_NUMBER += 1
 
-    # create price vectors from inserted bounds
     price_base_product, price_upgrade, price_subscription = get_price_vectors(prices, differential_evolution_creator)
+    revenue_per_user_type, welfare_per_user_type = calculate_revenue_and_welfare(
+        price_base_product, price_upgrade, price_subscription, *arguments)
+    write_evaluation_to_file(differential_evolution_creator, file_path, revenue_per_user_type, price_base_product,
+                             price_upgrade, price_subscription)
+    return revenue_per_user_type, welfare_per_user_type
 
-    if differential_evolution_creator.evolution_with_all_user_types_from_game:
-        # prepare user types
-        interval_length = (differential_evolution_creator.valuation_range[1] -
-                           differential_evolution_creator.valuation_range[
-                               0]) / single_number_of_user_valuations
-        valuations = np.arange(differential_evolution_creator.valuation_range[0],
-                               differential_evolution_creator.valuation_range[1] + interval_length, interval_length)
-        quality_decay_factors = differential_evolution_creator.quality_decay_factors
-        long_term_engagement_factors = [single_engagement_factor_short_term_user,
-                                        differential_evolution_creator.engagement_factor_long_term_user]
-
-        total_revenue = []
-        user_welfare = []
-
-        # only used for execution testing
-        total_valuation_weight = 0
-        total_prob_user_type = 0
-
-        # iterate over valuation types
-        for v in range(len(valuations) - 1):
-            lowerbound = valuations[v]
-            upperbound = valuations[v + 1]
-            valuation_mean = (differential_evolution_creator.valuation_range[0] +
-                              differential_evolution_creator.valuation_range[1]) / 2
-            if single_standard_deviation_valuation != 0:
-                cdf_lowerboud = get_truncated_normal(mean=valuation_mean,
-                                                     sd=single_standard_deviation_valuation,
-                                                     low=differential_evolution_creator.valuation_range[0],
-                                                     upp=differential_evolution_creator.valuation_range[1]).cdf(
-                    lowerbound)
-                cdf_upperbound = get_truncated_normal(mean=valuation_mean,
-                                                      sd=single_standard_deviation_valuation,
-                                                      low=differential_evolution_creator.valuation_range[0],
-                                                      upp=differential_evolution_creator.valuation_range[1]).cdf(
-                    upperbound)
-                valuation_weight = cdf_upperbound - cdf_lowerboud
-                total_valuation_weight += valuation_weight
-
-                valuation = (lowerbound + upperbound) / 2
-            # single_standard_deviation_valuation == 0
-            else:
-                valuation = valuation_mean
-                valuation_weight = 1 / (len(valuations) - 1)
-                total_valuation_weight += valuation_weight
-
-            for quality_decay_factor in quality_decay_factors:
-                for long_term_engagement_factor in long_term_engagement_factors:
-                    user_type = UserType(None, long_term_engagement_factor, quality_decay_factor, valuation)
-                    product_information = ProductInformation(price_base_product, price_upgrade, price_subscription,
-                                                             [
-                                                                 differential_evolution_creator.product_quality_base_product,
-                                                                 differential_evolution_creator.product_quality_upgrade])
-
-                    game = create_game(product_information, user_type, differential_evolution_creator.n_max,
-                                       differential_evolution_creator.n_upgrade,
-                                       differential_evolution_creator.price_strategy_type)
-                    calculate_optimal_user_actions(game)
-
-                    # optimal actions are independent of arrival time and can be reused
-                    for arrival_time in range(1, differential_evolution_creator.n_max + 1):
-                        game.user_type.arrival_time = arrival_time
-                        calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game)
-                        test_reached_probabilities(game)
-
-                        prob_user_type = get_probability_user_type(game.user_type,
-                                                                   differential_evolution_creator,
-                                                                   single_arrivals_in_first_timestep,
-                                                                   single_probability_of_second_quality_decay_element,
-                                                                   single_engagement_factor_short_term_user) * valuation_weight
-                        total_revenue.append(game.expected_publisher_revenue * prob_user_type)
-                        user_welfare.append(game.expected_user_welfare * prob_user_type)
-                        total_prob_user_type += prob_user_type
-                        # set values to 0 again
-                        game.expected_publisher_revenue = 0
-                        game.expected_user_welfare = 0
-                        timestep = game.n_max
-                        while timestep > 0:
-                            for user_state in game.user_states[timestep - 1]:
-                                user_state.probability_state_is_reached = 0
-                            timestep -= 1
-        revenue_per_user_type = sum(total_revenue)
-        test_if_value_equal_one(total_valuation_weight, "total_valuation_weight")
-        test_if_value_equal_one(total_prob_user_type, "total_prob_user_type")
 
+def calculate_revenue_and_welfare(price_base_product, price_upgrade, price_subscription, *arguments):
+    """
+    Calculates the expected revenue and welfare of the price vectors of an evaluation
+
+    Parameters
+    ----------
+    price_base_product : list[float]
+        prices for the base product over time
+    price_upgrade : list[float]
+        prices for the upgrade over time
+    price_subscription : list[float]
+        prices for subscription over time
+    *arguments
+        all other necessary arguments for one single differential evolution evaluation, see objective_maximize_revenue()
+
+    Returns
+    -------
+    revenue_per_user_type : float
+        expected revenue of the price vectors
+    welfare_per_user_type : float
+        expected welfare of the price vectors
+    """
+    differential_evolution_creator, file_path, single_number_of_user_valuations, single_arrivals_in_first_timestep, single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user, single_standard_deviation_valuation, user_type_population = arguments
+
+    # the revenue can be read from the start states of the backward induction, the forward pass is only needed to check
+    # the probabilities states are reached
+    is_forward_pass_needed = not differential_evolution_creator.revenue_from_backward_induction
 
+    if differential_evolution_creator.evolution_with_all_user_types_from_game:
+        product_information = ProductInformation(price_base_product, price_upgrade, price_subscription,
+                                                 [differential_evolution_creator.product_quality_base_product,
+                                                  differential_evolution_creator.product_quality_upgrade])
+        # user types prepared once for all evaluations
+        valuations = user_type_population.valuations
+        quality_decay_factors = user_type_population.quality_decay_factors
+        engagement_factors = user_type_population.engagement_factors
+        probabilities = user_type_population.probabilities
+
+        # all arrival times of a user type are weighted with their probabilities in a single forward pass
+        if differential_evolution_creator.exact_valuation_integration:
+            # valuations are integrated between the policy breakpoints instead of using the midpoints
+            revenue_per_user_type, welfare_per_user_type = get_population_revenue_and_welfare_with_exact_valuations(
+                product_information, differential_evolution_creator, single_arrivals_in_first_timestep,
+                single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user,
+                single_standard_deviation_valuation)
+        elif differential_evolution_creator.use_tensorized_backward_induction:
+            # all user types are solved at once
+            tensorized_game = solve_user_types_tensorized(product_information, differential_evolution_creator.n_max,
+                                                          differential_evolution_creator.n_upgrade,
+                                                          differential_evolution_creator.price_strategy_type,
+                                                          valuations, quality_decay_factors, engagement_factors,
+                                                          probabilities, is_forward_pass_needed)
+            if is_forward_pass_needed:
+                test_reached_probabilities_tensorized(tensorized_game)
+            revenue_per_user_type = tensorized_game.expected_publisher_revenue.sum().item()
+            welfare_per_user_type = tensorized_game.expected_user_welfare.sum().item()
+        else:
+            total_revenue = []
+            user_welfare = []
+            for user_type_index in range(len(valuations)):
+                game = get_game_with_arrival_mixture(product_information, valuations, quality_decay_factors,
+                                                     engagement_factors, probabilities, user_type_index,
+                                                     differential_evolution_creator, is_forward_pass_needed)
+                total_revenue.append(game.expected_publisher_revenue)
+                user_welfare.append(game.expected_user_welfare)
+            revenue_per_user_type = sum(total_revenue)
+            welfare_per_user_type = sum(user_welfare)
 
     # evolution_with_all_user_types_from_game = False => evolution for single user type
     else:
@@ -349,15 +636,199 @@ def objective_maximize_revenue(prices, *arguments):
                                                  [differential_evolution_creator.product_quality_base_product,
                                                   differential_evolution_creator.product_quality_upgrade])
 
-        game = create_game(product_information, user_type, differential_evolution_creator.n_max,
-                           differential_evolution_creator.n_upgrade,
-                           differential_evolution_creator.price_strategy_type)
-        calculate_optimal_user_actions(game)
-        calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game)
-        test_reached_probabilities(game)
+        game = get_game_from_pool(product_information, user_type, differential_evolution_creator.n_max,
+                                  differential_evolution_creator.n_upgrade,
+                                  differential_evolution_creator.price_strategy_type)
+        calculate_optimal_user_actions_with_engine(game, differential_evolution_creator)
+        if is_forward_pass_needed:
+            calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game)
+            test_reached_probabilities(game)
+        else:
+            probabilities_arrival_time = [0] * differential_evolution_creator.n_max
+            probabilities_arrival_time[differential_evolution_creator.user_arrival_time - 1] = 1
+            calculate_publisher_revenue_and_user_welfare_from_backward_induction(game, probabilities_arrival_time)
         revenue_per_user_type = game.expected_publisher_revenue
+        welfare_per_user_type = game.expected_user_welfare
 
-    # write evaluation to .txt file if specified
+    return revenue_per_user_type, welfare_per_user_type
+
+
+def objective_maximize_revenue_vectorized(prices, *arguments):
+    """
+    Defines the objective function for all candidates of a generation of differential evolution at once
+
+    The price vectors of all candidates are created together and the revenue of all candidates and user types is
+    calculated with the tensorized backward induction, i.e., the result is the same as objective_maximize_revenue()
+    for every candidate.
+
+    Parameters
+    ----------
+    prices : ndarray
+        shape (number of prices, candidates), all prices (variables) of every candidate
+    *arguments
+        all other necessary arguments for one single differential evolution evaluation such as the DifferentialEvolutionCreator
+        and the UserTypePopulation (None for a single user type)
+
+    Returns
+    -------
+    ndarray
+        shape (candidates,), negated revenue of every candidate
+    """
+    differential_evolution_creator, file_path, single_number_of_user_valuations, single_arrivals_in_first_timestep, single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user, single_standard_deviation_valuation, user_type_population = arguments
+
+    global EVALUATION_NUMBER
+
+    price_base_product, price_upgrade, price_subscription = get_price_vectors_of_population(
+        prices, differential_evolution_creator)
+    number_of_candidates = price_base_product.shape[0]
+    is_forward_pass_needed = not differential_evolution_creator.revenue_from_backward_induction
+
+    if differential_evolution_creator.evolution_with_all_user_types_from_game:
+        valuations = user_type_population.valuations
+        quality_decay_factors = user_type_population.quality_decay_factors
+        engagement_factors = user_type_population.engagement_factors
+        probabilities = user_type_population.probabilities
+    # evolution_with_all_user_types_from_game = False => evolution for single user type
+    else:
+        valuations = [differential_evolution_creator.user_valuation]
+        quality_decay_factors = [differential_evolution_creator.user_quality_decay_factor]
+        engagement_factors = [differential_evolution_creator.user_engagement_factor]
+        probabilities = np.zeros((1, differential_evolution_creator.n_max))
+        probabilities[0, differential_evolution_creator.user_arrival_time - 1] = 1
+
+    revenue = np.zeros(number_of_candidates)
+    welfare = np.zeros(number_of_candidates)
+
+    # only candidates not evaluated before (up to evaluation_cache_tolerance) are solved
+    candidates_to_solve = list(range(number_of_candidates))
+    if differential_evolution_creator.use_evaluation_cache:
+        evaluation_cache_keys = [get_evaluation_cache_key(differential_evolution_creator, arguments[2:7],
+                                                          price_base_product[i], price_upgrade[i],
+                                                          price_subscription[i]) for i in range(number_of_candidates)]
+        candidates_to_solve = []
+        for i in range(number_of_candidates):
+            cached_evaluation = get_cached_evaluation(evaluation_cache_keys[i])
+            if cached_evaluation is None:
+                candidates_to_solve.append(i)
+            else:
+                revenue[i] = cached_evaluation.expected_publisher_revenue
+                welfare[i] = cached_evaluation.expected_user_welfare
+
+    if differential_evolution_creator.exact_valuation_integration and \
+            differential_evolution_creator.evolution_with_all_user_types_from_game:
+        # the valuations evaluated depend on the policy breakpoints of a candidate, candidates are solved one by one
+        for i in candidates_to_solve:
+            product_information = ProductInformation(price_base_product[i], price_upgrade[i], price_subscription[i],
+                                                     [differential_evolution_creator.product_quality_base_product,
+                                                      differential_evolution_creator.product_quality_upgrade])
+            revenue[i], welfare[i] = get_population_revenue_and_welfare_with_exact_valuations(
+                product_information, differential_evolution_creator, single_arrivals_in_first_timestep,
+                single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user,
+                single_standard_deviation_valuation)
+    else:
+        number_of_candidates_solved_at_once = max(1, MAX_USER_TYPES_SOLVED_AT_ONCE // len(valuations))
+        for first_candidate in range(0, len(candidates_to_solve), number_of_candidates_solved_at_once):
+            candidates = candidates_to_solve[first_candidate:first_candidate + number_of_candidates_solved_at_once]
+            product_informations = [ProductInformation(price_base_product[i], price_upgrade[i], price_subscription[i],
+                                                       [differential_evolution_creator.product_quality_base_product,
+                                                        differential_evolution_creator.product_quality_upgrade])
+                                    for i in candidates]
+            tensorized_game = solve_user_types_tensorized_for_price_vectors(
+                product_informations, differential_evolution_creator.n_max, differential_evolution_creator.n_upgrade,
+                differential_evolution_creator.price_strategy_type, valuations, quality_decay_factors,
+                engagement_factors, probabilities, is_forward_pass_needed)
+            if is_forward_pass_needed:
+                test_reached_probabilities_tensorized(tensorized_game)
+            revenue[candidates] = tensorized_game.expected_publisher_revenue.reshape(
+                (len(candidates), len(valuations))).sum(axis=1)
+            welfare[candidates] = tensorized_game.expected_user_welfare.reshape(
+                (len(candidates), len(valuations))).sum(axis=1)
+
+    if differential_evolution_creator.use_evaluation_cache:
+        for i in candidates_to_solve:
+            add_evaluation_to_cache(evaluation_cache_keys[i], CachedEvaluation(revenue[i].item(), welfare[i].item()))
+
+    # write evaluations to .txt file if specified
+    for i in range(number_of_candidates):
+        EVALUATION_NUMBER += 1
+        write_evaluation_to_file(differential_evolution_creator, file_path, revenue[i].item(),
+                                 price_base_product[i].tolist(), price_upgrade[i].tolist(),
+                                 price_subscription[i].tolist())
+
+    # return negated values since differential evolution is minimizing
+    return -np.abs(revenue)
+
+
+def get_game_with_arrival_mixture(product_information, valuations, quality_decay_factors, engagement_factors,
+                                  probabilities, user_type_index, differential_evolution_creator,
+                                  is_forward_pass_needed=True):
+    """
+    Performs the backward induction for a user type and a single forward pass over all arrival times
+
+    Without forward pass, the expected revenue and welfare are read from the start states of the backward induction.
+
+    Parameters
+    ----------
+    product_information : ProductInformation
+        prices over time and product qualities
+    valuations : list[float]
+        valuation of every user type
+    quality_decay_factors : list[float]
+        quality decay factor of every user type
+    engagement_factors : list[float]
+        engagement factor of every user type
+    probabilities : ndarray
+        shape (types, n_max), probability of every user type and arrival time
+    user_type_index : int
+        index of the user type
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+    is_forward_pass_needed : bool, optional
+        True if the probabilities states are reached are needed, default: True
+
+    Returns
+    -------
+    Game
+        game with the expected revenue and welfare over all arrival times weighted with their probabilities
+    """
+    user_type = UserType(None, engagement_factors[user_type_index], quality_decay_factors[user_type_index],
+                         valuations[user_type_index])
+    game = get_game_from_pool(product_information, user_type, differential_evolution_creator.n_max,
+                              differential_evolution_creator.n_upgrade,
+                              differential_evolution_creator.price_strategy_type)
+    calculate_optimal_user_actions_with_engine(game, differential_evolution_creator)
+
+    # optimal actions are independent of arrival time, all arrival times are handled in one forward pass
+    probabilities_arrival_time = probabilities[user_type_index].tolist()
+    if is_forward_pass_needed:
+        calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare_of_arrival_mixture(
+            game, probabilities_arrival_time)
+        test_reached_probabilities_of_arrival_mixture(game, probabilities_arrival_time)
+    else:
+        calculate_publisher_revenue_and_user_welfare_from_backward_induction(game, probabilities_arrival_time)
+    return game
+
+
+def write_evaluation_to_file(differential_evolution_creator, file_path, revenue_per_user_type, price_base_product,
+                             price_upgrade, price_subscription):
+    """
+    Writes the evaluation with the global EVALUATION_NUMBER to the .txt file if specified in the creator
+
+    Parameters
+    ----------
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+    file_path : str
+        path to the .txt file of the differential evolution
+    revenue_per_user_type : float
+        expected revenue of the evaluation
+    price_base_product : list[float]
+        prices for the base product over time
+    price_upgrade : list[float]
+        prices for the upgrade over time
+    price_subscription : list[float]
+        prices for subscription over time
+    """
     if EVALUATION_NUMBER % differential_evolution_creator.print_result_every_x_iterations == 0 or \
             EVALUATION_NUMBER <= differential_evolution_creator.print_result_for_the_first_x_iterations:
         price_base_product_rounded = []
@@ -372,10 +843,7 @@ def objective_maximize_revenue(prices, *arguments):
             round(revenue_per_user_type, 4)) + ",\t Base product price: " + str(
             price_base_product_rounded) + ",\t Upgrade price: " + str(
             price_upgrade_rounded) + ",\t Subscription price: " + str(price_subscription_rounded)
-        add_line_to_document(file_path, info_string)
-
-    # return negated value since differential evolution is minimizing
-    return -abs(revenue_per_user_type)
+        get_run_log(file_path).add_line(info_string)
 
 
 def get_solution_details(prices, *arguments):
@@ -388,6 +856,7 @@ def get_solution_details(prices, *arguments):
         list containing all optimal prices (variables) found by differential evolution
     *arguments
         all other necessary arguments for one single differential evolution evaluation such as the DifferentialEvolutionCreator
+        and the UserTypePopulation (None for a single user type)
 
     Returns
     -------
@@ -408,122 +877,76 @@ def get_solution_details(prices, *arguments):
     revenue_subscription_per_timestep : list[float]
         expected revenue through subscription in every timestep given all optimal prices
     """
-    differential_evolution_creator, file_path, single_number_of_user_valuations, single_arrivals_in_first_timestep, single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user, single_standard_deviation_valuation = arguments
+    differential_evolution_creator, file_path, single_number_of_user_valuations, single_arrivals_in_first_timestep, single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user, single_standard_deviation_valuation, user_type_population = arguments
 
     price_base_product, price_upgrade, price_subscription = get_price_vectors(prices, differential_evolution_creator)
 
+    # the details of price vectors evaluated before (up to evaluation_cache_tolerance) are not calculated again
+    cached_evaluation = None
+    if differential_evolution_creator.use_evaluation_cache:
+        evaluation_cache_key = get_evaluation_cache_key(differential_evolution_creator, arguments[2:7],
+                                                        price_base_product, price_upgrade, price_subscription)
+        cached_evaluation = get_cached_evaluation(evaluation_cache_key)
+        if cached_evaluation is not None and cached_evaluation.revenue_base_product_per_timestep is not None:
+            return price_base_product, price_upgrade, price_subscription, \
+                cached_evaluation.expected_publisher_revenue, cached_evaluation.expected_user_welfare, \
+                cached_evaluation.revenue_base_product_per_timestep, cached_evaluation.revenue_upgrade_per_timestep, \
+                cached_evaluation.revenue_subscription_per_timestep
+
     # do backward induction analogously to objective_maximize_revenue()
     if differential_evolution_creator.evolution_with_all_user_types_from_game:
-        interval_length = (differential_evolution_creator.valuation_range[1] -
-                           differential_evolution_creator.valuation_range[
-                               0]) / single_number_of_user_valuations
-        valuations = np.arange(differential_evolution_creator.valuation_range[0],
-                               differential_evolution_creator.valuation_range[1] + interval_length, interval_length)
-        quality_decay_factors = differential_evolution_creator.quality_decay_factors
-        long_term_engagement_factors = [single_engagement_factor_short_term_user,
-                                        differential_evolution_creator.engagement_factor_long_term_user]
-
-        total_revenue = []
-        user_welfare = []
-
-        # only used for execution testing
-        total_valuation_weight = 0
-        total_prob_user_type = 0
-
-        revenue_base_product_per_timestep = []
-        revenue_upgrade_per_timestep = []
-        revenue_subscription_per_timestep = []
-
-        for i in range(0, differential_evolution_creator.n_max):
-            revenue_base_product_per_timestep.append(0)
-            revenue_upgrade_per_timestep.append(0)
-            revenue_subscription_per_timestep.append(0)
-
-        for v in range(len(valuations) - 1):
-            lowerbound = valuations[v]
-            upperbound = valuations[v + 1]
-            valuation_mean = (differential_evolution_creator.valuation_range[0] +
-                              differential_evolution_creator.valuation_range[1]) / 2
-
-            if single_standard_deviation_valuation != 0:
-                cdf_lowerboud = get_truncated_normal(mean=valuation_mean,
-                                                     sd=single_standard_deviation_valuation,
-                                                     low=differential_evolution_creator.valuation_range[0],
-                                                     upp=differential_evolution_creator.valuation_range[1]).cdf(
-                    lowerbound)
-                cdf_upperbound = get_truncated_normal(mean=valuation_mean,
-                                                      sd=single_standard_deviation_valuation,
-                                                      low=differential_evolution_creator.valuation_range[0],
-                                                      upp=differential_evolution_creator.valuation_range[1]).cdf(
-                    upperbound)
-                valuation_weight = cdf_upperbound - cdf_lowerboud
-                total_valuation_weight += valuation_weight
-                valuation = (lowerbound + upperbound) / 2
-            # single_standard_deviation_valuation == 0
-            else:
-                valuation = valuation_mean
-                valuation_weight = 1 / (len(valuations) - 1)
-                total_valuation_weight += valuation_weight
-
-            for i in range(len(quality_decay_factors)):
-                for j in range(len(long_term_engagement_factors)):
-                    user_type = UserType(None, long_term_engagement_factors[j], quality_decay_factors[i], valuation)
-                    product_information = ProductInformation(price_base_product, price_upgrade, price_subscription,
-                                                             [
-                                                                 differential_evolution_creator.product_quality_base_product,
-                                                                 differential_evolution_creator.product_quality_upgrade])
-
-                    game = create_game(product_information, user_type, differential_evolution_creator.n_max,
-                                       differential_evolution_creator.n_upgrade,
-                                       differential_evolution_creator.price_strategy_type)
-                    calculate_optimal_user_actions(game)
-
-                    for arr_time in range(1, differential_evolution_creator.n_max + 1):
-                        game.user_type.arrival_time = arr_time
-                        calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game)
-                        test_reached_probabilities(game)
-
-                        prob_user_type = get_probability_user_type(game.user_type,
-                                                                   differential_evolution_creator,
-                                                                   single_arrivals_in_first_timestep,
-                                                                   single_probability_of_second_quality_decay_element,
-                                                                   single_engagement_factor_short_term_user) * valuation_weight
-                        total_prob_user_type += prob_user_type
-                        total_revenue.append(game.expected_publisher_revenue * prob_user_type)
-                        user_welfare.append(game.expected_user_welfare * prob_user_type)
-
-                        # count actions of user type
-                        timestep_count_revenue = game.n_max
-
-                        while timestep_count_revenue > 0:
-                            for current_user_state in game.user_states[timestep_count_revenue - 1]:
-                                if current_user_state.probability_state_is_reached > 0:
-                                    if current_user_state.best_action.subscribe_action == 1:
-                                        revenue_subscription_per_timestep[timestep_count_revenue - 1] += \
-                                            price_subscription[
-                                                timestep_count_revenue - 1] * prob_user_type * current_user_state.probability_state_is_reached
-                                        if timestep_count_revenue == game.n_max:
-                                            revenue_subscription_per_timestep[
-                                                timestep_count_revenue - 1] += current_user_state.expected_payment_in_future * prob_user_type * current_user_state.probability_state_is_reached
-                                    if current_user_state.best_action.buy_action.base_product == 1:
-                                        revenue_base_product_per_timestep[timestep_count_revenue - 1] += \
-                                            price_base_product[
-                                                timestep_count_revenue - 1] * prob_user_type * current_user_state.probability_state_is_reached
-                                    if current_user_state.best_action.buy_action.upgrade == 1:
-                                        revenue_upgrade_per_timestep[timestep_count_revenue - 1] += price_upgrade[
-                                                                                                        timestep_count_revenue - 1] * prob_user_type * current_user_state.probability_state_is_reached
-                            timestep_count_revenue -= 1
-
-                        # clean game for next user type
-                        game.expected_publisher_revenue = 0
-                        game.expected_user_welfare = 0
-                        timestep = game.n_max
-                        while timestep > 0:
-                            for user_state in game.user_states[timestep - 1]:
-                                user_state.probability_state_is_reached = 0
-                            timestep -= 1
-        test_if_value_equal_one(total_valuation_weight, "total_valuation_weight")
-        test_if_value_equal_one(total_prob_user_type, "total_prob_user_type")
+        product_information = ProductInformation(price_base_product, price_upgrade, price_subscription,
+                                                 [differential_evolution_creator.product_quality_base_product,
+                                                  differential_evolution_creator.product_quality_upgrade])
+        valuations = user_type_population.valuations
+        quality_decay_factors = user_type_population.quality_decay_factors
+        engagement_factors = user_type_population.engagement_factors
+        probabilities = user_type_population.probabilities
+
+        if differential_evolution_creator.exact_valuation_integration:
+            # the revenue per timestep is integrated between the breakpoints as well, hence it sums up to the revenue
+            exact_revenue, exact_welfare, exact_revenue_per_timestep = \
+                get_population_revenue_and_welfare_with_exact_valuations(
+                    product_information, differential_evolution_creator, single_arrivals_in_first_timestep,
+                    single_probability_of_second_quality_decay_element, single_engagement_factor_short_term_user,
+                    single_standard_deviation_valuation, is_breakdown_needed=True)
+            total_revenue = [exact_revenue]
+            user_welfare = [exact_welfare]
+            revenue_base_product_per_timestep, revenue_upgrade_per_timestep, revenue_subscription_per_timestep = \
+                exact_revenue_per_timestep
+        elif differential_evolution_creator.use_tensorized_backward_induction:
+            tensorized_game = solve_user_types_tensorized(product_information, differential_evolution_creator.n_max,
+                                                          differential_evolution_creator.n_upgrade,
+                                                          differential_evolution_creator.price_strategy_type,
+                                                          valuations, quality_decay_factors, engagement_factors,
+                                                          probabilities)
+            test_reached_probabilities_tensorized(tensorized_game)
+            total_revenue = [tensorized_game.expected_publisher_revenue.sum().item()]
+            user_welfare = [tensorized_game.expected_user_welfare.sum().item()]
+            revenue_base_product_per_timestep = tensorized_game.revenue_base_product.sum(axis=(0, 1)).tolist()
+            revenue_upgrade_per_timestep = tensorized_game.revenue_upgrade.sum(axis=(0, 1)).tolist()
+            revenue_subscription_per_timestep = tensorized_game.revenue_subscription.sum(axis=(0, 1)).tolist()
+        else:
+            total_revenue = []
+            user_welfare = []
+            revenue_base_product_per_timestep = [0] * differential_evolution_creator.n_max
+            revenue_upgrade_per_timestep = [0] * differential_evolution_creator.n_max
+            revenue_subscription_per_timestep = [0] * differential_evolution_creator.n_max
+
+            for user_type_index in range(len(valuations)):
+                game = get_game_with_arrival_mixture(product_information, valuations, quality_decay_factors,
+                                                     engagement_factors, probabilities, user_type_index,
+                                                     differential_evolution_creator)
+                total_revenue.append(game.expected_publisher_revenue)
+                user_welfare.append(game.expected_user_welfare)
+
+                # count actions of user type, already weighted with the probabilities of the arrival times
+                revenue_base_product_user_type, revenue_upgrade_user_type, revenue_subscription_user_type = get_revenue_per_timestep(
+                    game)
+                for i in range(0, differential_evolution_creator.n_max):
+                    revenue_base_product_per_timestep[i] += revenue_base_product_user_type[i]
+                    revenue_upgrade_per_timestep[i] += revenue_upgrade_user_type[i]
+                    revenue_subscription_per_timestep[i] += revenue_subscription_user_type[i]
 
     # evolution_with_all_user_types_from_game = False => evolution for single user type
     else:
@@ -535,10 +958,10 @@ def get_solution_details(prices, *arguments):
                                                  [differential_evolution_creator.product_quality_base_product,
                                                   differential_evolution_creator.product_quality_upgrade])
 
-        game = create_game(product_information, user_type, differential_evolution_creator.n_max,
-                           differential_evolution_creator.n_upgrade,
-                           differential_evolution_creator.price_strategy_type)
-        calculate_optimal_user_actions(game)
+        game = get_game_from_pool(product_information, user_type, differential_evolution_creator.n_max,
+                                  differential_evolution_creator.n_upgrade,
+                                  differential_evolution_creator.price_strategy_type)
+        calculate_optimal_user_actions_with_engine(game, differential_evolution_creator)
         calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game)
         test_reached_probabilities(game)
 
@@ -570,6 +993,11 @@ def get_solution_details(prices, *arguments):
                                                                                         timestep_count_revenue - 1] * current_user_state.probability_state_is_reached
             timestep_count_revenue -= 1
 
+    if differential_evolution_creator.use_evaluation_cache:
+        add_evaluation_to_cache(evaluation_cache_key, CachedEvaluation(
+            sum(total_revenue), sum(user_welfare), revenue_base_product_per_timestep, revenue_upgrade_per_timestep,
+            revenue_subscription_per_timestep))
+
     return price_base_product, price_upgrade, price_subscription, sum(total_revenue), sum(
         user_welfare), revenue_base_product_per_timestep, revenue_upgrade_per_timestep, revenue_subscription_per_timestep
 
@@ -777,3 +1205,31 @@ def get_price_vectors(prices, differential_evolution_creator):
             price_index += 1
 
     return price_base_product, price_upgrade, price_subscription
+
+
+def get_price_vectors_of_population(prices, differential_evolution_creator):
+    """
+    Creates the price vectors of all candidates at once, see get_price_vectors()
+
+    Parameters
+    ----------
+    prices : ndarray
+        shape (number of prices, candidates), all prices (variables) of every candidate
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+
+    Returns
+    -------
+    price_base_product : ndarray
+        shape (candidates, n_max), prices for the base product over time
+    price_upgrade : ndarray
+        shape (candidates, n_max), prices for the upgrade over time
+    price_subscription : ndarray
+        shape (candidates, n_max), prices for subscription over time
+    """
+    prices = np.asarray(prices, dtype=float)
+    number_of_candidates = prices.shape[1]
+    # every price of the price vectors is either an array over all candidates or the same for all candidates
+    price_vectors = get_price_vectors(prices, differential_evolution_creator)
+    return tuple(np.stack([np.broadcast_to(np.asarray(price, dtype=float), (number_of_candidates,))
+                           for price in price_vector], axis=1) for price_vector in price_vectors)
@@ -0,0 +1,120 @@
+import numpy as np
+
+
+class EarlyStopping(object):
+    """
+    A class used to represent the early stopping policy of a differential evolution, called after every generation
+
+    Differential evolution is stopped if the best revenue improves by at most early_stopping_relative_improvement
+    (relative to the best revenue) over the last early_stopping_generations generations, or if the spread of the
+    population in price space is below early_stopping_price_spread. The spread is the largest standard deviation of a
+    price in the population relative to the width of its bounds.
+
+    ...
+
+    Attributes
+    ----------
+    early_stopping_generations : int
+        number of generations the improvement is measured over, 0: no early stopping by improvement
+    early_stopping_relative_improvement : float
+        relative improvement of the best revenue over the generations, below which differential evolution is stopped
+    early_stopping_price_spread : float
+        spread of the population, below which differential evolution is stopped, 0: no early stopping by spread
+    widths_of_bounds : ndarray
+        shape (number of prices,), width of the bounds of every price
+    best_revenues : list[float]
+        best revenue after every generation, a resumed run continues with those of its checkpoint
+    stop_reason : str
+        reason differential evolution has been stopped, None if it has not been stopped early
+    generation : int
+        generation differential evolution has been stopped after, None if it has not been stopped early
+    """
+
+    def __init__(self, differential_evolution_creator, bounds):
+        """
+        Parameters
+        ----------
+        differential_evolution_creator : DifferentialEvolutionCreator
+            object containing all details about differential evolution specifics
+        bounds : list[list[float]]
+            bounds of the prices (variables), see create_bounds()
+        """
+        self.early_stopping_generations = differential_evolution_creator.early_stopping_generations
+        self.early_stopping_relative_improvement = differential_evolution_creator.early_stopping_relative_improvement
+        self.early_stopping_price_spread = differential_evolution_creator.early_stopping_price_spread
+        lower_bounds, upper_bounds = np.array(bounds, dtype=float).T
+        # bounds of a single price (lower = upper) do not contribute to the spread
+        self.widths_of_bounds = np.where(upper_bounds > lower_bounds, upper_bounds - lower_bounds, np.inf)
+        self.best_revenues = []
+        self.stop_reason = None
+        self.generation = None
+
+    def __call__(self, intermediate_result):
+        """
+        Decides whether differential evolution is stopped after the generation
+
+        Parameters
+        ----------
+        intermediate_result : OptimizeResult
+            state of differential evolution after the generation (fun: negated best revenue, population: prices of
+            every member, nit: generation)
+
+        Returns
+        -------
+        bool
+            True if differential evolution is stopped
+        """
+        self.best_revenues.append(-intermediate_result.fun)
+
+        if 0 < self.early_stopping_generations < len(self.best_revenues):
+            previous_best_revenue = self.best_revenues[-1 - self.early_stopping_generations]
+            improvement = self.best_revenues[-1] - previous_best_revenue
+            if improvement <= self.early_stopping_relative_improvement * abs(previous_best_revenue):
+                self.stop_reason = f"best revenue improved by {improvement} in the last " \
+                                   f"{self.early_stopping_generations} generations"
+        if self.stop_reason is None and self.early_stopping_price_spread > 0:
+            price_spread = (np.std(intermediate_result.population, axis=0) / self.widths_of_bounds).max()
+            if price_spread < self.early_stopping_price_spread:
+                self.stop_reason = f"spread of the population in price space is {price_spread}"
+
+        if self.stop_reason is not None:
+            self.generation = intermediate_result.nit
+            return True
+        return False
+
+    def is_enabled(self):
+        """
+        Returns True if differential evolution can be stopped early
+
+        Returns
+        -------
+        bool
+            True if early stopping by improvement or spread is enabled
+        """
+        return self.early_stopping_generations > 0 or self.early_stopping_price_spread > 0
+
+
+def combine_callbacks(callbacks):
+    """
+    Combines the callbacks of differential evolution, all callbacks are called and it is stopped if one returns True
+
+    Parameters
+    ----------
+    callbacks : list[callable]
+        callbacks of differential evolution called with the intermediate result
+
+    Returns
+    -------
+    callable
+        callback for scipy.optimize.differential_evolution(), None if there are no callbacks
+    """
+    if not callbacks:
+        return None
+
+    def combined_callback(intermediate_result):
+        is_stopped = False
+        for callback in callbacks:
+            is_stopped = bool(callback(intermediate_result)) or is_stopped
+        return is_stopped
+
+    return combined_callback
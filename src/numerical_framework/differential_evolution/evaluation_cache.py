@@ -0,0 +1,150 @@
+from collections import OrderedDict
+
+# evaluations of differential evolution, key: (user type population, quantized price vectors)
+EVALUATION_CACHE = OrderedDict()
+# the least recently used evaluations are removed from EVALUATION_CACHE above this size
+MAX_SIZE_OF_EVALUATION_CACHE = 100000
+# lookups of the current differential evolution (of this process)
+EVALUATION_CACHE_HITS = 0
+EVALUATION_CACHE_MISSES = 0
+
+
+class CachedEvaluation(object):
+    """
+    A class used to represent an evaluation of differential evolution stored in the EVALUATION_CACHE
+
+    ...
+
+    Attributes
+    ----------
+    expected_publisher_revenue : float
+        expected revenue of the evaluation
+    expected_user_welfare : float
+        expected welfare of the evaluation
+    revenue_base_product_per_timestep : list[float]
+        expected revenue through the base product in every timestep, None if not calculated yet
+    revenue_upgrade_per_timestep : list[float]
+        expected revenue through the upgrade in every timestep, None if not calculated yet
+    revenue_subscription_per_timestep : list[float]
+        expected revenue through subscription in every timestep, None if not calculated yet
+    """
+
+    def __init__(self, expected_publisher_revenue, expected_user_welfare, revenue_base_product_per_timestep=None,
+                 revenue_upgrade_per_timestep=None, revenue_subscription_per_timestep=None):
+        """
+        Parameters
+        ----------
+        expected_publisher_revenue : float
+            expected revenue of the evaluation
+        expected_user_welfare : float
+            expected welfare of the evaluation
+        revenue_base_product_per_timestep : list[float], optional
+            expected revenue through the base product in every timestep, default: None
+        revenue_upgrade_per_timestep : list[float], optional
+            expected revenue through the upgrade in every timestep, default: None
+        revenue_subscription_per_timestep : list[float], optional
+            expected revenue through subscription in every timestep, default: None
+        """
+        self.expected_publisher_revenue = expected_publisher_revenue
+        self.expected_user_welfare = expected_user_welfare
+        self.revenue_base_product_per_timestep = revenue_base_product_per_timestep
+        self.revenue_upgrade_per_timestep = revenue_upgrade_per_timestep
+        self.revenue_subscription_per_timestep = revenue_subscription_per_timestep
+
+
+def get_evaluation_cache_key(differential_evolution_creator, population_key, price_base_product, price_upgrade,
+                             price_subscription):
+    """
+    Creates the key of an evaluation in the EVALUATION_CACHE
+
+    The prices are rounded to multiples of evaluation_cache_tolerance, i.e., price vectors closer than the tolerance
+    (usually) share their evaluation. With tolerance 0, only identical price vectors share their evaluation.
+
+    Parameters
+    ----------
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+    population_key : tuple
+        parameters the user types of the evaluation are created from
+    price_base_product : list[float]
+        prices for the base product over time
+    price_upgrade : list[float]
+        prices for the upgrade over time
+    price_subscription : list[float]
+        prices for subscription over time
+
+    Returns
+    -------
+    tuple
+        key of the evaluation
+    """
+    tolerance = differential_evolution_creator.evaluation_cache_tolerance
+    prices = [float(price) for price_vector in [price_base_product, price_upgrade, price_subscription]
+              for price in price_vector]
+    if tolerance > 0:
+        prices = [round(price / tolerance) for price in prices]
+    return population_key, tuple(prices)
+
+
+def get_cached_evaluation(key):
+    """
+    Returns the evaluation of the key from the EVALUATION_CACHE and counts the hit or miss
+
+    Parameters
+    ----------
+    key : tuple
+        key of the evaluation created with get_evaluation_cache_key()
+
+    Returns
+    -------
+    CachedEvaluation
+        cached evaluation, None if the key is not cached
+    """
+    global EVALUATION_CACHE_HITS, EVALUATION_CACHE_MISSES
+    cached_evaluation = EVALUATION_CACHE.get(key)
+    if cached_evaluation is None:
+        EVALUATION_CACHE_MISSES += 1
+    else:
+        EVALUATION_CACHE_HITS += 1
+        EVALUATION_CACHE.move_to_end(key)
+    return cached_evaluation
+
+
+def add_evaluation_to_cache(key, cached_evaluation):
+    """
+    Adds the evaluation to the EVALUATION_CACHE and removes the least recently used evaluation if it is full
+
+    Parameters
+    ----------
+    key : tuple
+        key of the evaluation created with get_evaluation_cache_key()
+    cached_evaluation : CachedEvaluation
+        evaluation to be cached
+    """
+    EVALUATION_CACHE[key] = cached_evaluation
+    EVALUATION_CACHE.move_to_end(key)
+    if len(EVALUATION_CACHE) > MAX_SIZE_OF_EVALUATION_CACHE:
+        EVALUATION_CACHE.popitem(last=False)
+
+
+def get_evaluation_cache_counters():
+    """
+    Returns the hits and misses of the EVALUATION_CACHE since the last reset
+
+    Returns
+    -------
+    hits : int
+        number of lookups of cached evaluations
+    misses : int
+        number of lookups of evaluations not cached
+    """
+    return EVALUATION_CACHE_HITS, EVALUATION_CACHE_MISSES
+
+
+def reset_evaluation_cache_counters():
+    """
+    Sets the hits and misses to 0 for the next differential evolution, the cached evaluations are kept
+    """
+    global EVALUATION_CACHE_HITS, EVALUATION_CACHE_MISSES
+    EVALUATION_CACHE_HITS = 0
+    EVALUATION_CACHE_MISSES = 0
@@ -0,0 +1,266 @@
+import numpy as np
+from scipy.stats import qmc
+
+from src.model.game.price_strategy_type import PriceStrategyType
+from src.model.user.user_type import UserType
+from src.numerical_framework.helpers.high_price import HighPrice
+from src.numerical_framework.single_maximize_revenue.single_maximize_revenue import \
+    calculate_highest_possible_base_price, calculate_highest_possible_upgrade_price
+
+# quantiles of the reservation prices the representative user types of a population are chosen at
+REPRESENTATIVE_USER_TYPE_QUANTILES = [0.5, 0.25, 0.75, 0.1, 0.9]
+# reservation prices of the representative user types are multiplied with these factors for the seeded members
+RESERVATION_PRICE_FACTORS = [1, 0.9, 0.75, 0.5]
+
+
+def calculate_highest_possible_subscription_price(user_type, timestep, differential_evolution_creator):
+    """
+    Finds the highest subscription price for which subscribing in the timestep has a non negative immediate utility
+
+    Parameters
+    ----------
+    user_type : UserType
+        the users type
+    timestep : int
+        timestep for which calculation has to be made
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+
+    Returns
+    -------
+    float
+        the highest price for which the user subscribes in the timestep
+    """
+    quality = user_type.quality_decay_factor ** (timestep - 1) * \
+        differential_evolution_creator.product_quality_base_product
+    if timestep >= differential_evolution_creator.n_upgrade:
+        quality += user_type.quality_decay_factor ** (timestep - differential_evolution_creator.n_upgrade) * \
+                   differential_evolution_creator.product_quality_upgrade
+    return max(quality * user_type.valuation, 0)
+
+
+def get_reservation_price_vectors(user_type, differential_evolution_creator):
+    """
+    Creates the price vectors of the highest prices the user type is willing to pay in every timestep
+
+    The base product and upgrade prices are the closed forms of single maximize revenue, the subscription prices are
+    the immediate utility of subscribing.
+
+    Parameters
+    ----------
+    user_type : UserType
+        the users type
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+
+    Returns
+    -------
+    price_base_product : list[float]
+        prices for the base product over time
+    price_upgrade : list[float]
+        prices for the upgrade over time
+    price_subscription : list[float]
+        prices for subscription over time
+    """
+    price_base_product = []
+    price_upgrade = []
+    price_subscription = []
+    for timestep in range(1, differential_evolution_creator.n_max + 1):
+        price_base_product.append(
+            calculate_highest_possible_base_price(user_type, timestep, differential_evolution_creator))
+        if timestep < differential_evolution_creator.n_upgrade:
+            price_upgrade.append(HighPrice)
+        else:
+            price_upgrade.append(
+                calculate_highest_possible_upgrade_price(user_type, timestep, differential_evolution_creator))
+        price_subscription.append(
+            calculate_highest_possible_subscription_price(user_type, timestep, differential_evolution_creator))
+    return price_base_product, price_upgrade, price_subscription
+
+
+def get_price_ratio(price, previous_price):
+    """
+    Returns the discount factor between two prices (1 if the previous price is 0)
+
+    Parameters
+    ----------
+    price : float
+        price in the timestep
+    previous_price : float
+        price the discount factor refers to
+
+    Returns
+    -------
+    float
+        discount factor
+    """
+    if previous_price == 0:
+        return 1
+    return price / previous_price
+
+
+def get_prices_of_price_vectors(price_base_product, price_upgrade, price_subscription, differential_evolution_creator):
+    """
+    Creates the prices (variables) of differential evolution from the price vectors, i.e., inverse of
+    get_price_vectors()
+
+    Discounted prices are encoded as discount factors to the first price (base product and upgrade) or to the price of
+    the previous timestep (subscription). Prices of the price vectors that are not variables of differential evolution
+    (e.g., fixed first prices) are ignored.
+
+    Parameters
+    ----------
+    price_base_product : list[float]
+        prices for the base product over time
+    price_upgrade : list[float]
+        prices for the upgrade over time
+    price_subscription : list[float]
+        prices for subscription over time
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+
+    Returns
+    -------
+    list[float]
+        prices (variables) of differential evolution in the order of create_bounds()
+    """
+    prices = []
+    n_max = differential_evolution_creator.n_max
+    n_upgrade = differential_evolution_creator.n_upgrade
+
+    # base price
+    if differential_evolution_creator.price_strategy_type == PriceStrategyType.BUY or \
+            differential_evolution_creator.price_strategy_type == PriceStrategyType.BOTH:
+        if differential_evolution_creator.play_different_ask_prices:
+            first_base_price = price_base_product[0]
+            if differential_evolution_creator.first_base_price_fixed is None \
+                    or differential_evolution_creator.first_base_price_fixed == 0:
+                prices.append(first_base_price)
+            else:
+                first_base_price = differential_evolution_creator.first_base_price_fixed
+            for i in range(1, n_max):
+                if differential_evolution_creator.is_prices_discounted:
+                    prices.append(get_price_ratio(price_base_product[i], first_base_price))
+                else:
+                    prices.append(price_base_product[i])
+
+            # upgrade price
+            first_upgrade_price = price_upgrade[n_upgrade - 1]
+            if differential_evolution_creator.first_upgrade_price_fixed is None \
+                    or differential_evolution_creator.first_upgrade_price_fixed == 0:
+                prices.append(first_upgrade_price)
+            else:
+                first_upgrade_price = differential_evolution_creator.first_upgrade_price_fixed
+            for i in range(1, n_max - n_upgrade + 1):
+                if differential_evolution_creator.is_prices_discounted:
+                    prices.append(get_price_ratio(price_upgrade[n_upgrade - 1 + i], first_upgrade_price))
+                else:
+                    prices.append(price_upgrade[n_upgrade - 1 + i])
+        # play_different_ask_prices = False => initial model as in Dierks and Seuken (2020)
+        else:
+            prices.append(price_base_product[0])
+            prices.append(price_base_product[n_upgrade - 1])
+            prices.append(price_upgrade[n_upgrade - 1])
+
+    # subscription price (single variable or is discounted in all cases)
+    if differential_evolution_creator.price_strategy_type == PriceStrategyType.SUB or \
+            differential_evolution_creator.price_strategy_type == PriceStrategyType.BOTH or \
+            differential_evolution_creator.price_strategy_type == PriceStrategyType.BOTH_BUY:
+        prices.append(price_subscription[0])
+        if differential_evolution_creator.play_different_ask_prices and \
+                differential_evolution_creator.is_subscription_price_variable:
+            for i in range(1, n_max):
+                prices.append(get_price_ratio(price_subscription[i], price_subscription[i - 1]))
+
+    return prices
+
+
+def get_representative_user_types(differential_evolution_creator, user_type_population):
+    """
+    Returns the user types whose reservation prices are used to seed the initial population
+
+    With all user types from the game, these are the user types at the REPRESENTATIVE_USER_TYPE_QUANTILES of the
+    highest base price in the first timestep, weighted with the probabilities of the user types. Otherwise, it is the
+    single user type of the creator.
+
+    Parameters
+    ----------
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+    user_type_population : UserTypePopulation
+        all user types and their probabilities, None if the single user type of the creator is used
+
+    Returns
+    -------
+    list[UserType]
+        representative user types (without duplicates)
+    """
+    if user_type_population is None:
+        return [UserType(differential_evolution_creator.user_arrival_time,
+                         differential_evolution_creator.user_engagement_factor,
+                         differential_evolution_creator.user_quality_decay_factor,
+                         differential_evolution_creator.user_valuation)]
+
+    user_types = [UserType(1, engagement_factor, quality_decay_factor, valuation)
+                  for valuation, quality_decay_factor, engagement_factor in
+                  zip(user_type_population.valuations, user_type_population.quality_decay_factors,
+                      user_type_population.engagement_factors)]
+    reservation_prices = np.array([calculate_highest_possible_base_price(user_type, 1, differential_evolution_creator)
+                                   for user_type in user_types])
+    weights = np.asarray(user_type_population.probabilities).sum(axis=1)
+    order = np.argsort(reservation_prices, kind='stable')
+    cumulative_weights = np.cumsum(weights[order]) / weights.sum()
+
+    representative_indices = []
+    for quantile in REPRESENTATIVE_USER_TYPE_QUANTILES:
+        index = order[min(np.searchsorted(cumulative_weights, quantile), len(order) - 1)]
+        if index not in representative_indices:
+            representative_indices.append(index)
+    return [user_types[index] for index in representative_indices]
+
+
+def create_seeded_initial_population(differential_evolution_creator, bounds, popsize, user_type_population, rng):
+    """
+    Creates the initial population of differential evolution, partly seeded with reservation prices of user types
+
+    A share of seeded_initial_population_fraction of the members are the reservation prices of the representative user
+    types multiplied with the RESERVATION_PRICE_FACTORS (clipped to the bounds). The other members are sampled by Latin
+    hypercube as scipy does by default. The population has as many members as scipy would create for popsize.
+
+    Parameters
+    ----------
+    differential_evolution_creator : DifferentialEvolutionCreator
+        object containing all details about differential evolution specifics
+    bounds : list[list[float]]
+        bounds of the prices (variables), see create_bounds()
+    popsize : int
+        popsize of differential evolution
+    user_type_population : UserTypePopulation
+        all user types and their probabilities, None if the single user type of the creator is used
+    rng : Generator
+        random number generator of differential evolution
+
+    Returns
+    -------
+    ndarray
+        shape (members, number of prices), initial population to be passed as init to differential evolution
+    """
+    lower_bounds, upper_bounds = np.array(bounds, dtype=float).T
+    number_of_members = max(5, popsize * len(bounds))
+
+    seeded_members = []
+    representative_user_types = get_representative_user_types(differential_evolution_creator, user_type_population)
+    for factor in RESERVATION_PRICE_FACTORS:
+        for user_type in representative_user_types:
+            price_vectors = get_reservation_price_vectors(user_type, differential_evolution_creator)
+            prices = get_prices_of_price_vectors(*[[factor * price for price in price_vector]
+                                                   for price_vector in price_vectors],
+                                                 differential_evolution_creator)
+            seeded_members.append(np.clip(prices, lower_bounds, upper_bounds))
+    number_of_seeded_members = min(len(seeded_members), number_of_members, round(
+        differential_evolution_creator.seeded_initial_population_fraction * number_of_members))
+
+    sampled_members = qmc.LatinHypercube(d=len(bounds), rng=rng).random(number_of_members - number_of_seeded_members)
+    sampled_members = lower_bounds + sampled_members * (upper_bounds - lower_bounds)
+    return np.vstack([np.array(seeded_members[:number_of_seeded_members]).reshape(-1, len(bounds)),
+                      sampled_members])
@@ -0,0 +1,424 @@
+import math
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+import numpy as np
+from scipy.optimize import differential_evolution, minimize, OptimizeResult
+from scipy.stats import qmc
+
+from src.numerical_framework.helpers.parallel_helper import get_number_of_processes
+
+# relative tolerance of the objectives of a generation for convergence (default of scipy differential evolution)
+RELATIVE_TOLERANCE = 0.01
+# step size of CMA-ES relative to the width of the bounds at the start
+INITIAL_STEP_SIZE_CMA_ES = 0.3
+# CMA-ES stops if the step size relative to the width of the bounds is below this tolerance
+STEP_SIZE_TOLERANCE_CMA_ES = 1e-8
+
+
+class OptimizationProblem(object):
+    """
+    A class used to represent the minimization of the objective of a run over the bounds of its prices
+
+    ...
+
+    Attributes
+    ----------
+    objective : callable
+        objective(prices, *arguments) of a single candidate
+    vectorized_objective : callable
+        objective(prices, *arguments) of prices with shape (number of prices, candidates), None if the candidates are
+        evaluated one after the other
+    bounds : list[list[float]]
+        bounds of the prices (variables), see create_bounds()
+    arguments : tuple
+        arguments of the objective
+    strategy : str
+        strategy of differential evolution, not used by other optimizers
+    popsize : int
+        popsize of differential evolution, population size of CMA-ES and number of starts of multi-start optimizers
+    rng : Generator
+        random number generator of the optimizer
+    init : str or ndarray
+        'latinhypercube' or shape (members, number of prices), initial population (e.g., seeded or of a checkpoint)
+    maxiter : int
+        maximal number of generations (iterations)
+    callback : callable
+        callback of differential evolution (checkpoints and early stopping), None if there are no callbacks
+    workers : int or callable
+        number of worker processes the candidates (scalar objective) are evaluated in, -1 to use all available CPU
+        cores, or map-like callable evaluating the candidates (e.g., in a persistent worker pool)
+    candidate_map : callable
+        map of the process pool evaluate_candidates() uses while evaluate_in_parallel() is open, None otherwise
+    """
+
+    def __init__(self, objective, vectorized_objective, bounds, arguments, strategy, popsize, rng, init, maxiter,
+                 callback, workers):
+        """
+        Parameters
+        ----------
+        objective : callable
+            objective(prices, *arguments) of a single candidate
+        vectorized_objective : callable
+            objective(prices, *arguments) of prices with shape (number of prices, candidates), None if the candidates
+            are evaluated one after the other
+        bounds : list[list[float]]
+            bounds of the prices (variables), see create_bounds()
+        arguments : tuple
+            arguments of the objective
+        strategy : str
+            strategy of differential evolution, not used by other optimizers
+        popsize : int
+            popsize of differential evolution, population size of CMA-ES and number of starts of multi-start optimizers
+        rng : Generator
+            random number generator of the optimizer
+        init : str or ndarray
+            'latinhypercube' or shape (members, number of prices), initial population (e.g., seeded or of a checkpoint)
+        maxiter : int
+            maximal number of generations (iterations)
+        callback : callable
+            callback of differential evolution (checkpoints and early stopping), None if there are no callbacks
+        workers : int or callable
+            number of worker processes the candidates (scalar objective) are evaluated in, -1 to use all available
+            CPU cores, or map-like callable evaluating the candidates (e.g., in a persistent worker pool)
+        """
+        self.objective = objective
+        self.vectorized_objective = vectorized_objective
+        self.bounds = bounds
+        self.arguments = arguments
+        self.strategy = strategy
+        self.popsize = popsize
+        self.rng = rng
+        self.init = init
+        self.maxiter = maxiter
+        self.callback = callback
+        self.workers = workers
+        self.candidate_map = None
+
+    @contextmanager
+    def evaluate_in_parallel(self):
+        """
+        Opens a pool of worker processes evaluate_candidates() uses until the context is closed
+
+        No pool is opened for the vectorized objective, a single worker or map-like workers (e.g., a persistent
+        worker pool), hence the pool is created once per run and not for every generation.
+        """
+        if self.vectorized_objective is not None or callable(self.workers) or \
+                get_number_of_processes(self.workers) == 1:
+            yield
+            return
+        with ProcessPoolExecutor(max_workers=get_number_of_processes(self.workers)) as executor:
+            self.candidate_map = executor.map
+            try:
+                yield
+            finally:
+                self.candidate_map = None
+
+    def evaluate_candidates(self, candidates):
+        """
+        Evaluates the objective of every candidate
+
+        The candidates are evaluated in the worker processes if the workers are map-like or evaluate_in_parallel() is
+        open, otherwise one after the other in this process.
+
+        Parameters
+        ----------
+        candidates : ndarray
+            shape (candidates, number of prices), prices of every candidate
+
+        Returns
+        -------
+        ndarray
+            shape (candidates,), objective of every candidate
+        """
+        if self.vectorized_objective is not None:
+            return np.asarray(self.vectorized_objective(np.asarray(candidates).T, *self.arguments), dtype=float)
+        objective_of_candidate = ObjectiveOfCandidate(self.objective, self.arguments)
+        if callable(self.workers):
+            return np.array(list(self.workers(objective_of_candidate, list(candidates))), dtype=float)
+        if self.candidate_map is not None:
+            # several candidates are sent to a worker at once to reduce the communication
+            chunksize = max(1, len(candidates) // (4 * get_number_of_processes(self.workers)))
+            return np.array(list(self.candidate_map(objective_of_candidate, candidates, chunksize=chunksize)),
+                            dtype=float)
+        return np.array([self.objective(candidate, *self.arguments) for candidate in candidates], dtype=float)
+
+
+class ObjectiveOfCandidate(object):
+    """
+    A class used to represent the objective of a run as a picklable function of the prices of a single candidate
+
+    ...
+
+    Attributes
+    ----------
+    objective : callable
+        objective(prices, *arguments) of a single candidate
+    arguments : tuple
+        arguments of the objective
+    """
+
+    def __init__(self, objective, arguments):
+        """
+        Parameters
+        ----------
+        objective : callable
+            objective(prices, *arguments) of a single candidate
+        arguments : tuple
+            arguments of the objective
+        """
+        self.objective = objective
+        self.arguments = arguments
+
+    def __call__(self, prices):
+        return self.objective(prices, *self.arguments)
+
+
+class AbstractOptimizer(ABC):
+    """
+    A class defining an optimizer minimizing the objective of a run over the bounds of its prices
+
+    The result is an OptimizeResult with at least x, fun, nfev (evaluated price vectors), nit and message. Optimizers
+    that support callbacks also return the last population and its objectives.
+    """
+    # True: the runs of the optimizer are repeated for every strategy in differential_evolution_strategies
+    uses_strategies = False
+    # True: the optimizer calls the callback after every generation (checkpoints and early stopping) and can be resumed
+    # from the population of a checkpoint
+    supports_callbacks = False
+    # True: the candidates can be evaluated with map-like workers (e.g., the context of a persistent worker pool),
+    # otherwise workers must be a number of processes
+    supports_map_like_workers = True
+
+    @abstractmethod
+    def minimize(self, optimization_problem):
+        pass
+
+
+class DifferentialEvolutionOptimizer(AbstractOptimizer):
+    """
+    A class defining differential evolution of scipy (optionally polished with L-BFGS-B as by default in scipy)
+    """
+    uses_strategies = True
+    supports_callbacks = True
+
+    def __init__(self, polish=True):
+        self.polish = polish
+
+    def minimize(self, optimization_problem):
+        if optimization_problem.vectorized_objective is not None:
+            # the whole population is evaluated in one call, which requires workers = 1
+            return differential_evolution(optimization_problem.vectorized_objective, optimization_problem.bounds,
+                                          args=optimization_problem.arguments, vectorized=True, workers=1,
+                                          updating='deferred', popsize=optimization_problem.popsize,
+                                          strategy=optimization_problem.strategy, maxiter=optimization_problem.maxiter,
+                                          rng=optimization_problem.rng, init=optimization_problem.init,
+                                          callback=optimization_problem.callback, polish=self.polish)
+        # updating = 'deferred' is compatible with parallelization
+        return differential_evolution(optimization_problem.objective, optimization_problem.bounds,
+                                      args=optimization_problem.arguments, workers=optimization_problem.workers,
+                                      updating='deferred', popsize=optimization_problem.popsize,
+                                      strategy=optimization_problem.strategy, maxiter=optimization_problem.maxiter,
+                                      rng=optimization_problem.rng, init=optimization_problem.init,
+                                      callback=optimization_problem.callback, polish=self.polish)
+
+
+class DifferentialEvolutionPowellOptimizer(DifferentialEvolutionOptimizer):
+    """
+    A class defining differential evolution for the coarse search, refined by the derivative free Powell method
+    """
+
+    def __init__(self):
+        super().__init__(polish=False)
+
+    def minimize(self, optimization_problem):
+        result = super().minimize(optimization_problem)
+        refinement = minimize(optimization_problem.objective, result.x, args=optimization_problem.arguments,
+                              method='Powell', bounds=optimization_problem.bounds)
+        if refinement.fun < result.fun:
+            result.x = refinement.x
+            result.fun = refinement.fun
+        result.nfev += refinement.nfev
+        result.message = str(result.message) + " Refinement: " + str(refinement.message)
+        return result
+
+
+class MultiStartOptimizer(AbstractOptimizer):
+    """
+    A class defining a local derivative free method of scipy started from popsize points
+
+    The starting points are the first members of the initial population (e.g., seeded) or sampled by Latin hypercube.
+    The local methods evaluate one candidate after the other, hence the starts are distributed over the workers.
+    """
+    supports_map_like_workers = False
+
+    def __init__(self, method):
+        self.method = method
+
+    def minimize(self, optimization_problem):
+        lower_bounds, upper_bounds = np.array(optimization_problem.bounds, dtype=float).T
+        starting_points = qmc.LatinHypercube(d=len(lower_bounds), rng=optimization_problem.rng).random(
+            optimization_problem.popsize)
+        starting_points = lower_bounds + starting_points * (upper_bounds - lower_bounds)
+        if not isinstance(optimization_problem.init, str):
+            number_of_initial_points = min(len(optimization_problem.init), optimization_problem.popsize)
+            starting_points[:number_of_initial_points] = optimization_problem.init[:number_of_initial_points]
+
+        minimize_from_starting_point = partial(minimize_locally, self.method, optimization_problem.objective,
+                                               optimization_problem.arguments, optimization_problem.bounds)
+        number_of_processes = min(get_number_of_processes(optimization_problem.workers), len(starting_points))
+        if number_of_processes <= 1:
+            results = [minimize_from_starting_point(starting_point) for starting_point in starting_points]
+        else:
+            with ProcessPoolExecutor(max_workers=number_of_processes) as executor:
+                results = list(executor.map(minimize_from_starting_point, starting_points))
+
+        best_result = None
+        number_of_evaluations = 0
+        number_of_iterations = 0
+        for result in results:
+            number_of_evaluations += result.nfev
+            number_of_iterations += result.nit
+            if best_result is None or result.fun < best_result.fun:
+                best_result = result
+        return OptimizeResult(x=best_result.x, fun=best_result.fun, nfev=number_of_evaluations,
+                              nit=number_of_iterations, message=f"Best of {len(starting_points)} starts: " + str(
+                                  best_result.message))
+
+
+def minimize_locally(method, objective, arguments, bounds, starting_point):
+    """
+    Minimizes the objective with a local method of scipy from a starting point (a start of MultiStartOptimizer)
+
+    Parameters
+    ----------
+    method : str
+        local method of scipy.optimize.minimize()
+    objective : callable
+        objective(prices, *arguments) of a single candidate
+    arguments : tuple
+        arguments of the objective
+    bounds : list[list[float]]
+        bounds of the prices (variables)
+    starting_point : ndarray
+        shape (number of prices,), prices the method is started from
+
+    Returns
+    -------
+    OptimizeResult
+        result of the local method
+    """
+    return minimize(objective, starting_point, args=arguments, method=method, bounds=bounds)
+
+
+class CmaEsOptimizer(AbstractOptimizer):
+    """
+    A class defining the covariance matrix adaptation evolution strategy (CMA-ES) with the default parameters of
+    Hansen (2016), The CMA Evolution Strategy: A Tutorial
+
+    The search is done on the bounds scaled to [0, 1]. Candidates outside the bounds are evaluated at the closest
+    price vector within the bounds and ranked with a penalty of their squared distance to the bounds. Like
+    differential evolution, it converges if the standard deviation of the objectives of a generation is at most
+    RELATIVE_TOLERANCE times their mean.
+    """
+
+    def minimize(self, optimization_problem):
+        # the pool of worker processes is opened once for all generations
+        with optimization_problem.evaluate_in_parallel():
+            return self.minimize_in_parallel(optimization_problem)
+
+    def minimize_in_parallel(self, optimization_problem):
+        lower_bounds, upper_bounds = np.array(optimization_problem.bounds, dtype=float).T
+        widths = upper_bounds - lower_bounds
+        dimension = len(lower_bounds)
+        rng = optimization_problem.rng
+
+        # default parameters
+        number_of_candidates = max(4 + int(3 * math.log(dimension)), optimization_problem.popsize)
+        number_of_parents = number_of_candidates // 2
+        weights = math.log(number_of_parents + 0.5) - np.log(np.arange(1, number_of_parents + 1))
+        weights /= weights.sum()
+        effective_number_of_parents = 1 / np.sum(weights ** 2)
+        cumulation_covariance = (4 + effective_number_of_parents / dimension) / (
+                dimension + 4 + 2 * effective_number_of_parents / dimension)
+        cumulation_step_size = (effective_number_of_parents + 2) / (dimension + effective_number_of_parents + 5)
+        learning_rate_rank_one = 2 / ((dimension + 1.3) ** 2 + effective_number_of_parents)
+        learning_rate_rank_parents = min(1 - learning_rate_rank_one, 2 * (
+                effective_number_of_parents - 2 + 1 / effective_number_of_parents) / (
+                                                 (dimension + 2) ** 2 + effective_number_of_parents))
+        damping = 1 + 2 * max(0, math.sqrt((effective_number_of_parents - 1) / (dimension + 1)) - 1) + \
+            cumulation_step_size
+        expected_norm = math.sqrt(dimension) * (1 - 1 / (4 * dimension) + 1 / (21 * dimension ** 2))
+
+        # state, the mean starts at the first member of the initial population (e.g., seeded) or the center
+        mean = np.full(dimension, 0.5)
+        if not isinstance(optimization_problem.init, str):
+            mean = np.clip((np.asarray(optimization_problem.init[0], dtype=float) - lower_bounds) / widths, 0, 1)
+        step_size = INITIAL_STEP_SIZE_CMA_ES
+        covariance = np.eye(dimension)
+        evolution_path_covariance = np.zeros(dimension)
+        evolution_path_step_size = np.zeros(dimension)
+
+        best_x = lower_bounds + mean * widths
+        best_fun = math.inf
+        number_of_evaluations = 0
+        message = "Maximum number of iterations has been exceeded."
+        generation = 0
+        for generation in range(1, optimization_problem.maxiter + 1):
+            eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+            standard_deviations = np.sqrt(np.maximum(eigenvalues, 1e-20))
+            steps = rng.standard_normal((number_of_candidates, dimension)) @ (
+                    eigenvectors * standard_deviations).T
+            candidates = mean + step_size * steps
+            candidates_within_bounds = np.clip(candidates, 0, 1)
+            objectives = optimization_problem.evaluate_candidates(lower_bounds + candidates_within_bounds * widths)
+            number_of_evaluations += number_of_candidates
+            penalties = np.sum((candidates - candidates_within_bounds) ** 2, axis=1) * (
+                    1 + np.abs(objectives).max())
+
+            if objectives.min() < best_fun:
+                best_fun = objectives.min()
+                best_x = lower_bounds + candidates_within_bounds[objectives.argmin()] * widths
+
+            # update of mean, evolution paths, covariance and step size
+            parents = np.argsort(objectives + penalties, kind='stable')[:number_of_parents]
+            old_mean = mean
+            mean = weights @ candidates_within_bounds[parents]
+            mean_step = (mean - old_mean) / step_size
+            inverse_square_root_covariance = (eigenvectors / standard_deviations) @ eigenvectors.T
+            evolution_path_step_size = (1 - cumulation_step_size) * evolution_path_step_size + math.sqrt(
+                cumulation_step_size * (2 - cumulation_step_size) * effective_number_of_parents) * \
+                (inverse_square_root_covariance @ mean_step)
+            is_path_short = np.linalg.norm(evolution_path_step_size) / math.sqrt(
+                1 - (1 - cumulation_step_size) ** (2 * generation)) / expected_norm < 1.4 + 2 / (dimension + 1)
+            evolution_path_covariance = (1 - cumulation_covariance) * evolution_path_covariance + is_path_short * \
+                math.sqrt(cumulation_covariance * (2 - cumulation_covariance) * effective_number_of_parents) * mean_step
+            parent_steps = (candidates_within_bounds[parents] - old_mean) / step_size
+            covariance = (1 - learning_rate_rank_one - learning_rate_rank_parents) * covariance + \
+                learning_rate_rank_one * (np.outer(evolution_path_covariance, evolution_path_covariance) + (
+                    1 - is_path_short) * cumulation_covariance * (2 - cumulation_covariance) * covariance) + \
+                learning_rate_rank_parents * (parent_steps.T * weights) @ parent_steps
+            covariance = (covariance + covariance.T) / 2
+            step_size *= math.exp((cumulation_step_size / damping) * (
+                    np.linalg.norm(evolution_path_step_size) / expected_norm - 1))
+
+            if np.std(objectives) <= RELATIVE_TOLERANCE * abs(np.mean(objectives)):
+                message = "Optimization terminated successfully."
+                break
+            if step_size * standard_deviations.max() < STEP_SIZE_TOLERANCE_CMA_ES:
+                message = "Step size below tolerance."
+                break
+
+        return OptimizeResult(x=best_x, fun=best_fun, nfev=number_of_evaluations, nit=generation, message=message)
+
+
+# optimizers that can be chosen in optimizers in DIFFERENTIAL_EVOLUTION in config.ini
+OPTIMIZERS = {
+    'differential_evolution': DifferentialEvolutionOptimizer(),
+    'differential_evolution_powell': DifferentialEvolutionPowellOptimizer(),
+    'cma_es': CmaEsOptimizer(),
+    'nelder_mead': MultiStartOptimizer('Nelder-Mead'),
+    'powell': MultiStartOptimizer('Powell'),
+}
@@ -0,0 +1,46 @@
+class PriceBounds(object):
+    """
+    A class used to represent Price Bounds used to perform Differential Evolution
+
+    ...
+
+    Attributes
+    ----------
+    buy_min : int
+        minimum bound for base product price
+    buy_max : int
+        maximum bound for base product price
+    upgrade_min : int
+        minimum bound for upgrade price
+    upgrade_max : int
+        maximum bound for upgrade price
+    subscription_min : int
+        minimum bound for subscription price
+    subscription_max : int
+        maximum bound for subscription price
+    """
+
+    def __init__(self, buy_min, buy_max, upgrade_min, upgrade_max, subscription_min, subscription_max):
+        """
+        Parameters
+        ----------
+        buy_min : int
+            minimum bound for base product price
+        buy_max : int
+            maximum bound for base product price
+        upgrade_min : int
+            minimum bound for upgrade price
+        upgrade_max : int
+            maximum bound for upgrade price
+        subscription_min : int
+            minimum bound for subscription price
+        subscription_max : int
+            maximum bound for subscription price
+
+        """
+        self.buy_min = buy_min
+        self.buy_max = buy_max
+        self.upgrade_min = upgrade_min
+        self.upgrade_max = upgrade_max
+        self.subscription_min = subscription_min
+        self.subscription_max = subscription_max
@@ -1,7 +1,7 @@
 from abc import ABC
 
 from src.model.publisher.productinformation import ProductInformation
-from src.numerical_framework.differential_evolution.differential_evolution import PriceBounds
+from src.numerical_framework.differential_evolution.price_bounds import PriceBounds
 from src.numerical_framework.helpers.validators.validator_arrival_time import ValidatorArrivalTime
 from src.numerical_framework.helpers.validators.validator_base_price import ValidatorBasePrice
 from src.numerical_framework.helpers.validators.validator_base_price_for_both_buy import ValidatorBasePriceForBothBuy
@@ -11,6 +11,8 @@ from src.numerical_framework.helpers.validators.validator_engagement_factor_long
     ValidatorEngagementFactorLongTermUser
 from src.numerical_framework.helpers.validators.validator_engagement_factor_short_term_user import \
     ValidatorEngagementFactorShortTermUser
+from src.numerical_framework.helpers.validators.validator_exact_valuation_integration import \
+    ValidatorExactValuationIntegration
 from src.numerical_framework.helpers.validators.validator_files_backward_induction_results_are_written_to import \
     ValidatorFilesBackwardInductionResultsAreWrittenTo
 from src.numerical_framework.helpers.validators.validator_files_differential_evolution_results_are_written_to import \
@@ -26,6 +28,10 @@ from src.numerical_framework.helpers.validators.validator_is_prices_discounted i
 from src.numerical_framework.helpers.validators.validator_is_subscription_price_variable import \
     ValidatorIsSubscriptionPriceVariable
 from src.numerical_framework.helpers.validators.validator_n_max import ValidatorNMax
+from src.numerical_framework.helpers.validators.validator_number_of_concurrent_runs import \
+    ValidatorNumberOfConcurrentRuns
+from src.numerical_framework.helpers.validators.validator_number_of_workers_backward_induction import \
+    ValidatorNumberOfWorkersBackwardInduction
 from src.numerical_framework.helpers.validators.validator_n_upgrade import ValidatorNUpgrade
 from src.numerical_framework.helpers.validators.validator_number_of_iterations_per_evolution_type import \
     ValidatorNumberOfIterationsPerEvolutionType
@@ -57,6 +63,8 @@ from src.numerical_framework.helpers.validators.validator_product_quality_base_p
     ValidatorProductQualityBaseProduct
 from src.numerical_framework.helpers.validators.validator_product_quality_upgrade import ValidatorProductQualityUpgrade
 from src.numerical_framework.helpers.validators.validator_quality_decay_factors import ValidatorQualityDecayFactors
+from src.numerical_framework.helpers.validators.validator_revenue_from_backward_induction import \
+    ValidatorRevenueFromBackwardInduction
 from src.numerical_framework.helpers.validators.validator_standard_deviation_valuation import \
     ValidatorStandardDeviationValuation
 from src.numerical_framework.helpers.validators.validator_strategies import ValidatorStrategies
@@ -88,6 +96,32 @@ from src.numerical_framework.helpers.validators.validator_user_valuations_backwa
     ValidatorUserValuationsBackwardInduction
 from src.numerical_framework.helpers.validators.validator_user_valuations_single_max_revenue import \
     ValidatorUserValuationsSingleMaxRevenue
+from src.numerical_framework.helpers.validators.validator_use_suffix_cache import ValidatorUseSuffixCache
+from src.numerical_framework.helpers.validators.validator_checkpoint_every_x_generations import \
+    ValidatorCheckpointEveryXGenerations
+from src.numerical_framework.helpers.validators.validator_resume_from_checkpoint import ValidatorResumeFromCheckpoint
+from src.numerical_framework.helpers.validators.validator_study_name import ValidatorStudyName
+from src.numerical_framework.helpers.validators.validator_seeded_initial_population_fraction import \
+    ValidatorSeededInitialPopulationFraction
+from src.numerical_framework.helpers.validators.validator_optimizers import ValidatorOptimizers
+from src.numerical_framework.helpers.validators.validator_early_stopping_generations import \
+    ValidatorEarlyStoppingGenerations
+from src.numerical_framework.helpers.validators.validator_early_stopping_relative_improvement import \
+    ValidatorEarlyStoppingRelativeImprovement
+from src.numerical_framework.helpers.validators.validator_early_stopping_price_spread import \
+    ValidatorEarlyStoppingPriceSpread
+from src.numerical_framework.helpers.validators.validator_compress_run_logs import ValidatorCompressRunLogs
+from src.numerical_framework.helpers.validators.validator_result_database import ValidatorResultDatabase
+from src.numerical_framework.helpers.validators.validator_reuse_solved_user_types import ValidatorReuseSolvedUserTypes
+from src.numerical_framework.helpers.validators.validator_use_persistent_worker_pool import \
+    ValidatorUsePersistentWorkerPool
+from src.numerical_framework.helpers.validators.validator_use_evaluation_cache import ValidatorUseEvaluationCache
+from src.numerical_framework.helpers.validators.validator_evaluation_cache_tolerance import \
+    ValidatorEvaluationCacheTolerance
+from src.numerical_framework.helpers.validators.validator_use_tensorized_backward_induction import \
+    ValidatorUseTensorizedBackwardInduction
+from src.numerical_framework.helpers.validators.validator_use_vectorized_objective import \
+    ValidatorUseVectorizedObjective
 from src.numerical_framework.helpers.validators.validator_valuation_range import ValidatorValuationRange
 
 
@@ -109,9 +143,16 @@ class AbstractGameCreator(ABC):
     product_quality_upgrade = None
     price_strategy_type = None
     files_results_are_written_to = None
+    result_database = None
     path_to_main_file = None
     path_to_folder = None
     number_of_user_valuations = None
+    use_tensorized_backward_induction = False
+    # only read from the config.ini for differential evolution
+    use_suffix_cache = False
+    # shard of the settings or runs of this process (see sharding_helper.py), set in main.py
+    shard_index = 0
+    shard_count = 1
 
 
 class DifferentialEvolutionCreator(AbstractGameCreator):
@@ -129,6 +170,7 @@ class DifferentialEvolutionCreator(AbstractGameCreator):
     print_result_for_the_first_x_iterations = None
     popsizes = None
     differential_evolution_strategies = None
+    optimizers = ["differential_evolution"]
     name_main_file_without_ending = None
     number_of_iterations_per_evolution_type = None
     user_valuation = None
@@ -137,6 +179,21 @@ class DifferentialEvolutionCreator(AbstractGameCreator):
     user_engagement_factor = None
     base_price_for_both_buy = None
     upgrade_price_for_both_buy = None
+    use_vectorized_objective = False
+    revenue_from_backward_induction = False
+    exact_valuation_integration = False
+    use_evaluation_cache = False
+    evaluation_cache_tolerance = 0
+    number_of_concurrent_runs = 1
+    use_persistent_worker_pool = False
+    checkpoint_every_x_generations = 0
+    resume_from_checkpoint = False
+    study_name = ""
+    seeded_initial_population_fraction = 0
+    early_stopping_generations = 0
+    early_stopping_relative_improvement = 0
+    early_stopping_price_spread = 0
+    compress_run_logs = False
 
 
 class BackwardInductionCreator(AbstractGameCreator):
@@ -154,6 +211,8 @@ class BackwardInductionCreator(AbstractGameCreator):
     user_quality_decay_factors = None
     user_engagement_factors = None
     product_information = None
+    number_of_workers = 1
+    reuse_solved_user_types = False
 
 
 class SingleMaximizeRevenueCreator(AbstractGameCreator):
@@ -282,6 +341,7 @@ def get_all_validators():
         ValidatorPathToFolderBackwardInduction(),
         ValidatorPathToFolderDifferentialEvolution(),
         ValidatorPathToFolderSingleMaxRevenue(),
+        ValidatorUseTensorizedBackwardInduction(),
         ValidatorPriceStrategy(),
         ValidatorArrivalTime(),
         ValidatorNMax(),
@@ -307,6 +367,7 @@ def get_all_validators():
         ValidatorUserEngagementFactorsBackwardInduction(),
         ValidatorUserQualityDecayFactorsBackwardInduction(),
         ValidatorFilesBackwardInductionResultsAreWrittenTo(),
+        ValidatorNumberOfWorkersBackwardInduction(),
         ValidatorUserValuationsSingleMaxRevenue(),
         ValidatorUserArrivalTimesSingleMaxRevenue(),
         ValidatorUserEngagementFactorsSingleMaxRevenue(),
@@ -330,4 +391,23 @@ def get_all_validators():
         ValidatorFilesDifferentialEvolutionResultsAreWrittenTo(),
         ValidatorNumberOfIterationsPerEvolutionType(),
         ValidatorBasePriceForBothBuy(),
-        ValidatorUpgradePriceForBothBuy()]
+        ValidatorUpgradePriceForBothBuy(),
+        ValidatorUseVectorizedObjective(),
+        ValidatorRevenueFromBackwardInduction(),
+        ValidatorExactValuationIntegration(),
+        ValidatorUseSuffixCache(),
+        ValidatorUseEvaluationCache(),
+        ValidatorEvaluationCacheTolerance(),
+        ValidatorNumberOfConcurrentRuns(),
+        ValidatorCheckpointEveryXGenerations(),
+        ValidatorResumeFromCheckpoint(),
+        ValidatorStudyName(),
+        ValidatorSeededInitialPopulationFraction(),
+        ValidatorOptimizers(),
+        ValidatorEarlyStoppingGenerations(),
+        ValidatorEarlyStoppingRelativeImprovement(),
+        ValidatorEarlyStoppingPriceSpread(),
+        ValidatorCompressRunLogs(),
+        ValidatorResultDatabase(),
+        ValidatorReuseSolvedUserTypes(),
+        ValidatorUsePersistentWorkerPool()]
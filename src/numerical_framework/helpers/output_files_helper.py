@@ -1,9 +1,18 @@
 import csv
 import os
+import time
 
 from src.numerical_framework.helpers.high_price import HighPrice
+from src.numerical_framework.helpers.result_store import get_result_store, ResultStore, BACKWARD_INDUCTION, \
+    DIFFERENTIAL_EVOLUTION, SINGLE_MAX_REVENUE
 
 PARTITION_LINE = "-------------------------------------"
+# rows buffered by a result sink and seconds after which they are written to the .csv files
+RESULT_SINK_BATCH_SIZE = 1000
+RESULT_SINK_FLUSH_INTERVAL = 10
+# names of the methods in error messages
+METHOD_DESCRIPTIONS = {BACKWARD_INDUCTION: "backward induction", DIFFERENTIAL_EVOLUTION: "differential evolution",
+                       SINGLE_MAX_REVENUE: "single max search"}
 
 
 def count_rows_in_csv(file_name):
@@ -20,9 +29,25 @@ def count_rows_in_csv(file_name):
     int
         number of rows in the csv
     """
-    file = open(file_name)
-    reader = csv.reader(file)
-    return len(list(reader))
+    with open(file_name, encoding='UTF8', newline='') as file:
+        return sum(1 for _ in csv.reader(file))
+
+
+def is_file_empty(file_name):
+    """
+    Checks if a given file is empty, e.g., a .csv file without header line (without reading the file)
+
+    Parameters
+    ----------
+    file_name : String
+        file name with path
+
+    Returns
+    -------
+    bool
+        True if the file has no content
+    """
+    return os.path.getsize(file_name) == 0
 
 
 def write_csv_row(file_name, row):
@@ -42,6 +67,109 @@ def write_csv_row(file_name, row):
         writer.writerow(row)
 
 
+class ResultSink(object):
+    """
+    A class used to represent the .csv files the results of a run are written to, kept open until the run is finished
+
+    Every file is created (with its header line) when the first row is written to it. Rows are buffered and written if
+    batch_size rows are buffered or RESULT_SINK_FLUSH_INTERVAL seconds have passed, and when the sink is closed. Used
+    as context manager, the sink is closed even if the run fails.
+
+    ...
+
+    Attributes
+    ----------
+    batch_size : int
+        number of buffered rows after which the rows are written to the files
+    files : dict
+        key: file name with path, value: open file
+    writers : dict
+        key: file name with path, value: csv writer of the file
+    buffered_rows : dict
+        key: file name with path, value: rows not written to the file yet
+    number_of_buffered_rows : int
+        number of rows not written to the files yet
+    last_flush_time : float
+        time the buffered rows have been written to the files last (time.monotonic())
+    """
+
+    def __init__(self, batch_size=RESULT_SINK_BATCH_SIZE):
+        """
+        Parameters
+        ----------
+        batch_size : int, optional
+            number of buffered rows after which the rows are written to the files, default: RESULT_SINK_BATCH_SIZE
+        """
+        self.batch_size = batch_size
+        self.files = {}
+        self.writers = {}
+        self.buffered_rows = {}
+        self.number_of_buffered_rows = 0
+        self.last_flush_time = time.monotonic()
+
+    def write_row(self, save_path, file_name, row, write_header_line=None):
+        """
+        Writes a row to a given .csv file
+
+        Parameters
+        ----------
+        save_path : String
+            path to folder location of the file
+        file_name : String
+            file name without path
+        row : list[String]
+            one element in the list per column which shall be written
+        write_header_line : callable, optional
+            writes the header line to the file (called with the file name with path) if the file is empty when the
+            first row is written to it, default: None (no header line)
+        """
+        complete_name = os.path.join(save_path, file_name)
+        if complete_name not in self.files:
+            create_or_get_file(save_path, file_name)
+            if write_header_line is not None and is_file_empty(complete_name):
+                write_header_line(complete_name)
+            self.files[complete_name] = open(complete_name, 'a', encoding='UTF8', newline='')
+            self.writers[complete_name] = csv.writer(self.files[complete_name])
+            self.buffered_rows[complete_name] = []
+
+        self.buffered_rows[complete_name].append(row)
+        self.number_of_buffered_rows += 1
+        if self.number_of_buffered_rows >= self.batch_size or \
+                time.monotonic() - self.last_flush_time >= RESULT_SINK_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows to the files
+        """
+        for complete_name, rows in self.buffered_rows.items():
+            if rows:
+                self.writers[complete_name].writerows(rows)
+                self.files[complete_name].flush()
+                rows.clear()
+        self.number_of_buffered_rows = 0
+        self.last_flush_time = time.monotonic()
+
+    def close(self):
+        """
+        Writes the buffered rows to the files and closes them
+        """
+        try:
+            self.flush()
+        finally:
+            for file in self.files.values():
+                file.close()
+            self.files = {}
+            self.writers = {}
+            self.buffered_rows = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 def create_or_get_file(save_path, file_name):
     """
     Create or get a file at given location
@@ -54,8 +182,8 @@ def create_or_get_file(save_path, file_name):
         file name with path
     """
     complete_name = os.path.join(save_path, file_name)
-    if not os.path.exists(save_path):
-        os.makedirs(save_path)
+    # concurrent runs can create the folder at the same time
+    os.makedirs(save_path, exist_ok=True)
     if not os.path.exists(complete_name):
         file = open(complete_name, "w+")
         file.close()
@@ -115,9 +243,9 @@ def write_header_line_overview_csv_differential_evolution(n_max, path_main_file)
     path_main_file : String
         file name with path
     """
-    header_row = ['Start time', 'Runtime', 'File Name', 'DE Strat.', 'Optimization Type', 'Number of evaluations',
-                  'Bound base prod', 'Bound upgrade prod', 'Bound subscription', 'Num. user valuations', 'Popsize',
-                  'Revenue', 'Welfare', 'Overall welf.', 'Base product']
+    header_row = ['Start time', 'Runtime', 'File Name', 'DE Strat.', 'Optimization Type',
+                  'Number of evaluations', 'Bound base prod', 'Bound upgrade prod', 'Bound subscription',
+                  'Num. user valuations', 'Popsize', 'Revenue', 'Welfare', 'Overall welf.', 'Base product']
     for i in range(1, n_max):
         header_row.append(' ')
     header_row.append('Upgrade')
@@ -160,6 +288,8 @@ def write_header_line_overview_csv_differential_evolution(n_max, path_main_file)
     header_row.append('user_valuation')
     header_row.append('user_engagement_factor')
     header_row.append('user_quality_decay_factor')
+    # appended as last column such that rows of older .csv files (without optimizer) stay under their header
+    header_row.append('Optimizer')
 
     write_csv_row(path_main_file, header_row)
 
@@ -287,7 +417,7 @@ def write_header_line_overview_csv_search_max_revenue(n_max, path_main_file):
     write_csv_row(path_main_file, header_row)
 
 
-def fill_text_file_with_basic_information(differential_evolution_creator, file_path):
+def fill_text_file_with_basic_information(differential_evolution_creator, run_log):
     """
     Write the basic information of differential evolution to the .txt file
 
@@ -295,8 +425,8 @@ def fill_text_file_with_basic_information(differential_evolution_creator, file_p
     ----------
     differential_evolution_creator : DifferentialEvolutionCreator
         object containing all details about differential evolution specifics
-    file_path : String
-        file name with path
+    run_log : RunLog
+        run log of the .txt file
     """
     if differential_evolution_creator.price_bounds is not None:
         price_bounds = differential_evolution_creator.price_bounds
@@ -304,21 +434,77 @@ def fill_text_file_with_basic_information(differential_evolution_creator, file_p
             price_bounds.buy_max) + ", upgrade: " + str(
             price_bounds.upgrade_min) + ", " + str(price_bounds.upgrade_max) + ", subscription: " + str(
             price_bounds.subscription_min) + ", " + str(price_bounds.subscription_max)
-        add_line_to_document(file_path, price_bound_string)
+        run_log.add_line(price_bound_string)
 
     number_of_user_types_string = "Number of user valuations: " + str(
         differential_evolution_creator.number_of_user_valuations)
-    add_line_to_document(file_path, number_of_user_types_string)
+    run_log.add_line(number_of_user_types_string)
+
+
+def write_result_row(result, information_row, method, write_header_line, result_sink=None):
+    """
+    Writes the row of a result to the main .csv file and the .csv files results are written to (or the result database)
+
+    Parameters
+    ----------
+    result : AbstractResult
+        object containing all results about the solution
+    information_row : list
+        row of the result, one element per column of the header line
+    method : String
+        BACKWARD_INDUCTION, DIFFERENTIAL_EVOLUTION or SINGLE_MAX_REVENUE
+    write_header_line : callable
+        writes the header line of the method, called with n_max and the file name with path
+    result_sink : ResultSink, optional
+        open .csv files of the run, default: None (the files are opened for this result only)
+    """
+    if result_sink is None:
+        with ResultSink(batch_size=1) as result_sink:
+            write_result_row(result, information_row, method, write_header_line, result_sink)
+        return
+
+    result_sink.write_row(os.path.dirname(result.path_to_main_file), os.path.basename(result.path_to_main_file),
+                          information_row)
+    if result.result_database is not None:
+        get_result_store(os.path.join(result.path_to_folder, result.result_database)).add_result(method, result)
+    elif result.files_results_are_written_to is not None:
+        for file in result.files_results_are_written_to:
+            try:
+                result_sink.write_row(result.path_to_folder, file, information_row,
+                                      lambda file_name: write_header_line(result.n_max, file_name))
+            except:
+                raise Exception(f"Error when creating {file} for {METHOD_DESCRIPTIONS[method]}.")
 
 
-def write_backward_induction_result(backward_induction_result):
+def write_backward_induction_result(backward_induction_result, result_sink=None):
     """
-    Writes the results from backward induction into .csv files
+    Writes the results from backward induction into .csv files (or the result database)
 
     Parameters
     ----------
     backward_induction_result : BackwardInductionResult
         object containing all results about backward induction solution
+    result_sink : ResultSink, optional
+        open .csv files of the run, default: None (the files are opened for this result only)
+    """
+    information_row = get_backward_induction_result_row(backward_induction_result)
+    write_result_row(backward_induction_result, information_row, BACKWARD_INDUCTION,
+                     write_header_line_overview_csv_backward_induction, result_sink)
+
+
+def get_backward_induction_result_row(backward_induction_result):
+    """
+    Creates the row of the .csv files for a result from backward induction
+
+    Parameters
+    ----------
+    backward_induction_result : BackwardInductionResult
+        object containing all results about backward induction solution
+
+    Returns
+    -------
+    list
+        one element per column of the header line
     """
     information_row = [backward_induction_result.timestamp,
                        str(backward_induction_result.path_to_main_file),
@@ -362,32 +548,38 @@ def write_backward_induction_result(backward_induction_result):
     information_row.append(backward_induction_result.arrivals_in_first_timestep)
     information_row.append(backward_induction_result.product_quality_base_product)
     information_row.append(backward_induction_result.product_quality_upgrade)
+    return information_row
 
-    write_csv_row(backward_induction_result.path_to_main_file, information_row)
 
-    if backward_induction_result.files_results_are_written_to is not None:
-        for file in backward_induction_result.files_results_are_written_to:
-            try:
-                file_name = create_or_get_file(
-                    backward_induction_result.path_to_folder, file)
-                if count_rows_in_csv(file_name) == 0:
-                    write_header_line_overview_csv_backward_induction(
-                        backward_induction_result.n_max,
-                        file_name)
-                write_csv_row(file_name, information_row)
-            except:
-                raise Exception(
-                    f"Error when creating {file} for backward induction.")
+def write_differential_evolution_result(differential_evolution_result, result_sink=None):
+    """
+    Writes the results from differential evolution into a row at .csv files (or the result database)
+
+    Parameters
+    ----------
+    differential_evolution_result : DifferentialEvolutionResult
+        object containing all results about differential evolution solution
+    result_sink : ResultSink, optional
+        open .csv files of the run, default: None (the files are opened for this result only)
+    """
+    information_row = get_differential_evolution_result_row(differential_evolution_result)
+    write_result_row(differential_evolution_result, information_row, DIFFERENTIAL_EVOLUTION,
+                     write_header_line_overview_csv_differential_evolution, result_sink)
 
 
-def write_differential_evolution_result(differential_evolution_result):
+def get_differential_evolution_result_row(differential_evolution_result):
     """
-    Writes the results from differential evolution into a row at .csv files
+    Creates the row of the .csv files for a result from differential evolution
 
     Parameters
     ----------
     differential_evolution_result : DifferentialEvolutionResult
         object containing all results about differential evolution solution
+
+    Returns
+    -------
+    list
+        one element per column of the header line
     """
     information_row = [differential_evolution_result.start_time,
                        differential_evolution_result.runtime,
@@ -465,31 +657,39 @@ def write_differential_evolution_result(differential_evolution_result):
         information_row.append("-")
         information_row.append("-")
         information_row.append("-")
+    information_row.append(differential_evolution_result.optimizer)
+    return information_row
 
-    write_csv_row(differential_evolution_result.path_to_main_file, information_row)
 
-    if differential_evolution_result.files_results_are_written_to is not None:
-        for file in differential_evolution_result.files_results_are_written_to:
-            try:
-                file_name = create_or_get_file(
-                    differential_evolution_result.path_to_folder, file)
-                if count_rows_in_csv(file_name) == 0:
-                    write_header_line_overview_csv_differential_evolution(
-                        differential_evolution_result.n_max,
-                        file_name)
-                write_csv_row(file_name, information_row)
-            except:
-                raise Exception(f"Error when creating {file} for backward induction.")
+def write_single_maximize_revenue_result(single_maximize_revenue_result, result_sink=None):
+    """
+    Writes the results from single maximize revenue into .csv files (or the result database)
+
+    Parameters
+    ----------
+    single_maximize_revenue_result : SingleMaximizeRevenueResult
+        object containing all results about single maximize revenue solution
+    result_sink : ResultSink, optional
+        open .csv files of the run, default: None (the files are opened for this result only)
+    """
+    information_row = get_single_maximize_revenue_result_row(single_maximize_revenue_result)
+    write_result_row(single_maximize_revenue_result, information_row, SINGLE_MAX_REVENUE,
+                     write_header_line_overview_csv_single_max_revenue, result_sink)
 
 
-def write_single_maximize_revenue_result(single_maximize_revenue_result):
+def get_single_maximize_revenue_result_row(single_maximize_revenue_result):
     """
-    Writes the results from single maximize revenue into .csv files
+    Creates the row of the .csv files for a result from single maximize revenue
 
     Parameters
     ----------
     single_maximize_revenue_result : SingleMaximizeRevenueResult
         object containing all results about single maximize revenue solution
+
+    Returns
+    -------
+    list
+        one element per column of the header line
     """
     information_row = [single_maximize_revenue_result.timestamp, single_maximize_revenue_result.user_valuation,
                        single_maximize_revenue_result.user_arrival_time,
@@ -526,19 +726,7 @@ def write_single_maximize_revenue_result(single_maximize_revenue_result):
     information_row.append(str(single_maximize_revenue_result.n_upgrade))
     information_row.append(str(single_maximize_revenue_result.product_quality_base_product))
     information_row.append(str(single_maximize_revenue_result.product_quality_upgrade))
-    write_csv_row(single_maximize_revenue_result.path_to_main_file, information_row)
-
-    if single_maximize_revenue_result.files_results_are_written_to is not None:
-        for file in single_maximize_revenue_result.files_results_are_written_to:
-            try:
-                file_name = create_or_get_file(single_maximize_revenue_result.path_to_folder, file)
-                if count_rows_in_csv(file_name) == 0:
-                    write_header_line_overview_csv_single_max_revenue(
-                        single_maximize_revenue_result.n_max,
-                        file_name)
-                write_csv_row(file_name, information_row)
-            except:
-                raise Exception(f"Error when creating {file} for single max search.")
+    return information_row
 
 
 def write_search_maximize_revenue_result(search_maximize_revenue_result):
@@ -576,3 +764,47 @@ def write_search_maximize_revenue_result(search_maximize_revenue_result):
     information_row.append(search_maximize_revenue_result.product_quality_base_product)
     information_row.append(search_maximize_revenue_result.product_quality_upgrade)
     write_csv_row(search_maximize_revenue_result.path_to_main_file, information_row)
+
+
+def export_result_database(database_path, method, n_max, file_name):
+    """
+    Writes all results of a method from the result database into a .csv file, in the same format as the .csv files
+    results are written to without result database
+
+    Parameters
+    ----------
+    database_path : String
+        path to the .sqlite file
+    method : String
+        BACKWARD_INDUCTION, DIFFERENTIAL_EVOLUTION or SINGLE_MAX_REVENUE
+    n_max : int
+        number of timesteps users arrive to the system and publisher can change prices (for the header line)
+    file_name : String
+        file name with path, overwritten if it exists
+
+    Returns
+    -------
+    int
+        number of exported results
+    """
+    if not os.path.exists(database_path):
+        raise Exception(f'{database_path} is not a result database.')
+    write_header_line = {BACKWARD_INDUCTION: write_header_line_overview_csv_backward_induction,
+                         DIFFERENTIAL_EVOLUTION: write_header_line_overview_csv_differential_evolution,
+                         SINGLE_MAX_REVENUE: write_header_line_overview_csv_single_max_revenue}[method]
+    get_result_row = {BACKWARD_INDUCTION: get_backward_induction_result_row,
+                      DIFFERENTIAL_EVOLUTION: get_differential_evolution_result_row,
+                      SINGLE_MAX_REVENUE: get_single_maximize_revenue_result_row}[method]
+
+    result_store = ResultStore(database_path)
+    results = result_store.load_results(method)
+    result_store.close()
+
+    with open(file_name, 'w'):
+        pass
+    write_header_line(n_max, file_name)
+    with open(file_name, 'a', encoding='UTF8', newline='') as file:
+        writer = csv.writer(file)
+        for result in results:
+            writer.writerow(get_result_row(result))
+    return len(results)
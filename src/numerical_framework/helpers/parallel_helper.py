@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+
+def get_number_of_processes(number_of_workers):
+    """
+    Returns the number of processes for the number of workers defined in the config.ini
+
+    Parameters
+    ----------
+    number_of_workers : int
+        number of worker processes, -1 to use all available CPU cores
+
+    Returns
+    -------
+    int
+        number of processes (at least 1)
+    """
+    if number_of_workers == -1:
+        return os.cpu_count() or 1
+    return max(1, number_of_workers)
+
+
+def map_in_parallel(function, creator, arguments, number_of_workers, is_ordered=True):
+    """
+    Calls function(creator, argument) for every argument, distributed over a pool of worker processes
+
+    By default, the results are yielded in the order of the arguments (independent of the order the workers finish),
+    hence the results can be written to the .csv files in the same order as without workers. With a single worker, no
+    process pool is created and the calls are done one after the other in this process.
+
+    Parameters
+    ----------
+    function : callable
+        module level function (must be picklable) called with the creator and a single argument
+    creator : AbstractGameCreator
+        creator defined through config.ini, copied to the worker processes
+    arguments : list
+        arguments the function is called with
+    number_of_workers : int
+        number of worker processes, -1 to use all available CPU cores
+    is_ordered : bool, optional
+        True: results in the order of the arguments, False: results as soon as they are finished, default: True
+
+    Yields
+    ------
+    object
+        result of the function for every argument
+    """
+    number_of_processes = min(get_number_of_processes(number_of_workers), len(arguments))
+    if number_of_processes <= 1:
+        for argument in arguments:
+            yield function(creator, argument)
+    elif not is_ordered:
+        # every argument is a single task such that finished results are not held back by the rest of a chunk
+        with ProcessPoolExecutor(max_workers=number_of_processes) as executor:
+            futures = [executor.submit(function, creator, argument) for argument in arguments]
+            for future in as_completed(futures):
+                yield future.result()
+    else:
+        # several arguments are sent to a worker at once to reduce the communication for many small calls
+        chunksize = max(1, len(arguments) // (4 * number_of_processes))
+        with ProcessPoolExecutor(max_workers=number_of_processes) as executor:
+            for result in executor.map(partial(function, creator), arguments, chunksize=chunksize):
+                yield result
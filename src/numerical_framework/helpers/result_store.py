@@ -0,0 +1,325 @@
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.numerical_framework.differential_evolution.price_bounds import PriceBounds
+from src.numerical_framework.result.result import BackwardInductionResult, DifferentialEvolutionResult, \
+    SingleMaximizeRevenueResult
+
+# results are committed in one transaction if this many results are added or this many seconds have passed
+BATCH_SIZE = 500
+COMMIT_INTERVAL = 10
+# methods the results are stored for (same as type in MAIN in config.ini)
+BACKWARD_INDUCTION = 'BACKWARD_INDUCTION'
+DIFFERENTIAL_EVOLUTION = 'DIFFERENTIAL_EVOLUTION'
+SINGLE_MAX_REVENUE = 'SINGLE_MAX_REVENUE'
+RESULT_CLASSES = {BACKWARD_INDUCTION: BackwardInductionResult, DIFFERENTIAL_EVOLUTION: DifferentialEvolutionResult,
+                  SINGLE_MAX_REVENUE: SingleMaximizeRevenueResult}
+# parameters of the game shared by all runs of a setting
+SCENARIO_COLUMNS = ['n_max', 'n_upgrade', 'number_of_user_valuations', 'arrivals_in_first_timestep',
+                    'probability_of_second_quality_decay_factor', 'engagement_factor_short_term_user',
+                    'standard_deviation_valuation', 'engagement_factor_long_term_user', 'probability_short_term_user',
+                    'quality_decay_factors', 'valuation_range', 'product_quality_base_product',
+                    'product_quality_upgrade']
+RUN_COLUMNS = ['timestamp', 'runtime', 'path_to_main_file', 'price_strategy_type', 'optimizer',
+               'differential_evolution_strategy', 'number_of_evaluations', 'popsize', 'price_bounds',
+               'is_prices_discounted', 'is_subscription_price_variable', 'first_base_price_fixed',
+               'first_upgrade_price_fixed', 'evolution_with_all_user_types_from_game', 'user_arrival_time',
+               'user_valuation', 'user_engagement_factor', 'user_quality_decay_factor', 'probability_user_type',
+               'expected_publisher_revenue', 'expected_user_welfare', 'expected_total_welfare']
+# attributes of the results stored in columns of runs with a different name
+RENAMED_RUN_ATTRIBUTES = {
+    BACKWARD_INDUCTION: {'user_arrival_time': 'arrival_time', 'user_valuation': 'valuation',
+                         'user_engagement_factor': 'engagement_factor',
+                         'user_quality_decay_factor': 'quality_decay_factor'},
+    DIFFERENTIAL_EVOLUTION: {'timestamp': 'start_time'},
+    SINGLE_MAX_REVENUE: {}}
+# columns have no type, values keep their python type (e.g., 25 and 25.0) and are exported as written to .csv files
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    {', '.join(SCENARIO_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS scenarios_population ON scenarios (
+    number_of_user_valuations, arrivals_in_first_timestep, probability_of_second_quality_decay_factor,
+    engagement_factor_short_term_user, standard_deviation_valuation
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    method TEXT NOT NULL,
+    scenario_id INTEGER NOT NULL REFERENCES scenarios (id),
+    {', '.join(RUN_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS runs_method ON runs (method, price_strategy_type, scenario_id);
+CREATE INDEX IF NOT EXISTS runs_user_type ON runs (
+    user_valuation, user_arrival_time, user_engagement_factor, user_quality_decay_factor
+);
+CREATE TABLE IF NOT EXISTS price_schedules (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    timestep INTEGER NOT NULL,
+    price_base_product,
+    price_upgrade,
+    price_subscription,
+    PRIMARY KEY (run_id, timestep)
+);
+CREATE TABLE IF NOT EXISTS timestep_revenues (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    timestep INTEGER NOT NULL,
+    revenue_base_product,
+    revenue_upgrade,
+    revenue_subscription,
+    PRIMARY KEY (run_id, timestep)
+);
+"""
+# open result stores of this process, key: path to the database
+RESULT_STORES = {}
+
+
+class ResultStore(object):
+    """
+    A class used to represent the SQLite database the results of backward induction, differential evolution and single
+    maximize revenue are stored in
+
+    Every result is a row of runs, which refers to the row of scenarios with its game parameters. The prices and
+    revenues of every timestep are rows of price_schedules and timestep_revenues. Results are written in batches of
+    BATCH_SIZE results per transaction, at the latest after COMMIT_INTERVAL seconds.
+
+    ...
+
+    Attributes
+    ----------
+    database_path : str
+        path to the .sqlite file
+    connection : Connection
+        connection to the database
+    scenario_ids : dict
+        key: values of the scenario columns, value: id of the scenario
+    results_since_commit : int
+        number of results added since the last commit
+    last_commit_time : float
+        time of the last commit (time.monotonic())
+    """
+
+    def __init__(self, database_path):
+        """
+        Parameters
+        ----------
+        database_path : str
+            path to the .sqlite file (created if it does not exist)
+        """
+        self.database_path = database_path
+        self.connection = sqlite3.connect(database_path)
+        self.connection.executescript(SCHEMA)
+        self.scenario_ids = {}
+        self.results_since_commit = 0
+        self.last_commit_time = time.monotonic()
+
+    def add_result(self, method, result):
+        """
+        Adds the result to the database, committed with the batch of the result
+
+        Parameters
+        ----------
+        method : str
+            BACKWARD_INDUCTION, DIFFERENTIAL_EVOLUTION or SINGLE_MAX_REVENUE
+        result : AbstractResult
+            result of the method
+        """
+        scenario_id = self.get_scenario_id([to_database_value(getattr(result, column)) for column in SCENARIO_COLUMNS])
+        run_values = []
+        for column in RUN_COLUMNS:
+            value = getattr(result, RENAMED_RUN_ATTRIBUTES[method].get(column, column), None)
+            if isinstance(value, PriceBounds):
+                value = [value.buy_min, value.buy_max, value.upgrade_min, value.upgrade_max, value.subscription_min,
+                         value.subscription_max]
+            run_values.append(to_database_value(value))
+        run_id = self.connection.execute(
+            f"INSERT INTO runs (method, scenario_id, {', '.join(RUN_COLUMNS)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(RUN_COLUMNS))})", [method, scenario_id] + run_values).lastrowid
+
+        timesteps = range(1, result.n_max + 1)
+        self.connection.executemany(
+            "INSERT INTO price_schedules VALUES (?, ?, ?, ?, ?)",
+            [(run_id, timestep, to_database_value(price_base_product), to_database_value(price_upgrade),
+              to_database_value(price_subscription)) for timestep, price_base_product, price_upgrade, price_subscription
+             in zip(timesteps, result.price_base_product, result.price_upgrade, result.price_subscription)])
+        self.connection.executemany(
+            "INSERT INTO timestep_revenues VALUES (?, ?, ?, ?, ?)",
+            [(run_id, timestep, to_database_value(revenue_base_product), to_database_value(revenue_upgrade),
+              to_database_value(revenue_subscription)) for timestep, revenue_base_product, revenue_upgrade,
+             revenue_subscription in zip(timesteps, result.revenue_base_product, result.revenue_upgrade,
+                                         result.revenue_subscription)])
+
+        self.results_since_commit += 1
+        if self.results_since_commit >= BATCH_SIZE or time.monotonic() - self.last_commit_time >= COMMIT_INTERVAL:
+            self.commit()
+
+    def get_scenario_id(self, scenario_values):
+        """
+        Returns the id of the scenario with the values, the scenario is inserted if it is not in the database
+
+        Parameters
+        ----------
+        scenario_values : list
+            values of the SCENARIO_COLUMNS converted with to_database_value()
+
+        Returns
+        -------
+        int
+            id of the scenario
+        """
+        key = tuple(scenario_values)
+        if key not in self.scenario_ids:
+            # IS instead of = such that missing parameters (NULL) are equal
+            row = self.connection.execute(
+                f"SELECT id FROM scenarios WHERE {' AND '.join(column + ' IS ?' for column in SCENARIO_COLUMNS)}",
+                scenario_values).fetchone()
+            if row is None:
+                self.scenario_ids[key] = self.connection.execute(
+                    f"INSERT INTO scenarios ({', '.join(SCENARIO_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(SCENARIO_COLUMNS))})", scenario_values).lastrowid
+            else:
+                self.scenario_ids[key] = row[0]
+        return self.scenario_ids[key]
+
+    def load_results(self, method):
+        """
+        Loads all results of the method in the order they have been added
+
+        Parameters
+        ----------
+        method : str
+            BACKWARD_INDUCTION, DIFFERENTIAL_EVOLUTION or SINGLE_MAX_REVENUE
+
+        Returns
+        -------
+        list[AbstractResult]
+            results with the attributes written to the .csv files
+        """
+        results = {}
+        for row in self.connection.execute(
+                f"SELECT runs.id, {', '.join('scenarios.' + column for column in SCENARIO_COLUMNS)}, "
+                f"{', '.join('runs.' + column for column in RUN_COLUMNS)} FROM runs "
+                f"JOIN scenarios ON scenarios.id = runs.scenario_id WHERE runs.method = ? ORDER BY runs.id", [method]):
+            result = RESULT_CLASSES[method]()
+            for column, value in zip(SCENARIO_COLUMNS, row[1:]):
+                setattr(result, column, from_database_value(value))
+            for column, value in zip(RUN_COLUMNS, row[1 + len(SCENARIO_COLUMNS):]):
+                value = from_database_value(value)
+                if column == 'price_bounds' and value is not None:
+                    value = PriceBounds(*value)
+                setattr(result, RENAMED_RUN_ATTRIBUTES[method].get(column, column), value)
+            for attribute in ['price_base_product', 'price_upgrade', 'price_subscription', 'revenue_base_product',
+                              'revenue_upgrade', 'revenue_subscription']:
+                setattr(result, attribute, [])
+            results[row[0]] = result
+
+        for run_id, price_base_product, price_upgrade, price_subscription in self.connection.execute(
+                "SELECT run_id, price_base_product, price_upgrade, price_subscription FROM price_schedules "
+                "JOIN runs ON runs.id = price_schedules.run_id WHERE runs.method = ? ORDER BY run_id, timestep",
+                [method]):
+            results[run_id].price_base_product.append(price_base_product)
+            results[run_id].price_upgrade.append(price_upgrade)
+            results[run_id].price_subscription.append(price_subscription)
+        for run_id, revenue_base_product, revenue_upgrade, revenue_subscription in self.connection.execute(
+                "SELECT run_id, revenue_base_product, revenue_upgrade, revenue_subscription FROM timestep_revenues "
+                "JOIN runs ON runs.id = timestep_revenues.run_id WHERE runs.method = ? ORDER BY run_id, timestep",
+                [method]):
+            results[run_id].revenue_base_product.append(revenue_base_product)
+            results[run_id].revenue_upgrade.append(revenue_upgrade)
+            results[run_id].revenue_subscription.append(revenue_subscription)
+        return list(results.values())
+
+    def commit(self):
+        """
+        Commits the results added since the last commit
+        """
+        self.connection.commit()
+        self.results_since_commit = 0
+        self.last_commit_time = time.monotonic()
+
+    def close(self):
+        """
+        Commits the added results and closes the database
+        """
+        self.commit()
+        self.connection.close()
+        if RESULT_STORES.get(self.database_path) is self:
+            del RESULT_STORES[self.database_path]
+
+
+def to_database_value(value):
+    """
+    Converts a value of a result to a value stored in the database
+
+    Lists and bools are stored as JSON text, dates and durations as text (as written to .csv files) and numpy values
+    as python values.
+
+    Parameters
+    ----------
+    value : object
+        value of a result
+
+    Returns
+    -------
+    int or float or str or None
+        value stored in the database
+    """
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    elif isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (list, tuple, bool)):
+        return json.dumps(value, default=lambda element: element.item())
+    if isinstance(value, (datetime, timedelta)):
+        return str(value)
+    return value
+
+
+def from_database_value(value):
+    """
+    Converts a value stored in the database to the value of a result, inverse of to_database_value()
+
+    Parameters
+    ----------
+    value : int or float or str or None
+        value stored in the database
+
+    Returns
+    -------
+    object
+        value of a result
+    """
+    if isinstance(value, str) and (value.startswith('[') or value in ['true', 'false']):
+        return json.loads(value)
+    return value
+
+
+def get_result_store(database_path):
+    """
+    Returns the result store of the database opened in this process, it is opened if it is not open yet
+
+    Parameters
+    ----------
+    database_path : str
+        path to the .sqlite file
+
+    Returns
+    -------
+    ResultStore
+        result store the results are added to
+    """
+    if database_path not in RESULT_STORES:
+        RESULT_STORES[database_path] = ResultStore(database_path)
+    return RESULT_STORES[database_path]
+
+
+def close_result_stores():
+    """
+    Commits the added results and closes all result stores opened in this process
+    """
+    for result_store in list(RESULT_STORES.values()):
+        result_store.close()
@@ -0,0 +1,246 @@
+import gzip
+import os
+import time
+
+from src.numerical_framework.helpers.output_files_helper import add_first_line_to_document
+
+# bytes reserved at the beginning of an uncompressed run log for the summary written at the end of the run
+RESERVED_SUMMARY_SIZE = 16384
+# buffered characters and seconds after which the lines of a run log are written to the file
+FLUSH_SIZE = 65536
+FLUSH_INTERVAL = 10
+# run logs ending with this ending are compressed, their summary is written to a separate file
+GZIP_FILE_ENDING = ".gz"
+SUMMARY_FILE_ENDING = ".summary.txt"
+# open run logs of this process, key: path to the run log
+RUN_LOGS = {}
+
+
+class RunLog(object):
+    """
+    A class used to represent the .txt file a differential evolution run is logged to, kept open during the run
+
+    Lines of the process that opened the run log are buffered and written to the file if FLUSH_SIZE characters are
+    buffered or FLUSH_INTERVAL seconds have passed. Other processes (e.g., workers of differential evolution) write
+    every line immediately, hence no lines are lost if a worker process is ended.
+
+    Several processes append to the same run log. Every flush is hence a single write to the end of the file, for a
+    compressed run log a complete gzip member (gzip reads concatenated members as one file), such that the lines of
+    different processes do not interleave.
+
+    ...
+
+    Attributes
+    ----------
+    file_path : str
+        path to the run log
+    is_owner : bool
+        True if the run log has been opened by this process for its run, False for worker processes
+    process_id : int
+        id of the process the file is open in
+    file : file object
+        file the lines are appended to (unbuffered binary file for a compressed run log)
+    buffered_lines : list[str]
+        lines not written to the file yet
+    buffered_size : int
+        number of characters not written to the file yet
+    last_flush_time : float
+        time the buffered lines have been written to the file last (time.monotonic())
+    """
+
+    def __init__(self, file_path, is_owner):
+        """
+        Parameters
+        ----------
+        file_path : str
+            path to the run log
+        is_owner : bool
+            True if the run log is opened by this process for its run, False for worker processes
+        """
+        self.file_path = file_path
+        self.is_owner = is_owner
+        self.process_id = os.getpid()
+        if is_compressed(file_path):
+            # a gzip stream kept open would interleave with the members appended by other processes
+            self.file = open(file_path, 'ab', buffering=0)
+        else:
+            self.file = open(file_path, 'a')
+        self.buffered_lines = []
+        self.buffered_size = 0
+        self.last_flush_time = time.monotonic()
+
+    def add_line(self, line):
+        """
+        Adds the line at the end of the run log
+
+        Parameters
+        ----------
+        line : str
+            line without line break
+        """
+        self.buffered_lines.append(line + '\n')
+        self.buffered_size += len(line) + 1
+        if not self.is_owner or self.buffered_size >= FLUSH_SIZE or \
+                time.monotonic() - self.last_flush_time >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered lines to the file
+        """
+        if self.buffered_lines:
+            if is_compressed(self.file_path):
+                self.file.write(gzip.compress(''.join(self.buffered_lines).encode()))
+            else:
+                self.file.write(''.join(self.buffered_lines))
+            self.buffered_lines = []
+            self.buffered_size = 0
+        self.file.flush()
+        self.last_flush_time = time.monotonic()
+
+    def write_summary(self, lines):
+        """
+        Writes the summary of the run at the beginning of the run log without rewriting the run log
+
+        The summary is written into the block reserved at the beginning of the run log. Compressed run logs have their
+        summary in a separate file. Run logs without reserved block or summaries larger than it are rewritten with the
+        summary at the beginning.
+
+        Parameters
+        ----------
+        lines : list[str]
+            lines of the summary without line breaks
+        """
+        self.flush()
+        if is_compressed(self.file_path):
+            with open(get_summary_path(self.file_path), 'w') as summary_file:
+                summary_file.write(''.join(line + '\n' for line in lines))
+            return
+
+        summary = ''.join(line + '\n' for line in lines).encode()
+        if len(summary) < RESERVED_SUMMARY_SIZE and has_reserved_summary_block(self.file_path):
+            with open(self.file_path, 'r+b') as file:
+                file.write(summary + b' ' * (RESERVED_SUMMARY_SIZE - len(summary) - 1) + b'\n')
+        else:
+            self.file.close()
+            for line in reversed(lines):
+                add_first_line_to_document(self.file_path, line)
+            self.file = open(self.file_path, 'a')
+
+    def close(self):
+        """
+        Writes the buffered lines to the file and closes it
+        """
+        self.flush()
+        self.file.close()
+        if RUN_LOGS.get(self.file_path) is self:
+            del RUN_LOGS[self.file_path]
+
+
+def is_compressed(file_path):
+    """
+    Returns True if the run log is compressed with gzip
+
+    Parameters
+    ----------
+    file_path : str
+        path to the run log
+
+    Returns
+    -------
+    bool
+        True if the path ends with GZIP_FILE_ENDING
+    """
+    return file_path.endswith(GZIP_FILE_ENDING)
+
+
+def get_summary_path(file_path):
+    """
+    Returns the path of the summary of a compressed run log
+
+    Parameters
+    ----------
+    file_path : str
+        path to the compressed run log (e.g., ...txt.gz)
+
+    Returns
+    -------
+    str
+        path to the summary (e.g., ...summary.txt)
+    """
+    file_path = file_path[:-len(GZIP_FILE_ENDING)]
+    return os.path.splitext(file_path)[0] + SUMMARY_FILE_ENDING
+
+
+def has_reserved_summary_block(file_path):
+    """
+    Returns True if the run log begins with a block reserved for the summary, i.e., RESERVED_SUMMARY_SIZE - 1 spaces
+    and a line break
+
+    Parameters
+    ----------
+    file_path : str
+        path to the uncompressed run log
+
+    Returns
+    -------
+    bool
+        True if the summary can be written into the reserved block
+    """
+    with open(file_path, 'rb') as file:
+        block = file.read(RESERVED_SUMMARY_SIZE)
+    return len(block) == RESERVED_SUMMARY_SIZE and block.endswith(b'\n') and not block[:-1].strip(b' ')
+
+
+def open_run_log(file_path):
+    """
+    Opens the run log of a run of this process, a new uncompressed run log begins with the block reserved for the
+    summary
+
+    Parameters
+    ----------
+    file_path : str
+        path to the run log (created if it does not exist)
+
+    Returns
+    -------
+    RunLog
+        run log the lines of the run are added to
+    """
+    if not is_compressed(file_path) and (not os.path.exists(file_path) or os.path.getsize(file_path) == 0):
+        with open(file_path, 'w') as file:
+            file.write(' ' * (RESERVED_SUMMARY_SIZE - 1) + '\n')
+    run_log = RunLog(file_path, True)
+    RUN_LOGS[file_path] = run_log
+    return run_log
+
+
+def get_run_log(file_path):
+    """
+    Returns the run log opened in this process, a worker process opens the run log without buffering
+
+    Parameters
+    ----------
+    file_path : str
+        path to the run log
+
+    Returns
+    -------
+    RunLog
+        run log the lines are added to
+    """
+    run_log = RUN_LOGS.get(file_path)
+    # a forked process inherits the run logs of its parent, which are not used
+    if run_log is None or run_log.process_id != os.getpid():
+        run_log = RunLog(file_path, False)
+        RUN_LOGS[file_path] = run_log
+    return run_log
+
+
+def close_run_logs_of_worker():
+    """
+    Closes the run logs a worker process has opened without buffering (e.g., of earlier runs of a persistent worker)
+    """
+    for run_log in list(RUN_LOGS.values()):
+        if not run_log.is_owner and run_log.process_id == os.getpid():
+            run_log.close()
@@ -0,0 +1,166 @@
+import csv
+import os
+import re
+
+from src.numerical_framework.helpers.output_files_helper import create_or_get_file, is_file_empty, \
+    write_csv_row
+
+# main .csv file of a shard ends with this suffix, e.g., ..._shard_2_of_4.csv
+SHARD_SUFFIX_PATTERN = re.compile(r"_shard_(\d+)_of_(\d+)\.csv$")
+
+
+def get_shard_from_environment(environment=None):
+    """
+    Returns the shard of this process defined through the environment variables of a SLURM job array
+
+    SLURM_ARRAY_TASK_ID, SLURM_ARRAY_TASK_COUNT and SLURM_ARRAY_TASK_MIN are set by SLURM for every task of a job
+    array (e.g., --array=0-3) and can be set by hand to run a shard locally.
+
+    Parameters
+    ----------
+    environment : dict, optional
+        environment variables, default: None (os.environ)
+
+    Returns
+    -------
+    shard_index : int
+        index of the shard between 0 and shard_count - 1
+    shard_count : int
+        number of shards, 1 if no job array is used
+    """
+    if environment is None:
+        environment = os.environ
+    if 'SLURM_ARRAY_TASK_ID' not in environment or 'SLURM_ARRAY_TASK_COUNT' not in environment:
+        return 0, 1
+    shard_index = int(environment['SLURM_ARRAY_TASK_ID']) - int(environment.get('SLURM_ARRAY_TASK_MIN', 0))
+    shard_count = int(environment['SLURM_ARRAY_TASK_COUNT'])
+    return shard_index, shard_count
+
+
+def validate_shard(shard_index, shard_count):
+    """
+    Validates the shard index and number of shards
+
+    Parameters
+    ----------
+    shard_index : int
+        index of the shard
+    shard_count : int
+        number of shards
+
+    Returns
+    -------
+    str
+        error message, None if the shard is valid
+    """
+    if shard_count < 1:
+        return f'number of shards must be positive but is {shard_count}.'
+    if not (0 <= shard_index < shard_count):
+        return f'shard index must be between 0 and {shard_count - 1} but is {shard_index}.'
+    return None
+
+
+def select_shard(arguments, shard_index, shard_count):
+    """
+    Returns the arguments of a shard, i.e., a contiguous part of the arguments
+
+    The parts of all shards differ in their length by at most 1. Concatenated in the order of the shard index, they
+    are the same as the arguments, hence merged results are in the same order as without shards.
+
+    Parameters
+    ----------
+    arguments : list
+        arguments of all shards (e.g., settings, single user types or runs)
+    shard_index : int
+        index of the shard between 0 and shard_count - 1
+    shard_count : int
+        number of shards
+
+    Returns
+    -------
+    list
+        arguments of the shard
+    """
+    quotient, remainder = divmod(len(arguments), shard_count)
+    start = shard_index * quotient + min(shard_index, remainder)
+    end = start + quotient + (1 if shard_index < remainder else 0)
+    return arguments[start:end]
+
+
+def get_shard_suffix(shard_index, shard_count):
+    """
+    Returns the suffix of the main .csv file name (without ending) of a shard
+
+    Parameters
+    ----------
+    shard_index : int
+        index of the shard
+    shard_count : int
+        number of shards
+
+    Returns
+    -------
+    str
+        suffix of the file name, empty if there is a single shard
+    """
+    if shard_count == 1:
+        return ""
+    return f"_shard_{shard_index}_of_{shard_count}"
+
+
+def merge_shard_files(shard_files, path_to_folder, files_results_are_written_to):
+    """
+    Appends the results of all shards to the .csv files results are written to
+
+    The main .csv files of all shards must be given. The header is copied from the first shard if a .csv file is
+    empty and the results are appended in the order of the shard index.
+
+    Parameters
+    ----------
+    shard_files : list[str]
+        main .csv files of all shards (ending with _shard_<index>_of_<count>.csv)
+    path_to_folder : str
+        folder the .csv files results are written to are located in
+    files_results_are_written_to : list[str]
+        .csv files the results of all shards are appended to
+
+    Returns
+    -------
+    int
+        number of results appended to every .csv file
+
+    Raises
+    -------
+    Exception
+        if a file is not the main .csv file of a shard or if shards are missing or given twice
+    """
+    shards = {}
+    shard_counts = set()
+    for shard_file in shard_files:
+        match = SHARD_SUFFIX_PATTERN.search(shard_file)
+        if match is None:
+            raise Exception(f'{shard_file} is not the main .csv file of a shard.')
+        shard_index, shard_count = int(match.group(1)), int(match.group(2))
+        if shard_index in shards:
+            raise Exception(f'shard {shard_index} is given twice: {shards[shard_index]} and {shard_file}.')
+        shards[shard_index] = shard_file
+        shard_counts.add(shard_count)
+    if len(shard_counts) != 1 or sorted(shards) != list(range(next(iter(shard_counts)))):
+        raise Exception(f'shards {sorted(shards)} of {sorted(shard_counts)} shards are not complete.')
+
+    header = None
+    results = []
+    for shard_index in sorted(shards):
+        with open(shards[shard_index], encoding='UTF8', newline='') as file:
+            rows = list(csv.reader(file))
+        if rows:
+            header = rows[0]
+            results.extend(rows[1:])
+
+    for file in files_results_are_written_to:
+        file_name = create_or_get_file(path_to_folder, file)
+        if is_file_empty(file_name) and header is not None:
+            write_csv_row(file_name, header)
+        for result in results:
+            write_csv_row(file_name, result)
+    return len(results)
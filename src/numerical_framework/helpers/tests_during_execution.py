@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def test_reached_probabilities(game):
     """
     Tests if the reached probabilities for all states of a timestep sum up to 1
@@ -23,6 +26,63 @@ def test_reached_probabilities(game):
         t -= 1
 
 
+def test_reached_probabilities_of_arrival_mixture(game, probabilities_arrival_time):
+    """
+    Tests if the reached probabilities for all states of a timestep sum up to the probability the user arrived until then
+
+    Parameters
+    ----------
+    game : Game
+        object containing all details when a publisher and a user are playing optimally against each other
+    probabilities_arrival_time : list[float]
+        probability of every arrival time the forward pass was weighted with
+
+    Raises
+    -------
+    Exception
+        if reached probabilities for all states of a timestep don't sum up to the probability the user arrived
+    """
+    total_prob_arrived = 0
+    for t in range(game.n_max):
+        total_prob_arrived += probabilities_arrival_time[t]
+        if total_prob_arrived > 0:
+            total_prob_reached_in_timestep = 0
+            for user_state in game.user_states[t]:
+                total_prob_reached_in_timestep += user_state.probability_state_is_reached
+            if round(total_prob_reached_in_timestep / total_prob_arrived, 4) != 1:
+                raise Exception(
+                    f'Error detected. The summed probability for states in a timestep is {str(total_prob_reached_in_timestep / total_prob_arrived)} instead of 1 (relative to the arrived users).')
+
+
+def test_reached_probabilities_tensorized(tensorized_game):
+    """
+    Tests if the reached probabilities for all states of a timestep sum up to 1 for every user type and cohort
+
+    The reached probabilities are relative to the weight of the users arrived until the timestep (1 for a single
+    arrival time).
+
+    Parameters
+    ----------
+    tensorized_game : TensorizedGame
+        arrays found by the tensorized backward induction including the probabilities states are reached
+
+    Raises
+    -------
+    Exception
+        if reached probabilities for all states of a timestep don't sum up to 1
+    """
+    total_prob_reached_in_timestep = tensorized_game.probability_state_is_reached.sum(axis=3)
+    total_prob_arrived = np.broadcast_to(np.cumsum(tensorized_game.arrival_time_weights, axis=2),
+                                         total_prob_reached_in_timestep.shape)
+    # only timesteps after the arrival time are reached
+    is_arrived = total_prob_arrived > 0
+    total_prob_reached_in_timestep = total_prob_reached_in_timestep[is_arrived] / total_prob_arrived[is_arrived]
+    is_not_one = np.round(total_prob_reached_in_timestep, 4) != 1
+    if is_not_one.any():
+        raise Exception(
+            f'Error detected. The summed probability for states in a timestep is {str(total_prob_reached_in_timestep[is_not_one][0])} instead of 1.')
+
+
 def test_if_value_equal_one(total_value, name_of_total_value):
     """
     Tests if a value (rounded) is equal to 1
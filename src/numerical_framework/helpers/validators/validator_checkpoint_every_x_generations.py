@@ -0,0 +1,26 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorCheckpointEveryXGenerations(AbstractValidator):
+    """
+    A class defining the validator for the parameter checkpoint every x generations from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.checkpoint_every_x_generations = config.getint('DIFFERENTIAL_EVOLUTION',
+                                                                   'checkpoint_every_x_generations', fallback=0)
+            if creator.checkpoint_every_x_generations < 0:
+                return f'checkpoint_every_x_generations in DIFFERENTIAL_EVOLUTION in config.ini must be 0 (no checkpoints) or positive integer but is {creator.checkpoint_every_x_generations}.'
+        except ValueError:
+            return 'checkpoint_every_x_generations in DIFFERENTIAL_EVOLUTION in config.ini must be 0 (no checkpoints) or positive integer'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
@@ -0,0 +1,24 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorCompressRunLogs(AbstractValidator):
+    """
+    A class defining the validator for the parameter compress run logs from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.compress_run_logs = config.getboolean('DIFFERENTIAL_EVOLUTION', 'compress_run_logs',
+                                                          fallback=False)
+        except ValueError:
+            return 'compress_run_logs in DIFFERENTIAL_EVOLUTION in config.ini must be True or False'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
@@ -0,0 +1,26 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorEarlyStoppingGenerations(AbstractValidator):
+    """
+    A class defining the validator for the parameter early stopping generations from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.early_stopping_generations = config.getint('DIFFERENTIAL_EVOLUTION', 'early_stopping_generations',
+                                                               fallback=0)
+            if creator.early_stopping_generations < 0:
+                return f'early_stopping_generations in DIFFERENTIAL_EVOLUTION in config.ini must be 0 (no early stopping) or positive integer but is {creator.early_stopping_generations}.'
+        except ValueError:
+            return 'early_stopping_generations in DIFFERENTIAL_EVOLUTION in config.ini must be 0 (no early stopping) or positive integer'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
@@ -0,0 +1,27 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorEarlyStoppingRelativeImprovement(AbstractValidator):
+    """
+    A class defining the validator for the parameter early stopping relative improvement from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.early_stopping_relative_improvement = config.getfloat('DIFFERENTIAL_EVOLUTION',
+                                                                          'early_stopping_relative_improvement',
+                                                                          fallback=0)
+            if creator.early_stopping_relative_improvement < 0:
+                return f'early_stopping_relative_improvement in DIFFERENTIAL_EVOLUTION in config.ini must be 0 or greater but is {creator.early_stopping_relative_improvement}.'
+        except ValueError:
+            return 'early_stopping_relative_improvement in DIFFERENTIAL_EVOLUTION in config.ini must be non negative float'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
@@ -0,0 +1,26 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorEvaluationCacheTolerance(AbstractValidator):
+    """
+    A class defining the validator for the parameter evaluation cache tolerance from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.evaluation_cache_tolerance = config.getfloat('DIFFERENTIAL_EVOLUTION', 'evaluation_cache_tolerance',
+                                                                 fallback=0)
+            if creator.evaluation_cache_tolerance < 0:
+                return f'evaluation_cache_tolerance in DIFFERENTIAL_EVOLUTION in config.ini must be 0 (only identical prices) or greater but is {creator.evaluation_cache_tolerance}.'
+        except ValueError:
+            return 'evaluation_cache_tolerance in DIFFERENTIAL_EVOLUTION in config.ini must be non negative float'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
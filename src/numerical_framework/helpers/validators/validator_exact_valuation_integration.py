@@ -0,0 +1,24 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorExactValuationIntegration(AbstractValidator):
+    """
+    A class defining the validator for the parameter exact valuation integration from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.exact_valuation_integration = config.getboolean('DIFFERENTIAL_EVOLUTION',
+                                                                    'exact_valuation_integration', fallback=False)
+        except ValueError:
+            return 'exact_valuation_integration in DIFFERENTIAL_EVOLUTION in config.ini must be True or False'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
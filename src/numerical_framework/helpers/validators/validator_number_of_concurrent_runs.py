@@ -0,0 +1,26 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorNumberOfConcurrentRuns(AbstractValidator):
+    """
+    A class defining the validator for the parameter number of concurrent runs from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.number_of_concurrent_runs = config.getint('DIFFERENTIAL_EVOLUTION', 'number_of_concurrent_runs',
+                                                              fallback=1)
+            if creator.number_of_concurrent_runs < 1 and creator.number_of_concurrent_runs != -1:
+                return f'number_of_concurrent_runs in DIFFERENTIAL_EVOLUTION in config.ini must be -1 (all CPU cores) or positive integer but is {creator.number_of_concurrent_runs}.'
+        except ValueError:
+            return 'number_of_concurrent_runs in DIFFERENTIAL_EVOLUTION in config.ini must be -1 (all CPU cores) or positive integer'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
@@ -0,0 +1,25 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorNumberOfWorkersBackwardInduction(AbstractValidator):
+    """
+    A class defining the validator for the parameter number of workers of backward induction from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.number_of_workers = config.getint('BACKWARD_INDUCTION', 'number_of_workers', fallback=1)
+            if creator.number_of_workers < 1 and creator.number_of_workers != -1:
+                return f'number_of_workers in BACKWARD_INDUCTION in config.ini must be -1 (all CPU cores) or positive integer but is {creator.number_of_workers}.'
+        except ValueError:
+            return 'number_of_workers in BACKWARD_INDUCTION in config.ini must be -1 (all CPU cores) or positive integer'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return True
+
+    def differential_evolution_needs_validation(self):
+        return False
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
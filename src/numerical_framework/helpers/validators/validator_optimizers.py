@@ -0,0 +1,39 @@
+import json
+
+from src.numerical_framework.differential_evolution.optimizers import OPTIMIZERS
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorOptimizers(AbstractValidator):
+    """
+    A class defining the validator for the parameter optimizers from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            optimizers = json.loads(config.get('DIFFERENTIAL_EVOLUTION', 'optimizers',
+                                               fallback='["differential_evolution"]'))
+            if not len(optimizers) > 0:
+                return 'optimizers in DIFFERENTIAL_EVOLUTION in config.ini must contain at least one element'
+            for optimizer in optimizers:
+                if optimizer not in OPTIMIZERS:
+                    return f'every element in optimizers in DIFFERENTIAL_EVOLUTION in config.ini must be one of {", ".join(OPTIMIZERS)}'
+            creator.optimizers = optimizers
+            # the starts of multi-start optimizers are evaluated in separate processes without the evaluation cache of
+            # the main process
+            if creator.use_evaluation_cache and not all(OPTIMIZERS[optimizer].supports_map_like_workers
+                                                        for optimizer in optimizers):
+                return 'optimizers in DIFFERENTIAL_EVOLUTION in config.ini must not contain nelder_mead or powell ' \
+                       'if use_evaluation_cache is True'
+        except ValueError:
+            return f'every element in optimizers in DIFFERENTIAL_EVOLUTION in config.ini must be one of {", ".join(OPTIMIZERS)}'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
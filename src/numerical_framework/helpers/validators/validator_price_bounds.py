@@ -1,6 +1,6 @@
 import json
 
-from src.numerical_framework.differential_evolution.differential_evolution import PriceBounds
+from src.numerical_framework.differential_evolution.price_bounds import PriceBounds
 from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
 
 
@@ -0,0 +1,26 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorResultDatabase(AbstractValidator):
+    """
+    A class defining the validator for the parameter result database from the config.ini
+    """
+
+    def validate(self, config, creator):
+        result_database = config.get('MAIN', 'result_database', fallback='').strip()
+        if result_database == '':
+            creator.result_database = None
+        elif not result_database.endswith('.sqlite'):
+            return f"result_database in MAIN in config.ini must be empty or a file name ending with .sqlite, but is {result_database}."
+        else:
+            creator.result_database = result_database
+        return None
+
+    def backward_induction_needs_validation(self):
+        return True
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return True
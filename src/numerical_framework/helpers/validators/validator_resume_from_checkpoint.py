@@ -0,0 +1,24 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorResumeFromCheckpoint(AbstractValidator):
+    """
+    A class defining the validator for the parameter resume from checkpoint from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.resume_from_checkpoint = config.getboolean('DIFFERENTIAL_EVOLUTION', 'resume_from_checkpoint',
+                                                               fallback=False)
+        except ValueError:
+            return 'resume_from_checkpoint in DIFFERENTIAL_EVOLUTION in config.ini must be True or False'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
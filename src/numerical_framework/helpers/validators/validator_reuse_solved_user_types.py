@@ -0,0 +1,24 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorReuseSolvedUserTypes(AbstractValidator):
+    """
+    A class defining the validator for the parameter reuse solved user types from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.reuse_solved_user_types = config.getboolean('BACKWARD_INDUCTION', 'reuse_solved_user_types',
+                                                                fallback=False)
+        except ValueError:
+            return 'reuse_solved_user_types in BACKWARD_INDUCTION in config.ini must be True or False'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return True
+
+    def differential_evolution_needs_validation(self):
+        return False
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
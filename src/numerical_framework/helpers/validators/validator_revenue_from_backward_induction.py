@@ -0,0 +1,25 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorRevenueFromBackwardInduction(AbstractValidator):
+    """
+    A class defining the validator for the parameter revenue from backward induction from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.revenue_from_backward_induction = config.getboolean('DIFFERENTIAL_EVOLUTION',
+                                                                        'revenue_from_backward_induction',
+                                                                        fallback=False)
+        except ValueError:
+            return 'revenue_from_backward_induction in DIFFERENTIAL_EVOLUTION in config.ini must be True or False'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
@@ -0,0 +1,27 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorSeededInitialPopulationFraction(AbstractValidator):
+    """
+    A class defining the validator for the parameter seeded initial population fraction from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.seeded_initial_population_fraction = config.getfloat('DIFFERENTIAL_EVOLUTION',
+                                                                         'seeded_initial_population_fraction',
+                                                                         fallback=0)
+            if not 0 <= creator.seeded_initial_population_fraction <= 1:
+                return f'seeded_initial_population_fraction in DIFFERENTIAL_EVOLUTION in config.ini must be between 0 and 1 but is {creator.seeded_initial_population_fraction}.'
+        except ValueError:
+            return 'seeded_initial_population_fraction in DIFFERENTIAL_EVOLUTION in config.ini must be float between 0 and 1'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
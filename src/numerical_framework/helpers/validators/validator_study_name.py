@@ -0,0 +1,23 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorStudyName(AbstractValidator):
+    """
+    A class defining the validator for the parameter study name from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.study_name = config.get('DIFFERENTIAL_EVOLUTION', 'study_name', fallback='').strip()
+        except ValueError:
+            return 'study_name in DIFFERENTIAL_EVOLUTION in config.ini must be a string'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
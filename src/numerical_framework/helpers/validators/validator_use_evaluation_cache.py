@@ -0,0 +1,24 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorUseEvaluationCache(AbstractValidator):
+    """
+    A class defining the validator for the parameter use evaluation cache from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.use_evaluation_cache = config.getboolean('DIFFERENTIAL_EVOLUTION', 'use_evaluation_cache',
+                                                             fallback=False)
+        except ValueError:
+            return 'use_evaluation_cache in DIFFERENTIAL_EVOLUTION in config.ini must be True or False'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
@@ -0,0 +1,25 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorUseTensorizedBackwardInduction(AbstractValidator):
+    """
+    A class defining the validator for the parameter use tensorized backward induction from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.use_tensorized_backward_induction = config.getboolean('MAIN',
+                                                                          'use_tensorized_backward_induction',
+                                                                          fallback=False)
+        except ValueError:
+            return 'use_tensorized_backward_induction in MAIN in config.ini must be True or False'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return True
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
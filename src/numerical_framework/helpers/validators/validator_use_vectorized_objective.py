@@ -0,0 +1,24 @@
+from src.numerical_framework.helpers.validators.abstract_validator import AbstractValidator
+
+
+class ValidatorUseVectorizedObjective(AbstractValidator):
+    """
+    A class defining the validator for the parameter use vectorized objective from the config.ini
+    """
+
+    def validate(self, config, creator):
+        try:
+            creator.use_vectorized_objective = config.getboolean('DIFFERENTIAL_EVOLUTION', 'use_vectorized_objective',
+                                                                 fallback=False)
+        except ValueError:
+            return 'use_vectorized_objective in DIFFERENTIAL_EVOLUTION in config.ini must be True or False'
+        return None
+
+    def backward_induction_needs_validation(self):
+        return False
+
+    def differential_evolution_needs_validation(self):
+        return True
+
+    def single_maximize_revenue_needs_validation(self):
+        return False
@@ -0,0 +1,319 @@
+import multiprocessing
+import os
+import pickle
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+# persistent worker pools of this process, key: number of processes
+WORKER_POOLS = {}
+# evaluation contexts loaded in this (worker) process, key: name of the shared memory block of the context
+EVALUATION_CONTEXTS = {}
+
+
+class EvaluationContext(object):
+    """
+    A class used to represent everything a worker needs to evaluate candidates of a run except their prices
+
+    The context is pickled once into a shared memory block and loaded once by every worker process, the tasks only
+    contain the name of the block and the prices of a candidate.
+
+    ...
+
+    Attributes
+    ----------
+    objective : callable
+        module level function objective(prices, *arguments) of a single candidate
+    arguments : tuple
+        arguments of the objective (e.g., creator and user type population of the run)
+    prepare_worker : callable
+        module level function called with *prepare_worker_arguments in every worker before its first evaluation in the
+        context (e.g., to set the evaluation number of the run), None if nothing has to be prepared
+    prepare_worker_arguments : tuple
+        arguments of prepare_worker
+    """
+
+    def __init__(self, objective, arguments, prepare_worker=None, prepare_worker_arguments=()):
+        """
+        Parameters
+        ----------
+        objective : callable
+            module level function objective(prices, *arguments) of a single candidate
+        arguments : tuple
+            arguments of the objective
+        prepare_worker : callable, optional
+            module level function called in every worker before its first evaluation in the context, default: None
+        prepare_worker_arguments : tuple, optional
+            arguments of prepare_worker, default: ()
+        """
+        self.objective = objective
+        self.arguments = arguments
+        self.prepare_worker = prepare_worker
+        self.prepare_worker_arguments = prepare_worker_arguments
+
+
+class SharedEvaluationContext(object):
+    """
+    A class used to represent an evaluation context shared with the worker processes through a shared memory block
+
+    An instance is map-like (see __call__()) and can be passed as workers to scipy.optimize.differential_evolution().
+    The shared memory block is removed with close() after the run.
+
+    ...
+
+    Attributes
+    ----------
+    worker_pool : WorkerPool
+        persistent pool the candidates are evaluated in
+    shared_memory_block : SharedMemory
+        block containing the pickled EvaluationContext
+    resource_tracker_id : int
+        id of the resource tracker the block is registered with, see get_resource_tracker_id()
+    """
+
+    def __init__(self, worker_pool, evaluation_context):
+        """
+        Parameters
+        ----------
+        worker_pool : WorkerPool
+            persistent pool the candidates are evaluated in
+        evaluation_context : EvaluationContext
+            context shared with the workers
+        """
+        self.worker_pool = worker_pool
+        pickled_context = pickle.dumps(evaluation_context, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared_memory_block = shared_memory.SharedMemory(create=True, size=len(pickled_context))
+        self.shared_memory_block.buf[:len(pickled_context)] = pickled_context
+        self.resource_tracker_id = get_resource_tracker_id()
+
+    def __call__(self, function, candidates):
+        """
+        Evaluates the objective of the context for every candidate in the worker processes
+
+        Parameters
+        ----------
+        function : callable
+            objective wrapped by scipy, not sent to the workers since the objective is part of the context
+        candidates : iterable
+            prices of every candidate
+
+        Returns
+        -------
+        list
+            objective of every candidate in the order of the candidates
+        """
+        tasks = [(self.shared_memory_block.name, self.resource_tracker_id, candidate) for candidate in candidates]
+        return self.worker_pool.map(evaluate_in_shared_context, tasks)
+
+    def close(self):
+        """
+        Removes the shared memory block of the context
+        """
+        self.shared_memory_block.close()
+        self.shared_memory_block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class WorkerPool(object):
+    """
+    A class used to represent a pool of worker processes created once and reused by all runs of this process
+
+    ...
+
+    Attributes
+    ----------
+    number_of_processes : int
+        number of worker processes
+    process_id : int
+        id of the process the pool has been created in
+    pool : Pool
+        multiprocessing pool of the worker processes
+    """
+
+    def __init__(self, number_of_processes):
+        """
+        Parameters
+        ----------
+        number_of_processes : int
+            number of worker processes
+        """
+        self.number_of_processes = number_of_processes
+        self.process_id = os.getpid()
+        start_method = multiprocessing.get_start_method(allow_none=True)
+        if start_method is None and os.name == 'posix' and sys.version_info < (3, 14):
+            # as scipy does for its pools, "fork" (default before Python 3.14) can lead to deadlocks
+            start_method = 'forkserver'
+        self.pool = multiprocessing.get_context(start_method).Pool(number_of_processes)
+
+    def share_context(self, evaluation_context):
+        """
+        Shares the context of a run with the worker processes
+
+        Parameters
+        ----------
+        evaluation_context : EvaluationContext
+            context of the run
+
+        Returns
+        -------
+        SharedEvaluationContext
+            map-like context the candidates of the run are evaluated with, must be closed after the run
+        """
+        return SharedEvaluationContext(self, evaluation_context)
+
+    def map(self, function, tasks):
+        """
+        Calls the function for every task in the worker processes
+
+        Parameters
+        ----------
+        function : callable
+            module level function called with a single task
+        tasks : list
+            tasks the function is called with
+
+        Returns
+        -------
+        list
+            result of the function for every task in the order of the tasks
+        """
+        # several tasks are sent to a worker at once to reduce the communication for many small calls
+        chunksize = max(1, len(tasks) // (4 * self.number_of_processes))
+        return self.pool.map(function, tasks, chunksize=chunksize)
+
+    def close(self):
+        """
+        Ends the worker processes
+        """
+        self.pool.close()
+        self.pool.join()
+
+
+def get_worker_pool(number_of_processes):
+    """
+    Returns the persistent worker pool of this process, created at the first call
+
+    Parameters
+    ----------
+    number_of_processes : int
+        number of worker processes
+
+    Returns
+    -------
+    WorkerPool
+        pool reused by all runs of this process
+    """
+    worker_pool = WORKER_POOLS.get(number_of_processes)
+    # a forked process inherits the worker pools of its parent, which cannot be used
+    if worker_pool is None or worker_pool.process_id != os.getpid():
+        worker_pool = WorkerPool(number_of_processes)
+        WORKER_POOLS[number_of_processes] = worker_pool
+    return worker_pool
+
+
+def close_worker_pools():
+    """
+    Ends the worker processes of all worker pools created in this process
+    """
+    for number_of_processes, worker_pool in list(WORKER_POOLS.items()):
+        if worker_pool.process_id == os.getpid():
+            worker_pool.close()
+        del WORKER_POOLS[number_of_processes]
+
+
+def get_resource_tracker_id():
+    """
+    Returns an id of the resource tracker of this process, processes sharing a resource tracker return the same id
+
+    Returns
+    -------
+    int
+        inode of the pipe to the resource tracker, None from Python 3.13 (attaching does not register blocks)
+    """
+    if sys.version_info >= (3, 13):
+        return None
+    return os.fstat(resource_tracker.getfd()).st_ino
+
+
+def attach_shared_memory_block(name, resource_tracker_id):
+    """
+    Attaches to the shared memory block of a context without leaving it registered with the resource tracker
+
+    Before Python 3.13, attaching registers the block with the resource tracker of the worker. A worker with its own
+    resource tracker (e.g., in a run of concurrent runs) would remove the block again with a warning about a leaked
+    shared memory object at shutdown, although the process sharing the context unlinks it after the run. Hence the
+    block is unregistered again unless the worker shares the resource tracker of that process.
+
+    Parameters
+    ----------
+    name : str
+        name of the shared memory block of the context
+    resource_tracker_id : int
+        id of the resource tracker of the process sharing the context, see get_resource_tracker_id()
+
+    Returns
+    -------
+    SharedMemory
+        attached shared memory block, must be closed but not unlinked
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shared_memory_block = shared_memory.SharedMemory(name=name)
+    if get_resource_tracker_id() != resource_tracker_id:
+        resource_tracker.unregister(shared_memory_block._name, 'shared_memory')
+    return shared_memory_block
+
+
+def get_evaluation_context(name, resource_tracker_id):
+    """
+    Returns the evaluation context of the shared memory block, loaded once per worker process
+
+    Parameters
+    ----------
+    name : str
+        name of the shared memory block of the context
+    resource_tracker_id : int
+        id of the resource tracker of the process sharing the context, see get_resource_tracker_id()
+
+    Returns
+    -------
+    EvaluationContext
+        context of the run
+    """
+    evaluation_context = EVALUATION_CONTEXTS.get(name)
+    if evaluation_context is None:
+        shared_memory_block = attach_shared_memory_block(name, resource_tracker_id)
+        try:
+            evaluation_context = pickle.loads(shared_memory_block.buf)
+        finally:
+            shared_memory_block.close()
+        # a worker evaluates a single run at a time, contexts of earlier runs are not needed anymore
+        EVALUATION_CONTEXTS.clear()
+        EVALUATION_CONTEXTS[name] = evaluation_context
+        if evaluation_context.prepare_worker is not None:
+            evaluation_context.prepare_worker(*evaluation_context.prepare_worker_arguments)
+    return evaluation_context
+
+
+def evaluate_in_shared_context(task):
+    """
+    Evaluates the objective of the context for the prices of a candidate in a worker process
+
+    Parameters
+    ----------
+    task : tuple
+        name of the shared memory block of the context, id of the resource tracker of the process sharing the context
+        and prices of the candidate
+
+    Returns
+    -------
+    float
+        objective of the candidate
+    """
+    name, resource_tracker_id, prices = task
+    evaluation_context = get_evaluation_context(name, resource_tracker_id)
+    return evaluation_context.objective(prices, *evaluation_context.arguments)
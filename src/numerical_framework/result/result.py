@@ -30,6 +30,7 @@ class AbstractResult(ABC):
     product_quality_base_product = None
     product_quality_upgrade = None
     files_results_are_written_to = None
+    result_database = None
     path_to_folder = None
 
 
@@ -45,6 +46,7 @@ class DifferentialEvolutionResult(AbstractResult):
     is_subscription_price_variable = None
     price_bounds = None
     popsize = None
+    optimizer = None
     differential_evolution_strategy = None
     user_valuation = None
     user_arrival_time = None
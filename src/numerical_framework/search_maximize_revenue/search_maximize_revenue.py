@@ -2,7 +2,7 @@ from datetime import datetime
 
 import numpy as np
 
-from src.model.game.game import create_game
+from src.model.game.game import get_game_from_pool
 from src.model.game.price_strategy_type import PriceStrategyType
 from src.model.publisher.productinformation import ProductInformation
 from src.model.user.user_type import get_truncated_normal, UserType, get_probability_user_type
@@ -147,7 +147,8 @@ def search_maximize_revenue(search_maximize_revenue_creator):
                             user_type = UserType(None, engagement_factor, quality_decay_factor,
                                                  valuation)
 
-                            game = create_game(product_information, user_type, n_max, n_upgrade, price_strategy_type)
+                            game = get_game_from_pool(product_information, user_type, n_max, n_upgrade,
+                                                      price_strategy_type)
                             calculate_optimal_user_actions(game)
 
                             for arr_time in range(1, n_max + 1):
@@ -166,15 +167,8 @@ def search_maximize_revenue(search_maximize_revenue_creator):
                                 user_welfare += [game.expected_user_welfare * prob_user_type]
                                 total_prob_user_type += prob_user_type
 
-                                # set values to 0 again
-                                game.expected_publisher_revenue = 0
-                                game.expected_user_welfare = 0
-                                timestep = game.n_max
-
-                                while timestep > 0:
-                                    for user_state in game.user_states[timestep - 1]:
-                                        user_state.probability_state_is_reached = 0
-                                    timestep -= 1
+                                # set values to 0 again, the results of the backward induction are kept
+                                game.reset_forward_pass()
                 test_if_value_equal_one(total_prob_user_type, "total_prob_user_type")
                 total_prob_user_type = 0
 
@@ -0,0 +1,834 @@
+from functools import lru_cache
+
+import numpy as np
+
+from src.model.publisher.productinformation import ProductQuality
+from src.model.user.user_action import create_all_possible_user_actions
+from src.model.user.user_functions import get_realized_quality, get_transition_table, \
+    get_expected_utility_and_payment_of_subscription_tail
+from src.model.user.user_state import Ownership, create_all_possible_user_states
+
+
+class TensorizedGame(object):
+    """
+    A class used to represent the games of several user types as NumPy arrays for the tensorized backward induction
+
+    The first axis of the arrays depending on the user type is the user type axis. Every user type faces one of
+    several price vectors, such that the same user types can be solved for several price vectors at once. States are
+    indexed in the order of create_all_possible_user_states(price_strategy_type), actions in the order of
+    create_all_possible_user_actions(price_strategy_type).
+
+    ...
+
+    Attributes
+    ----------
+    user_states : list[UserState]
+        all possible user states of a timestep, the position in the list is the state index
+    user_actions : list[UserAction]
+        all possible user actions, the position in the list is the action index
+    price_base_product : ndarray
+        shape (price vectors, n_max), price over time for base product
+    price_upgrade : ndarray
+        shape (price vectors, n_max), price over time for upgrade
+    price_subscription : ndarray
+        shape (price vectors, n_max), price over time for subscription
+    price_vector_index : ndarray
+        shape (types,), index of the price vector a user type faces
+    is_action_allowed : ndarray
+        shape (n_max, states, actions), False if an action is skipped in the backward induction
+    normalized_immediate_reward : ndarray
+        shape (types, n_max, states, actions), reward for a user with valuation = 1
+    immediate_payment : ndarray
+        shape (price vectors, n_max, actions), payment of an action (independent of the state and user type)
+    immediate_utility : ndarray
+        shape (types, n_max, states, actions), immediate utility of an action in a state
+    transition_probability : ndarray
+        shape (engagement factors, n_max, states, actions, states), probability to get from a state with an action to a
+        state in the next timestep. The entry for n_max is not used.
+    engagement_factor_index : ndarray
+        shape (types,), index of the engagement factor of a user type in transition_probability
+    expected_utility_in_future_in_last_timestep : ndarray
+        shape (types, states, actions), expected utility after n_max (geometric series and subscription tail)
+    expected_payment_in_future_in_last_timestep : ndarray
+        shape (types, states, actions), expected payment after n_max (subscription tail)
+    best_action_index : ndarray
+        shape (types, n_max, states), index of the optimal action found through backward induction
+    immediate_payment_of_best_action : ndarray
+        shape (types, n_max, states), see UserState.immediate_payment
+    normalized_immediate_reward_of_best_action : ndarray
+        shape (types, n_max, states), see UserState.normalized_immediate_reward
+    immediate_utility_of_best_action : ndarray
+        shape (types, n_max, states), see UserState.immediate_utility
+    expected_payment_in_future : ndarray
+        shape (types, n_max, states), see UserState.expected_payment_in_future
+    expected_utility_in_future : ndarray
+        shape (types, n_max, states), see UserState.expected_utility_in_future
+    expected_utility : ndarray
+        shape (types, n_max, states), see UserState.expected_utility
+    arrival_time_weights : ndarray
+        shape (types or 1, cohorts, n_max), weight of the users of a cohort arriving in every timestep. A cohort is either
+        a single arrival time (identity matrix) or a mixture of all arrival times weighted with their probabilities
+    probability_state_is_reached : ndarray
+        shape (types, cohorts, n_max, states), see UserState.probability_state_is_reached
+    expected_publisher_revenue : ndarray
+        shape (types, cohorts), see Game.expected_publisher_revenue
+    expected_user_welfare : ndarray
+        shape (types, cohorts), see Game.expected_user_welfare
+    revenue_base_product : ndarray
+        shape (types, cohorts, n_max), expected revenue through the base product in every timestep
+    revenue_upgrade : ndarray
+        shape (types, cohorts, n_max), expected revenue through the upgrade in every timestep
+    revenue_subscription : ndarray
+        shape (types, cohorts, n_max), expected revenue through subscription in every timestep (the payment after n_max
+        is added to n_max)
+    """
+
+    def __init__(self, user_states, user_actions):
+        """
+        Parameters
+        ----------
+        user_states : list[UserState]
+            all possible user states of a timestep, the position in the list is the state index
+        user_actions : list[UserAction]
+            all possible user actions, the position in the list is the action index
+        """
+        self.user_states = user_states
+        self.user_actions = user_actions
+        self.price_base_product = None
+        self.price_upgrade = None
+        self.price_subscription = None
+        self.price_vector_index = None
+        self.is_action_allowed = None
+        self.normalized_immediate_reward = None
+        self.immediate_payment = None
+        self.immediate_utility = None
+        self.transition_probability = None
+        self.engagement_factor_index = None
+        self.expected_utility_in_future_in_last_timestep = None
+        self.expected_payment_in_future_in_last_timestep = None
+        self.best_action_index = None
+        self.immediate_payment_of_best_action = None
+        self.normalized_immediate_reward_of_best_action = None
+        self.immediate_utility_of_best_action = None
+        self.expected_payment_in_future = None
+        self.expected_utility_in_future = None
+        self.expected_utility = None
+        self.arrival_time_weights = None
+        self.probability_state_is_reached = None
+        self.expected_publisher_revenue = None
+        self.expected_user_welfare = None
+        self.revenue_base_product = None
+        self.revenue_upgrade = None
+        self.revenue_subscription = None
+
+
+def calculate_optimal_user_actions_tensorized(game):
+    """
+    Finds the optimal action for every user state in every timestep with array operations
+
+    Produces the same results as calculate_optimal_user_actions() and writes them to the user states of the game, such
+    that the probabilities states are reached, revenue and welfare can be calculated as before.
+
+    Parameters
+    ----------
+    game : Game
+        object holding all important information for the publisher and user acting optimally against each other
+
+    Returns
+    -------
+    TensorizedGame
+        arrays used and found by the backward induction (user type axis of length 1)
+    """
+    tensorized_game = create_tensorized_game([game.product_information], [0], game.n_max, game.n_upgrade,
+                                             game.price_strategy_type, [game.user_type.valuation],
+                                             [game.user_type.quality_decay_factor],
+                                             [game.user_type.engagement_factor])
+    perform_tensorized_backward_induction(tensorized_game, game.n_max)
+    write_tensorized_results_to_user_states(tensorized_game, game)
+    return tensorized_game
+
+
+def solve_user_types_tensorized(product_information, n_max, n_upgrade, price_strategy_type, valuations,
+                                quality_decay_factors, engagement_factors, probabilities_arrival_time=None,
+                                is_forward_pass_needed=True):
+    """
+    Finds the optimal actions, expected revenue and welfare of several user types for all arrival times at once
+
+    The user types are given element-wise, i.e., user type k has valuations[k], quality_decay_factors[k] and
+    engagement_factors[k]. Without probabilities of the arrival times, every arrival time is a cohort of its own.
+    Otherwise, all arrival times are mixed into a single cohort weighted with the probabilities. Without forward pass,
+    only the expected revenue and welfare are calculated (from the backward induction).
+
+    Parameters
+    ----------
+    product_information : ProductInformation
+        prices over time and product qualities
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    n_upgrade : int
+        timestep of upgrade release
+    price_strategy_type : PriceStrategyType
+        type of price strategy chosen by the publisher
+    valuations : list[float]
+        valuation of every user type
+    quality_decay_factors : list[float]
+        quality decay factor of every user type
+    engagement_factors : list[float]
+        engagement factor of every user type
+    probabilities_arrival_time : ndarray, optional
+        shape (types, n_max), probability of every user type and arrival time, default: None (no mixture)
+    is_forward_pass_needed : bool, optional
+        True if the probabilities states are reached and the revenue per timestep are needed, default: True
+
+    Returns
+    -------
+    TensorizedGame
+        optimal actions, expected revenue and welfare of every user type and arrival time (or mixture)
+    """
+    return solve_user_types_tensorized_for_price_vectors([product_information], n_max, n_upgrade,
+                                                         price_strategy_type, valuations, quality_decay_factors,
+                                                         engagement_factors, probabilities_arrival_time,
+                                                         is_forward_pass_needed)
+
+
+def solve_user_types_tensorized_for_price_vectors(product_informations, n_max, n_upgrade, price_strategy_type,
+                                                  valuations, quality_decay_factors, engagement_factors,
+                                                  probabilities_arrival_time=None, is_forward_pass_needed=True):
+    """
+    Finds the optimal actions, expected revenue and welfare of several user types for several price vectors at once
+
+    Every user type is solved for every price vector. The user type axis of the result is ordered by price vector,
+    i.e., user type k facing price vector i has index i * len(valuations) + k. The arrival times are handled as in
+    solve_user_types_tensorized().
+
+    Parameters
+    ----------
+    product_informations : list[ProductInformation]
+        prices over time of every price vector, all with the same product qualities
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    n_upgrade : int
+        timestep of upgrade release
+    price_strategy_type : PriceStrategyType
+        type of price strategy chosen by the publisher
+    valuations : list[float]
+        valuation of every user type
+    quality_decay_factors : list[float]
+        quality decay factor of every user type
+    engagement_factors : list[float]
+        engagement factor of every user type
+    probabilities_arrival_time : ndarray, optional
+        shape (types, n_max), probability of every user type and arrival time, default: None (no mixture)
+    is_forward_pass_needed : bool, optional
+        True if the probabilities states are reached and the revenue per timestep are needed, default: True
+
+    Returns
+    -------
+    TensorizedGame
+        optimal actions, expected revenue and welfare of every price vector, user type and arrival time (or mixture)
+    """
+    number_of_price_vectors = len(product_informations)
+    price_vector_indices = np.repeat(np.arange(number_of_price_vectors), len(valuations))
+    tensorized_game = create_tensorized_game(product_informations, price_vector_indices, n_max, n_upgrade,
+                                             price_strategy_type, list(valuations) * number_of_price_vectors,
+                                             list(quality_decay_factors) * number_of_price_vectors,
+                                             list(engagement_factors) * number_of_price_vectors)
+    perform_tensorized_backward_induction(tensorized_game, n_max)
+    if probabilities_arrival_time is None:
+        arrival_time_weights = np.eye(n_max)[None, :, :]
+    else:
+        arrival_time_weights = np.tile(np.asarray(probabilities_arrival_time, dtype=float)[:, None, :],
+                                       (number_of_price_vectors, 1, 1))
+    if is_forward_pass_needed:
+        calculate_publisher_revenue_and_user_welfare_for_arrival_time_weights(tensorized_game, n_max,
+                                                                              arrival_time_weights)
+    else:
+        calculate_publisher_revenue_and_user_welfare_from_backward_induction(tensorized_game, arrival_time_weights)
+    return tensorized_game
+
+
+def create_tensorized_game(product_informations, price_vector_indices, n_max, n_upgrade, price_strategy_type,
+                           valuations, quality_decay_factors, engagement_factors):
+    """
+    Creates the arrays for rewards, payments, allowed actions and transitions of several user types
+
+    Parameters
+    ----------
+    product_informations : list[ProductInformation]
+        prices over time of every price vector, all with the same product qualities
+    price_vector_indices : list[int]
+        index of the price vector every user type faces
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    n_upgrade : int
+        timestep of upgrade release
+    price_strategy_type : PriceStrategyType
+        type of price strategy chosen by the publisher
+    valuations : list[float]
+        valuation of every user type
+    quality_decay_factors : list[float]
+        quality decay factor of every user type
+    engagement_factors : list[float]
+        engagement factor of every user type
+
+    Returns
+    -------
+    TensorizedGame
+        arrays needed to perform the tensorized backward induction
+    """
+    user_states = create_all_possible_user_states(price_strategy_type)
+    user_actions = create_all_possible_user_actions(price_strategy_type)
+    tensorized_game = TensorizedGame(user_states, user_actions)
+
+    demand = np.array([user_state.demand for user_state in user_states], dtype=float)
+    owns_base_product = np.array([user_state.ownership.base_product for user_state in user_states])
+    owns_upgrade = np.array([user_state.ownership.upgrade for user_state in user_states])
+    subscribe_action = np.array([user_action.subscribe_action for user_action in user_actions], dtype=float)
+    buys_base_product = np.array([user_action.buy_action.base_product for user_action in user_actions])
+    buys_upgrade = np.array([user_action.buy_action.upgrade for user_action in user_actions])
+
+    # ownership after the action, shape (states, actions)
+    base_product_after_action = np.maximum(owns_base_product[:, None], buys_base_product[None, :])
+    upgrade_after_action = np.maximum(owns_upgrade[:, None], buys_upgrade[None, :])
+
+    # realized quality per user type, timestep and ownership (index: 2 * base_product + upgrade)
+    product_information = product_informations[0]
+    product_quality = product_information.product_quality
+    realized_quality = np.array(
+        [get_realized_qualities(quality_decay_factor, n_max, n_upgrade, product_quality.base_product,
+                                product_quality.upgrade) for quality_decay_factor in quality_decay_factors])
+    realized_quality_after_action = realized_quality[:, :, 2 * base_product_after_action + upgrade_after_action]
+    realized_quality_with_subscription = realized_quality[:, :, 3]
+
+    tensorized_game.normalized_immediate_reward = demand[None, None, :, None] * (
+            subscribe_action[None, None, None, :] * realized_quality_with_subscription[:, :, None, None] +
+            (1 - subscribe_action)[None, None, None, :] * realized_quality_after_action)
+
+    tensorized_game.price_base_product = np.array(
+        [price_vector.price_base_product[:n_max] for price_vector in product_informations], dtype=float)
+    tensorized_game.price_upgrade = np.array(
+        [price_vector.price_upgrade[:n_max] for price_vector in product_informations], dtype=float)
+    tensorized_game.price_subscription = np.array(
+        [price_vector.price_subscription[:n_max] for price_vector in product_informations], dtype=float)
+    tensorized_game.price_vector_index = np.array(price_vector_indices, dtype=int)
+    tensorized_game.immediate_payment = \
+        tensorized_game.price_subscription[:, :, None] * subscribe_action[None, None, :] + (
+                tensorized_game.price_base_product[:, :, None] * buys_base_product[None, None, :] +
+                tensorized_game.price_upgrade[:, :, None] * buys_upgrade[None, None, :])
+
+    immediate_payment_of_user_type = tensorized_game.immediate_payment[tensorized_game.price_vector_index]
+    valuations = np.array(valuations, dtype=float)
+    tensorized_game.immediate_utility = tensorized_game.normalized_immediate_reward * \
+                                        valuations[:, None, None, None] - immediate_payment_of_user_type[:, :, None, :]
+
+    tensorized_game.is_action_allowed = create_allowed_actions(n_max, n_upgrade, owns_base_product, owns_upgrade,
+                                                               subscribe_action, buys_base_product, buys_upgrade)
+
+    # transitions only depend on the engagement factor of the user type
+    distinct_engagement_factors = []
+    for engagement_factor in engagement_factors:
+        if engagement_factor not in distinct_engagement_factors:
+            distinct_engagement_factors.append(engagement_factor)
+    tensorized_game.engagement_factor_index = np.array(
+        [distinct_engagement_factors.index(engagement_factor) for engagement_factor in engagement_factors])
+    tensorized_game.transition_probability = np.array(
+        [get_transition_probabilities(engagement_factor, n_max, n_upgrade, product_quality.upgrade,
+                                      price_strategy_type) for engagement_factor in distinct_engagement_factors])
+
+    add_expected_utility_and_payment_after_last_timestep(tensorized_game, product_quality, n_max, n_upgrade,
+                                                         valuations, quality_decay_factors,
+                                                         engagement_factors, demand, subscribe_action,
+                                                         base_product_after_action, upgrade_after_action,
+                                                         realized_quality[:, n_max - 1])
+    return tensorized_game
+
+
+@lru_cache(maxsize=None)
+def get_realized_qualities(quality_decay_factor, n_max, n_upgrade, quality_base_product, quality_upgrade):
+    """
+    Calculates the realized quality of every ownership in every timestep (see get_realized_quality())
+
+    Parameters
+    ----------
+    quality_decay_factor : float
+        in thesis: x_gamma of user type
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    n_upgrade : int
+        timestep of upgrade release
+    quality_base_product : float
+        quality of base product
+    quality_upgrade : float
+        quality of upgrade
+
+    Returns
+    -------
+    ndarray
+        shape (n_max, 4), realized quality per timestep and ownership (index: 2 * base_product + upgrade), read-only
+        since it is shared between calls
+    """
+    product_quality = ProductQuality(quality_base_product, quality_upgrade)
+    realized_qualities = np.array(
+        [[get_realized_quality(timestep, n_upgrade, Ownership(ownership // 2, ownership % 2), quality_decay_factor,
+                               product_quality) for ownership in range(4)] for timestep in range(1, n_max + 1)])
+    realized_qualities.setflags(write=False)
+    return realized_qualities
+
+
+def create_allowed_actions(n_max, n_upgrade, owns_base_product, owns_upgrade, subscribe_action, buys_base_product,
+                           buys_upgrade):
+    """
+    Creates the mask of actions considered in the backward induction (see calculate_optimal_user_actions())
+
+    Parameters
+    ----------
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    n_upgrade : int
+        timestep of upgrade release
+    owns_base_product : ndarray
+        shape (states,), 1 if base product is owned in the state
+    owns_upgrade : ndarray
+        shape (states,), 1 if upgrade is owned in the state
+    subscribe_action : ndarray
+        shape (actions,), 1 if action subscribes
+    buys_base_product : ndarray
+        shape (actions,), 1 if action buys the base product
+    buys_upgrade : ndarray
+        shape (actions,), 1 if action buys the upgrade
+
+    Returns
+    -------
+    ndarray
+        shape (n_max, states, actions), True if the action is allowed in the state and timestep
+    """
+    owns_base_product = owns_base_product[:, None]
+    owns_upgrade = owns_upgrade[:, None]
+    subscribe_action = subscribe_action[None, :]
+    buys_base_product = buys_base_product[None, :]
+    buys_upgrade = buys_upgrade[None, :]
+
+    # it is not allowed to buy the upgrade without owning or buying the base product
+    is_not_allowed = (owns_base_product == 0) & (buys_base_product == 0) & (buys_upgrade == 1)
+    # it is never optimal to subscribe if base product and upgrade are already owned
+    is_not_allowed |= (owns_base_product == 1) & (owns_upgrade == 1) & (subscribe_action == 1)
+    # if base product or upgrade already owned, it is never optimal to buy the corresponding product
+    is_not_allowed |= (buys_upgrade == 1) & (owns_upgrade == 1)
+    is_not_allowed |= (buys_base_product == 1) & (owns_base_product == 1)
+
+    is_allowed = np.repeat(~is_not_allowed[None, :, :], n_max, axis=0)
+    # if upgrade is not released yet it cannot be optimal to buy it
+    timesteps = np.arange(1, n_max + 1)
+    is_allowed &= ~((timesteps < n_upgrade)[:, None, None] & (buys_upgrade == 1)[None, :, :])
+    return is_allowed
+
+
+@lru_cache(maxsize=None)
+def get_transition_probabilities(engagement_factor, n_max, n_upgrade, quality_upgrade, price_strategy_type):
+    """
+    Creates the transition probabilities used to calculate the expected utility and payment in future
+
+    The dense arrays are filled from the successor states of get_transition_table().
+
+    Parameters
+    ----------
+    engagement_factor : float
+        engagement factor of the user type
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    n_upgrade : int
+        timestep of upgrade release
+    quality_upgrade : float
+        quality of upgrade
+    price_strategy_type : PriceStrategyType
+        type of price strategy chosen by the publisher
+
+    Returns
+    -------
+    ndarray
+        shape (n_max, states, actions, states), probability to get from a state in timestep t with an action to a state
+        in timestep t + 1, read-only since it is shared between calls
+    """
+    user_states = create_all_possible_user_states(price_strategy_type)
+    user_actions = create_all_possible_user_actions(price_strategy_type)
+    transition_table = get_transition_table(engagement_factor, n_upgrade, quality_upgrade, price_strategy_type)
+
+    def get_transition_probabilities_for_next_timestep(is_upgrade_release):
+        transition_probability_for_next_timestep = np.zeros((len(user_states), len(user_actions), len(user_states)))
+        for s, current_user_state in enumerate(user_states):
+            for a, user_action in enumerate(user_actions):
+                for next_user_state_index, transition_probability_of_successor in transition_table[
+                        (is_upgrade_release, current_user_state.code, user_action.code)]:
+                    transition_probability_for_next_timestep[s, a, next_user_state_index] = \
+                        transition_probability_of_successor
+        return transition_probability_for_next_timestep
+
+    transition_probability = np.repeat(get_transition_probabilities_for_next_timestep(False)[None, :, :, :], n_max,
+                                       axis=0)
+    # timestep t uses the probabilities of timestep t + 1 = n_upgrade
+    if 2 <= n_upgrade <= n_max:
+        transition_probability[n_upgrade - 2] = get_transition_probabilities_for_next_timestep(True)
+    transition_probability.setflags(write=False)
+    return transition_probability
+
+
+def add_expected_utility_and_payment_after_last_timestep(tensorized_game, product_quality, n_max, n_upgrade,
+                                                         valuations, quality_decay_factors, engagement_factors, demand,
+                                                         subscribe_action, base_product_after_action,
+                                                         upgrade_after_action, realized_quality_in_last_timestep):
+    """
+    Adds the expected utility and payment after n_max to the tensorized game (cases 1 to 4 from thesis)
+
+    Parameters
+    ----------
+    tensorized_game : TensorizedGame
+        arrays of the game, the normalized immediate reward and the prices have to be set
+    product_quality : ProductQuality
+        quality of base product and upgrade
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    n_upgrade : int
+        timestep of upgrade release
+    valuations : ndarray
+        shape (types,), valuation of every user type
+    quality_decay_factors : list[float]
+        quality decay factor of every user type
+    engagement_factors : list[float]
+        engagement factor of every user type
+    demand : ndarray
+        shape (states,), demand of the states
+    subscribe_action : ndarray
+        shape (actions,), 1 if action subscribes
+    base_product_after_action : ndarray
+        shape (states, actions), 1 if base product is owned after the action
+    upgrade_after_action : ndarray
+        shape (states, actions), 1 if upgrade is owned after the action
+    realized_quality_in_last_timestep : ndarray
+        shape (types, 4), realized quality in n_max per ownership (index: 2 * base_product + upgrade)
+    """
+    number_of_user_types = len(valuations)
+    geometric_factor = 1 - np.array(quality_decay_factors, dtype=float) * np.array(engagement_factors, dtype=float)
+
+    # case 1 from thesis: geometric series with ownership
+    utility_now = tensorized_game.normalized_immediate_reward[:, n_max - 1] * valuations[:, None, None]
+    expected_utility_without_subscription = utility_now / geometric_factor[:, None, None] - utility_now
+
+    # the subscription tail only depends on the demand of the state, which is 1 for a subscribing user
+    price_subscription_in_last_timestep = \
+        tensorized_game.price_subscription[tensorized_game.price_vector_index, n_max - 1].tolist()
+    utility_with_subscription = np.zeros(number_of_user_types)
+    payment_with_subscription = np.zeros(number_of_user_types)
+    utility_upgrade_with_subscription = np.zeros(number_of_user_types)
+    payment_upgrade_with_subscription = np.zeros(number_of_user_types)
+    for k in range(number_of_user_types):
+        utility_with_subscription[k], payment_with_subscription[k] = \
+            get_expected_utility_and_payment_of_subscription_tail(
+                valuations[k].item(), quality_decay_factors[k], engagement_factors[k],
+                price_subscription_in_last_timestep[k], n_max, n_upgrade, product_quality.base_product,
+                product_quality.upgrade)
+        utility_upgrade_with_subscription[k], payment_upgrade_with_subscription[k] = \
+            get_expected_utility_and_payment_of_subscription_tail(
+                valuations[k].item(), quality_decay_factors[k], engagement_factors[k],
+                price_subscription_in_last_timestep[k], n_max, n_upgrade, 0, product_quality.upgrade)
+
+    # case 2 from thesis
+    owns_nothing = ((base_product_after_action == 0) & (upgrade_after_action == 0))[None, :, :]
+    # case 3 from thesis
+    owns_base_product_only = ((base_product_after_action == 1) & (upgrade_after_action == 0))[None, :, :]
+    utility_now_with_ownership = demand[None, :] * realized_quality_in_last_timestep[:, 2:3] * valuations[:, None]
+    expected_utility_through_ownership = utility_now_with_ownership / geometric_factor[:, None] - \
+                                         utility_now_with_ownership
+
+    has_demand = (demand[:, None] == 1)[None, :, :]
+    shape = (number_of_user_types,) + base_product_after_action.shape
+    expected_utility_with_subscription = np.zeros(shape)
+    expected_payment_with_subscription = np.zeros(shape)
+    expected_utility_with_subscription = np.where(owns_nothing & has_demand,
+                                                  utility_with_subscription[:, None, None],
+                                                  expected_utility_with_subscription)
+    expected_payment_with_subscription = np.where(owns_nothing & has_demand,
+                                                  payment_with_subscription[:, None, None],
+                                                  expected_payment_with_subscription)
+    expected_utility_with_subscription = np.where(
+        owns_base_product_only,
+        expected_utility_through_ownership[:, :, None] +
+        np.where(has_demand, utility_upgrade_with_subscription[:, None, None], 0),
+        expected_utility_with_subscription)
+    expected_payment_with_subscription = np.where(owns_base_product_only & has_demand,
+                                                  payment_upgrade_with_subscription[:, None, None],
+                                                  expected_payment_with_subscription)
+    # case 4 from thesis is already handled as subscription is never optimal if o = [1,1]
+
+    is_subscribing = (subscribe_action == 1)[None, None, :]
+    tensorized_game.expected_utility_in_future_in_last_timestep = np.where(
+        is_subscribing, expected_utility_with_subscription, expected_utility_without_subscription)
+    tensorized_game.expected_payment_in_future_in_last_timestep = np.where(
+        is_subscribing, expected_payment_with_subscription, 0.0)
+
+
+def get_preference_ranks(user_actions):
+    """
+    Ranks the user actions with the rules of get_preferred_action_if_deliver_equal_utility()
+
+    Parameters
+    ----------
+    user_actions : list[UserAction]
+        all possible user actions
+
+    Returns
+    -------
+    ndarray
+        shape (actions,), the preferred of two actions delivering equal utility has the higher rank
+    """
+    return np.array([user_action.preference_rank for user_action in user_actions])
+
+
+def perform_tensorized_backward_induction(tensorized_game, n_max):
+    """
+    Finds the optimal action of every user type in every state by iterating back from n_max to 1 with array operations
+
+    Ties are broken as in calculate_optimal_user_actions(): among actions delivering the same positive utility the
+    preferred action is chosen, among actions delivering zero utility the last action is chosen.
+
+    Parameters
+    ----------
+    tensorized_game : TensorizedGame
+        arrays of the game, the results are added to this object
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    """
+    number_of_user_types, _, number_of_states, number_of_actions = tensorized_game.immediate_utility.shape
+    preference_ranks = get_preference_ranks(tensorized_game.user_actions)
+    action_positions = np.arange(number_of_actions)
+    user_type_indices = np.arange(number_of_user_types)[:, None]
+    state_indices = np.arange(number_of_states)[None, :]
+
+    shape = (number_of_user_types, n_max, number_of_states)
+    tensorized_game.best_action_index = np.zeros(shape, dtype=int)
+    tensorized_game.immediate_payment_of_best_action = np.zeros(shape)
+    tensorized_game.normalized_immediate_reward_of_best_action = np.zeros(shape)
+    tensorized_game.immediate_utility_of_best_action = np.zeros(shape)
+    tensorized_game.expected_payment_in_future = np.zeros(shape)
+    tensorized_game.expected_utility_in_future = np.zeros(shape)
+    tensorized_game.expected_utility = np.zeros(shape)
+
+    timestep = n_max
+    while timestep > 0:
+        immediate_utility = tensorized_game.immediate_utility[:, timestep - 1]
+        if timestep == n_max:
+            expected_utility_in_future = tensorized_game.expected_utility_in_future_in_last_timestep
+            expected_payment_in_future = tensorized_game.expected_payment_in_future_in_last_timestep
+        else:
+            # multiplication and sum are kept separate such that results are bitwise equal to the object version
+            transition_probability = tensorized_game.transition_probability[
+                tensorized_game.engagement_factor_index, timestep - 1]
+            expected_utility_in_future = (transition_probability *
+                                          tensorized_game.expected_utility[:, timestep, None, None, :]).sum(axis=3)
+            expected_total_payment_of_next_states = tensorized_game.expected_payment_in_future[:, timestep] + \
+                                                    tensorized_game.immediate_payment_of_best_action[:, timestep]
+            expected_payment_in_future = (transition_probability *
+                                          expected_total_payment_of_next_states[:, None, None, :]).sum(axis=3)
+
+        total_expected_utility = immediate_utility + expected_utility_in_future
+        total_expected_utility = np.where(tensorized_game.is_action_allowed[timestep - 1], total_expected_utility,
+                                          -np.inf)
+        best_action_index = select_best_actions(total_expected_utility, preference_ranks, action_positions)
+        best_action = (user_type_indices, state_indices, best_action_index)
+
+        tensorized_game.best_action_index[:, timestep - 1] = best_action_index
+        tensorized_game.immediate_payment_of_best_action[:, timestep - 1] = tensorized_game.immediate_payment[
+            tensorized_game.price_vector_index[:, None], timestep - 1, best_action_index]
+        tensorized_game.normalized_immediate_reward_of_best_action[:, timestep - 1] = \
+            tensorized_game.normalized_immediate_reward[:, timestep - 1][best_action]
+        tensorized_game.immediate_utility_of_best_action[:, timestep - 1] = immediate_utility[best_action]
+        tensorized_game.expected_payment_in_future[:, timestep - 1] = expected_payment_in_future[best_action]
+        tensorized_game.expected_utility_in_future[:, timestep - 1] = expected_utility_in_future[best_action]
+        tensorized_game.expected_utility[:, timestep - 1] = total_expected_utility[best_action]
+
+        timestep -= 1
+
+
+def select_best_actions(total_expected_utility, preference_ranks, action_positions):
+    """
+    Selects the optimal action along the last axis
+
+    Parameters
+    ----------
+    total_expected_utility : ndarray
+        shape (..., actions), expected utility of every action, -inf if action is not allowed
+    preference_ranks : ndarray
+        shape (actions,), see get_preference_ranks()
+    action_positions : ndarray
+        shape (actions,), 0, 1, ..., actions - 1
+
+    Returns
+    -------
+    ndarray
+        shape (...), index of the optimal action
+    """
+    best_expected_utility = total_expected_utility.max(axis=-1, keepdims=True)
+    is_best = total_expected_utility == best_expected_utility
+    # equal positive utility: preferred action, equal zero utility: last action in the list
+    tie_break_key = np.where(best_expected_utility > 0, preference_ranks, action_positions)
+    return np.where(is_best, tie_break_key, -1).argmax(axis=-1)
+
+
+def calculate_publisher_revenue_and_user_welfare_for_all_arrival_times(tensorized_game, n_max):
+    """
+    Calculates the probabilities states are reached, expected revenue and welfare for every user type and arrival time
+
+    Works as calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare() for all arrival times
+    at once: the user arriving in timestep a enters the start state in timestep a.
+
+    Parameters
+    ----------
+    tensorized_game : TensorizedGame
+        arrays found by the tensorized backward induction, the results are added to this object
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    """
+    calculate_publisher_revenue_and_user_welfare_for_arrival_time_weights(tensorized_game, n_max,
+                                                                          np.eye(n_max)[None, :, :])
+
+
+def calculate_publisher_revenue_and_user_welfare_for_arrival_time_weights(tensorized_game, n_max,
+                                                                          arrival_time_weights):
+    """
+    Calculates the probabilities states are reached, expected revenue and welfare for cohorts of arriving users
+
+    Users of cohort c and user type k enter the start state in timestep a with the weight
+    arrival_time_weights[k, c, a - 1]. Since the forward pass is linear, a cohort weighted with the probabilities of
+    all arrival times gives the expected revenue and welfare over all arrival times in a single pass.
+
+    Parameters
+    ----------
+    tensorized_game : TensorizedGame
+        arrays found by the tensorized backward induction, the results are added to this object
+    n_max : int
+        last timestep where users arrive and publisher can change prices
+    arrival_time_weights : ndarray
+        shape (types or 1, cohorts, n_max), weight of the users of a cohort arriving in every timestep
+    """
+    number_of_user_types, _, number_of_states = tensorized_game.best_action_index.shape
+    number_of_cohorts = arrival_time_weights.shape[1]
+    start_state_index = [s for s, user_state in enumerate(tensorized_game.user_states)
+                         if user_state.demand == 1 and user_state.ownership.base_product == 0 and
+                         user_state.ownership.upgrade == 0][0]
+    subscribe_action = np.array([user_action.subscribe_action for user_action in tensorized_game.user_actions])
+    buys_base_product = np.array([user_action.buy_action.base_product for user_action in tensorized_game.user_actions])
+    buys_upgrade = np.array([user_action.buy_action.upgrade for user_action in tensorized_game.user_actions])
+    user_type_indices = np.arange(number_of_user_types)[:, None]
+    state_indices = np.arange(number_of_states)[None, :]
+    # shape (types, n_max, 1), prices faced by every user type
+    price_base_product = tensorized_game.price_base_product[tensorized_game.price_vector_index][:, :, None]
+    price_upgrade = tensorized_game.price_upgrade[tensorized_game.price_vector_index][:, :, None]
+    price_subscription = tensorized_game.price_subscription[tensorized_game.price_vector_index][:, :, None]
+
+    tensorized_game.arrival_time_weights = arrival_time_weights
+    tensorized_game.probability_state_is_reached = np.zeros(
+        (number_of_user_types, number_of_cohorts, n_max, number_of_states))
+    tensorized_game.expected_publisher_revenue = np.zeros((number_of_user_types, number_of_cohorts))
+    tensorized_game.expected_user_welfare = np.zeros((number_of_user_types, number_of_cohorts))
+    tensorized_game.revenue_base_product = np.zeros((number_of_user_types, number_of_cohorts, n_max))
+    tensorized_game.revenue_upgrade = np.zeros((number_of_user_types, number_of_cohorts, n_max))
+    tensorized_game.revenue_subscription = np.zeros((number_of_user_types, number_of_cohorts, n_max))
+
+    # shape (types, cohorts, states)
+    probability_state_is_reached = np.zeros((number_of_user_types, number_of_cohorts, number_of_states))
+    for timestep in range(1, n_max + 1):
+        if timestep > 1:
+            transition_probability = tensorized_game.transition_probability[
+                tensorized_game.engagement_factor_index, timestep - 2]
+            transition_probability_of_best_action = transition_probability[
+                user_type_indices, state_indices, tensorized_game.best_action_index[:, timestep - 2]]
+            probability_state_is_reached = (probability_state_is_reached[:, :, :, None] *
+                                            transition_probability_of_best_action[:, None, :, :]).sum(axis=2)
+        probability_state_is_reached[:, :, start_state_index] += arrival_time_weights[:, :, timestep - 1]
+        tensorized_game.probability_state_is_reached[:, :, timestep - 1] = probability_state_is_reached
+
+        best_action_index = tensorized_game.best_action_index[:, timestep - 1]
+        immediate_payment = tensorized_game.immediate_payment_of_best_action[:, timestep - 1]
+        immediate_utility = tensorized_game.immediate_utility_of_best_action[:, timestep - 1]
+        payment_subscription = subscribe_action[best_action_index] * price_subscription[:, timestep - 1]
+        if timestep == n_max:
+            expected_payment_in_future = tensorized_game.expected_payment_in_future[:, timestep - 1]
+            immediate_payment = immediate_payment + expected_payment_in_future
+            immediate_utility = immediate_utility + tensorized_game.expected_utility_in_future[:, timestep - 1]
+            payment_subscription = payment_subscription + subscribe_action[best_action_index] * \
+                                   expected_payment_in_future
+
+        tensorized_game.expected_publisher_revenue += (probability_state_is_reached *
+                                                       immediate_payment[:, None, :]).sum(axis=2)
+        tensorized_game.expected_user_welfare += (probability_state_is_reached *
+                                                  immediate_utility[:, None, :]).sum(axis=2)
+        payment_base_product = buys_base_product[best_action_index] * price_base_product[:, timestep - 1]
+        payment_upgrade = buys_upgrade[best_action_index] * price_upgrade[:, timestep - 1]
+        tensorized_game.revenue_base_product[:, :, timestep - 1] = (probability_state_is_reached *
+                                                                    payment_base_product[:, None, :]).sum(axis=2)
+        tensorized_game.revenue_upgrade[:, :, timestep - 1] = (probability_state_is_reached *
+                                                               payment_upgrade[:, None, :]).sum(axis=2)
+        tensorized_game.revenue_subscription[:, :, timestep - 1] = (probability_state_is_reached *
+                                                                    payment_subscription[:, None, :]).sum(axis=2)
+
+
+def calculate_publisher_revenue_and_user_welfare_from_backward_induction(tensorized_game, arrival_time_weights):
+    """
+    Calculates the expected revenue and welfare for cohorts of arriving users without a forward pass
+
+    A user arriving in timestep a pays the immediate and expected future payment of the start state in timestep a
+    found by the backward induction. The results are the same as with
+    calculate_publisher_revenue_and_user_welfare_for_arrival_time_weights(), but the probabilities states are reached
+    and the revenue per timestep are not calculated.
+
+    Parameters
+    ----------
+    tensorized_game : TensorizedGame
+        arrays found by the tensorized backward induction, the results are added to this object
+    arrival_time_weights : ndarray
+        shape (types or 1, cohorts, n_max), weight of the users of a cohort arriving in every timestep
+    """
+    start_state_index = [s for s, user_state in enumerate(tensorized_game.user_states)
+                         if user_state.demand == 1 and user_state.ownership.base_product == 0 and
+                         user_state.ownership.upgrade == 0][0]
+    # shape (types, n_max)
+    expected_payment_of_start_state = tensorized_game.immediate_payment_of_best_action[:, :, start_state_index] + \
+                                      tensorized_game.expected_payment_in_future[:, :, start_state_index]
+    expected_utility_of_start_state = tensorized_game.expected_utility[:, :, start_state_index]
+
+    tensorized_game.arrival_time_weights = arrival_time_weights
+    tensorized_game.expected_publisher_revenue = (arrival_time_weights *
+                                                  expected_payment_of_start_state[:, None, :]).sum(axis=2)
+    tensorized_game.expected_user_welfare = (arrival_time_weights *
+                                             expected_utility_of_start_state[:, None, :]).sum(axis=2)
+
+
+def write_tensorized_results_to_user_states(tensorized_game, game, user_type_index=0):
+    """
+    Writes the optimal actions and expected values of the tensorized game to the user states of the game
+
+    Parameters
+    ----------
+    tensorized_game : TensorizedGame
+        arrays found by the tensorized backward induction
+    game : Game
+        object holding all important information for the publisher and user acting optimally against each other
+    user_type_index : int, optional
+        user type of the tensorized game which is written to the game, default: 0
+    """
+    best_action_index = tensorized_game.best_action_index[user_type_index].tolist()
+    immediate_payment = tensorized_game.immediate_payment_of_best_action[user_type_index].tolist()
+    normalized_immediate_reward = tensorized_game.normalized_immediate_reward_of_best_action[user_type_index].tolist()
+    immediate_utility = tensorized_game.immediate_utility_of_best_action[user_type_index].tolist()
+    expected_payment_in_future = tensorized_game.expected_payment_in_future[user_type_index].tolist()
+    expected_utility_in_future = tensorized_game.expected_utility_in_future[user_type_index].tolist()
+    expected_utility = tensorized_game.expected_utility[user_type_index].tolist()
+
+    for t in range(game.n_max):
+        for s, user_state in enumerate(game.user_states[t]):
+            user_state.best_action = tensorized_game.user_actions[best_action_index[t][s]]
+            user_state.immediate_payment = immediate_payment[t][s]
+            user_state.normalized_immediate_reward = normalized_immediate_reward[t][s]
+            user_state.immediate_utility = immediate_utility[t][s]
+            user_state.expected_payment_in_future = expected_payment_in_future[t][s]
+            user_state.expected_utility_in_future = expected_utility_in_future[t][s]
+            user_state.expected_utility = expected_utility[t][s]
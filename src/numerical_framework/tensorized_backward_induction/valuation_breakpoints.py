@@ -0,0 +1,402 @@
+import numpy as np
+from scipy.stats import norm
+
+from src.model.user.user_type import UserType, get_probability_user_type
+from src.numerical_framework.tensorized_backward_induction.tensorized_backward_induction import \
+    solve_user_types_tensorized
+
+# two valuations closer than this (relative to the width of the valuation range) are not split further, the breakpoint
+# of their policies is set by the intersection of their lines or in the middle
+VALUATION_BREAKPOINT_RELATIVE_TOLERANCE = 1e-9
+# relative tolerance two lines of the expected utility are considered the same with
+LINE_TOLERANCE = 1e-9
+
+
+class ValuationBreakpoints(object):
+    """
+    A class used to represent the results of a user type (except valuation) at the valuations evaluated while searching
+    the policy breakpoints
+
+    For fixed prices, the optimal policy of a user arriving in a timestep only changes at a finite number of valuations
+    (breakpoints). The expected utility of a fixed policy is a line in the valuation: welfare(v) = reward * v - revenue,
+    where reward is the expected normalized reward and revenue the expected payment. Between two breakpoints, the
+    revenue (and its breakdown per timestep) is hence constant and the welfare linear. Only the states reached from the
+    arrival define the line, states that are never reached do not create breakpoints.
+
+    ...
+
+    Attributes
+    ----------
+    valuations : ndarray
+        shape (points,), sorted valuations evaluated
+    expected_publisher_revenue : ndarray
+        shape (points, n_max), expected revenue of a user arriving in every timestep
+    expected_user_welfare : ndarray
+        shape (points, n_max), expected welfare of a user arriving in every timestep
+    expected_reward : ndarray
+        shape (points, n_max), slope of the line of the optimal policy of a user arriving in every timestep
+    revenue_base_product : ndarray
+        shape (points, n_max, n_max), expected revenue through the base product in every timestep of a user arriving in
+        every timestep, None if the breakdown has not been calculated
+    revenue_upgrade : ndarray
+        shape (points, n_max, n_max), expected revenue through the upgrade in every timestep, None if not calculated
+    revenue_subscription : ndarray
+        shape (points, n_max, n_max), expected revenue through subscription in every timestep, None if not calculated
+    """
+
+    def __init__(self, valuations, expected_publisher_revenue, expected_user_welfare, revenue_base_product=None,
+                 revenue_upgrade=None, revenue_subscription=None):
+        """
+        Parameters
+        ----------
+        valuations : ndarray
+            shape (points,), sorted valuations evaluated
+        expected_publisher_revenue : ndarray
+            shape (points, n_max), expected revenue of a user arriving in every timestep
+        expected_user_welfare : ndarray
+            shape (points, n_max), expected welfare of a user arriving in every timestep
+        revenue_base_product : ndarray, optional
+            shape (points, n_max, n_max), expected revenue through the base product in every timestep, default: None
+        revenue_upgrade : ndarray, optional
+            shape (points, n_max, n_max), expected revenue through the upgrade in every timestep, default: None
+        revenue_subscription : ndarray, optional
+            shape (points, n_max, n_max), expected revenue through subscription in every timestep, default: None
+        """
+        self.valuations = valuations
+        self.expected_publisher_revenue = expected_publisher_revenue
+        self.expected_user_welfare = expected_user_welfare
+        self.expected_reward = get_expected_reward(valuations, expected_publisher_revenue, expected_user_welfare)
+        self.revenue_base_product = revenue_base_product
+        self.revenue_upgrade = revenue_upgrade
+        self.revenue_subscription = revenue_subscription
+
+    def is_same_line_as_next(self):
+        """
+        Returns True where a valuation has the same line of the expected utility as the next valuation
+
+        Returns
+        -------
+        ndarray
+            shape (points - 1, n_max), True if the revenue and welfare are those of the same policy on the whole
+            interval between the two valuations
+        """
+        return is_same_line(self.expected_reward[:-1], self.expected_publisher_revenue[:-1], self.expected_reward[1:],
+                            self.expected_publisher_revenue[1:])
+
+    def get_breakpoints(self):
+        """
+        Returns the valuation between every two valuations at which the optimal policy changes
+
+        Returns
+        -------
+        ndarray
+            shape (points - 1, n_max), intersection of the lines of the two valuations (the upper valuation if the
+            lines are the same, the middle if the lines are parallel)
+        """
+        lower_valuations = self.valuations[:-1, None]
+        upper_valuations = self.valuations[1:, None]
+        breakpoints = get_intersection_of_lines(self.expected_reward[:-1], self.expected_publisher_revenue[:-1],
+                                                self.expected_reward[1:], self.expected_publisher_revenue[1:])
+        breakpoints = np.where(np.isnan(breakpoints), (lower_valuations + upper_valuations) / 2, breakpoints)
+        breakpoints = np.clip(breakpoints, lower_valuations, upper_valuations)
+        return np.where(self.is_same_line_as_next(), upper_valuations, breakpoints)
+
+
+def get_expected_reward(valuations, expected_publisher_revenue, expected_user_welfare):
+    """
+    Calculates the slope of the line of the expected utility, i.e., the expected normalized reward of the policy
+
+    At valuation 0, no policy with a payment is optimal and the slope is set to 0. A policy with the same revenue but
+    a larger reward (e.g., a product with price 0) is found as a breakpoint at valuation 0 by the next valuation.
+
+    Parameters
+    ----------
+    valuations : ndarray
+        shape (points,), valuations
+    expected_publisher_revenue : ndarray
+        shape (points, n_max), expected revenue (payment) of a user arriving in every timestep
+    expected_user_welfare : ndarray
+        shape (points, n_max), expected welfare (utility) of a user arriving in every timestep
+
+    Returns
+    -------
+    ndarray
+        shape (points, n_max), expected normalized reward
+    """
+    valuations = np.asarray(valuations, dtype=float)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valuations != 0, (expected_user_welfare + expected_publisher_revenue) / valuations, 0)
+
+
+def is_same_line(lower_reward, lower_revenue, upper_reward, upper_revenue):
+    """
+    Returns True where two lines of the expected utility are the same (up to LINE_TOLERANCE)
+
+    Parameters
+    ----------
+    lower_reward, lower_revenue, upper_reward, upper_revenue : ndarray
+        slopes and payments of the two lines
+
+    Returns
+    -------
+    ndarray
+        True if the lines are the same
+    """
+    return np.isclose(lower_reward, upper_reward, rtol=LINE_TOLERANCE, atol=LINE_TOLERANCE) & \
+        np.isclose(lower_revenue, upper_revenue, rtol=LINE_TOLERANCE, atol=LINE_TOLERANCE)
+
+
+def get_intersection_of_lines(lower_reward, lower_revenue, upper_reward, upper_revenue):
+    """
+    Calculates the valuation at which two lines of the expected utility intersect
+
+    Parameters
+    ----------
+    lower_reward, lower_revenue, upper_reward, upper_revenue : ndarray
+        slopes and payments of the two lines
+
+    Returns
+    -------
+    ndarray
+        valuation of the intersection, nan if the lines are parallel
+    """
+    reward_difference = upper_reward - lower_reward
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # lines of the subscription tail differ by tiny rewards and payments, their intersection is still exact
+        return np.where(reward_difference != 0, (upper_revenue - lower_revenue) / reward_difference, np.nan)
+
+
+def find_valuation_breakpoints(product_information, n_max, n_upgrade, price_strategy_type, valuation_range,
+                               quality_decay_factors, engagement_factors, is_breakdown_needed=False):
+    """
+    Finds the valuations at which the optimal policy of every user type (except valuation) changes
+
+    The expected utility of a fixed policy is linear in the valuation, hence the optimal expected utility of a user
+    arriving in a timestep is the maximum of lines and every policy is optimal on a single interval of valuations. If
+    the lines at both ends of an interval differ, the user type is solved at their intersection: either the line there
+    is one of the two (the intersection is the breakpoint) or a new policy has been found between them and both halves
+    are searched again. Every breakpoint hence costs a single solve. All user types and valuations of a step are solved
+    at once with the tensorized backward induction.
+
+    Parameters
+    ----------
+    product_information : ProductInformation
+        prices over time and product qualities
+    n_max : int
+        number of timesteps
+    n_upgrade : int
+        timestep upgrade is released
+    price_strategy_type : str
+        price strategy type, i.e., one of PriceStrategyType
+    valuation_range : list[float]
+        lower and upper bound of the valuations
+    quality_decay_factors : list[float]
+        quality decay factor of every user type
+    engagement_factors : list[float]
+        engagement factor of every user type
+    is_breakdown_needed : bool, optional
+        True: the revenue per timestep is calculated with the forward pass, default: False
+
+    Returns
+    -------
+    list[ValuationBreakpoints]
+        results at the valuations evaluated for every user type
+    """
+    number_of_types = len(quality_decay_factors)
+    tolerance = VALUATION_BREAKPOINT_RELATIVE_TOLERANCE * max(1, max(valuation_range) - min(valuation_range))
+    # per user type: valuation -> (revenue per arrival time, welfare per arrival time, breakdown per arrival time)
+    results = [{} for _ in range(number_of_types)]
+    pending = [(k, float(valuation)) for k in range(number_of_types) for valuation in valuation_range]
+
+    while pending:
+        tensorized_game = solve_user_types_tensorized(product_information, n_max, n_upgrade, price_strategy_type,
+                                                      [valuation for _, valuation in pending],
+                                                      [quality_decay_factors[k] for k, _ in pending],
+                                                      [engagement_factors[k] for k, _ in pending],
+                                                      is_forward_pass_needed=is_breakdown_needed)
+        for i, (k, valuation) in enumerate(pending):
+            breakdown = None
+            if is_breakdown_needed:
+                breakdown = (tensorized_game.revenue_base_product[i], tensorized_game.revenue_upgrade[i],
+                             tensorized_game.revenue_subscription[i])
+            results[k][valuation] = (tensorized_game.expected_publisher_revenue[i],
+                                     tensorized_game.expected_user_welfare[i], breakdown)
+
+        pending = []
+        for k in range(number_of_types):
+            valuations = np.array(sorted(results[k]))
+            if len(valuations) < 2:
+                continue
+            revenue = np.array([results[k][valuation][0] for valuation in valuations])
+            reward = get_expected_reward(valuations, revenue,
+                                         np.array([results[k][valuation][1] for valuation in valuations]))
+            lower_valuations = valuations[:-1, None]
+            upper_valuations = valuations[1:, None]
+            # parallel lines of different policies cannot both be optimal, the interval is bisected
+            candidates = get_intersection_of_lines(reward[:-1], revenue[:-1], reward[1:], revenue[1:])
+            candidates = np.where(np.isnan(candidates), (lower_valuations + upper_valuations) / 2, candidates)
+            # intersections at the ends of an interval are breakpoints which have been found
+            is_candidate = ~is_same_line(reward[:-1], revenue[:-1], reward[1:], revenue[1:]) & \
+                (upper_valuations - lower_valuations > 2 * tolerance) & \
+                (candidates > lower_valuations + tolerance) & (candidates < upper_valuations - tolerance)
+            candidates = np.sort(candidates[is_candidate])
+            # several arrival times often change their policy at the same valuation
+            is_new = np.concatenate([[True], np.diff(candidates) > tolerance])[:len(candidates)]
+            pending.extend((k, candidate) for candidate in candidates[is_new].tolist())
+
+    valuation_breakpoints = []
+    for k in range(number_of_types):
+        valuations = sorted(results[k])
+        breakdowns = [results[k][valuation][2] for valuation in valuations]
+        revenue_base_product = revenue_upgrade = revenue_subscription = None
+        if is_breakdown_needed:
+            revenue_base_product, revenue_upgrade, revenue_subscription = (
+                np.array([breakdown[i] for breakdown in breakdowns]) for i in range(3))
+        valuation_breakpoints.append(ValuationBreakpoints(
+            np.array(valuations), np.array([results[k][valuation][0] for valuation in valuations]),
+            np.array([results[k][valuation][1] for valuation in valuations]), revenue_base_product, revenue_upgrade,
+            revenue_subscription))
+    return valuation_breakpoints
+
+
+def integrate_over_valuations(valuation_breakpoints, mean, standard_deviation, valuation_range):
+    """
+    Integrates revenue and welfare of a user type exactly over the truncated normal distribution of valuations
+
+    Every interval between two valuations evaluated is split at the breakpoint of their lines (see
+    ValuationBreakpoints.get_breakpoints()). On each part, the revenue (and its breakdown per timestep) is constant and
+    the welfare is the line of the policy.
+
+    Parameters
+    ----------
+    valuation_breakpoints : ValuationBreakpoints
+        results at the valuations evaluated for a user type
+    mean : float
+        mean of the normal distribution of valuations
+    standard_deviation : float
+        standard deviation of the normal distribution of valuations (> 0)
+    valuation_range : list[float]
+        lower and upper bound the normal distribution is truncated to
+
+    Returns
+    -------
+    expected_publisher_revenue : ndarray
+        shape (n_max,), expected revenue of a user arriving in every timestep
+    expected_user_welfare : ndarray
+        shape (n_max,), expected welfare of a user arriving in every timestep
+    revenue_per_timestep : tuple[ndarray]
+        shape (n_max, n_max) each, expected revenue through base product, upgrade and subscription in every timestep of
+        a user arriving in every timestep, None if the breakdown has not been calculated
+    """
+    valuations = valuation_breakpoints.valuations
+    breakpoints = valuation_breakpoints.get_breakpoints()
+    # the interval from valuation j to j + 1 is split at the breakpoint: the policy of j below, of j + 1 above
+    lower = np.concatenate([np.broadcast_to(valuations[:-1, None], breakpoints.shape), breakpoints])
+    upper = np.concatenate([breakpoints, np.broadcast_to(valuations[1:, None], breakpoints.shape)])
+    segment_index = np.concatenate([np.arange(len(valuations) - 1), np.arange(1, len(valuations))])
+    revenue = valuation_breakpoints.expected_publisher_revenue[segment_index]
+    reward = valuation_breakpoints.expected_reward[segment_index]
+
+    # probability and first moment of the truncated normal distribution on every segment, shape (segments, n_max)
+    normalization = norm.cdf(valuation_range[1], mean, standard_deviation) - norm.cdf(valuation_range[0], mean,
+                                                                                        standard_deviation)
+    probability = (norm.cdf(upper, mean, standard_deviation) - norm.cdf(lower, mean, standard_deviation)) / \
+                  normalization
+    first_moment = (mean * (norm.cdf(upper, mean, standard_deviation) - norm.cdf(lower, mean, standard_deviation)) -
+                    standard_deviation ** 2 * (norm.pdf(upper, mean, standard_deviation) -
+                                               norm.pdf(lower, mean, standard_deviation))) / normalization
+
+    expected_publisher_revenue = (probability * revenue).sum(axis=0)
+    expected_user_welfare = (first_moment * reward - probability * revenue).sum(axis=0)
+    revenue_per_timestep = None
+    if valuation_breakpoints.revenue_base_product is not None:
+        revenue_per_timestep = tuple(
+            (probability[:, :, None] * revenue_of_product[segment_index]).sum(axis=0) for revenue_of_product in
+            [valuation_breakpoints.revenue_base_product, valuation_breakpoints.revenue_upgrade,
+             valuation_breakpoints.revenue_subscription])
+    return expected_publisher_revenue, expected_user_welfare, revenue_per_timestep
+
+
+def get_population_revenue_and_welfare_with_exact_valuations(product_information, creator,
+                                                             single_arrivals_in_first_timestep,
+                                                             single_probability_of_second_quality_decay_element,
+                                                             single_engagement_factor_short_term_user,
+                                                             single_standard_deviation_valuation,
+                                                             is_breakdown_needed=False):
+    """
+    Calculates the expected revenue and welfare of the whole population with continuous valuations
+
+    Instead of number_of_user_valuations midpoints, the valuations are integrated exactly between the breakpoints of
+    the optimal policy of every user type (except valuation). The other user type probabilities are the same as in
+    get_user_types_of_population().
+
+    Parameters
+    ----------
+    product_information : ProductInformation
+        prices over time and product qualities
+    creator: AbstractGameCreator
+        creator defined through config.ini
+    single_arrivals_in_first_timestep: int
+        x_a from thesis defining arrival distribution
+    single_probability_of_second_quality_decay_element: float
+        x_gamma from thesis defining quality decay distribution
+    single_engagement_factor_short_term_user: float
+        x_delta from thesis defining engagement factor distribution
+    single_standard_deviation_valuation: float
+        standard deviation of the truncated normal distribution of valuations
+    is_breakdown_needed : bool, optional
+        True: the revenue per timestep is integrated as well (forward pass at every valuation), default: False
+
+    Returns
+    -------
+    expected_publisher_revenue : float
+        expected revenue of the population
+    expected_user_welfare : float
+        expected welfare of the population
+    revenue_per_timestep : tuple[list[float]]
+        only if is_breakdown_needed, expected revenue through base product, upgrade and subscription in every timestep
+    """
+    valuation_mean = (creator.valuation_range[0] + creator.valuation_range[1]) / 2
+    quality_decay_factors = []
+    engagement_factors = []
+    for quality_decay_factor in creator.quality_decay_factors:
+        for engagement_factor in [single_engagement_factor_short_term_user, creator.engagement_factor_long_term_user]:
+            quality_decay_factors.append(quality_decay_factor)
+            engagement_factors.append(engagement_factor)
+
+    # all valuations equal the mean if the standard deviation is 0
+    valuation_range = creator.valuation_range if single_standard_deviation_valuation != 0 else [valuation_mean]
+    valuation_breakpoints = find_valuation_breakpoints(product_information, creator.n_max, creator.n_upgrade,
+                                                       creator.price_strategy_type, valuation_range,
+                                                       quality_decay_factors, engagement_factors, is_breakdown_needed)
+
+    expected_publisher_revenue = 0
+    expected_user_welfare = 0
+    revenue_per_timestep = np.zeros((3, creator.n_max))
+    for k in range(len(quality_decay_factors)):
+        if single_standard_deviation_valuation != 0:
+            revenue_per_arrival_time, welfare_per_arrival_time, revenue_per_arrival_time_and_timestep = \
+                integrate_over_valuations(valuation_breakpoints[k], valuation_mean,
+                                          single_standard_deviation_valuation, creator.valuation_range)
+        else:
+            revenue_per_arrival_time = valuation_breakpoints[k].expected_publisher_revenue[0]
+            welfare_per_arrival_time = valuation_breakpoints[k].expected_user_welfare[0]
+            revenue_per_arrival_time_and_timestep = None
+            if is_breakdown_needed:
+                revenue_per_arrival_time_and_timestep = (valuation_breakpoints[k].revenue_base_product[0],
+                                                         valuation_breakpoints[k].revenue_upgrade[0],
+                                                         valuation_breakpoints[k].revenue_subscription[0])
+        for arrival_time in range(1, creator.n_max + 1):
+            probability = get_probability_user_type(
+                UserType(arrival_time, engagement_factors[k], quality_decay_factors[k], None), creator,
+                single_arrivals_in_first_timestep, single_probability_of_second_quality_decay_element,
+                single_engagement_factor_short_term_user)
+            expected_publisher_revenue += probability * revenue_per_arrival_time[arrival_time - 1]
+            expected_user_welfare += probability * welfare_per_arrival_time[arrival_time - 1]
+            if is_breakdown_needed:
+                for i, revenue_of_product in enumerate(revenue_per_arrival_time_and_timestep):
+                    revenue_per_timestep[i] += probability * revenue_of_product[arrival_time - 1]
+    if is_breakdown_needed:
+        return float(expected_publisher_revenue), float(expected_user_welfare), tuple(
+            revenue_of_product.tolist() for revenue_of_product in revenue_per_timestep)
+    return float(expected_publisher_revenue), float(expected_user_welfare)
@@ -3,8 +3,10 @@ import unittest
 from src.model.game.price_strategy_type import PriceStrategyType
 from src.model.publisher.productinformation import ProductInformation
 from src.model.user.user_action import create_all_possible_user_actions, UserAction
+from src.model.game.game import Game
 from src.model.user.user_functions import get_transition_probability, get_preferred_action_if_deliver_equal_utility, \
-    get_normalized_immediate_reward, get_immediate_payment
+    get_normalized_immediate_reward, get_immediate_payment, get_successor_states, \
+    get_expected_utility_and_payment_of_subscription_tail, get_allowed_user_actions, SUBSCRIPTION_TAIL_CACHE_SIZE
 from src.model.user.user_state import create_all_possible_user_states, UserState
 from src.model.user.user_type import UserType
 
@@ -202,6 +204,67 @@ class TestUserFunctions(unittest.TestCase):
                          get_transition_probability(timestep, self.n_upgrade, self.user_states[3], self.user_states[0],
                                                     self.user_actions[0], self.user_type, 0.5))
 
+    def test_successor_states(self):
+        for quality_upgrade in [0, 0.5]:
+            product_information = ProductInformation([10] * 12, [3] * 12, [5] * 12, [1, quality_upgrade])
+            game = Game(product_information, self.user_type, 12, self.n_upgrade, PriceStrategyType.BOTH)
+            for next_timestep in range(2, 13):
+                for current_user_state in self.user_states:
+                    for user_action in self.user_actions:
+                        successor_states = dict(get_successor_states(next_timestep, current_user_state, user_action,
+                                                                     game))
+                        # at most two successors with a transition probability > 0
+                        self.assertLessEqual(len(successor_states), 2)
+                        for next_user_state_index, next_user_state in enumerate(self.user_states):
+                            self.assertEqual(get_transition_probability(next_timestep, self.n_upgrade,
+                                                                        next_user_state, current_user_state,
+                                                                        user_action, self.user_type, quality_upgrade),
+                                             successor_states.get(next_user_state_index, 0))
+
+    def test_expected_utility_and_payment_of_subscription_tail(self):
+        n_max = 12
+        for valuation in [0, 10, 25, 300]:
+            for quality_decay_factor in [0.5, 0.9, 0.999]:
+                for engagement_factor in [0, 0.5, 1]:
+                    for subscription_price in [0, 1, 22]:
+                        for quality_base_product, quality_upgrade in [(1, 0.5), (0, 0.5), (1.7, 0)]:
+                            expected_utility, expected_payment = self.get_subscription_tail_step_by_step(
+                                valuation, quality_decay_factor, engagement_factor, subscription_price, n_max,
+                                self.n_upgrade, quality_base_product, quality_upgrade)
+                            utility, payment = get_expected_utility_and_payment_of_subscription_tail(
+                                valuation, quality_decay_factor, engagement_factor, subscription_price, n_max,
+                                self.n_upgrade, quality_base_product, quality_upgrade)
+                            self.assertAlmostEqual(expected_utility, utility, delta=1e-9 * max(1, expected_utility))
+                            self.assertAlmostEqual(expected_payment, payment, delta=1e-9 * max(1, expected_payment))
+
+        # the last subscribed timestep has an immediate utility of exactly 0
+        self.assertEqual(get_expected_utility_and_payment_of_subscription_tail(20, 0.5, 0.5, 5, 1, 1, 1, 0),
+                         (2.5, 2.5 + 5 * 0.5 ** 2))
+
+        # continuous valuations and prices do not grow the cache without bound
+        for i in range(2 * SUBSCRIPTION_TAIL_CACHE_SIZE):
+            get_expected_utility_and_payment_of_subscription_tail(25 + i / 1000, 0.9, 0.5, 9.5, n_max, self.n_upgrade,
+                                                                  1, 0.5)
+        self.assertEqual(SUBSCRIPTION_TAIL_CACHE_SIZE,
+                         get_expected_utility_and_payment_of_subscription_tail.cache_info().currsize)
+
+    @staticmethod
+    def get_subscription_tail_step_by_step(valuation, quality_decay_factor, engagement_factor, subscription_price,
+                                           n_max, n_upgrade, quality_base_product, quality_upgrade):
+        future_utility = 0
+        future_payment = 0
+        immediate_utility = 1
+        timestep = n_max + 1
+        while immediate_utility > 0:
+            quality_factor = quality_decay_factor ** (timestep - 1) * quality_base_product + \
+                             quality_decay_factor ** (timestep - n_upgrade) * quality_upgrade
+            immediate_utility = quality_factor * valuation - subscription_price
+            if immediate_utility >= 0:
+                future_utility += immediate_utility * engagement_factor ** (timestep - n_max)
+                future_payment += subscription_price * engagement_factor ** (timestep - n_max)
+            timestep += 1
+        return future_utility, future_payment
+
     def test_get_preferred_action_if_deliver_equal_utility(self):
         user_action_1 = UserAction(0, [0, 0])
         user_action_2 = UserAction(0, [0, 1])
@@ -259,6 +322,27 @@ class TestUserFunctions(unittest.TestCase):
         for action in [user_action_4]:
             self.assertEqual(get_preferred_action_if_deliver_equal_utility(user_action_7, action), action)
 
+    def test_allowed_user_actions(self):
+        user_states = create_all_possible_user_states(PriceStrategyType.BOTH)
+        for is_upgrade_released in [True, False]:
+            allowed_user_actions = get_allowed_user_actions(PriceStrategyType.BOTH, is_upgrade_released)
+            # no demand and no ownership: everything except the upgrade alone (and the upgrade before release)
+            self.assertEqual([(0, 0, 0), (0, 1, 0), (0, 1, 1), (1, 0, 0), (1, 1, 0)] if is_upgrade_released else
+                             [(0, 0, 0), (0, 1, 0), (1, 0, 0), (1, 1, 0)],
+                             [(user_action.subscribe_action, user_action.buy_action.base_product,
+                               user_action.buy_action.upgrade) for user_action in
+                              allowed_user_actions[user_states[0].code]])
+            # base product and upgrade owned: do nothing
+            self.assertEqual([(0, 0, 0)], [(user_action.subscribe_action, user_action.buy_action.base_product,
+                                            user_action.buy_action.upgrade) for user_action in
+                                           allowed_user_actions[user_states[5].code]])
+            # base product owned
+            self.assertEqual([(0, 0, 0), (0, 0, 1), (1, 0, 0), (1, 0, 1)] if is_upgrade_released else
+                             [(0, 0, 0), (1, 0, 0)],
+                             [(user_action.subscribe_action, user_action.buy_action.base_product,
+                               user_action.buy_action.upgrade) for user_action in
+                              allowed_user_actions[user_states[4].code]])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,8 @@
 import unittest
 
-from src.model.user.user_action import BuyAction
-from src.model.user.user_state import get_max_of_buying_and_ownership, Ownership
+from src.model.game.price_strategy_type import PriceStrategyType
+from src.model.user.user_action import BuyAction, create_all_possible_user_actions
+from src.model.user.user_state import get_max_of_buying_and_ownership, Ownership, create_all_possible_user_states
 
 
 class TestUserState(unittest.TestCase):
@@ -16,6 +17,17 @@ class TestUserState(unittest.TestCase):
         self.assertEqual(1, get_max_of_buying_and_ownership(BuyAction(0, 0), Ownership(0, 1)).upgrade)
         self.assertEqual(1, get_max_of_buying_and_ownership(BuyAction(0, 1), Ownership(0, 1)).upgrade)
 
+    def test_codes_are_unique(self):
+        user_states = create_all_possible_user_states(PriceStrategyType.BOTH)
+        self.assertEqual(len(user_states), len({user_state.code for user_state in user_states}))
+        for user_state in user_states:
+            self.assertEqual(4 * user_state.demand + 2 * user_state.ownership.base_product +
+                             user_state.ownership.upgrade, user_state.code)
+
+        user_actions = create_all_possible_user_actions(PriceStrategyType.BOTH)
+        self.assertEqual(len(user_actions), len({user_action.code for user_action in user_actions}))
+        self.assertEqual(len(user_actions), len({user_action.preference_rank for user_action in user_actions}))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,19 @@
 import unittest
 
-from src.model.game.game import create_game
+from src.model.game.game import create_game, get_game_from_pool
 from src.model.game.price_strategy_type import PriceStrategyType
 from src.model.publisher.productinformation import ProductInformation
 from src.model.user.user_type import UserType
 from src.numerical_framework.backward_induction.backward_induction import calculate_optimal_user_actions, \
-    calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare
+    calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare, \
+    calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare_of_arrival_mixture, \
+    calculate_publisher_revenue_and_user_welfare_from_backward_induction, get_revenue_per_timestep, \
+    calculate_optimal_user_actions_with_suffix_cache, get_backward_induction_results_of_population, \
+    get_backward_induction_result_of_user_type, get_user_types_of_populations, solve_distinct_user_types, \
+    get_backward_induction_results_of_population_from_solved_user_types
+from src.numerical_framework.backward_induction.reweighting import get_distinct_user_types
+from src.numerical_framework.helpers.framework_creators import BackwardInductionCreator
+from src.numerical_framework.helpers.parallel_helper import map_in_parallel
 
 
 class MyTestCase(unittest.TestCase):
@@ -184,6 +192,122 @@ class MyTestCase(unittest.TestCase):
                                price_strategy)
             self.compare_calculated_with_expected_values(game, expected_revenue, expected_welfare, arrival_time)
 
+    def test_arrival_mixture(self):
+        base_price = [45.82, 45.82, 45.82, 45.82, 45.82, 45.82, 21.8, 21.8, 21.8, 21.8, 21.8, 21.8]
+        upgrade_price = [18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06]
+        subscription_price = [14.66, 14.66, 14.66, 14.66, 14.66, 14.66, 14.66, 14.66, 14.66, 14.66, 14.66, 14.66]
+        product_information = ProductInformation(base_price, upgrade_price, subscription_price, [1, 0.5])
+        n_max = 12
+        probabilities_arrival_time = [0.3, 0.1, 0, 0.05, 0.05, 0.1, 0.1, 0.1, 0, 0.1, 0.05, 0.05]
+        for price_strategy in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH]:
+            user_type = UserType(None, 0.9, 0.9, 42)
+            mixture_game = create_game(product_information, user_type, n_max, 7, price_strategy)
+            calculate_optimal_user_actions(mixture_game)
+            calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare_of_arrival_mixture(
+                mixture_game, probabilities_arrival_time)
+            mixture_revenue_per_timestep = get_revenue_per_timestep(mixture_game)
+
+            # weighted results of the forward passes for every arrival time
+            expected_revenue = 0
+            expected_welfare = 0
+            expected_revenue_per_timestep = [[0] * n_max for _ in range(3)]
+            for arrival_time in range(1, n_max + 1):
+                game = create_game(product_information, UserType(arrival_time, 0.9, 0.9, 42), n_max, 7,
+                                   price_strategy)
+                calculate_optimal_user_actions(game)
+                calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game)
+                expected_revenue += game.expected_publisher_revenue * probabilities_arrival_time[arrival_time - 1]
+                expected_welfare += game.expected_user_welfare * probabilities_arrival_time[arrival_time - 1]
+                for revenue_type, revenue_per_timestep in enumerate(get_revenue_per_timestep(game)):
+                    for t in range(n_max):
+                        expected_revenue_per_timestep[revenue_type][t] += \
+                            revenue_per_timestep[t] * probabilities_arrival_time[arrival_time - 1]
+
+            self.assertAlmostEqual(expected_revenue, mixture_game.expected_publisher_revenue)
+            self.assertAlmostEqual(expected_welfare, mixture_game.expected_user_welfare)
+            for revenue_type in range(3):
+                for t in range(n_max):
+                    self.assertAlmostEqual(expected_revenue_per_timestep[revenue_type][t],
+                                           mixture_revenue_per_timestep[revenue_type][t])
+
+    def test_revenue_from_backward_induction(self):
+        base_price = [45.82, 45.82, 45.82, 45.82, 45.82, 45.82, 21.8, 21.8, 21.8, 21.8, 21.8, 21.8]
+        upgrade_price = [18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06]
+        subscription_price = [14.66, 14.66, 14.66, 14.66, 14.66, 14.66, 9, 9, 9, 9, 9, 9]
+        product_information = ProductInformation(base_price, upgrade_price, subscription_price, [1, 0.5])
+        n_max = 12
+        probabilities_arrival_time = [0.3, 0.1, 0, 0.05, 0.05, 0.1, 0.1, 0.1, 0, 0.1, 0.05, 0.05]
+        for price_strategy in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH,
+                               PriceStrategyType.BOTH_BUY]:
+            for valuation in [0, 10, 42]:
+                user_type = UserType(None, 0.5, 0.9, valuation)
+                expected_game = create_game(product_information, user_type, n_max, 7, price_strategy)
+                calculate_optimal_user_actions(expected_game)
+                calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare_of_arrival_mixture(
+                    expected_game, probabilities_arrival_time)
+                calculated_game = create_game(product_information, user_type, n_max, 7, price_strategy)
+                calculate_optimal_user_actions(calculated_game)
+                calculate_publisher_revenue_and_user_welfare_from_backward_induction(calculated_game,
+                                                                                     probabilities_arrival_time)
+
+                self.assertAlmostEqual(expected_game.expected_publisher_revenue,
+                                       calculated_game.expected_publisher_revenue)
+                self.assertAlmostEqual(expected_game.expected_user_welfare, calculated_game.expected_user_welfare)
+
+    def test_game_from_pool(self):
+        base_price = [45.82, 45.82, 45.82, 45.82, 45.82, 45.82, 21.8, 21.8, 21.8, 21.8, 21.8, 21.8]
+        upgrade_price = [18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06]
+        product_informations = [ProductInformation(base_price, upgrade_price, [14.66] * 12, [1, 0.5]),
+                                ProductInformation(base_price, upgrade_price, [9] * 12, [1, 0.5])]
+        # the same game is re-targeted to every user type, prices and n_upgrade
+        for price_strategy in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH]:
+            for product_information in product_informations:
+                for n_upgrade in [1, 7]:
+                    for user_type in [UserType(1, 0.9, 0.9, 42), UserType(4, 0.5, 0.85, 10)]:
+                        expected_game = create_game(product_information, user_type, 12, n_upgrade, price_strategy)
+                        calculate_optimal_user_actions(expected_game)
+                        calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(
+                            expected_game)
+                        calculated_game = get_game_from_pool(product_information, user_type, 12, n_upgrade,
+                                                             price_strategy)
+                        calculate_optimal_user_actions(calculated_game)
+                        calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(
+                            calculated_game)
+                        self.assertEqual(expected_game.expected_publisher_revenue,
+                                         calculated_game.expected_publisher_revenue)
+                        self.assertEqual(expected_game.expected_user_welfare, calculated_game.expected_user_welfare)
+                        for t in range(12):
+                            for expected_state, calculated_state in zip(expected_game.user_states[t],
+                                                                        calculated_game.user_states[t]):
+                                self.assertEqual(expected_state.probability_state_is_reached,
+                                                 calculated_state.probability_state_is_reached)
+
+    def test_suffix_cache(self):
+        base_price = [45.82, 45.82, 45.82, 45.82, 45.82, 45.82, 21.8, 21.8, 21.8, 21.8, 21.8, 21.8]
+        upgrade_price = [18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06]
+        subscription_price = [14.66, 14.66, 14.66, 14.66, 14.66, 14.66, 9, 9, 9, 9, 9, 9]
+        # prices only differing in early timesteps share the cached results of the late timesteps
+        product_informations = [
+            ProductInformation(base_price, upgrade_price, subscription_price, [1, 0.5]),
+            ProductInformation([30] * 3 + base_price[3:], upgrade_price, subscription_price, [1, 0.5]),
+            ProductInformation(base_price, upgrade_price, [5] * 8 + subscription_price[8:], [1, 0.5]),
+            ProductInformation(base_price[:11] + [20], upgrade_price, subscription_price, [1, 0.5])]
+        for price_strategy in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH]:
+            for product_information in product_informations + product_informations:
+                user_type = UserType(2, 0.5, 0.9, 42)
+                expected_game = create_game(product_information, user_type, 12, 7, price_strategy)
+                calculate_optimal_user_actions(expected_game)
+                calculated_game = create_game(product_information, user_type, 12, 7, price_strategy)
+                calculate_optimal_user_actions_with_suffix_cache(calculated_game)
+                for t in range(12):
+                    for expected_state, calculated_state in zip(expected_game.user_states[t],
+                                                                calculated_game.user_states[t]):
+                        self.assertIs(expected_state.best_action, calculated_state.best_action)
+                        self.assertEqual(expected_state.immediate_payment, calculated_state.immediate_payment)
+                        self.assertEqual(expected_state.expected_payment_in_future,
+                                         calculated_state.expected_payment_in_future)
+                        self.assertEqual(expected_state.expected_utility, calculated_state.expected_utility)
+
     def compare_calculated_with_expected_values(self, game, expected_revenue, expected_welfare, arrival_time):
         calculate_optimal_user_actions(game)
         calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(game)
@@ -191,6 +315,93 @@ class MyTestCase(unittest.TestCase):
                          round(expected_revenue[arrival_time - 1], 5))
         self.assertEqual(round(game.expected_user_welfare, 5), round(expected_welfare[arrival_time - 1], 5))
 
+    def test_parallel_sweep(self):
+        base_price = [45.82, 45.82, 45.82, 45.82, 45.82, 45.82, 21.8, 21.8, 21.8, 21.8, 21.8, 21.8]
+        upgrade_price = [18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06]
+        subscription_price = [14.66, 14.66, 14.66, 14.66, 14.66, 14.66, 9, 9, 9, 9, 9, 9]
+        backward_induction_creator = BackwardInductionCreator()
+        backward_induction_creator.product_information = ProductInformation(base_price, upgrade_price,
+                                                                            subscription_price, [1, 0.5])
+        backward_induction_creator.price_strategy_type = PriceStrategyType.BOTH
+        backward_induction_creator.n_max = 12
+        backward_induction_creator.n_upgrade = 7
+        backward_induction_creator.quality_decay_factors = [0.85, 0.9, 0.95]
+        backward_induction_creator.engagement_factor_long_term_user = 0.9
+        backward_induction_creator.probability_short_term_user = 0.8
+        backward_induction_creator.valuation_range = [0, 50]
+        backward_induction_creator.print_user_types_combined = True
+        backward_induction_creator.print_single_user_types = True
+        population_parameters = [(3, 5, 0.8, 0.5, 10), (2, 1, 0.2, 0.3, 5), (3, 12, 0.5, 0.5, 0)]
+        user_type_parameters = [(valuation, arrival_time, 0.5, 0.9) for valuation in [10, 42] for arrival_time in
+                                [1, 6, 12]]
+
+        # the results of the workers are in the same order as without workers
+        for function, arguments in [(get_backward_induction_results_of_population, population_parameters),
+                                    (get_backward_induction_result_of_user_type, user_type_parameters)]:
+            expected_results = list(map_in_parallel(function, backward_induction_creator, arguments, 1))
+            calculated_results = list(map_in_parallel(function, backward_induction_creator, arguments, 2))
+            self.assertEqual(len(arguments), len(calculated_results))
+            for expected_result, calculated_result in zip(expected_results, calculated_results):
+                if function == get_backward_induction_result_of_user_type:
+                    expected_result, calculated_result = [expected_result], [calculated_result]
+                self.assertEqual(len(expected_result), len(calculated_result))
+                for expected_row, calculated_row in zip(expected_result, calculated_result):
+                    self.assertEqual(expected_row.arrival_time, calculated_row.arrival_time)
+                    self.assertEqual(expected_row.valuation, calculated_row.valuation)
+                    self.assertEqual(expected_row.expected_publisher_revenue,
+                                     calculated_row.expected_publisher_revenue)
+                    self.assertEqual(expected_row.expected_user_welfare, calculated_row.expected_user_welfare)
+                    self.assertEqual(expected_row.revenue_subscription, calculated_row.revenue_subscription)
+
+    def test_reuse_solved_user_types(self):
+        base_price = [45.82, 45.82, 45.82, 45.82, 45.82, 45.82, 21.8, 21.8, 21.8, 21.8, 21.8, 21.8]
+        upgrade_price = [18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06, 18.06]
+        subscription_price = [14.66, 14.66, 14.66, 14.66, 14.66, 14.66, 9, 9, 9, 9, 9, 9]
+        backward_induction_creator = BackwardInductionCreator()
+        backward_induction_creator.product_information = ProductInformation(base_price, upgrade_price,
+                                                                            subscription_price, [1, 0.5])
+        backward_induction_creator.price_strategy_type = PriceStrategyType.BOTH
+        backward_induction_creator.n_max = 12
+        backward_induction_creator.n_upgrade = 7
+        backward_induction_creator.quality_decay_factors = [0.85, 0.9, 0.95]
+        backward_induction_creator.engagement_factor_long_term_user = 0.9
+        backward_induction_creator.probability_short_term_user = 0.8
+        backward_induction_creator.valuation_range = [0, 50]
+        backward_induction_creator.print_user_types_combined = True
+        backward_induction_creator.print_single_user_types = True
+        # populations sharing user types with different arrivals, quality decay and valuation distributions
+        population_parameters = [(3, 5, 0.8, 0.5, 10), (3, 1, 0.2, 0.5, 5), (3, 12, 0.5, 0.5, 0),
+                                 (2, 3, 0.5, 0.3, 10), (3, 5, 0.8, 0.3, 10)]
+
+        # the results of the solved user types are the same as of solving every population
+        for use_tensorized_backward_induction in [False, True]:
+            backward_induction_creator.use_tensorized_backward_induction = use_tensorized_backward_induction
+            user_types_of_populations = get_user_types_of_populations(backward_induction_creator,
+                                                                      population_parameters)
+            user_types = get_distinct_user_types([user_types[:3] for user_types in user_types_of_populations])
+            self.assertLess(len(user_types), sum(len(user_types[0]) for user_types in user_types_of_populations))
+            solved_user_types = solve_distinct_user_types(backward_induction_creator, user_types)
+            for single_population_parameters, user_types in zip(population_parameters, user_types_of_populations):
+                expected_results = get_backward_induction_results_of_population(backward_induction_creator,
+                                                                                single_population_parameters)
+                calculated_results = get_backward_induction_results_of_population_from_solved_user_types(
+                    backward_induction_creator, single_population_parameters, user_types, solved_user_types)
+                self.assertEqual(len(expected_results), len(calculated_results))
+                for expected_row, calculated_row in zip(expected_results, calculated_results):
+                    self.assertEqual(expected_row.arrival_time, calculated_row.arrival_time)
+                    self.assertEqual(expected_row.valuation, calculated_row.valuation)
+                    self.assertEqual(expected_row.number_of_user_valuations, calculated_row.number_of_user_valuations)
+                    self.assertAlmostEqual(expected_row.probability_user_type, calculated_row.probability_user_type)
+                    self.assertAlmostEqual(expected_row.expected_publisher_revenue,
+                                           calculated_row.expected_publisher_revenue)
+                    self.assertAlmostEqual(expected_row.expected_user_welfare, calculated_row.expected_user_welfare)
+                    for expected_revenue, calculated_revenue in zip(
+                            expected_row.revenue_base_product + expected_row.revenue_upgrade +
+                            expected_row.revenue_subscription,
+                            calculated_row.revenue_base_product + calculated_row.revenue_upgrade +
+                            calculated_row.revenue_subscription):
+                        self.assertAlmostEqual(expected_revenue, calculated_revenue)
+
 
 if __name__ == '__main__':
     unittest.main()
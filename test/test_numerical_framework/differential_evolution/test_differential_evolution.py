@@ -1,7 +1,26 @@
+import configparser
+import glob
+import os
+import pickle
+import tempfile
+import time
 import unittest
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+
+import main
 
 from src.model.game.price_strategy_type import PriceStrategyType
-from src.numerical_framework.differential_evolution.differential_evolution import create_bounds, get_price_vectors
+from src.model.user.user_type import create_user_type_population
+from src.numerical_framework.differential_evolution.differential_evolution import create_bounds, get_price_vectors, \
+    differential_evolution_maximize_revenue, run_differential_evolution, \
+    objective_maximize_revenue, objective_maximize_revenue_vectorized, get_solution_details
+from src.numerical_framework.differential_evolution.checkpoint import find_latest_checkpoint, write_checkpoint, \
+    get_study_key
+from src.numerical_framework.differential_evolution.evaluation_cache import EVALUATION_CACHE, \
+    get_evaluation_cache_counters, reset_evaluation_cache_counters
 from src.numerical_framework.helpers.framework_creators import DifferentialEvolutionCreator
 from src.numerical_framework.helpers.high_price import HighPrice
 
@@ -195,5 +214,335 @@ class TestBoundsAndPriceVectorCreation(unittest.TestCase):
             self.assertEqual(price_upgrade[i], 5)
 
 
+class TestVectorizedObjective(unittest.TestCase):
+    def setUp(self):
+        self.differential_evolution_creator = DifferentialEvolutionCreator()
+        self.differential_evolution_creator.n_max = 12
+        self.differential_evolution_creator.n_upgrade = 7
+        self.differential_evolution_creator.quality_decay_factors = [0.85, 0.9, 0.95]
+        self.differential_evolution_creator.engagement_factor_long_term_user = 0.9
+        self.differential_evolution_creator.probability_short_term_user = 0.8
+        self.differential_evolution_creator.valuation_range = [0, 50]
+        self.differential_evolution_creator.product_quality_base_product = 1
+        self.differential_evolution_creator.product_quality_upgrade = 0.5
+        self.differential_evolution_creator.base_price_for_both_buy = [50 - i for i in range(12)]
+        self.differential_evolution_creator.upgrade_price_for_both_buy = [30 - i for i in range(12)]
+        self.differential_evolution_creator.user_valuation = 25
+        self.differential_evolution_creator.user_arrival_time = 3
+        self.differential_evolution_creator.user_quality_decay_factor = 0.9
+        self.differential_evolution_creator.user_engagement_factor = 0.5
+        # no evaluations are written to a file
+        self.differential_evolution_creator.print_result_every_x_iterations = 1000000
+        self.differential_evolution_creator.print_result_for_the_first_x_iterations = 0
+        user_type_population = create_user_type_population(self.differential_evolution_creator, 4, 5, 0.8, 0.5, 10)
+        self.arguments = (self.differential_evolution_creator, None, 4, 5, 0.8, 0.5, 10, user_type_population)
+
+    def test_same_results_as_objective(self):
+        random_number_generator = np.random.default_rng(0)
+        for price_strategy_type in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH,
+                                    PriceStrategyType.BOTH_BUY]:
+            for evolution_with_all_user_types_from_game in [True, False]:
+                self.differential_evolution_creator.price_strategy_type = price_strategy_type
+                self.differential_evolution_creator.evolution_with_all_user_types_from_game = \
+                    evolution_with_all_user_types_from_game
+                bounds = np.array(create_bounds(self.differential_evolution_creator), dtype=float)
+                prices = bounds[:, 0:1] + random_number_generator.random((len(bounds), 5)) * (
+                        bounds[:, 1:2] - bounds[:, 0:1])
+
+                revenue = objective_maximize_revenue_vectorized(prices, *self.arguments)
+                self.assertEqual((5,), revenue.shape)
+                for i in range(5):
+                    self.assertAlmostEqual(objective_maximize_revenue(prices[:, i], *self.arguments), revenue[i])
+
+    def test_same_results_with_revenue_from_backward_induction(self):
+        random_number_generator = np.random.default_rng(1)
+        for price_strategy_type in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH,
+                                    PriceStrategyType.BOTH_BUY]:
+            for evolution_with_all_user_types_from_game in [True, False]:
+                self.differential_evolution_creator.price_strategy_type = price_strategy_type
+                self.differential_evolution_creator.evolution_with_all_user_types_from_game = \
+                    evolution_with_all_user_types_from_game
+                bounds = np.array(create_bounds(self.differential_evolution_creator), dtype=float)
+                prices = bounds[:, 0:1] + random_number_generator.random((len(bounds), 3)) * (
+                        bounds[:, 1:2] - bounds[:, 0:1])
+
+                self.differential_evolution_creator.revenue_from_backward_induction = False
+                expected_revenue = objective_maximize_revenue_vectorized(prices, *self.arguments)
+                self.differential_evolution_creator.revenue_from_backward_induction = True
+                np.testing.assert_allclose(objective_maximize_revenue_vectorized(prices, *self.arguments),
+                                           expected_revenue, rtol=1e-12)
+                for use_tensorized_backward_induction in [True, False]:
+                    self.differential_evolution_creator.use_tensorized_backward_induction = \
+                        use_tensorized_backward_induction
+                    for i in range(3):
+                        self.assertAlmostEqual(expected_revenue[i],
+                                               objective_maximize_revenue(prices[:, i], *self.arguments))
+
+
+    def test_exact_valuation_integration(self):
+        self.differential_evolution_creator.price_strategy_type = PriceStrategyType.BOTH
+        self.differential_evolution_creator.evolution_with_all_user_types_from_game = True
+        self.differential_evolution_creator.exact_valuation_integration = True
+        bounds = np.array(create_bounds(self.differential_evolution_creator), dtype=float)
+        prices = bounds[:, 0:1] + np.random.default_rng(2).random((len(bounds), 2)) * (bounds[:, 1:2] - bounds[:, 0:1])
+
+        revenue = objective_maximize_revenue_vectorized(prices, *self.arguments)
+        for i in range(2):
+            self.assertAlmostEqual(objective_maximize_revenue(prices[:, i], *self.arguments), revenue[i])
+
+    def test_evaluation_cache(self):
+        self.differential_evolution_creator.price_strategy_type = PriceStrategyType.BOTH
+        bounds = np.array(create_bounds(self.differential_evolution_creator), dtype=float)
+        prices = bounds[:, 0:1] + np.random.default_rng(3).random((len(bounds), 3)) * (bounds[:, 1:2] - bounds[:, 0:1])
+        for evolution_with_all_user_types_from_game in [True, False]:
+            self.differential_evolution_creator.evolution_with_all_user_types_from_game = \
+                evolution_with_all_user_types_from_game
+            expected_revenue = objective_maximize_revenue_vectorized(prices, *self.arguments)
+            expected_solution_details = get_solution_details(prices[:, 0], *self.arguments)
+
+            EVALUATION_CACHE.clear()
+            reset_evaluation_cache_counters()
+            self.differential_evolution_creator.use_evaluation_cache = True
+            self.differential_evolution_creator.evaluation_cache_tolerance = 0.001
+            np.testing.assert_allclose(objective_maximize_revenue_vectorized(prices, *self.arguments),
+                                       expected_revenue)
+            self.assertEqual((0, 3), get_evaluation_cache_counters())
+            # prices closer than the tolerance share the evaluation
+            for i in range(3):
+                self.assertAlmostEqual(expected_revenue[i],
+                                       objective_maximize_revenue(prices[:, i] + 1e-9, *self.arguments))
+            self.assertEqual((3, 3), get_evaluation_cache_counters())
+            for _ in range(2):
+                solution_details = get_solution_details(prices[:, 0], *self.arguments)
+                for expected_detail, detail in zip(expected_solution_details, solution_details):
+                    np.testing.assert_allclose(expected_detail, detail)
+            self.assertEqual((5, 3), get_evaluation_cache_counters())
+            self.differential_evolution_creator.use_evaluation_cache = False
+
+    def test_evaluation_of_solution_from_solution_details(self):
+        self.differential_evolution_creator.price_strategy_type = PriceStrategyType.SUB
+        self.differential_evolution_creator.evolution_with_all_user_types_from_game = False
+        self.differential_evolution_creator.use_vectorized_objective = True
+        self.differential_evolution_creator.use_evaluation_cache = True
+        run_parameters = (1, None, None, None, None, None, "differential_evolution", "best1bin", 5)
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            self.differential_evolution_creator.path_to_folder = path_to_folder
+            self.differential_evolution_creator.name_main_file_without_ending = "main"
+            EVALUATION_CACHE.clear()
+            result = run_differential_evolution(self.differential_evolution_creator, run_parameters)
+            file_name, = os.listdir(os.path.join(path_to_folder, "main"))
+            with open(os.path.join(path_to_folder, "main", file_name)) as run_log:
+                lines = run_log.read().splitlines()
+        self.differential_evolution_creator.use_evaluation_cache = False
+        self.differential_evolution_creator.use_vectorized_objective = False
+
+        # the solution is not evaluated again after the details have been calculated
+        evaluation_line, = [line for line in lines if line.startswith("Solution: ")]
+        self.assertAlmostEqual(-result.expected_publisher_revenue, float(evaluation_line.split("Evaluation: ")[1]))
+        # all evaluations of the vectorized objective are looked up in this process
+        cache_line, = [line for line in lines if "Evaluation cache hits: " in line]
+        self.assertNotIn("main process only", cache_line)
+
+    def test_evaluation_cache_around_worker_processes(self):
+        self.differential_evolution_creator.price_strategy_type = PriceStrategyType.SUB
+        self.differential_evolution_creator.evolution_with_all_user_types_from_game = False
+        self.differential_evolution_creator.use_evaluation_cache = True
+        run_parameters = (1, None, None, None, None, None, "differential_evolution", "best1bin", 5)
+        EVALUATION_CACHE.clear()
+        reset_evaluation_cache_counters()
+        cache_lines = []
+        evaluation_cache_keys_of_runs = []
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            self.differential_evolution_creator.path_to_folder = path_to_folder
+            self.differential_evolution_creator.name_main_file_without_ending = "main"
+            # the candidates are evaluated in two worker processes
+            with mock.patch("src.numerical_framework.differential_evolution.differential_evolution."
+                            "get_number_of_processes", return_value=2):
+                for _ in range(2):
+                    result = run_differential_evolution(self.differential_evolution_creator, run_parameters)
+                    file_name, = [file for file in os.listdir(os.path.join(path_to_folder, "main"))
+                                  if file.endswith(".txt") and file not in [line[0] for line in cache_lines]]
+                    with open(os.path.join(path_to_folder, "main", file_name)) as run_log:
+                        cache_line, = [line for line in run_log.read().splitlines()
+                                       if "Evaluation cache hits: " in line]
+                    cache_lines.append((file_name, cache_line, result.number_of_evaluations))
+                    evaluation_cache_keys_of_runs.append(set(EVALUATION_CACHE))
+                    # runs must differ in their .txt file name
+                    time.sleep(1)
+        self.differential_evolution_creator.use_evaluation_cache = False
+
+        for file_name, cache_line, number_of_evaluations in cache_lines:
+            hits = int(cache_line.split("Evaluation cache hits: ")[1].split(",")[0])
+            misses = int(cache_line.split("Evaluation cache misses: ")[1])
+            # all evaluations of the workers and the solution details are looked up in this process
+            self.assertEqual(number_of_evaluations + 1, hits + misses)
+        # the evaluations of the first run are cached in this process and kept for the second run
+        self.assertGreater(len(evaluation_cache_keys_of_runs[0]), 0)
+        self.assertTrue(evaluation_cache_keys_of_runs[0] <= evaluation_cache_keys_of_runs[1])
+
+
+class TestConcurrentRuns(unittest.TestCase):
+    def test_concurrent_runs(self):
+        differential_evolution_creator = DifferentialEvolutionCreator()
+        differential_evolution_creator.n_max = 12
+        differential_evolution_creator.n_upgrade = 7
+        differential_evolution_creator.price_strategy_type = PriceStrategyType.SUB
+        differential_evolution_creator.evolution_with_all_user_types_from_game = False
+        differential_evolution_creator.product_quality_base_product = 1
+        differential_evolution_creator.product_quality_upgrade = 0.5
+        differential_evolution_creator.user_valuation = 25
+        differential_evolution_creator.user_arrival_time = 3
+        differential_evolution_creator.user_quality_decay_factor = 0.9
+        differential_evolution_creator.user_engagement_factor = 0.5
+        differential_evolution_creator.print_result_every_x_iterations = 1000000
+        differential_evolution_creator.print_result_for_the_first_x_iterations = 0
+        differential_evolution_creator.use_vectorized_objective = True
+        differential_evolution_creator.differential_evolution_strategies = ["best1bin"]
+        differential_evolution_creator.popsizes = [5, 6]
+        differential_evolution_creator.number_of_iterations_per_evolution_type = 2
+        differential_evolution_creator.number_of_concurrent_runs = 2
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            differential_evolution_creator.path_to_folder = path_to_folder
+            differential_evolution_creator.path_to_main_file = os.path.join(path_to_folder, "main.csv")
+            differential_evolution_creator.name_main_file_without_ending = "main"
+            differential_evolution_maximize_revenue(differential_evolution_creator)
+
+            # every run has its own .txt file and a row in the main .csv file
+            self.assertEqual(4, len(os.listdir(os.path.join(path_to_folder, "main"))))
+            with open(differential_evolution_creator.path_to_main_file) as main_file:
+                self.assertEqual(4, len(main_file.readlines()))
+
+
+class TestCheckpoint(unittest.TestCase):
+    def test_checkpoint_and_resume(self):
+        differential_evolution_creator = DifferentialEvolutionCreator()
+        differential_evolution_creator.n_max = 12
+        differential_evolution_creator.n_upgrade = 7
+        differential_evolution_creator.price_strategy_type = PriceStrategyType.SUB
+        differential_evolution_creator.evolution_with_all_user_types_from_game = False
+        differential_evolution_creator.product_quality_base_product = 1
+        differential_evolution_creator.product_quality_upgrade = 0.5
+        differential_evolution_creator.user_valuation = 25
+        differential_evolution_creator.user_arrival_time = 3
+        differential_evolution_creator.user_quality_decay_factor = 0.9
+        differential_evolution_creator.user_engagement_factor = 0.5
+        differential_evolution_creator.print_result_every_x_iterations = 1000000
+        differential_evolution_creator.print_result_for_the_first_x_iterations = 0
+        differential_evolution_creator.use_vectorized_objective = True
+        differential_evolution_creator.checkpoint_every_x_generations = 2
+        run_parameters = (1, None, None, None, None, None, "differential_evolution", "best1bin", 5)
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            differential_evolution_creator.path_to_folder = path_to_folder
+            differential_evolution_creator.name_main_file_without_ending = "main"
+            result = run_differential_evolution(differential_evolution_creator, run_parameters)
+            checkpoint = find_latest_checkpoint(path_to_folder, run_parameters, PriceStrategyType.SUB,
+                                                create_bounds(differential_evolution_creator),
+                                                get_study_key(differential_evolution_creator))
+            self.assertTrue(checkpoint.is_finished)
+            self.assertGreater(checkpoint.generation, 0)
+
+            # finished runs are skipped
+            differential_evolution_creator.resume_from_checkpoint = True
+            self.assertIsNone(run_differential_evolution(differential_evolution_creator, run_parameters))
+
+            # an unfinished run continues from its last population in the same .txt file
+            checkpoint.is_finished = False
+            write_checkpoint(checkpoint)
+            resumed_result = run_differential_evolution(differential_evolution_creator, run_parameters)
+            self.assertEqual(result.start_time, resumed_result.start_time)
+            # the best member of the last population is kept, hence the revenue does not decrease
+            self.assertGreaterEqual(resumed_result.expected_publisher_revenue,
+                                    result.expected_publisher_revenue - 1e-9)
+            self.assertEqual(1, len([file for file in os.listdir(os.path.join(path_to_folder, "main"))
+                                     if file.endswith(".txt")]))
+
+    def test_checkpoint_of_other_study_is_not_resumed(self):
+        differential_evolution_creator = DifferentialEvolutionCreator()
+        differential_evolution_creator.n_max = 12
+        differential_evolution_creator.n_upgrade = 7
+        differential_evolution_creator.price_strategy_type = PriceStrategyType.SUB
+        differential_evolution_creator.evolution_with_all_user_types_from_game = False
+        differential_evolution_creator.product_quality_base_product = 1
+        differential_evolution_creator.product_quality_upgrade = 0.5
+        differential_evolution_creator.user_valuation = 25
+        differential_evolution_creator.user_arrival_time = 3
+        differential_evolution_creator.user_quality_decay_factor = 0.9
+        differential_evolution_creator.user_engagement_factor = 0.5
+        differential_evolution_creator.print_result_every_x_iterations = 1000000
+        differential_evolution_creator.print_result_for_the_first_x_iterations = 0
+        differential_evolution_creator.use_vectorized_objective = True
+        differential_evolution_creator.checkpoint_every_x_generations = 1
+        differential_evolution_creator.early_stopping_generations = 1000
+        run_parameters = (1, None, None, None, None, None, "differential_evolution", "best1bin", 5)
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            differential_evolution_creator.path_to_folder = path_to_folder
+            differential_evolution_creator.name_main_file_without_ending = "main"
+            run_differential_evolution(differential_evolution_creator, run_parameters)
+            checkpoint = find_latest_checkpoint(path_to_folder, run_parameters, PriceStrategyType.SUB,
+                                                create_bounds(differential_evolution_creator),
+                                                get_study_key(differential_evolution_creator))
+            # the window of the early stopping policy is continued by a resumed run
+            self.assertGreater(checkpoint.generation, 0)
+            self.assertEqual(checkpoint.generation, len(checkpoint.best_revenues))
+
+            # the main file of a restarted job is named by its start time, which does not start the run again
+            differential_evolution_creator.name_main_file_without_ending = "restarted_main"
+            self.assertIsNotNone(find_latest_checkpoint(path_to_folder, run_parameters, PriceStrategyType.SUB,
+                                                        create_bounds(differential_evolution_creator),
+                                                        get_study_key(differential_evolution_creator)))
+            differential_evolution_creator.name_main_file_without_ending = "main"
+
+            # a study with another game or study name in the same folder starts the run again
+            differential_evolution_creator.resume_from_checkpoint = True
+            for name, value in [("user_valuation", 30), ("study_name", "other_study")]:
+                previous_value = getattr(differential_evolution_creator, name)
+                setattr(differential_evolution_creator, name, value)
+                self.assertIsNone(find_latest_checkpoint(path_to_folder, run_parameters, PriceStrategyType.SUB,
+                                                         create_bounds(differential_evolution_creator),
+                                                         get_study_key(differential_evolution_creator)))
+                self.assertIsNotNone(run_differential_evolution(differential_evolution_creator, run_parameters))
+                setattr(differential_evolution_creator, name, previous_value)
+
+    def test_restarted_job_resumes_from_checkpoint(self):
+        config = configparser.RawConfigParser()
+        config.read(os.path.join(os.path.dirname(__file__), "..", "..", "..", "config.ini"))
+        config.set("MAIN", "type", "DIFFERENTIAL_EVOLUTION")
+        config.set("GAME_INFORMATION", "price_strategy_type", "SUB")
+        config.set("DIFFERENTIAL_EVOLUTION", "evolution_with_all_user_types_from_game", "False")
+        config.set("DIFFERENTIAL_EVOLUTION", "use_vectorized_objective", "True")
+        config.set("DIFFERENTIAL_EVOLUTION", "popsizes", "[5]")
+        config.set("DIFFERENTIAL_EVOLUTION", "number_of_iterations_per_evolution_type", "1")
+        config.set("DIFFERENTIAL_EVOLUTION", "checkpoint_every_x_generations", "1")
+        config.set("DIFFERENTIAL_EVOLUTION", "resume_from_checkpoint", "True")
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            config.set("MAIN", "local_path_to_file_folder_differential_evolution", path_to_folder)
+            first_start_time = datetime(2021, 8, 22, 10, 0, 0)
+            with mock.patch("main.datetime") as main_datetime:
+                main_datetime.now.return_value = first_start_time
+                main.differential_evolution(config)
+            first_main_file_name = first_start_time.strftime("%m.%d.%Y_%H.%M.%S") + "_" + PriceStrategyType.SUB
+            run_file_name, = [file for file in os.listdir(os.path.join(path_to_folder, first_main_file_name))
+                              if file.endswith(".txt")]
+
+            # the job is stopped before the run is finished
+            checkpoint_path, = glob.glob(os.path.join(path_to_folder, "**", "*.checkpoint"), recursive=True)
+            with open(checkpoint_path, "rb") as file:
+                checkpoint = pickle.load(file)
+            checkpoint.is_finished = False
+            write_checkpoint(checkpoint)
+
+            # the restarted job has another main file but continues the run in the .txt file of the first job
+            second_start_time = datetime(2021, 8, 22, 14, 30, 0)
+            with mock.patch("main.datetime") as main_datetime:
+                main_datetime.now.return_value = second_start_time
+                main.differential_evolution(config)
+            second_main_file_name = second_start_time.strftime("%m.%d.%Y_%H.%M.%S") + "_" + PriceStrategyType.SUB
+            self.assertFalse(os.path.exists(os.path.join(path_to_folder, second_main_file_name)))
+            with open(os.path.join(path_to_folder, first_main_file_name, run_file_name)) as run_log:
+                self.assertIn("RESUMED at generation " + str(checkpoint.generation), run_log.read())
+            with open(os.path.join(path_to_folder, second_main_file_name + ".csv")) as main_file:
+                self.assertEqual(2, len(main_file.readlines()))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+from scipy.optimize import OptimizeResult, differential_evolution
+
+from src.numerical_framework.differential_evolution.early_stopping import EarlyStopping, combine_callbacks
+from src.numerical_framework.helpers.framework_creators import DifferentialEvolutionCreator
+
+
+class TestEarlyStopping(unittest.TestCase):
+    def setUp(self):
+        self.differential_evolution_creator = DifferentialEvolutionCreator()
+        self.bounds = [[0, 10], [0, 1]]
+        self.population = np.array([[0, 0], [10, 1]])
+
+    def test_stop_by_improvement(self):
+        self.differential_evolution_creator.early_stopping_generations = 2
+        self.differential_evolution_creator.early_stopping_relative_improvement = 0.01
+        early_stopping = EarlyStopping(self.differential_evolution_creator, self.bounds)
+        self.assertTrue(early_stopping.is_enabled())
+        # revenue improves by less than 1% over the last 2 generations only in generation 5
+        for generation, best_revenue in enumerate([10, 10.5, 11, 11.05, 11.06], start=1):
+            is_stopped = early_stopping(OptimizeResult(fun=-best_revenue, population=self.population,
+                                                       nit=generation))
+            self.assertEqual(generation == 5, is_stopped)
+        self.assertEqual(5, early_stopping.generation)
+        self.assertIn("improved", early_stopping.stop_reason)
+
+    def test_stop_by_price_spread(self):
+        self.differential_evolution_creator.early_stopping_price_spread = 0.01
+        early_stopping = EarlyStopping(self.differential_evolution_creator, self.bounds)
+        self.assertFalse(early_stopping(OptimizeResult(fun=-1, population=self.population, nit=1)))
+        # the second price spreads over its whole bounds
+        population = np.array([[5, 0], [5.01, 1]])
+        self.assertFalse(early_stopping(OptimizeResult(fun=-1, population=population, nit=2)))
+        population = np.array([[5, 0.5], [5.01, 0.501]])
+        self.assertTrue(early_stopping(OptimizeResult(fun=-1, population=population, nit=3)))
+        self.assertIn("spread", early_stopping.stop_reason)
+
+    def test_disabled_by_default(self):
+        early_stopping = EarlyStopping(self.differential_evolution_creator, self.bounds)
+        self.assertFalse(early_stopping.is_enabled())
+        self.assertIsNone(combine_callbacks([]))
+
+    def test_differential_evolution_is_stopped(self):
+        self.differential_evolution_creator.early_stopping_generations = 5
+        self.differential_evolution_creator.early_stopping_relative_improvement = 0.01
+        early_stopping = EarlyStopping(self.differential_evolution_creator, self.bounds)
+        called_generations = []
+        callback = combine_callbacks([lambda intermediate_result: called_generations.append(intermediate_result.nit),
+                                      early_stopping])
+        # constant objective, hence the revenue does not improve (and differential evolution does not converge)
+        result = differential_evolution(lambda prices: -1, self.bounds, callback=callback, tol=0, atol=-1,
+                                        rng=np.random.default_rng(0))
+        self.assertEqual(6, result.nit)
+        self.assertEqual([1, 2, 3, 4, 5, 6], called_generations)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from src.model.game.price_strategy_type import PriceStrategyType
+from src.model.user.user_type import create_user_type_population
+from src.numerical_framework.differential_evolution.differential_evolution import create_bounds, get_price_vectors
+from src.numerical_framework.differential_evolution.initial_population import get_prices_of_price_vectors, \
+    create_seeded_initial_population, get_representative_user_types
+from src.numerical_framework.helpers.framework_creators import DifferentialEvolutionCreator
+
+
+class TestSeededInitialPopulation(unittest.TestCase):
+    def setUp(self):
+        self.differential_evolution_creator = DifferentialEvolutionCreator()
+        self.differential_evolution_creator.n_max = 12
+        self.differential_evolution_creator.n_upgrade = 7
+        self.differential_evolution_creator.quality_decay_factors = [0.85, 0.9, 0.95]
+        self.differential_evolution_creator.engagement_factor_long_term_user = 0.9
+        self.differential_evolution_creator.probability_short_term_user = 0.8
+        self.differential_evolution_creator.valuation_range = [0, 50]
+        self.differential_evolution_creator.product_quality_base_product = 1
+        self.differential_evolution_creator.product_quality_upgrade = 0.5
+        self.differential_evolution_creator.base_price_for_both_buy = [50 - i for i in range(12)]
+        self.differential_evolution_creator.upgrade_price_for_both_buy = [30 - i for i in range(12)]
+        self.differential_evolution_creator.user_valuation = 25
+        self.differential_evolution_creator.user_arrival_time = 3
+        self.differential_evolution_creator.user_quality_decay_factor = 0.9
+        self.differential_evolution_creator.user_engagement_factor = 0.5
+        self.user_type_population = create_user_type_population(self.differential_evolution_creator, 4, 5, 0.8, 0.5,
+                                                                10)
+
+    def test_prices_of_price_vectors_are_inverse_of_price_vectors(self):
+        random_number_generator = np.random.default_rng(0)
+        for price_strategy_type in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH,
+                                    PriceStrategyType.BOTH_BUY]:
+            for play_different_ask_prices in [True, False]:
+                for is_discounted in [True, False]:
+                    for first_price_fixed in [None, 40]:
+                        self.differential_evolution_creator.price_strategy_type = price_strategy_type
+                        self.differential_evolution_creator.play_different_ask_prices = play_different_ask_prices
+                        self.differential_evolution_creator.is_prices_discounted = is_discounted
+                        self.differential_evolution_creator.is_subscription_price_variable = is_discounted
+                        self.differential_evolution_creator.first_base_price_fixed = first_price_fixed
+                        self.differential_evolution_creator.first_upgrade_price_fixed = first_price_fixed
+                        bounds = np.array(create_bounds(self.differential_evolution_creator), dtype=float)
+                        prices = random_number_generator.uniform(bounds[:, 0], bounds[:, 1])
+                        price_vectors = get_price_vectors(prices, self.differential_evolution_creator)
+                        np.testing.assert_allclose(
+                            prices, get_prices_of_price_vectors(*price_vectors, self.differential_evolution_creator))
+
+    def test_seeded_initial_population(self):
+        self.differential_evolution_creator.price_strategy_type = PriceStrategyType.BOTH
+        self.differential_evolution_creator.is_prices_discounted = True
+        self.differential_evolution_creator.seeded_initial_population_fraction = 0.5
+        bounds = np.array(create_bounds(self.differential_evolution_creator), dtype=float)
+
+        representative_user_types = get_representative_user_types(self.differential_evolution_creator,
+                                                                   self.user_type_population)
+        self.assertLessEqual(len(representative_user_types), 5)
+        valuations = [user_type.valuation for user_type in representative_user_types]
+        self.assertTrue(min(self.user_type_population.valuations) <= min(valuations) <= max(valuations) <=
+                        max(self.user_type_population.valuations))
+
+        population = create_seeded_initial_population(self.differential_evolution_creator, bounds, 2,
+                                                      self.user_type_population, np.random.default_rng(0))
+        # as many members as scipy creates for popsize, all within the bounds
+        self.assertEqual((2 * len(bounds), len(bounds)), population.shape)
+        self.assertTrue(np.all(population >= bounds[:, 0]) and np.all(population <= bounds[:, 1]))
+        # the first member is the reservation price of the median user type in the first timestep
+        self.assertGreater(population[0, 0], 0)
+
+        # without seeding, the population is sampled only
+        self.differential_evolution_creator.seeded_initial_population_fraction = 0
+        population = create_seeded_initial_population(self.differential_evolution_creator, bounds, 2, None,
+                                                      np.random.default_rng(0))
+        self.assertEqual((2 * len(bounds), len(bounds)), population.shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import csv
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.model.game.price_strategy_type import PriceStrategyType
+from src.numerical_framework.differential_evolution.differential_evolution import \
+    differential_evolution_maximize_revenue
+from src.numerical_framework.differential_evolution.optimizers import OPTIMIZERS, OptimizationProblem
+from src.numerical_framework.helpers.framework_creators import DifferentialEvolutionCreator
+from src.numerical_framework.helpers.worker_pool import EvaluationContext, get_worker_pool, close_worker_pools
+
+
+def shifted_sphere(prices, shift):
+    return float(np.sum((np.asarray(prices) - shift) ** 2))
+
+
+def shifted_sphere_vectorized(prices, shift):
+    return np.sum((np.asarray(prices) - shift) ** 2, axis=0)
+
+
+def get_process_id(prices, shift):
+    return os.getpid() + shifted_sphere(prices, shift)
+
+
+class TestOptimizers(unittest.TestCase):
+    def test_minimum_is_found(self):
+        bounds = [[0, 10], [0, 10], [0, 1]]
+        for name, optimizer in OPTIMIZERS.items():
+            for vectorized_objective in [None, shifted_sphere_vectorized]:
+                optimization_problem = OptimizationProblem(shifted_sphere, vectorized_objective, bounds, (3,),
+                                                           "best1bin", 15, np.random.default_rng(0),
+                                                           'latinhypercube', 1000, None, 1)
+                result = optimizer.minimize(optimization_problem)
+                # the third price is at its upper bound
+                np.testing.assert_allclose([3, 3, 1], result.x, atol=0.05, err_msg=name)
+                self.assertGreater(result.nfev, 0)
+
+    def test_same_results_with_workers(self):
+        bounds = [[0, 10], [0, 10], [0, 1]]
+        for name in ["cma_es", "nelder_mead", "powell"]:
+            results = []
+            for workers in [1, 2]:
+                optimization_problem = OptimizationProblem(shifted_sphere, None, bounds, (3,), "best1bin", 6,
+                                                           np.random.default_rng(0), 'latinhypercube', 50, None,
+                                                           workers)
+                results.append(OPTIMIZERS[name].minimize(optimization_problem))
+            if OPTIMIZERS[name].supports_map_like_workers:
+                with get_worker_pool(2).share_context(EvaluationContext(shifted_sphere, (3,))) as \
+                        shared_evaluation_context:
+                    optimization_problem = OptimizationProblem(shifted_sphere, None, bounds, (3,), "best1bin", 6,
+                                                               np.random.default_rng(0), 'latinhypercube', 50, None,
+                                                               shared_evaluation_context)
+                    results.append(OPTIMIZERS[name].minimize(optimization_problem))
+                close_worker_pools()
+            for result in results[1:]:
+                np.testing.assert_array_equal(results[0].x, result.x, err_msg=name)
+                self.assertEqual(results[0].nfev, result.nfev, msg=name)
+
+    def test_candidates_are_evaluated_in_workers(self):
+        optimization_problem = OptimizationProblem(get_process_id, None, [[0, 1]], (0,), "best1bin", 6,
+                                                   np.random.default_rng(0), 'latinhypercube', 50, None, 2)
+        candidates = np.zeros((20, 1))
+        self.assertEqual({os.getpid()}, set(optimization_problem.evaluate_candidates(candidates)))
+        with optimization_problem.evaluate_in_parallel():
+            process_ids = set(optimization_problem.evaluate_candidates(candidates))
+        self.assertNotIn(os.getpid(), process_ids)
+
+    def test_strategies_only_for_differential_evolution(self):
+        differential_evolution_creator = DifferentialEvolutionCreator()
+        differential_evolution_creator.n_max = 12
+        differential_evolution_creator.n_upgrade = 7
+        differential_evolution_creator.price_strategy_type = PriceStrategyType.SUB
+        differential_evolution_creator.evolution_with_all_user_types_from_game = False
+        differential_evolution_creator.product_quality_base_product = 1
+        differential_evolution_creator.product_quality_upgrade = 0.5
+        differential_evolution_creator.user_valuation = 25
+        differential_evolution_creator.user_arrival_time = 3
+        differential_evolution_creator.user_quality_decay_factor = 0.9
+        differential_evolution_creator.user_engagement_factor = 0.5
+        differential_evolution_creator.print_result_every_x_iterations = 1000000
+        differential_evolution_creator.print_result_for_the_first_x_iterations = 0
+        differential_evolution_creator.use_vectorized_objective = True
+        differential_evolution_creator.differential_evolution_strategies = ["best1bin", "rand1bin"]
+        differential_evolution_creator.optimizers = ["differential_evolution", "cma_es", "powell"]
+        differential_evolution_creator.popsizes = [5]
+        differential_evolution_creator.number_of_iterations_per_evolution_type = 1
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            differential_evolution_creator.path_to_folder = path_to_folder
+            differential_evolution_creator.path_to_main_file = os.path.join(path_to_folder, "main.csv")
+            differential_evolution_creator.name_main_file_without_ending = "main"
+            differential_evolution_maximize_revenue(differential_evolution_creator)
+
+            # two runs of differential evolution and one of every other optimizer
+            with open(differential_evolution_creator.path_to_main_file) as main_file:
+                optimizers_and_strategies = [[row[-1], row[3]] for row in csv.reader(main_file)]
+            self.assertEqual([["differential_evolution", "best1bin"], ["differential_evolution", "rand1bin"],
+                              ["cma_es", "-"], ["powell", "-"]], optimizers_and_strategies)
+
+
+if __name__ == '__main__':
+    unittest.main()
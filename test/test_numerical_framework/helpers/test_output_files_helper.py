@@ -0,0 +1,124 @@
+import csv
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.numerical_framework.differential_evolution.price_bounds import PriceBounds
+from src.numerical_framework.helpers.output_files_helper import ResultSink, write_backward_induction_result, \
+    write_header_line_overview_csv_backward_induction, write_header_line_overview_csv_differential_evolution, \
+    get_differential_evolution_result_row
+from src.numerical_framework.result.result import BackwardInductionResult, DifferentialEvolutionResult
+
+
+def create_backward_induction_result(path_to_folder, valuation):
+    backward_induction_result = BackwardInductionResult()
+    backward_induction_result.path_to_folder = path_to_folder
+    backward_induction_result.path_to_main_file = os.path.join(path_to_folder, "main.csv")
+    backward_induction_result.files_results_are_written_to = ["results.csv", "all_results.csv"]
+    backward_induction_result.timestamp = "10.18.2026_12.00.00"
+    backward_induction_result.valuation = valuation
+    backward_induction_result.n_max = 2
+    backward_induction_result.quality_decay_factors = [0.85, 0.9, 0.95]
+    backward_induction_result.expected_publisher_revenue = 1.5
+    backward_induction_result.price_base_product = [50, 49]
+    backward_induction_result.price_upgrade = [30, 29]
+    backward_induction_result.price_subscription = [22, 22]
+    backward_induction_result.revenue_base_product = [0.5, 0.25]
+    backward_induction_result.revenue_upgrade = [0, 0.5]
+    backward_induction_result.revenue_subscription = [0.25, 0]
+    return backward_induction_result
+
+
+def create_differential_evolution_result(path_to_folder):
+    differential_evolution_result = DifferentialEvolutionResult()
+    differential_evolution_result.path_to_main_file = os.path.join(path_to_folder, "main.csv")
+    differential_evolution_result.start_time = datetime(2026, 10, 18, 12, 0, 0)
+    differential_evolution_result.runtime = timedelta(seconds=12.5)
+    differential_evolution_result.optimizer = "cma_es"
+    differential_evolution_result.differential_evolution_strategy = "-"
+    differential_evolution_result.price_strategy_type = "BOTH"
+    differential_evolution_result.number_of_evaluations = 2500
+    differential_evolution_result.price_bounds = PriceBounds(0, 300, 0, 300, 0, 100)
+    differential_evolution_result.number_of_user_valuations = 10
+    differential_evolution_result.popsize = 15
+    differential_evolution_result.n_max = 2
+    differential_evolution_result.expected_publisher_revenue = 1.5
+    differential_evolution_result.expected_user_welfare = 3.25
+    differential_evolution_result.expected_total_welfare = 4.75
+    differential_evolution_result.price_base_product = [50, 49]
+    differential_evolution_result.price_upgrade = [30, 29]
+    differential_evolution_result.price_subscription = [22, 22]
+    differential_evolution_result.revenue_base_product = [0.5, 0.25]
+    differential_evolution_result.revenue_upgrade = [0, 0.5]
+    differential_evolution_result.revenue_subscription = [0.25, 0]
+    differential_evolution_result.is_prices_discounted = True
+    differential_evolution_result.is_subscription_price_variable = False
+    differential_evolution_result.first_base_price_fixed = 0
+    differential_evolution_result.first_upgrade_price_fixed = 0
+    differential_evolution_result.evolution_with_all_user_types_from_game = True
+    return differential_evolution_result
+
+
+def read_files(path_to_folder):
+    contents = {}
+    for file in ["main.csv", "results.csv", "all_results.csv"]:
+        with open(os.path.join(path_to_folder, file)) as f:
+            contents[file] = f.read()
+    return contents
+
+
+class TestResultSink(unittest.TestCase):
+    def test_rows_equal_rows_written_without_result_sink(self):
+        with tempfile.TemporaryDirectory() as path_to_folder, tempfile.TemporaryDirectory() as path_to_sink_folder:
+            for folder in [path_to_folder, path_to_sink_folder]:
+                write_header_line_overview_csv_backward_induction(2, os.path.join(folder, "main.csv"))
+
+            for valuation in range(5):
+                write_backward_induction_result(create_backward_induction_result(path_to_folder, valuation))
+            with ResultSink(batch_size=6) as result_sink:
+                for valuation in range(5):
+                    write_backward_induction_result(
+                        create_backward_induction_result(path_to_sink_folder, valuation), result_sink)
+                    # rows are written in batches of 6 rows (2 results), the header line immediately
+                    with open(os.path.join(path_to_sink_folder, "results.csv")) as file:
+                        self.assertEqual(1 + 2 * ((valuation + 1) // 2), len(file.read().splitlines()))
+
+            contents = read_files(path_to_folder)
+            # rows contain the path to the main file
+            self.assertEqual(contents, {file: content.replace(path_to_sink_folder, path_to_folder)
+                                        for file, content in read_files(path_to_sink_folder).items()})
+            # one header line and one row per result
+            self.assertEqual(6, len(contents["results.csv"].splitlines()))
+
+    def test_rows_are_written_if_run_fails(self):
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            write_header_line_overview_csv_backward_induction(2, os.path.join(path_to_folder, "main.csv"))
+            with self.assertRaises(ValueError):
+                with ResultSink() as result_sink:
+                    write_backward_induction_result(create_backward_induction_result(path_to_folder, 1), result_sink)
+                    self.assertEqual(1, len(read_files(path_to_folder)["results.csv"].splitlines()))
+                    raise ValueError("run failed")
+            self.assertEqual(2, len(read_files(path_to_folder)["results.csv"].splitlines()))
+            self.assertEqual({}, result_sink.files)
+
+
+class TestDifferentialEvolutionColumns(unittest.TestCase):
+    def test_optimizer_is_last_column(self):
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            write_header_line_overview_csv_differential_evolution(2, os.path.join(path_to_folder, "main.csv"))
+            with open(os.path.join(path_to_folder, "main.csv")) as file:
+                header_row, = list(csv.reader(file))
+        row = get_differential_evolution_result_row(create_differential_evolution_result(path_to_folder))
+
+        self.assertEqual(len(header_row), len(row))
+        # rows appended to .csv files written before the optimizer column keep the columns of their header
+        self.assertEqual(['Start time', 'Runtime', 'File Name', 'DE Strat.'], header_row[:4])
+        self.assertEqual(1.5, row[header_row.index('Revenue')])
+        self.assertEqual(15, row[header_row.index('Popsize')])
+        self.assertEqual('Optimizer', header_row[-1])
+        self.assertEqual("cma_es", row[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
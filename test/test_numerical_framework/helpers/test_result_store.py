@@ -0,0 +1,146 @@
+import copy
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.numerical_framework.differential_evolution.price_bounds import PriceBounds
+from src.numerical_framework.helpers.output_files_helper import write_backward_induction_result, \
+    write_differential_evolution_result, write_single_maximize_revenue_result, export_result_database, \
+    count_rows_in_csv
+from src.numerical_framework.helpers.result_store import close_result_stores, BACKWARD_INDUCTION, \
+    DIFFERENTIAL_EVOLUTION, SINGLE_MAX_REVENUE
+from src.numerical_framework.result.result import BackwardInductionResult, DifferentialEvolutionResult, \
+    SingleMaximizeRevenueResult
+
+
+def set_game_information(result, path_to_folder):
+    result.path_to_folder = path_to_folder
+    result.path_to_main_file = os.path.join(path_to_folder, "main.csv")
+    result.n_max = 3
+    result.n_upgrade = 2
+    result.number_of_user_valuations = 10
+    result.price_strategy_type = "BOTH"
+    result.engagement_factor_short_term_user = 0.5
+    result.engagement_factor_long_term_user = 0.9
+    result.probability_short_term_user = 0.8
+    result.quality_decay_factors = [0.85, 0.9, 0.95]
+    result.probability_of_second_quality_decay_factor = 0.8
+    result.valuation_range = [0, 50]
+    result.standard_deviation_valuation = 10
+    result.arrivals_in_first_timestep = 5
+    result.product_quality_base_product = 1
+    result.product_quality_upgrade = 0.5
+    result.price_base_product = [50, 49.5, np.float64(48.25)]
+    result.price_upgrade = [100000, 30, 29]
+    result.price_subscription = np.array([22.0, 21.5, 21.0])
+    result.revenue_base_product = [np.float64(1.5), 0.25, 0]
+    result.revenue_upgrade = [0, 0.125, 0.5]
+    result.revenue_subscription = [2.0, 1.75, 1.0 / 3]
+    result.expected_publisher_revenue = np.float64(7.4583)
+    result.expected_user_welfare = 3.25
+    result.expected_total_welfare = 10.7083
+
+
+def create_results(path_to_folder):
+    results = []
+    backward_induction_result = BackwardInductionResult()
+    set_game_information(backward_induction_result, path_to_folder)
+    backward_induction_result.timestamp = "10.18.2026_12.00.00"
+    backward_induction_result.probability_user_type = 0.01
+    backward_induction_result.arrival_time = 2
+    backward_induction_result.valuation = 25.0
+    backward_induction_result.engagement_factor = 0.5
+    backward_induction_result.quality_decay_factor = 0.9
+    results.append((BACKWARD_INDUCTION, write_backward_induction_result, backward_induction_result))
+    # result of all user types combined
+    backward_induction_result = copy.copy(backward_induction_result)
+    backward_induction_result.arrival_time = [1, 3]
+    backward_induction_result.valuation = [0, 50]
+    backward_induction_result.engagement_factor = [0.5, 0.9]
+    backward_induction_result.quality_decay_factor = [0.85, 0.9, 0.95]
+    results.append((BACKWARD_INDUCTION, write_backward_induction_result, backward_induction_result))
+
+    for price_bounds, user_valuation in [(PriceBounds(0, 300, 0, 300, 0, 100), "-"), (None, 25)]:
+        differential_evolution_result = DifferentialEvolutionResult()
+        set_game_information(differential_evolution_result, path_to_folder)
+        differential_evolution_result.start_time = datetime(2026, 10, 18, 12, 0, 0, 123456)
+        differential_evolution_result.runtime = timedelta(seconds=12.5)
+        differential_evolution_result.optimizer = "differential_evolution"
+        differential_evolution_result.differential_evolution_strategy = "best1bin"
+        differential_evolution_result.number_of_evaluations = 2500
+        differential_evolution_result.popsize = 15
+        differential_evolution_result.price_bounds = price_bounds
+        differential_evolution_result.is_prices_discounted = True
+        differential_evolution_result.is_subscription_price_variable = False
+        differential_evolution_result.first_base_price_fixed = 0
+        differential_evolution_result.first_upgrade_price_fixed = False
+        differential_evolution_result.evolution_with_all_user_types_from_game = user_valuation == "-"
+        differential_evolution_result.user_valuation = user_valuation
+        differential_evolution_result.user_arrival_time = 1
+        differential_evolution_result.user_engagement_factor = 0.5
+        differential_evolution_result.user_quality_decay_factor = 0.9
+        results.append((DIFFERENTIAL_EVOLUTION, write_differential_evolution_result, differential_evolution_result))
+
+    single_maximize_revenue_result = SingleMaximizeRevenueResult()
+    set_game_information(single_maximize_revenue_result, path_to_folder)
+    single_maximize_revenue_result.timestamp = "10.18.2026_12.00.00"
+    single_maximize_revenue_result.user_valuation = 25
+    single_maximize_revenue_result.user_arrival_time = 1
+    single_maximize_revenue_result.user_engagement_factor = 0.5
+    single_maximize_revenue_result.user_quality_decay_factor = 0.95
+    results.append((SINGLE_MAX_REVENUE, write_single_maximize_revenue_result, single_maximize_revenue_result))
+    return results
+
+
+class TestResultStore(unittest.TestCase):
+    def test_exported_results_equal_csv_files(self):
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            for method, write_result, result in create_results(path_to_folder):
+                file = method + ".csv"
+                result.files_results_are_written_to = [file]
+                # results are written to the .csv file ...
+                write_result(result)
+                # ... and to the result database
+                result.result_database = "results.sqlite"
+                write_result(result)
+                write_result(result)
+            close_result_stores()
+
+            for method in [BACKWARD_INDUCTION, DIFFERENTIAL_EVOLUTION, SINGLE_MAX_REVENUE]:
+                exported_file = os.path.join(path_to_folder, method + "_exported.csv")
+                number_of_results = export_result_database(os.path.join(path_to_folder, "results.sqlite"), method,
+                                                           3, exported_file)
+                self.assertEqual(count_rows_in_csv(os.path.join(path_to_folder, method + ".csv")) - 1,
+                                 number_of_results / 2)
+                with open(os.path.join(path_to_folder, method + ".csv")) as file:
+                    expected_lines = file.read().splitlines()
+                with open(exported_file) as file:
+                    exported_lines = file.read().splitlines()
+                # every result has been added twice to the database
+                self.assertEqual(expected_lines[1:], exported_lines[1::2])
+                self.assertEqual(expected_lines[1:], exported_lines[2::2])
+                self.assertEqual(expected_lines[0], exported_lines[0])
+
+    def test_normalized_tables(self):
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            for method, write_result, result in create_results(path_to_folder):
+                result.result_database = "results.sqlite"
+                write_result(result)
+            close_result_stores()
+
+            connection = sqlite3.connect(os.path.join(path_to_folder, "results.sqlite"))
+            # all results have the same game information
+            self.assertEqual(1, connection.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0])
+            self.assertEqual(5, connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0])
+            self.assertEqual(15, connection.execute("SELECT COUNT(*) FROM price_schedules").fetchone()[0])
+            self.assertEqual([(25.0,), (25,), (25,)], connection.execute(
+                "SELECT user_valuation FROM runs WHERE user_valuation = 25 ORDER BY id").fetchall())
+            connection.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import gzip
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from src.numerical_framework.helpers import run_log as run_log_module
+from src.numerical_framework.helpers.run_log import open_run_log, get_run_log, get_summary_path
+
+
+def add_lines_in_worker(file_path, worker_index):
+    for i in range(200):
+        get_run_log(file_path).add_line("WORKER " + str(worker_index) + " ITERATION: " + str(i))
+
+class TestRunLog(unittest.TestCase):
+    def test_summary_is_written_into_reserved_block(self):
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            file_path = os.path.join(path_to_folder, "run.txt")
+            run_log = open_run_log(file_path)
+            self.assertIs(run_log, get_run_log(file_path))
+            for i in range(1000):
+                run_log.add_line("ITERATION: " + str(i))
+            inode = os.stat(file_path).st_ino
+            run_log.write_summary(["Runtime: 1", "RESULT"])
+            run_log.close()
+
+            # the run log is not rewritten
+            self.assertEqual(inode, os.stat(file_path).st_ino)
+            with open(file_path) as file:
+                lines = [line.strip() for line in file.read().splitlines()]
+            self.assertEqual(["Runtime: 1", "RESULT", ""], lines[:3])
+            self.assertEqual(["ITERATION: " + str(i) for i in range(1000)], lines[3:])
+            self.assertNotIn(file_path, run_log_module.RUN_LOGS)
+
+    def test_summary_of_run_log_without_reserved_block(self):
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            file_path = os.path.join(path_to_folder, "run.txt")
+            with open(file_path, 'w') as file:
+                file.write("ITERATION: 1\n")
+            run_log = open_run_log(file_path)
+            run_log.add_line("RESUMED")
+            run_log.write_summary(["Runtime: 1", "RESULT"])
+            run_log.close()
+            with open(file_path) as file:
+                self.assertEqual(["Runtime: 1", "RESULT", "ITERATION: 1", "RESUMED"], file.read().splitlines())
+
+    def test_compressed_run_log(self):
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            file_path = os.path.join(path_to_folder, "run.txt.gz")
+            run_log = open_run_log(file_path)
+            run_log.add_line("ITERATION: 1")
+            run_log.write_summary(["Runtime: 1"])
+            run_log.close()
+            with gzip.open(file_path, 'rt') as file:
+                self.assertEqual(["ITERATION: 1"], file.read().splitlines())
+            self.assertEqual(os.path.join(path_to_folder, "run.summary.txt"), get_summary_path(file_path))
+            with open(get_summary_path(file_path)) as file:
+                self.assertEqual(["Runtime: 1"], file.read().splitlines())
+
+    def test_compressed_run_log_with_several_workers(self):
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            file_path = os.path.join(path_to_folder, "run.txt.gz")
+            run_log = open_run_log(file_path)
+            run_log.add_line("STARTED")
+            run_log.flush()
+            # workers append to the run log while its owner buffers its lines
+            with multiprocessing.get_context('spawn').Pool(3) as pool:
+                pool.starmap(add_lines_in_worker, [(file_path, worker_index) for worker_index in range(6)])
+                for i in range(200):
+                    run_log.add_line("OWNER ITERATION: " + str(i))
+            run_log.write_summary(["Runtime: 1"])
+            run_log.close()
+
+            with gzip.open(file_path, 'rt') as file:
+                lines = file.read().splitlines()
+            expected_lines = ["STARTED"] + ["OWNER ITERATION: " + str(i) for i in range(200)] + [
+                "WORKER " + str(worker_index) + " ITERATION: " + str(i) for worker_index in range(6) for i in
+                range(200)]
+            self.assertEqual(sorted(expected_lines), sorted(lines))
+            # the lines of every process are in their order
+            for prefix in ["OWNER "] + ["WORKER " + str(worker_index) + " " for worker_index in range(6)]:
+                self.assertEqual([prefix + "ITERATION: " + str(i) for i in range(200)],
+                                 [line for line in lines if line.startswith(prefix)])
+
+    def test_lines_of_other_processes_are_not_buffered(self):
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            file_path = os.path.join(path_to_folder, "run.txt")
+            with open(file_path, 'w'):
+                pass
+            # run log of a worker process, which has not opened the run log
+            run_log = get_run_log(file_path)
+            self.assertFalse(run_log.is_owner)
+            run_log.add_line("ITERATION: 1")
+            with open(file_path) as file:
+                self.assertEqual(["ITERATION: 1"], file.read().splitlines())
+            run_log.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
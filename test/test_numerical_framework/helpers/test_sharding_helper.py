@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from src.numerical_framework.helpers.output_files_helper import write_csv_row
+from src.numerical_framework.helpers.sharding_helper import get_shard_from_environment, select_shard, \
+    get_shard_suffix, merge_shard_files
+
+
+class TestShardingHelper(unittest.TestCase):
+    def test_shard_from_environment(self):
+        self.assertEqual((0, 1), get_shard_from_environment({}))
+        self.assertEqual((2, 4), get_shard_from_environment({'SLURM_ARRAY_TASK_ID': '2',
+                                                              'SLURM_ARRAY_TASK_COUNT': '4'}))
+        # --array=1-4
+        self.assertEqual((2, 4), get_shard_from_environment({'SLURM_ARRAY_TASK_ID': '3',
+                                                              'SLURM_ARRAY_TASK_COUNT': '4',
+                                                              'SLURM_ARRAY_TASK_MIN': '1'}))
+
+    def test_select_shard(self):
+        for number_of_arguments in [0, 1, 7, 12]:
+            arguments = list(range(number_of_arguments))
+            for shard_count in [1, 3, 5, 13]:
+                shards = [select_shard(arguments, shard_index, shard_count) for shard_index in range(shard_count)]
+                # the shards concatenated are the arguments and differ in their length by at most 1
+                self.assertEqual(arguments, [argument for shard in shards for argument in shard])
+                self.assertLessEqual(max(map(len, shards)) - min(map(len, shards)), 1)
+
+    def test_merge_shard_files(self):
+        with tempfile.TemporaryDirectory() as path_to_folder:
+            shard_files = []
+            for shard_index in [1, 0]:
+                shard_file = os.path.join(path_to_folder, "main" + get_shard_suffix(shard_index, 2) + ".csv")
+                write_csv_row(shard_file, ["header"])
+                write_csv_row(shard_file, [f"result {shard_index}a"])
+                write_csv_row(shard_file, [f"result {shard_index}b"])
+                shard_files.append(shard_file)
+
+            with self.assertRaises(Exception):
+                merge_shard_files(shard_files[:1], path_to_folder, ["results.csv"])
+            self.assertEqual(4, merge_shard_files(shard_files, path_to_folder, ["results.csv"]))
+            with open(os.path.join(path_to_folder, "results.csv")) as file:
+                self.assertEqual(["header", "result 0a", "result 0b", "result 1a", "result 1b"],
+                                 file.read().splitlines())
+
+
+if __name__ == '__main__':
+    unittest.main()
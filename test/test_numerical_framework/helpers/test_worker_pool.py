@@ -0,0 +1,121 @@
+import os
+import subprocess
+import sys
+import unittest
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.optimize import differential_evolution
+
+from src.numerical_framework.helpers import worker_pool as worker_pool_module
+from src.numerical_framework.helpers.worker_pool import EvaluationContext, get_worker_pool, close_worker_pools
+
+PREPARED_OFFSET = 0
+# concurrent runs with a persistent worker pool in every process of a run
+CONCURRENT_RUNS_WITH_PERSISTENT_WORKER_POOL = """
+import os
+import tempfile
+
+from src.model.game.price_strategy_type import PriceStrategyType
+from src.numerical_framework.differential_evolution.differential_evolution import \\
+    differential_evolution_maximize_revenue
+from src.numerical_framework.helpers.framework_creators import DifferentialEvolutionCreator
+
+if __name__ == '__main__':
+    differential_evolution_creator = DifferentialEvolutionCreator()
+    differential_evolution_creator.n_max = 12
+    differential_evolution_creator.n_upgrade = 7
+    differential_evolution_creator.price_strategy_type = PriceStrategyType.SUB
+    differential_evolution_creator.evolution_with_all_user_types_from_game = False
+    differential_evolution_creator.product_quality_base_product = 1
+    differential_evolution_creator.product_quality_upgrade = 0.5
+    differential_evolution_creator.user_valuation = 25
+    differential_evolution_creator.user_arrival_time = 3
+    differential_evolution_creator.user_quality_decay_factor = 0.9
+    differential_evolution_creator.user_engagement_factor = 0.5
+    differential_evolution_creator.print_result_every_x_iterations = 1000000
+    differential_evolution_creator.print_result_for_the_first_x_iterations = 0
+    differential_evolution_creator.differential_evolution_strategies = ["best1bin"]
+    differential_evolution_creator.popsizes = [5]
+    differential_evolution_creator.number_of_iterations_per_evolution_type = 2
+    differential_evolution_creator.number_of_concurrent_runs = {number_of_concurrent_runs}
+    differential_evolution_creator.use_persistent_worker_pool = True
+    differential_evolution_creator.early_stopping_generations = 3
+    differential_evolution_creator.early_stopping_relative_improvement = 0.01
+    with tempfile.TemporaryDirectory() as path_to_folder:
+        differential_evolution_creator.path_to_folder = path_to_folder
+        differential_evolution_creator.path_to_main_file = os.path.join(path_to_folder, "main.csv")
+        differential_evolution_creator.name_main_file_without_ending = "main"
+        differential_evolution_maximize_revenue(differential_evolution_creator)
+"""
+
+
+def prepare_offset(offset):
+    global PREPARED_OFFSET
+    PREPARED_OFFSET = offset
+
+
+def shifted_sphere(prices, shift):
+    return float(np.sum((np.asarray(prices) - shift) ** 2)) + PREPARED_OFFSET
+
+
+def get_process_id_and_offset(prices, shift):
+    return os.getpid(), PREPARED_OFFSET
+
+
+class TestWorkerPool(unittest.TestCase):
+    def tearDown(self):
+        close_worker_pools()
+
+    def test_pool_is_reused_by_contexts(self):
+        worker_pool = get_worker_pool(2)
+        self.assertIs(worker_pool, get_worker_pool(2))
+        candidates = [np.array([i, 2 * i], dtype=float) for i in range(20)]
+        for shift, offset in [(1, 0), (3, 10), (3, 0)]:
+            with worker_pool.share_context(EvaluationContext(shifted_sphere, (shift,), prepare_offset,
+                                                             (offset,))) as shared_evaluation_context:
+                self.assertEqual([shifted_sphere(candidate, shift) + offset for candidate in candidates],
+                                 shared_evaluation_context(None, candidates))
+                name = shared_evaluation_context.shared_memory_block.name
+            # the shared memory block is removed after the run
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+        # the worker processes are the same for all contexts
+        process_ids = set()
+        for offset in [1, 2]:
+            with worker_pool.share_context(EvaluationContext(get_process_id_and_offset, (0,), prepare_offset,
+                                                             (offset,))) as shared_evaluation_context:
+                for process_id, prepared_offset in shared_evaluation_context(None, candidates):
+                    process_ids.add(process_id)
+                    self.assertEqual(offset, prepared_offset)
+        self.assertLessEqual(len(process_ids), 2)
+        self.assertNotIn(os.getpid(), process_ids)
+
+        close_worker_pools()
+        self.assertEqual({}, worker_pool_module.WORKER_POOLS)
+
+    def test_differential_evolution_with_shared_context(self):
+        bounds = [(-5, 5), (-5, 5)]
+        expected_result = differential_evolution(shifted_sphere, bounds, args=(2,), updating='deferred', rng=1,
+                                                 polish=False)
+        with get_worker_pool(2).share_context(EvaluationContext(shifted_sphere, (2,))) as shared_evaluation_context:
+            calculated_result = differential_evolution(shifted_sphere, bounds, args=(2,), updating='deferred', rng=1,
+                                                       polish=False, workers=shared_evaluation_context)
+        np.testing.assert_array_equal(expected_result.x, calculated_result.x)
+        self.assertEqual(expected_result.nfev, calculated_result.nfev)
+
+    def test_no_leaked_shared_memory_with_concurrent_runs(self):
+        # the resource tracker warns about leaked shared memory blocks at the shutdown of the process
+        path_to_repository = os.path.join(os.path.dirname(__file__), "..", "..", "..")
+        for number_of_concurrent_runs in [1, 2]:
+            process = subprocess.run(
+                [sys.executable, "-c", CONCURRENT_RUNS_WITH_PERSISTENT_WORKER_POOL.format(
+                    number_of_concurrent_runs=number_of_concurrent_runs)],
+                cwd=path_to_repository, capture_output=True, text=True, timeout=300)
+            self.assertEqual(0, process.returncode, process.stderr)
+            self.assertEqual("", process.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
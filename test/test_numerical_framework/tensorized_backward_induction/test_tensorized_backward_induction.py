@@ -0,0 +1,158 @@
+import unittest
+
+import numpy as np
+
+from src.model.game.game import create_game
+from src.model.game.price_strategy_type import PriceStrategyType
+from src.model.publisher.productinformation import ProductInformation
+from src.model.user.user_type import UserType
+from src.numerical_framework.backward_induction.backward_induction import calculate_optimal_user_actions, \
+    calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare, get_revenue_per_timestep
+from src.numerical_framework.helpers.high_price import HighPrice
+from src.numerical_framework.tensorized_backward_induction.tensorized_backward_induction import \
+    calculate_optimal_user_actions_tensorized, solve_user_types_tensorized
+
+
+class TestTensorizedBackwardInduction(unittest.TestCase):
+    def setUp(self):
+        self.n_max = 12
+        base_price = [45.82, 45.82, 45.82, 45.82, 45.82, 45.82, 21.8, 21.8, 21.8, 21.8, 21.8, 21.8]
+        upgrade_price = [HighPrice] * 6 + [18.06] * 6
+        subscription_price = [10, 10, 10, 10, 10, 10, 9, 9, 9, 9, 9, 8]
+        self.product_informations = [ProductInformation(base_price, upgrade_price, subscription_price, [1, 0.5]),
+                                     ProductInformation(base_price, upgrade_price, subscription_price, [1.7, 0]),
+                                     ProductInformation([HighPrice] * 12, [HighPrice] * 12, [0] * 12, [1, 0.5])]
+
+    def test_same_results_as_object_backward_induction(self):
+        for price_strategy_type in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH,
+                                    PriceStrategyType.BOTH_BUY]:
+            for product_information in self.product_informations:
+                for n_upgrade in [1, 7, 12]:
+                    for valuation in [0, 10, 25, 49]:
+                        for engagement_factor in [0.5, 0.9]:
+                            for quality_decay_factor in [0.85, 0.95]:
+                                user_type = UserType(1, engagement_factor, quality_decay_factor, valuation)
+                                expected_game = create_game(product_information, user_type, self.n_max, n_upgrade,
+                                                            price_strategy_type)
+                                calculated_game = create_game(product_information, user_type, self.n_max, n_upgrade,
+                                                              price_strategy_type)
+                                calculate_optimal_user_actions(expected_game)
+                                calculate_optimal_user_actions_tensorized(calculated_game)
+                                self.compare_user_states(expected_game, calculated_game)
+
+                                calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(
+                                    expected_game)
+                                calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(
+                                    calculated_game)
+                                self.assertEqual(expected_game.expected_publisher_revenue,
+                                                 calculated_game.expected_publisher_revenue)
+                                self.assertEqual(expected_game.expected_user_welfare,
+                                                 calculated_game.expected_user_welfare)
+
+    def test_same_results_for_all_user_types_and_arrival_times(self):
+        valuations = [0, 10, 25, 49, 10, 25, 49]
+        quality_decay_factors = [0.85, 0.85, 0.95, 0.95, 0.95, 0.85, 0.85]
+        engagement_factors = [0.5, 0.9, 0.5, 0.9, 0.5, 0.5, 0.9]
+        for price_strategy_type in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH,
+                                    PriceStrategyType.BOTH_BUY]:
+            for product_information in self.product_informations:
+                for n_upgrade in [1, 7, 12]:
+                    tensorized_game = solve_user_types_tensorized(product_information, self.n_max, n_upgrade,
+                                                                  price_strategy_type, valuations,
+                                                                  quality_decay_factors, engagement_factors)
+                    for k in range(len(valuations)):
+                        user_type = UserType(None, engagement_factors[k], quality_decay_factors[k], valuations[k])
+                        for arrival_time in range(1, self.n_max + 1):
+                            user_type.arrival_time = arrival_time
+                            expected_game = create_game(product_information, user_type, self.n_max, n_upgrade,
+                                                        price_strategy_type)
+                            calculate_optimal_user_actions(expected_game)
+                            calculate_probabilities_states_are_reached_and_publisher_revenue_and_user_welfare(
+                                expected_game)
+                            revenue_base_product, revenue_upgrade, revenue_subscription = get_revenue_per_timestep(
+                                expected_game)
+
+                            self.assertAlmostEqual(expected_game.expected_publisher_revenue,
+                                                   tensorized_game.expected_publisher_revenue[k, arrival_time - 1])
+                            self.assertAlmostEqual(expected_game.expected_user_welfare,
+                                                   tensorized_game.expected_user_welfare[k, arrival_time - 1])
+                            for t in range(self.n_max):
+                                self.assertAlmostEqual(revenue_base_product[t],
+                                                       tensorized_game.revenue_base_product[k, arrival_time - 1, t])
+                                self.assertAlmostEqual(revenue_upgrade[t],
+                                                       tensorized_game.revenue_upgrade[k, arrival_time - 1, t])
+                                self.assertAlmostEqual(revenue_subscription[t],
+                                                       tensorized_game.revenue_subscription[k, arrival_time - 1, t])
+
+    def test_arrival_mixture(self):
+        valuations = [0, 10, 25, 49]
+        quality_decay_factors = [0.85, 0.85, 0.95, 0.95]
+        engagement_factors = [0.5, 0.9, 0.5, 0.9]
+        probabilities = np.random.default_rng(0).random((len(valuations), self.n_max))
+        probabilities[:, 2] = 0
+        probabilities /= probabilities.sum()
+        for price_strategy_type in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH,
+                                    PriceStrategyType.BOTH_BUY]:
+            for product_information in self.product_informations:
+                expected_game = solve_user_types_tensorized(product_information, self.n_max, 7, price_strategy_type,
+                                                            valuations, quality_decay_factors, engagement_factors)
+                calculated_game = solve_user_types_tensorized(product_information, self.n_max, 7,
+                                                              price_strategy_type, valuations, quality_decay_factors,
+                                                              engagement_factors, probabilities)
+                # the states of a timestep are reached by all users arrived until then
+                np.testing.assert_allclose(calculated_game.probability_state_is_reached[:, 0].sum(axis=2),
+                                           np.cumsum(probabilities, axis=1), rtol=1e-12, atol=1e-12)
+                np.testing.assert_allclose(calculated_game.expected_publisher_revenue[:, 0],
+                                           (expected_game.expected_publisher_revenue * probabilities).sum(axis=1),
+                                           rtol=1e-12, atol=1e-12)
+                np.testing.assert_allclose(calculated_game.expected_user_welfare[:, 0],
+                                           (expected_game.expected_user_welfare * probabilities).sum(axis=1),
+                                           rtol=1e-12, atol=1e-12)
+                for revenue_type in ["revenue_base_product", "revenue_upgrade", "revenue_subscription"]:
+                    np.testing.assert_allclose(
+                        getattr(calculated_game, revenue_type)[:, 0],
+                        (getattr(expected_game, revenue_type) * probabilities[:, :, None]).sum(axis=1),
+                        rtol=1e-12, atol=1e-12)
+
+    def test_revenue_from_backward_induction(self):
+        valuations = [0, 10, 25, 49]
+        quality_decay_factors = [0.85, 0.85, 0.95, 0.95]
+        engagement_factors = [0.5, 0.9, 0.5, 0.9]
+        probabilities = np.random.default_rng(1).random((len(valuations), self.n_max))
+        probabilities /= probabilities.sum()
+        for price_strategy_type in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH,
+                                    PriceStrategyType.BOTH_BUY]:
+            for product_information in self.product_informations:
+                for probabilities_arrival_time in [None, probabilities]:
+                    expected_game = solve_user_types_tensorized(product_information, self.n_max, 7,
+                                                                price_strategy_type, valuations,
+                                                                quality_decay_factors, engagement_factors,
+                                                                probabilities_arrival_time)
+                    calculated_game = solve_user_types_tensorized(product_information, self.n_max, 7,
+                                                                  price_strategy_type, valuations,
+                                                                  quality_decay_factors, engagement_factors,
+                                                                  probabilities_arrival_time,
+                                                                  is_forward_pass_needed=False)
+                    np.testing.assert_allclose(calculated_game.expected_publisher_revenue,
+                                               expected_game.expected_publisher_revenue, rtol=1e-12, atol=1e-12)
+                    np.testing.assert_allclose(calculated_game.expected_user_welfare,
+                                               expected_game.expected_user_welfare, rtol=1e-12, atol=1e-12)
+
+    def compare_user_states(self, expected_game, calculated_game):
+        for t in range(self.n_max):
+            for expected_state, calculated_state in zip(expected_game.user_states[t], calculated_game.user_states[t]):
+                self.assertEqual(expected_state.best_action.subscribe_action,
+                                 calculated_state.best_action.subscribe_action)
+                self.assertEqual(expected_state.best_action.buy_action.base_product,
+                                 calculated_state.best_action.buy_action.base_product)
+                self.assertEqual(expected_state.best_action.buy_action.upgrade,
+                                 calculated_state.best_action.buy_action.upgrade)
+                self.assertEqual(expected_state.expected_utility, calculated_state.expected_utility)
+                self.assertEqual(expected_state.expected_payment_in_future,
+                                 calculated_state.expected_payment_in_future)
+                self.assertEqual(expected_state.immediate_payment, calculated_state.immediate_payment)
+                self.assertEqual(expected_state.immediate_utility, calculated_state.immediate_utility)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+import numpy as np
+
+from src.model.game.price_strategy_type import PriceStrategyType
+from src.model.publisher.productinformation import ProductInformation
+from src.model.user.user_type import get_user_types_of_population
+from src.numerical_framework.helpers.framework_creators import DifferentialEvolutionCreator
+from src.numerical_framework.tensorized_backward_induction.tensorized_backward_induction import \
+    solve_user_types_tensorized
+from src.numerical_framework.tensorized_backward_induction.valuation_breakpoints import \
+    find_valuation_breakpoints, get_population_revenue_and_welfare_with_exact_valuations
+
+
+class TestValuationBreakpoints(unittest.TestCase):
+    def setUp(self):
+        self.creator = DifferentialEvolutionCreator()
+        self.creator.n_max = 12
+        self.creator.n_upgrade = 7
+        self.creator.quality_decay_factors = [0.85, 0.9, 0.95]
+        self.creator.engagement_factor_long_term_user = 0.9
+        self.creator.probability_short_term_user = 0.8
+        self.creator.valuation_range = [0, 50]
+        base_price = [45.82, 45.82, 45.82, 45.82, 45.82, 45.82, 21.8, 21.8, 21.8, 21.8, 21.8, 21.8]
+        upgrade_price = [18.06] * 12
+        subscription_price = [10, 10, 10, 10, 10, 10, 9, 9, 9, 9, 9, 9]
+        self.product_information = ProductInformation(base_price, upgrade_price, subscription_price, [1, 0.5])
+
+    def test_same_policy_between_breakpoints(self):
+        for price_strategy_type in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH]:
+            valuation_breakpoints = find_valuation_breakpoints(self.product_information, 12, 7, price_strategy_type,
+                                                               [0, 50], [0.9], [0.5])[0]
+            breakpoints = valuation_breakpoints.get_breakpoints()
+            # on both sides of every breakpoint, revenue is constant and welfare is the line of the policy
+            for j in range(len(valuation_breakpoints.valuations) - 1):
+                for arrival_time_index in range(12):
+                    lower_valuation = valuation_breakpoints.valuations[j]
+                    upper_valuation = valuation_breakpoints.valuations[j + 1]
+                    breakpoint = breakpoints[j, arrival_time_index]
+                    for valuation, point in [((2 * lower_valuation + breakpoint) / 3, j),
+                                             ((breakpoint + 2 * upper_valuation) / 3, j + 1)]:
+                        # at the breakpoint (and the valuations evaluated), both policies are optimal
+                        if min(abs(valuation - lower_valuation), abs(valuation - upper_valuation),
+                               abs(valuation - breakpoint)) < 1e-6:
+                            continue
+                        tensorized_game = solve_user_types_tensorized(self.product_information, 12, 7,
+                                                                      price_strategy_type, [valuation], [0.9], [0.5],
+                                                                      is_forward_pass_needed=False)
+                        self.assertAlmostEqual(
+                            valuation_breakpoints.expected_publisher_revenue[point, arrival_time_index],
+                            tensorized_game.expected_publisher_revenue[0, arrival_time_index], places=9)
+                        self.assertAlmostEqual(
+                            valuation_breakpoints.expected_reward[point, arrival_time_index] * valuation -
+                            valuation_breakpoints.expected_publisher_revenue[point, arrival_time_index],
+                            tensorized_game.expected_user_welfare[0, arrival_time_index], places=9)
+
+    def test_few_valuations_are_solved(self):
+        for price_strategy_type in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH]:
+            valuation_breakpoints = find_valuation_breakpoints(self.product_information, 12, 7, price_strategy_type,
+                                                               [0, 50], [0.9], [0.5])[0]
+            # a solve at the intersection of two lines either is the breakpoint or finds the line of a new policy
+            number_of_policy_changes = np.count_nonzero(~valuation_breakpoints.is_same_line_as_next())
+            self.assertLessEqual(len(valuation_breakpoints.valuations), 2 * number_of_policy_changes + 2)
+
+    def test_revenue_per_timestep_sums_up_to_revenue(self):
+        self.creator.price_strategy_type = PriceStrategyType.BOTH
+        revenue, welfare = get_population_revenue_and_welfare_with_exact_valuations(
+            self.product_information, self.creator, 5, 0.8, 0.5, 10)
+        revenue_with_breakdown, welfare_with_breakdown, revenue_per_timestep = \
+            get_population_revenue_and_welfare_with_exact_valuations(self.product_information, self.creator, 5, 0.8,
+                                                                     0.5, 10, is_breakdown_needed=True)
+        self.assertAlmostEqual(revenue, revenue_with_breakdown)
+        self.assertAlmostEqual(welfare, welfare_with_breakdown)
+        self.assertAlmostEqual(revenue, sum(sum(revenue_of_product) for revenue_of_product in revenue_per_timestep))
+
+    def test_population_revenue_converges_to_many_valuations(self):
+        for price_strategy_type in [PriceStrategyType.BUY, PriceStrategyType.SUB, PriceStrategyType.BOTH]:
+            self.creator.price_strategy_type = price_strategy_type
+            revenue, welfare = get_population_revenue_and_welfare_with_exact_valuations(
+                self.product_information, self.creator, 5, 0.8, 0.5, 10)
+            valuations, quality_decay_factors, engagement_factors, probabilities, _ = get_user_types_of_population(
+                self.creator, 1000, 5, 0.8, 0.5, 10)
+            tensorized_game = solve_user_types_tensorized(self.product_information, 12, 7, price_strategy_type,
+                                                          valuations, quality_decay_factors, engagement_factors,
+                                                          probabilities)
+            self.assertAlmostEqual(tensorized_game.expected_publisher_revenue.sum(), revenue, places=1)
+            self.assertAlmostEqual(tensorized_game.expected_user_welfare.sum(), welfare, places=3)
+
+    def test_standard_deviation_zero(self):
+        self.creator.price_strategy_type = PriceStrategyType.BOTH
+        revenue, welfare = get_population_revenue_and_welfare_with_exact_valuations(self.product_information,
+                                                                                    self.creator, 5, 0.8, 0.5, 0)
+        valuations, quality_decay_factors, engagement_factors, probabilities, _ = get_user_types_of_population(
+            self.creator, 1, 5, 0.8, 0.5, 0)
+        tensorized_game = solve_user_types_tensorized(self.product_information, 12, 7, PriceStrategyType.BOTH,
+                                                      valuations, quality_decay_factors, engagement_factors,
+                                                      probabilities)
+        self.assertAlmostEqual(tensorized_game.expected_publisher_revenue.sum(), revenue)
+        self.assertAlmostEqual(tensorized_game.expected_user_welfare.sum(), welfare)
+
+
+if __name__ == '__main__':
+    unittest.main()